@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+font-v benchmark suite
+
+Times FontVersion instantiation, parsing, setter methods, write_version_string, and end-to-end
+`font-v report` / `font-v write` runs.  Large fonts and a font directory corpus are generated
+deterministically from a seed with tests/fontgen.py.  Results are written as JSON so that runs can be
+compared with a threshold-based regression check.  No network access is required.
+
+Usage (from the root of the repository):
+
+    $ python benchmarks/fontv_benchmarks.py --output results.json
+    $ python benchmarks/fontv_benchmarks.py --compare results.json --threshold 1.25
+"""
+
+from __future__ import unicode_literals
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPOSITORY_ROOT, "lib"))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+import fontTools  # noqa: E402
+
+from fontv import app  # noqa: E402
+from fontv.libfv import FontVersion  # noqa: E402
+from fontv.settings import VERSION  # noqa: E402
+from tests import fontgen  # noqa: E402
+
+TESTFILES_DIR = os.path.join(REPOSITORY_ROOT, "tests", "testfiles")
+SMALL_FONTS = [
+    os.path.join(TESTFILES_DIR, "Test-VersionShaDEVMeta.ttf"),
+    os.path.join(TESTFILES_DIR, "Test-VersionShaDEVMeta.otf"),
+]
+# generated fonts: (file name, fontgen.FontSpec)
+GENERATED_FONTS = [
+    # name table string storage offsets are 16-bit, keep the string data below 64 KB
+    ("Test-LargeNameTable.ttf", fontgen.FontSpec(name_record_count=2000)),
+    (
+        "Test-ManyNameID5.otf",
+        fontgen.FontSpec(
+            nameid5_record_count=500,
+            platforms=("unicode", "mac", "windows"),
+            version_string="Version 1.010;[abcd123]-dev",
+            font_revision=1.010,
+            flavor="otf",
+        ),
+    ),
+    ("Test-65kGlyphs.ttf", fontgen.FontSpec(glyph_count=65535)),
+]
+# generated font directory corpus for the end-to-end runs
+CORPUS_SIZE = 50
+CORPUS_UNIQUE = 10
+DEFAULT_SEED = 20180101
+
+# benchmark result format version
+RESULTS_FORMAT = 1
+
+
+def time_function(function, number, repeat):
+    """
+    Returns a dictionary of timing statistics for function.  function is called number times per repeat and the
+    per-call time is recorded for each repeat.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_main(*args):
+    """Runs the font-v executable entry point with args and discards standard output"""
+    argv = sys.argv
+    sys.argv = ["font-v"] + list(args)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = argv
+
+
+def get_benchmarks(workdir, seed=DEFAULT_SEED):
+    """
+    Returns a list of (benchmark name, function) tuples.  Fonts that are modified are copied or generated in workdir.
+    The corpus used in the end-to-end runs is generated from seed.
+    """
+    fontpaths = []
+    for sourcepath in SMALL_FONTS:
+        fontpath = os.path.join(workdir, os.path.basename(sourcepath))
+        shutil.copy(sourcepath, fontpath)
+        fontpaths.append(fontpath)
+    for filename, spec in GENERATED_FONTS:
+        fontpaths.append(fontgen.write_font(spec, os.path.join(workdir, filename)))
+    corpus_fontpaths = fontgen.generate_corpus(
+        os.path.join(workdir, "corpus"),
+        seed,
+        CORPUS_SIZE,
+        unique=CORPUS_UNIQUE,
+        name_record_count=(0, 10, 100),
+        platforms=(("windows",), ("mac", "windows"), ("unicode", "mac", "windows")),
+        flavor=("ttf", "otf"),
+    )
+
+    benchmarks = []
+    for fontpath in fontpaths:
+        label = os.path.basename(fontpath)
+        fv = FontVersion(fontpath)
+        # a fixed commit SHA1 isolates the setter benchmark from git subprocess timing
+        fv._get_repo_commit = lambda: "abcd123"
+        outpath = os.path.join(workdir, "out-" + os.path.basename(fontpath))
+
+        benchmarks.extend(
+            [
+                ("construct[" + label + "]", lambda p=fontpath: FontVersion(p)),
+                ("parse[" + label + "]", fv._parse),
+                (
+                    "set_version_number[" + label + "]",
+                    lambda fv=fv: fv.set_version_number("2.000"),
+                ),
+                (
+                    "set_development_status[" + label + "]",
+                    fv.set_development_status,
+                ),
+                ("set_release_status[" + label + "]", fv.set_release_status),
+                (
+                    "set_state_git_commit_sha1[" + label + "]",
+                    lambda fv=fv: fv.set_state_git_commit_sha1(development=True),
+                ),
+                (
+                    "write_version_string[" + label + "]",
+                    lambda fv=fv, o=outpath: fv.write_version_string(fontpath=o),
+                ),
+            ]
+        )
+
+    benchmarks.extend(
+        [
+            ("app_report", lambda: run_main("report", *fontpaths)),
+            ("app_report_dev", lambda: run_main("report", "--dev", *fontpaths)),
+            ("app_write", lambda: run_main("write", "--ver=2.000", "--dev", *fontpaths)),
+            ("app_report[corpus]", lambda: run_main("report", *corpus_fontpaths)),
+            (
+                "app_report_prefetch[corpus]",
+                lambda: run_main("report", "--prefetch=8", *corpus_fontpaths),
+            ),
+            (
+                "app_write[corpus]",
+                lambda: run_main("write", "--ver=2.000", "--dev", *corpus_fontpaths),
+            ),
+        ]
+    )
+    return benchmarks
+
+
+def run_benchmarks(number=20, repeat=5, name_filter=None, seed=DEFAULT_SEED):
+    """
+    Runs the benchmark suite and returns a JSON serializable results dictionary.
+
+    :param number: (int) calls per repeat
+    :param repeat: (int) number of timed repeats
+    :param name_filter: (string) optional substring.  Only benchmarks with names that include the string are run
+    :param seed: (int) generated corpus seed
+    :return: (dict)
+    """
+    workdir = tempfile.mkdtemp(prefix="font-v-bench-")
+    try:
+        results = {}
+        for name, function in get_benchmarks(workdir, seed):
+            if name_filter is not None and name_filter not in name:
+                continue
+            function()  # warm up (lazy table loads, imports)
+            results[name] = time_function(function, number, repeat)
+    finally:
+        shutil.rmtree(workdir)
+
+    return {
+        "format": RESULTS_FORMAT,
+        "meta": {
+            "font-v": VERSION,
+            "fonttools": fontTools.version,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Compares the median timings of two result dictionaries.
+
+    :param baseline: (dict) baseline run_benchmarks() results
+    :param current: (dict) current run_benchmarks() results
+    :param threshold: (float) maximum permitted current / baseline median ratio
+    :return: (list) of (benchmark name, baseline median, current median, ratio, is regression) tuples
+    """
+    comparisons = []
+    for name, current_result in sorted(current["results"].items()):
+        if name not in baseline["results"]:
+            continue
+        baseline_median = baseline["results"][name]["median"]
+        current_median = current_result["median"]
+        ratio = current_median / baseline_median if baseline_median > 0 else 1.0
+        comparisons.append(
+            (name, baseline_median, current_median, ratio, ratio > threshold)
+        )
+    return comparisons
+
+
+def format_comparisons(comparisons):
+    lines = []
+    for name, baseline_median, current_median, ratio, is_regression in comparisons:
+        lines.append(
+            "{} {:<50} {:>12.1f} us {:>12.1f} us {:>7.2f}x".format(
+                "[X]" if is_regression else "[✓]",
+                name,
+                baseline_median * 1e6,
+                current_median * 1e6,
+                ratio,
+            )
+        )
+    return os.linesep.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="font-v benchmark suite")
+    parser.add_argument("--output", help="write JSON results to this path")
+    parser.add_argument("--compare", help="baseline JSON results path for a regression check")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="maximum permitted current / baseline median ratio (default: 1.25)",
+    )
+    parser.add_argument("--number", type=int, default=20, help="calls per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats")
+    parser.add_argument("--filter", help="only run benchmarks with names that include this string")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help="generated corpus seed (default: " + str(DEFAULT_SEED) + ")",
+    )
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.number, args.repeat, args.filter, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparisons = compare_results(baseline, current, args.threshold)
+        print(format_comparisons(comparisons))
+        regressions = [c for c in comparisons if c[4]]
+        if len(regressions) > 0:
+            print(
+                os.linesep
+                + str(len(regressions))
+                + " benchmark(s) exceeded the "
+                + str(args.threshold)
+                + "x threshold"
+            )
+            return 1
+    else:
+        for name, result in sorted(current["results"].items()):
+            print("{:<54} {:>12.1f} us".format(name, result["median"] * 1e6))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+asyncio API for font version reads, reports, and writes.
+
+Font file I/O and fontTools parse / compile work run on an executor so that the event loop is not blocked.  The
+default executor is the event loop default executor (a thread pool).  Pass a concurrent.futures executor to use a
+different pool.  ProcessPoolExecutor pools are supported by the report and write functions.  git commit SHA1
+lookups run as asyncio subprocesses.  An asyncio.Semaphore bounds the number of fonts that are read or written at
+the same time.
+"""
+
+from __future__ import unicode_literals
+
+import asyncio
+
+from git.exc import GitCommandError
+
+from fontv.libfv import FontVersion
+from fontv.report import FontReport, read_font_report as _read_font_report
+from fontv.telemetry import count, span
+from fontv.utilities import get_git_root_path
+
+# default maximum number of concurrent font reads / writes in report_fonts() and write_fonts()
+DEFAULT_CONCURRENCY = 16
+
+
+async def get_git_commit_sha1(gitroot_path):
+    """
+    Returns the short git commit SHA1 hash string for the commit at HEAD of a git repository.  git runs as an asyncio
+    subprocess.
+
+    :param gitroot_path: (string) path to the root directory of the git repository
+    :return: (string) short git commit SHA1 hash string
+    :raises: git.exc.GitCommandError if the git call fails
+    """
+    command = ["git", "rev-list", "--abbrev-commit", "--max-count=1", "--format=%h", "HEAD"]
+    count("git_calls")
+    with span("git.commit_sha1"):
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=gitroot_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise GitCommandError(command, process.returncode, stderr)
+    # output format: "commit [full sha1]\n[short sha1]\n"
+    return stdout.decode("utf-8").split("\n")[1].strip()
+
+
+async def get_git_sha1_cache(fontpaths, git_sha1_cache=None):
+    """
+    Returns a {git root path : short git commit SHA1 hash string} map for the git repositories that contain fontpaths.
+    One git subprocess runs per repository and the subprocesses run concurrently.
+
+    :param fontpaths: (iterable) font file paths
+    :param git_sha1_cache: (dict) optional existing map to update
+    :return: (dict)
+    :raises: IOError if the git repository root cannot be identified for a font path
+    :raises: git.exc.GitCommandError if a git call fails
+    """
+    if git_sha1_cache is None:
+        git_sha1_cache = {}
+    gitroot_paths = []
+    for fontpath in fontpaths:
+        gitroot_path = get_git_root_path(fontpath)
+        if gitroot_path not in git_sha1_cache and gitroot_path not in gitroot_paths:
+            gitroot_paths.append(gitroot_path)
+    sha1_strings = await asyncio.gather(
+        *[get_git_commit_sha1(gitroot_path) for gitroot_path in gitroot_paths]
+    )
+    git_sha1_cache.update(zip(gitroot_paths, sha1_strings))
+    return git_sha1_cache
+
+
+async def read_font_version(font, executor=None, semaphore=None):
+    """
+    Returns a FontVersion object for a font.  The font is read on the executor.  Close the FontVersion object when it is
+    no longer needed.
+
+    :param font: any font argument that is supported by the fontv.libfv.FontVersion constructor
+    :param executor: (concurrent.futures.Executor) optional executor.  Default = event loop default executor
+    :param semaphore: (asyncio.Semaphore) optional concurrency limit
+    :return: (fontv.libfv.FontVersion)
+    """
+    return await _run(FontVersion, font, executor, semaphore)
+
+
+async def read_font_report(font, executor=None, semaphore=None):
+    """
+    Returns the version data of a font.  The font is read and closed on the executor.
+
+    :param font: any font argument that is supported by the fontv.libfv.FontVersion constructor
+    :param executor: (concurrent.futures.Executor) optional executor.  Default = event loop default executor
+    :param semaphore: (asyncio.Semaphore) optional concurrency limit
+    :return: (fontv.report.FontReport)
+    """
+    return await _run(_read_font_report, font, executor, semaphore)
+
+
+async def report_fonts(fonts, executor=None, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Returns the version data of a sequence of fonts with up to `concurrency` fonts read at the same time.
+
+    :param fonts: (iterable) of fonts in any format that is supported by the fontv.libfv.FontVersion constructor
+    :param executor: (concurrent.futures.Executor) optional executor.  Default = event loop default executor
+    :param concurrency: (int) maximum number of fonts that are read at the same time
+    :return: (list) of fontv.report.FontReport objects in the order of fonts
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *[read_font_report(font, executor, semaphore) for font in fonts]
+    )
+
+
+async def write_font(
+    fontpath, write_request, executor=None, semaphore=None, git_sha1_cache=None
+):
+    """
+    Applies a WriteRequest to a font file and writes the font.  The git commit SHA1 lookup for sha1 state requests
+    runs as an asyncio subprocess before the font is modified on the executor.
+
+    :param fontpath: (string) font file path
+    :param write_request: (fontv.batch.WriteRequest) the modifications to write
+    :param executor: (concurrent.futures.Executor) optional executor.  Default = event loop default executor
+    :param semaphore: (asyncio.Semaphore) optional concurrency limit
+    :param git_sha1_cache: (dict) optional {git root path : short git commit SHA1 hash string} map
+    :return: (fontv.report.FontReport) version data of the written font
+    :raises: IOError if the git repository root cannot be identified for a sha1 state request
+    :raises: git.exc.GitCommandError if the git call fails
+    """
+    if git_sha1_cache is None:
+        git_sha1_cache = {}
+    if write_request.sha1:
+        await get_git_sha1_cache([fontpath], git_sha1_cache)
+    return await _run(
+        _write_font, (fontpath, write_request, git_sha1_cache), executor, semaphore
+    )
+
+
+async def write_fonts(
+    fontpaths, write_request, executor=None, concurrency=DEFAULT_CONCURRENCY
+):
+    """
+    Applies a WriteRequest to a sequence of font files with up to `concurrency` fonts written at the same time.  One
+    git subprocess runs per repository for sha1 state requests.
+
+    :param fontpaths: (iterable) font file paths
+    :param write_request: (fontv.batch.WriteRequest) the modifications to write
+    :param executor: (concurrent.futures.Executor) optional executor.  Default = event loop default executor
+    :param concurrency: (int) maximum number of fonts that are written at the same time
+    :return: (list) of fontv.report.FontReport objects in the order of fontpaths
+    :raises: IOError if the git repository root cannot be identified for a sha1 state request
+    :raises: git.exc.GitCommandError if a git call fails
+    """
+    fontpaths = list(fontpaths)
+    git_sha1_cache = {}
+    if write_request.sha1:
+        await get_git_sha1_cache(fontpaths, git_sha1_cache)
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *[
+            write_font(fontpath, write_request, executor, semaphore, git_sha1_cache)
+            for fontpath in fontpaths
+        ]
+    )
+
+
+async def _run(function, argument, executor, semaphore):
+    loop = asyncio.get_running_loop()
+    if semaphore is None:
+        return await loop.run_in_executor(executor, function, argument)
+    async with semaphore:
+        return await loop.run_in_executor(executor, function, argument)
+
+
+def _write_font(task):
+    """Executor function that applies a WriteRequest to a font, writes the font, and returns a FontReport"""
+    fontpath, write_request, git_sha1_cache = task
+    with FontVersion(fontpath) as fv:
+        fv.git_sha1_cache = git_sha1_cache
+        write_request.apply(fv)
+        fv.write_version_string()
+        return FontReport.from_font_version(fv)
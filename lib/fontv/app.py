@@ -14,13 +14,75 @@
 
 from __future__ import unicode_literals
 
+import collections
+import io
+import json
 import os
 import sys
 
+from fontTools.ttLib import TTLibError
+from git.exc import GitCommandError, InvalidGitRepositoryError
+
 from fontv import settings
+from fontv.archive import (
+    is_archive_path,
+    iter_archive_fonts,
+    read_archive_font,
+    split_archive_path,
+    write_archive,
+)
+from fontv.batch import WriteRequest, get_git_sha1_cache
+from fontv.check import check_fonts, find_font_files
 from fontv.commandlines import Command
-from fontv.libfv import FontVersion
-from fontv.utilities import file_exists, is_font
+from fontv.dedupe import LINK_MODES, fan_out, file_digest, group_identical_files
+from fontv.diff import diff_trees
+from fontv.gitfiles import get_changed_fonts, read_changed_font
+from fontv.journal import WriteJournal
+from fontv.libfv import FontVersion, is_valid_version_number
+from fontv.locking import (
+    LOCK_NOWAIT,
+    LOCK_WAIT,
+    LOCKED_FAILURE_MESSAGE,
+    FontLock,
+    FontLockedError,
+)
+from fontv.manifest import (
+    ManifestError,
+    apply_manifest,
+    format_results_table,
+    get_manifest_git_sha1_cache,
+    read_manifest,
+    resolve_manifest,
+)
+from fontv.metrics import RunMetrics
+from fontv.output import get_input_root, get_output_path
+from fontv.prefetch import DEFAULT_PREFETCH_DEPTH, FontPrefetcher
+from fontv.report import iter_font_reports, read_font_report, read_font_reports
+from fontv.snapshot import SnapshotWriter, read_snapshot, revert_fonts
+from fontv.telemetry import (
+    PhaseProfile,
+    add_span_callback,
+    count,
+    remove_span_callback,
+    span,
+)
+from fontv.transaction import TransactionError, write_fonts_transactional
+from fontv.ufo import (
+    UFOVersion,
+    get_ufo_paths,
+    is_ufo_source_path,
+    read_ufo_reports,
+    verify_ufo_version,
+)
+from fontv.utilities import (
+    dir_exists,
+    file_exists,
+    get_font_flavor,
+    get_git_root_path,
+    is_font,
+)
+from fontv.verify import verify_font_version
+from fontv.watch import ERROR, FontWatcher
 
 
 def main():
@@ -43,6 +105,60 @@ def main():
         print(settings.USAGE)
         sys.exit(0)
 
+    # --profile prints an aggregate per-phase timing table to the standard error stream at the end of the run
+    profile = None
+    if "--profile" in c.argv:
+        profile = PhaseProfile()
+        add_span_callback(profile)
+    # --metrics=[path] writes the run counters and phase wall times to a Prometheus textfile or JSON file
+    run_metrics = None
+    if c.contains_definitions("metrics"):
+        run_metrics = RunMetrics(c.subcmd)
+        run_metrics.start()
+    exit_code = 0
+    try:
+        with span("cli." + c.subcmd):
+            _run_subcommand(c)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 1
+        raise
+    except Exception:
+        # unhandled font errors (e.g. IndexError for fonts without nameID 5 records) are reported as failed runs
+        exit_code = 1
+        count("errors")
+        raise
+    finally:
+        if profile is not None:
+            remove_span_callback(profile)
+            sys.stderr.write(
+                os.linesep + "[font-v] profile:" + os.linesep + profile.format_table() + os.linesep
+            )
+        if run_metrics is not None:
+            if exit_code != 0 and run_metrics.counters["errors"] == 0:
+                # fatal command error
+                run_metrics.add_count("errors", 1)
+            run_metrics.stop(exit_code)
+            metrics_path = c.get_definition("metrics")
+            try:
+                run_metrics.write(metrics_path)
+            except (IOError, OSError) as e:
+                sys.stderr.write(
+                    "[font-v] ERROR: unable to write metrics file "
+                    + metrics_path
+                    + ": "
+                    + str(e)
+                    + os.linesep
+                )
+                sys.exit(1)
+
+
+def _run_subcommand(c):
+    """
+    Runs the font-v subcommand request.  Exits with status code 1 on errors.
+
+    :param c: (fontv.commandlines.Command) the parsed command
+    :return: None
+    """
     if c.subcmd == "report":
         # argument test
         if c.argc < 2:
@@ -52,31 +168,204 @@ def main():
             )
             sys.exit(1)
 
-        for arg in c.argv[1:]:
-            if is_font(arg):
-                font_path = arg
-                if file_exists(font_path):
-                    fv = FontVersion(font_path)
-                    print(os.linesep + fv.fontpath + ":")
-                    print("----- name.ID = 5:")
-                    # --dev switch report prints every version string in name records
-                    if "--dev" in c.argv:
-                        for record, v_string in fv.name_ID5_dict.items():
-                            devstring = str(record) + ":" + os.linesep + str(v_string)
-                            print(devstring)
-                    else:  # default report handling
-                        print(fv.get_name_id5_version_string())
-                    print("----- head.fontRevision:")
-                    head_fontrevision = fv.get_head_fontrevision_version_number()
-                    print("{:.3f}".format(head_fontrevision))
-                else:
-                    sys.stderr.write(
-                        "[font-v] ERROR: "
-                        + font_path
-                        + " does not appear to be a valid ttf "
-                        "or otf font file path." + os.linesep
-                    )
-                    sys.exit(1)
+        # --keep-going collects per-font errors as (font path, error message) tuples and continues with the next font
+        keep_going = "--keep-going" in c.argv
+        failures = []
+        font_count = 0
+
+        # --staged and --changed-since select fonts with git rather than with command line paths
+        if _is_git_selection_request(c):
+            changed_fonts = _get_git_selection(c)
+            if not keep_going:
+                fontstreams = (read_changed_font(changed_font) for changed_font in changed_fonts)
+                for report in iter_font_reports(fontstreams):
+                    _print_report(report, "--dev" in c.argv)
+                sys.exit(0)
+            for changed_font in changed_fonts:
+                font_count += 1
+                try:
+                    report = read_font_report(read_changed_font(changed_font))
+                except Exception as e:
+                    failures.append((changed_font.path, _format_exception(e)))
+                    continue
+                _print_report(report, "--dev" in c.argv)
+            _exit_on_failures(failures, font_count)
+            sys.exit(0)
+
+        # --dedupe parses byte-identical font files once.
+        # {font path : representative font path of the identical content group} map
+        representative_map = {}
+        # {representative font path : number of font paths in the content group} map
+        group_size_map = {}
+        # {representative font path : [list of FontReport, number of reports remaining]} map
+        parsed_map = {}
+        dedupe_stats = None
+        if "--dedupe" in c.argv:
+            dedupe_paths = [arg for arg in c.argv[1:] if _is_font_file_candidate(arg)]
+            with span("dedupe.group"):
+                groups, dedupe_stats = group_identical_files(dedupe_paths)
+            for group in groups:
+                group_size_map[group[0]] = len(group)
+                for font_path in group:
+                    representative_map[font_path] = group[0]
+
+        # --prefetch=[n] reads the version data of the next n fonts on a thread pool while a font is parsed
+        prefetcher = None
+        if c.contains_definitions("prefetch"):
+            prefetch_depth = _get_positive_integer_definition(c, "prefetch")
+            # font paths in parse order
+            prefetch_paths = []
+            for arg in c.argv[1:]:
+                if _is_font_file_candidate(arg):
+                    prefetch_paths.append(representative_map.get(arg, arg))
+            prefetch_paths = list(collections.OrderedDict.fromkeys(prefetch_paths))
+            prefetcher = FontPrefetcher(prefetch_paths, prefetch_depth)
+
+        try:
+            for arg in c.argv[1:]:
+                if is_archive_path(arg):
+                    # zip and tar archive fonts are streamed through memory without extraction
+                    archive_path, member = split_archive_path(arg)
+                    if not file_exists(archive_path):
+                        if keep_going:
+                            font_count += 1
+                            failures.append((archive_path, "archive file not found"))
+                            continue
+                        sys.stderr.write(
+                            "[font-v] ERROR: "
+                            + archive_path
+                            + " does not appear to be a valid archive file path."
+                            + os.linesep
+                        )
+                        sys.exit(1)
+                    if member is None:
+                        if not keep_going:
+                            for report in iter_font_reports(iter_archive_fonts(archive_path)):
+                                _print_report(report, "--dev" in c.argv)
+                            continue
+                        try:
+                            for fontstream in iter_archive_fonts(archive_path):
+                                font_count += 1
+                                try:
+                                    report = read_font_report(fontstream)
+                                except Exception as e:
+                                    failures.append((fontstream.name, _format_exception(e)))
+                                    continue
+                                _print_report(report, "--dev" in c.argv)
+                        except Exception as e:
+                            font_count += 1
+                            failures.append((archive_path, _format_exception(e)))
+                    else:
+                        font_count += 1
+                        try:
+                            with span("archive.read"):
+                                fontstream = read_archive_font(arg)
+                        except KeyError:
+                            if keep_going:
+                                failures.append((arg, "archive member not found"))
+                                continue
+                            sys.stderr.write(
+                                "[font-v] ERROR: "
+                                + arg
+                                + " does not appear to be a valid archive member path."
+                                + os.linesep
+                            )
+                            sys.exit(1)
+                        try:
+                            report = read_font_report(fontstream)
+                        except Exception as e:
+                            if not keep_going:
+                                raise
+                            failures.append((arg, _format_exception(e)))
+                            continue
+                        _print_report(report, "--dev" in c.argv)
+                elif is_ufo_source_path(arg):
+                    # UFO sources and the UFO sources of .designspace files are read from fontinfo.plist
+                    if not os.path.exists(arg):
+                        if keep_going:
+                            font_count += 1
+                            failures.append((arg, "file not found"))
+                            continue
+                        sys.stderr.write(
+                            "[font-v] ERROR: "
+                            + arg
+                            + " does not appear to be a valid UFO or designspace path."
+                            + os.linesep
+                        )
+                        sys.exit(1)
+                    try:
+                        reports = read_ufo_reports(arg)
+                    except Exception as e:
+                        if not keep_going:
+                            raise
+                        font_count += 1
+                        failures.append((arg, _format_exception(e)))
+                        continue
+                    font_count += len(reports)
+                    for report in reports:
+                        _print_report(report, "--dev" in c.argv)
+                elif is_font(arg) or _is_font_file_candidate(arg):
+                    font_path = arg
+                    if file_exists(font_path):
+                        representative_path = representative_map.get(font_path, font_path)
+                        if representative_path not in parsed_map:
+                            # the font file is closed as soon as the report data is read
+                            font = representative_path
+                            if prefetcher is not None:
+                                font = prefetcher.get(representative_path)
+                            # the font flavor is identified from the magic bytes before the font is parsed
+                            try:
+                                reports = read_font_reports(font)
+                            except TTLibError as e:
+                                font_count += 1
+                                if keep_going:
+                                    failures.append((font_path, str(e)))
+                                    continue
+                                sys.stderr.write(
+                                    "[font-v] ERROR: "
+                                    + font_path
+                                    + " does not appear to be a valid font file: "
+                                    + str(e)
+                                    + os.linesep
+                                )
+                                sys.exit(1)
+                            except Exception as e:
+                                if not keep_going:
+                                    raise
+                                font_count += 1
+                                failures.append((font_path, _format_exception(e)))
+                                continue
+                            parsed_map[representative_path] = [
+                                reports,
+                                group_size_map.get(representative_path, 1),
+                            ]
+                        else:
+                            count("dedupe_hits")
+                        font_count += 1
+                        for report in parsed_map[representative_path][0]:
+                            _print_report(report, "--dev" in c.argv, font_path)
+                        # release the report after the last report for the content group
+                        parsed_map[representative_path][1] -= 1
+                        if parsed_map[representative_path][1] == 0:
+                            del parsed_map[representative_path]
+                    elif keep_going:
+                        font_count += 1
+                        failures.append((font_path, "file not found"))
+                    else:
+                        sys.stderr.write(
+                            "[font-v] ERROR: "
+                            + font_path
+                            + " does not appear to be a valid ttf "
+                            "or otf font file path." + os.linesep
+                        )
+                        sys.exit(1)
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
+
+        if dedupe_stats is not None:
+            print(os.linesep + str(dedupe_stats))
+        _exit_on_failures(failures, font_count)
     elif c.subcmd == "write":
         # argument test
         if c.argc < 2:
@@ -90,8 +379,23 @@ def main():
         add_sha1 = False
         add_release_string = False
         add_dev_string = False
-        add_new_version = False
+        version_final = None
         fontpath_list = []  # list of font paths that user submits on command line
+        ufo_paths = []  # list of UFO source paths, including the UFO sources of .designspace files
+        # {archive path : list of member paths (None = all fonts in the archive)} map
+        archive_requests = {}
+        # --keep-going collects per-font errors as (font path, error message) tuples and continues with the next font
+        keep_going = "--keep-going" in c.argv
+        failures = []
+        # --verify re-reads the table directory, name table, and head table of every written font
+        verify = "--verify" in c.argv
+        # every font file is locked from the font read through the font write.  --skip-locked skips the fonts
+        # that are locked by another font-v process and reports them as failures instead of waiting for the locks
+        lock_mode = LOCK_NOWAIT if "--skip-locked" in c.argv else LOCK_WAIT
+        # --output-dir=[path] writes the fonts to an output tree that mirrors the input tree
+        output_dir = None
+        if c.contains_definitions("output-dir"):
+            output_dir = c.get_definition("output-dir")
 
         # test for mutually exclusive arguments
         # do not refactor this below the level of the argument tests that follow
@@ -102,8 +406,20 @@ def main():
             )
             sys.exit(1)
 
+        # --output-dir directory arguments are scanned recursively for font files
+        write_args = c.argv[1:]
+        input_dirs = []
+        if output_dir is not None:
+            write_args = []
+            for arg in c.argv[1:]:
+                if not arg.startswith("-") and not is_ufo_source_path(arg) and dir_exists(arg):
+                    input_dirs.append(arg)
+                    write_args.extend(find_font_files([arg]))
+                else:
+                    write_args.append(arg)
+
         # Parse command line arguments to determine user request(s)
-        for arg in c.argv[1:]:
+        for arg in write_args:
             if arg == "--sha1":
                 add_sha1 = True
             elif arg == "--rel":
@@ -111,7 +427,6 @@ def main():
             elif arg == "--dev":
                 add_dev_string = True
             elif arg[0:6] == "--ver=":
-                add_new_version = True
                 # split on the = symbol and use second part as definition
                 version_list = arg.split("=")
                 if len(version_list) < 2:
@@ -125,55 +440,603 @@ def main():
                     "-", "."
                 )  # specified on command line as 1-000
                 version_final = version_pre.replace("_", ".")  # or as 1_000
-            elif len(arg) > 4 and (
-                arg[-4:].lower() == ".ttf" or arg[-4:].lower() == ".otf"
-            ):
-                if file_exists(arg):
-                    fontpath_list.append(arg)
+                if not is_valid_version_number(version_final):
+                    sys.stderr.write(
+                        "[font-v] ERROR: --ver=" + version_list[1] + " is not a valid version "
+                        "number.  Use the X.XXX format." + os.linesep
+                    )
+                    sys.exit(1)
+            elif is_archive_path(arg):
+                archive_path, member = split_archive_path(arg)
+                if file_exists(archive_path):
+                    archive_requests.setdefault(archive_path, []).append(member)
+                elif keep_going:
+                    failures.append((archive_path, "archive file not found"))
                 else:
+                    sys.stderr.write(
+                        "[font-v] ERROR: " + archive_path + " does not appear to be a valid "
+                        "archive file path." + os.linesep
+                    )
+                    sys.exit(1)
+            elif is_ufo_source_path(arg):
+                if not os.path.exists(arg):
+                    if keep_going:
+                        failures.append((arg, "file not found"))
+                        continue
+                    sys.stderr.write(
+                        "[font-v] ERROR: " + arg + " does not appear to be a valid UFO or "
+                        "designspace path." + os.linesep
+                    )
+                    sys.exit(1)
+                try:
+                    ufo_paths.extend(get_ufo_paths([arg]))
+                except Exception as e:
+                    if not keep_going:
+                        raise
+                    failures.append((arg, _format_exception(e)))
+            elif is_font(arg) or _is_font_file_candidate(arg):
+                if not file_exists(arg):
+                    if keep_going:
+                        failures.append((arg, "file not found"))
+                        continue
                     sys.stderr.write(
                         "[font-v] ERROR: " + arg + " does not appear to be a valid "
                         "font file path." + os.linesep
                     )
                     sys.exit(1)
+                # non-font files are rejected from the magic bytes before any font is parsed
+                flavor = get_font_flavor(arg)
+                if keep_going and flavor == "ttc":
+                    failures.append((arg, "font collections are not supported by write"))
+                elif keep_going and flavor is None:
+                    failures.append((arg, "not a font file"))
+                elif flavor == "ttc":
+                    sys.stderr.write(
+                        "[font-v] ERROR: "
+                        + arg
+                        + " is a font collection.  Font collections are not supported by the write "
+                        "subcommand." + os.linesep
+                    )
+                    sys.exit(1)
+                elif flavor is not None:
+                    fontpath_list.append(arg)
+                else:
+                    sys.stderr.write(
+                        "[font-v] ERROR: " + arg + " does not appear to be a valid "
+                        "font file." + os.linesep
+                    )
+                    sys.exit(1)
+
+        if _is_git_selection_request(c):
+            fontpath_list = [
+                changed_font.path for changed_font in _get_git_selection(c)
+            ]
+        ufo_paths = list(collections.OrderedDict.fromkeys(ufo_paths))
 
-        if (
-            add_sha1 is False
-            and add_release_string is False
-            and add_dev_string is False
-            and add_new_version is False
-        ):
+        write_request = WriteRequest(
+            version_number=version_final,
+            sha1=add_sha1,
+            development=add_dev_string,
+            release=add_release_string,
+            propagate="--propagate" in c.argv,
+        )
+        if not write_request.has_changes():
             print("[font-v]  No changes specified.  Nothing to do.")
             sys.exit(0)
 
-        for fontpath in fontpath_list:
-            fv = FontVersion(fontpath)
+        input_root = None
+        if output_dir is not None:
+            conflicts = [option for option in ("--transaction", "--dedupe") if option in c.argv]
+            for name in ("journal", "snapshot"):
+                if c.contains_definitions(name):
+                    conflicts.append("--" + name)
+            if len(conflicts) > 0:
+                sys.stderr.write(
+                    "[font-v] ERROR: --output-dir cannot be used with "
+                    + ", ".join(conflicts)
+                    + "."
+                    + os.linesep
+                )
+                sys.exit(1)
+            if len(archive_requests) > 0 or len(ufo_paths) > 0:
+                sys.stderr.write(
+                    "[font-v] ERROR: --output-dir does not support archive fonts or UFO sources."
+                    + os.linesep
+                )
+                sys.exit(1)
+            if len(fontpath_list) > 0:
+                input_root = get_input_root(input_dirs + fontpath_list)
+                if os.path.abspath(output_dir) == input_root:
+                    sys.stderr.write(
+                        "[font-v] ERROR: --output-dir must be a directory other than the input "
+                        "directory " + input_root + "." + os.linesep
+                    )
+                    sys.exit(1)
 
-            # define a new version number substring
-            if add_new_version is True:
-                fv.set_version_number(version_final)
+        # --transaction writes all fonts or no fonts
+        if "--transaction" in c.argv:
+            if "--dedupe" in c.argv:
+                sys.stderr.write(
+                    "[font-v] ERROR: Please use either --transaction or --dedupe, not both."
+                    + os.linesep
+                )
+                sys.exit(1)
+            if keep_going:
+                sys.stderr.write(
+                    "[font-v] ERROR: Please use either --transaction or --keep-going, not both."
+                    + os.linesep
+                )
+                sys.exit(1)
+            if c.contains_definitions("journal"):
+                sys.stderr.write(
+                    "[font-v] ERROR: Please use either --transaction or --journal, not both."
+                    + os.linesep
+                )
+                sys.exit(1)
+            if c.contains_definitions("snapshot"):
+                sys.stderr.write(
+                    "[font-v] ERROR: Please use either --transaction or --snapshot, not both."
+                    + os.linesep
+                )
+                sys.exit(1)
+            if len(ufo_paths) > 0:
+                sys.stderr.write(
+                    "[font-v] ERROR: --transaction does not support UFO sources."
+                    + os.linesep
+                )
+                sys.exit(1)
+            if len(archive_requests) > 0:
+                # archive rewrites are not staged in the transaction
+                sys.stderr.write(
+                    "[font-v] ERROR: --transaction does not support archive fonts."
+                    + os.linesep
+                )
+                sys.exit(1)
+            try:
+                staged_fonts = write_fonts_transactional(
+                    fontpath_list, write_request, _get_jobs(c), lock_mode
+                )
+            except TransactionError as e:
+                count("errors", len(e.errors))
+                for fontpath, message in e.errors:
+                    sys.stderr.write(
+                        "[font-v] ERROR: " + fontpath + ": " + message + os.linesep
+                    )
+                sys.stderr.write(
+                    "[font-v] ERROR: transaction failed.  No fonts were modified."
+                    + os.linesep
+                )
+                sys.exit(1)
+            for staged_font in staged_fonts:
+                print(
+                    "[✓] " + staged_font.fontpath + " version string was successfully "
+                    "changed to:" + os.linesep + staged_font.version_string + os.linesep
+                )
+            fontpath_list = []
 
-            # define new state +/- status metadata substring
+        # --journal=[path] appends every completed font write to a checkpoint journal and --resume skips
+        # the fonts that the journal records as written with the same request.  --sha1 requests are journaled with the
+        # git commit SHA1 of the write and are written again after a new commit
+        journal = None
+        journal_git_sha1_cache = {}
+        if c.contains_definitions("journal"):
+            journal = WriteJournal(c.get_definition("journal"))
+        if "--resume" in c.argv:
+            if journal is None:
+                sys.stderr.write(
+                    "[font-v] ERROR: --resume requires a --journal=[path] definition."
+                    + os.linesep
+                )
+                sys.exit(1)
+            journal.load()
+            pending_fontpaths = [
+                fontpath
+                for fontpath in fontpath_list
+                if not journal.is_done(
+                    fontpath,
+                    write_request,
+                    _get_journal_git_sha1(fontpath, write_request, journal_git_sha1_cache),
+                )
+            ]
+            print(
+                "[font-v] resume: "
+                + str(len(fontpath_list) - len(pending_fontpaths))
+                + " of "
+                + str(len(fontpath_list))
+                + " fonts were already written."
+                + os.linesep
+            )
+            fontpath_list = pending_fontpaths
+
+        # --dedupe parses and modifies byte-identical font files once and fans the
+        # new font binary out to every identical target path.  --link also defines how --output-dir
+        # materializes the source fonts in the output tree
+        link_mode = "copy" if output_dir is None else "reflink"
+        if c.contains_definitions("link"):
+            link_mode = c.get_definition("link")
+            if link_mode not in LINK_MODES:
+                sys.stderr.write(
+                    "[font-v] ERROR: --link must be defined as one of "
+                    + ", ".join(LINK_MODES)
+                    + "."
+                    + os.linesep
+                )
+                sys.exit(1)
+        dedupe_stats = None
+        if "--dedupe" in c.argv:
+            with span("dedupe.group"):
+                groups, dedupe_stats = group_identical_files(fontpath_list)
             if add_sha1 is True:
-                if add_dev_string is True:
-                    fv.set_state_git_commit_sha1(development=True)
-                elif add_release_string is True:
-                    fv.set_state_git_commit_sha1(release=True)
-                else:
-                    fv.set_state_git_commit_sha1()
-            else:
-                # define new status metadata substring only
-                if add_dev_string is True:
-                    fv.set_development_status()
-                elif add_release_string is True:
-                    fv.set_release_status()
+                # the sha1 state is defined by the git repository of each font path
+                groups = _split_groups_by_git_root(groups)
+        else:
+            groups = [[fontpath] for fontpath in fontpath_list]
+
+        # --snapshot=[path] records the original name and head tables of every written font for `font-v revert`
+        snapshot = None
+        if c.contains_definitions("snapshot"):
+            snapshot = SnapshotWriter(c.get_definition("snapshot"))
+
+        font_count = len(failures) + sum(len(group) for group in groups) + len(ufo_paths)
+        try:
+            for group in groups:
+                try:
+                    input_sha256 = file_digest(group[0]) if journal is not None else None
+                    with FontVersion(group[0], lock=lock_mode) as fv:
+                        if journal is not None:
+                            # the journaled git commit SHA1 is the SHA1 that is written
+                            fv.git_sha1_cache = journal_git_sha1_cache
+                        write_request.apply(fv)
+                        if output_dir is None:
+                            fv.write_version_string(snapshot=snapshot)
+                        else:
+                            output_path = get_output_path(group[0], input_root, output_dir)
+                            fv.write_version_string(fontpath=output_path, link=link_mode)
+                except FontLockedError:
+                    # --skip-locked fonts are reported as failures with or without --keep-going
+                    for fontpath in group:
+                        failures.append((fontpath, LOCKED_FAILURE_MESSAGE))
+                    continue
+                except Exception as e:
+                    # e.g. IndexError for fonts without nameID 5 records, TTLibError, git errors for --sha1
+                    if not keep_going:
+                        raise
+                    for fontpath in group:
+                        failures.append((fontpath, _format_exception(e)))
+                    continue
+                fanned_out_paths = group[:1]
+                for fontpath in group[1:]:
+                    try:
+                        with FontLock(fontpath, lock_mode), span("dedupe.fan_out"):
+                            fan_out(group[0], fontpath, link_mode)
+                    except FontLockedError:
+                        failures.append((fontpath, LOCKED_FAILURE_MESSAGE))
+                        continue
+                    except (IOError, OSError) as e:
+                        # a failed target does not stop the fan out to the remaining targets
+                        failures.append((fontpath, _format_exception(e)))
+                        continue
+                    except Exception as e:
+                        if not keep_going:
+                            raise
+                        failures.append((fontpath, _format_exception(e)))
+                        continue
+                    fanned_out_paths.append(fontpath)
+                    count("dedupe_hits")
+                    count("fonts_written")
+                    if snapshot is not None:
+                        entry = snapshot.last_entry
+                        snapshot.record(
+                            fontpath,
+                            entry.name_data,
+                            entry.head_data,
+                            entry.input_sha256,
+                            entry.output_sha256,
+                        )
+
+                version_string = fv.get_name_id5_version_string()
+                # fonts are written to the output tree with --output-dir
+                target_paths = fanned_out_paths if output_dir is None else [output_path]
+                written_fontpaths = target_paths
+                if verify:
+                    written_fontpaths = []
+                    for fontpath in target_paths:
+                        mismatches = verify_font_version(
+                            fontpath, version_string, fv.head_fontRevision
+                        )
+                        if len(mismatches) > 0:
+                            failures.append(
+                                (fontpath, "verification failed: " + "; ".join(mismatches))
+                            )
+                        else:
+                            written_fontpaths.append(fontpath)
+
+                # fonts are journaled after the write so that an interrupted write is repeated on resume
+                # fonts that fail verification are not journaled
+                if journal is not None and len(written_fontpaths) > 0:
+                    output_sha256 = file_digest(written_fontpaths[0])
+                    git_sha1 = _get_journal_git_sha1(
+                        group[0], write_request, journal_git_sha1_cache
+                    )
+                    for fontpath in written_fontpaths:
+                        journal.record(
+                            fontpath,
+                            write_request,
+                            input_sha256,
+                            output_sha256,
+                            version_string,
+                            git_sha1,
+                        )
+
+                for fontpath in written_fontpaths:
+                    _print_write_success(
+                        fontpath,
+                        version_string,
+                        fv.updated_fields if write_request.propagate else None,
+                    )
+        finally:
+            if journal is not None:
+                journal.close()
+            if snapshot is not None:
+                snapshot.close()
+
+        if dedupe_stats is not None:
+            print(str(dedupe_stats) + os.linesep)
+
+        # UFO sources are versioned with fontinfo.plist writes.  Fonts are not compiled
+        for ufo_path in ufo_paths:
+            try:
+                with UFOVersion(ufo_path, lock=lock_mode) as uv:
+                    write_request.apply(uv)
+                    uv.write_version_string()
+            except FontLockedError:
+                failures.append((ufo_path, LOCKED_FAILURE_MESSAGE))
+                continue
+            except Exception as e:
+                if not keep_going:
+                    raise
+                failures.append((ufo_path, _format_exception(e)))
+                continue
+            version_string = uv.get_name_id5_version_string()
+            if verify:
+                mismatches = verify_ufo_version(ufo_path, version_string, uv.head_fontRevision)
+                if len(mismatches) > 0:
+                    failures.append(
+                        (ufo_path, "verification failed: " + "; ".join(mismatches))
+                    )
+                    continue
+            _print_write_success(
+                ufo_path,
+                version_string,
+                uv.updated_fields if write_request.propagate else None,
+            )
+
+        # each archive is read once and written once with all of the modified member fonts
+        for archive_path, members in archive_requests.items():
+            font_count += 1
+            try:
+                with FontLock(archive_path, lock_mode):
+                    missing_members, verify_failures = _write_archive_fonts(
+                        archive_path, members, write_request, verify
+                    )
+            except FontLockedError:
+                failures.append((archive_path, LOCKED_FAILURE_MESSAGE))
+                continue
+            except Exception as e:
+                # an archive is written with all of its modified fonts or is not modified
+                if not keep_going:
+                    raise
+                failures.append((archive_path, _format_exception(e)))
+                continue
+            if len(missing_members) > 0:
+                if keep_going:
+                    failures.append(
+                        (archive_path, "archive member(s) not found: " + ", ".join(missing_members))
+                    )
+                    continue
+                sys.stderr.write(
+                    "[font-v] ERROR: Unable to find archive member(s) "
+                    + ", ".join(missing_members)
+                    + " in "
+                    + archive_path
+                    + os.linesep
+                )
+                sys.exit(1)
+            # an archive with a font that fails verification is not modified
+            failures.extend(verify_failures)
+
+        _exit_on_failures(failures, font_count)
+    elif c.subcmd == "apply":
+        # argument test.  The first argument that is not an option is the manifest path
+        manifest_path = _get_path_argument(c)
+        if manifest_path is None:
+            sys.stderr.write(
+                "[font-v] ERROR: Command is missing necessary arguments. "
+                "Check `font-v --help`." + os.linesep
+            )
+            sys.exit(1)
+
+        if not file_exists(manifest_path):
+            sys.stderr.write(
+                "[font-v] ERROR: "
+                + manifest_path
+                + " does not appear to be a valid manifest file path."
+                + os.linesep
+            )
+            sys.exit(1)
+        jobs = _get_jobs(c)
+
+        # every manifest entry is validated before any font is written
+        try:
+            entries = read_manifest(manifest_path)
+            resolve_manifest(entries, os.path.dirname(manifest_path))
+            git_sha1_cache = get_manifest_git_sha1_cache(entries)
+        except ManifestError as e:
+            for error in e.errors:
+                sys.stderr.write("[font-v] ERROR: " + error + os.linesep)
+            sys.exit(1)
+
+        # --skip-locked skips the fonts that are locked by another font-v process instead of stalling a worker
+        lock_mode = LOCK_NOWAIT if "--skip-locked" in c.argv else LOCK_WAIT
+        results = apply_manifest(entries, git_sha1_cache, jobs, lock_mode)
+        print(format_results_table(entries, results))
+        failed_count = sum(
+            1
+            for entry_results in results.values()
+            for result in entry_results
+            if result.error != ""
+        )
+        if failed_count > 0:
+            count("errors", failed_count)
+            sys.exit(1)
+    elif c.subcmd == "check":
+        # argument test
+        if c.argc < 2:
+            sys.stderr.write(
+                "[font-v] ERROR: Command is missing necessary arguments. "
+                "Check `font-v --help`." + os.linesep
+            )
+            sys.exit(1)
 
-            fv.write_version_string()
+        check_paths = []
+        for arg in c.argv[1:]:
+            if arg.startswith("-"):
+                continue
+            if not os.path.exists(arg):
+                sys.stderr.write(
+                    "[font-v] ERROR: "
+                    + arg
+                    + " does not appear to be a valid font file or directory path."
+                    + os.linesep
+                )
+                sys.exit(1)
+            check_paths.append(arg)
+        check_report = check_fonts(find_font_files(check_paths), _get_jobs(c))
+        if "--json" in c.argv:
+            print(json.dumps(check_report.to_dict(), indent=2, sort_keys=True))
+        else:
+            print(check_report)
+        # CI gates fail on any consistency issue or font read error
+        if check_report.has_issues():
+            sys.exit(1)
+    elif c.subcmd == "diff":
+        # argument test
+        diff_paths = [arg for arg in c.argv[1:] if not arg.startswith("-")]
+        if len(diff_paths) != 2:
+            sys.stderr.write(
+                "[font-v] ERROR: Command is missing necessary arguments. "
+                "Check `font-v --help`." + os.linesep
+            )
+            sys.exit(1)
+        for diff_path in diff_paths:
+            if not dir_exists(diff_path):
+                sys.stderr.write(
+                    "[font-v] ERROR: "
+                    + diff_path
+                    + " does not appear to be a valid directory path."
+                    + os.linesep
+                )
+                sys.exit(1)
 
+        prefetch_depth = DEFAULT_PREFETCH_DEPTH
+        if c.contains_definitions("prefetch"):
+            prefetch_depth = _get_positive_integer_definition(c, "prefetch")
+        try:
+            tree_diff = diff_trees(diff_paths[0], diff_paths[1], prefetch_depth)
+        except Exception as e:
+            # e.g. ValueError for a file with a font extension that is not a font, IndexError for fonts
+            # without nameID 5 records
+            count("errors")
+            sys.stderr.write("[font-v] ERROR: " + _format_exception(e) + os.linesep)
+            sys.exit(1)
+        if "--ndjson" in c.argv:
+            for font_diff in tree_diff.diffs:
+                print(json.dumps(font_diff.to_dict(), ensure_ascii=False, sort_keys=True))
+        else:
+            print(tree_diff)
+    elif c.subcmd == "watch":
+        # argument test
+        watch_paths = [arg for arg in c.argv[1:] if not arg.startswith("-")]
+        if len(watch_paths) != 1:
+            sys.stderr.write(
+                "[font-v] ERROR: Command is missing necessary arguments. "
+                "Check `font-v --help`." + os.linesep
+            )
+            sys.exit(1)
+        watch_root = watch_paths[0]
+        if not dir_exists(watch_root):
+            sys.stderr.write(
+                "[font-v] ERROR: "
+                + watch_root
+                + " does not appear to be a valid directory path."
+                + os.linesep
+            )
+            sys.exit(1)
+
+        watcher_options = {}
+        if c.contains_definitions("debounce"):
+            debounce_ms = _get_positive_integer_definition(c, "debounce")
+            watcher_options["debounce"] = debounce_ms / 1000.0
+        # --poll=[ms] uses stat polling rather than inotify
+        if c.contains_definitions("poll"):
+            poll_ms = _get_positive_integer_definition(c, "poll")
+            watcher_options["poll_interval"] = poll_ms / 1000.0
+            watcher_options["use_inotify"] = False
+        with FontWatcher(watch_root, **watcher_options) as watcher:
+            _print_watch_changes(watcher.scan())
             print(
-                "[✓] " + fontpath + " version string was successfully changed "
-                "to:" + os.linesep + fv.get_name_id5_version_string() + os.linesep
+                "[font-v] watching "
+                + str(len(watcher.fonts))
+                + " fonts in "
+                + watch_root
+                + " ("
+                + watcher.backend
+                + ").  Press Ctrl+C to stop."
+                + os.linesep,
+                flush=True,
             )
+            try:
+                for changes in watcher.iter_changes():
+                    _print_watch_changes(changes)
+            except KeyboardInterrupt:
+                pass
+    elif c.subcmd == "revert":
+        # argument test.  The first argument that is not an option is the snapshot path
+        snapshot_path = _get_path_argument(c)
+        if snapshot_path is None:
+            sys.stderr.write(
+                "[font-v] ERROR: Command is missing necessary arguments. "
+                "Check `font-v --help`." + os.linesep
+            )
+            sys.exit(1)
+
+        if not file_exists(snapshot_path):
+            sys.stderr.write(
+                "[font-v] ERROR: "
+                + snapshot_path
+                + " does not appear to be a valid snapshot file path."
+                + os.linesep
+            )
+            sys.exit(1)
+        entries = read_snapshot(snapshot_path)
+        results = revert_fonts(entries, "--force" in c.argv, _get_jobs(c))
+        failed_count = 0
+        for result in results:
+            if result.error != "":
+                failed_count += 1
+                sys.stderr.write(
+                    "[font-v] ERROR: " + result.fontpath + ": " + result.error + os.linesep
+                )
+            else:
+                print(
+                    "[✓] "
+                    + result.fontpath
+                    + " name and head tables were restored"
+                    + (" (byte-identical to the original font)" if result.identical else "")
+                )
+        if failed_count > 0:
+            count("errors", failed_count)
+            sys.exit(1)
     else:  # user did not enter an acceptable subcommand
         sys.stderr.write(
             "[font-v] ERROR: Please enter a font-v subcommand with your request."
@@ -182,5 +1045,283 @@ def main():
         sys.exit(1)
 
 
+def _write_archive_fonts(archive_path, members, write_request, verify=False):
+    """
+    Applies a WriteRequest to fonts in an archive and replaces the archive with a new archive that contains the
+    modified fonts.  The archive is not modified if a requested archive member is not found or if a modified font
+    fails verification.
+
+    :param archive_path: (string) archive file path
+    :param members: (list) archive member paths.  A None item includes all fonts in the archive
+    :param write_request: (fontv.batch.WriteRequest) the modifications to write
+    :param verify: (boolean) True = verify the modified font buffers before the archive write
+    :return: (tuple) (sorted requested archive member paths that were not found in the archive, list of
+             (font path, error message) tuples for fonts that failed verification)
+    """
+    if None in members:
+        members = None
+    replacements = {}
+    # (archive member path, new version string, updated fields) tuples
+    modified_fonts = []
+    verify_failures = []
+    for fontstream in iter_archive_fonts(archive_path, members):
+        with FontVersion(fontstream) as fv:
+            write_request.apply(fv)
+            fontbuffer = io.BytesIO()
+            fv.write_version_string(fontpath=fontbuffer)
+            replacements[split_archive_path(fv.fontpath)[1]] = fontbuffer.getvalue()
+            modified_fonts.append(
+                (fv.fontpath, fv.get_name_id5_version_string(), fv.updated_fields)
+            )
+            if verify:
+                # the written font is verified from the buffer before the archive write
+                mismatches = verify_font_version(
+                    fontbuffer, fv.get_name_id5_version_string(), fv.head_fontRevision
+                )
+                if len(mismatches) > 0:
+                    verify_failures.append(
+                        (fv.fontpath, "verification failed: " + "; ".join(mismatches))
+                    )
+
+    if members is not None and len(replacements) < len(set(members)):
+        return sorted(set(members) - set(replacements.keys())), []
+    if len(verify_failures) > 0:
+        return [], verify_failures
+
+    with span("archive.write"):
+        write_archive(archive_path, replacements)
+    for fontpath, version_string, updated_fields in modified_fonts:
+        _print_write_success(
+            fontpath, version_string, updated_fields if write_request.propagate else None
+        )
+    return [], []
+
+
+def _print_write_success(fontpath, version_string, updated_fields=None):
+    """
+    Prints the new version string of a written font and, for write --propagate, each field that was modified.
+
+    :param fontpath: (string) font file path
+    :param version_string: (string) the new nameID 5 version string
+    :param updated_fields: (list) FontVersion.updated_fields value or None
+    :return: None
+    """
+    lines = [
+        "[✓] " + fontpath + " version string was successfully changed to:",
+        version_string,
+    ]
+    if updated_fields is not None:
+        for field, old_value, new_value in updated_fields:
+            lines.append("    " + field + ": '" + old_value + "' → '" + new_value + "'")
+    print(os.linesep.join(lines) + os.linesep)
+
+
+def _print_watch_changes(changes):
+    """
+    Prints font watch changes to the standard output stream and font parse errors to the standard error stream.
+
+    :param changes: (list) of fontv.watch.WatchChange objects
+    :return: None
+    """
+    for change in changes:
+        if change.change == ERROR:
+            count("errors")
+            sys.stderr.write(
+                "[font-v] ERROR: " + change.fontpath + ": " + change.error + os.linesep
+            )
+        else:
+            print(change, flush=True)
+
+
+def _get_path_argument(c):
+    """
+    Returns the first subcommand argument that is not an option.
+
+    :param c: (fontv.commandlines.Command) the parsed command
+    :return: (string) the argument or None if the command does not include a path argument
+    """
+    for arg in c.argv[1:]:
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+def _format_exception(e):
+    """Returns the `ExceptionType: message` string that is reported for a font error"""
+    return type(e).__name__ + ": " + str(e)
+
+
+def _get_journal_git_sha1(fontpath, write_request, git_sha1_cache):
+    """
+    Returns the short git commit SHA1 hash string of the git repository that contains a font for the --journal
+    entries of git commit SHA1 state write requests.
+
+    :param fontpath: (string) font file path
+    :param write_request: (fontv.batch.WriteRequest) the modifications of the run
+    :param git_sha1_cache: (dict) {git root path : short git commit SHA1 hash string} map that is shared with the
+                           FontVersion objects of the run
+    :return: (string) short git commit SHA1 hash string, or None for write requests without a git commit SHA1 state
+             and for fonts that are not in a git repository
+    """
+    if not write_request.sha1:
+        return None
+    try:
+        return get_git_sha1_cache([fontpath], git_sha1_cache)[get_git_root_path(fontpath)]
+    except Exception:
+        # e.g. fonts outside of a git repository.  The font write reports the git error
+        return None
+
+
+def _exit_on_failures(failures, font_count):
+    """
+    Reports the font errors that were collected with --keep-going or --skip-locked to the standard error stream and
+    exits with status code 1 if there are any errors.
+
+    :param failures: (list) of (font path, error message) tuples
+    :param font_count: (int) number of fonts in the run
+    :return: None
+    """
+    if len(failures) == 0:
+        return
+    count("errors", len(failures))
+    sys.stderr.write(os.linesep)
+    for fontpath, message in failures:
+        sys.stderr.write("[font-v] ERROR: " + fontpath + ": " + message + os.linesep)
+    sys.stderr.write(
+        "[font-v] ERROR: "
+        + str(len(failures))
+        + " of "
+        + str(font_count)
+        + " fonts failed."
+        + os.linesep
+    )
+    sys.exit(1)
+
+
+def _print_report(report, dev, fontpath=None):
+    """
+    Prints the name.ID = 5 and head.fontRevision report for a font to the standard output stream.
+
+    :param report: (fontv.report.FontReport) the font version data to report
+    :param dev: (boolean) True = print the version string in every nameID 5 record
+    :param fontpath: (string) optional font path label for the report.  Default = report.fontpath
+    :return: None
+    """
+    if fontpath is None:
+        fontpath = report.fontpath
+    # fonts in collections are labeled with the font index, e.g. `Family.ttc#1`
+    if report.font_number is not None:
+        fontpath += "#" + str(report.font_number)
+    print(os.linesep + fontpath + ":")
+    print("----- name.ID = 5:")
+    # --dev switch report prints every version string in name records
+    if dev:
+        for record, v_string in report.name_ID5_dict.items():
+            devstring = str(record) + ":" + os.linesep + str(v_string)
+            print(devstring)
+    else:  # default report handling
+        print(report.version_string)
+    print("----- head.fontRevision:")
+    print("{:.3f}".format(report.head_fontRevision))
+
+
+def _get_jobs(c):
+    """
+    Returns the number of parallel workers that is requested with the --jobs=[n] option.  Exits with status
+    code 1 if the definition is not a positive integer.
+
+    :param c: (fontv.commandlines.Command) the parsed command
+    :return: (int) number of workers or None for the default (number of CPUs)
+    """
+    if not c.contains_definitions("jobs"):
+        return None
+    return _get_positive_integer_definition(c, "jobs")
+
+
+def _get_positive_integer_definition(c, name):
+    """
+    Returns the integer value of a --[name]=[n] option definition.  Exits with status code 1 if the definition is
+    not a positive integer.
+
+    :param c: (fontv.commandlines.Command) the parsed command
+    :param name: (string) the option name
+    :return: (int)
+    """
+    value = c.get_definition(name)
+    if not value.isdigit() or int(value) < 1:
+        sys.stderr.write(
+            "[font-v] ERROR: --" + name + " must be defined as a positive integer." + os.linesep
+        )
+        sys.exit(1)
+    return int(value)
+
+
+def _is_font_file_candidate(arg):
+    """
+    Tests a command line argument to determine if it is a file path that is tested for font magic bytes.  Font files
+    are identified by content so that files without a .ttf or .otf extension (e.g. .woff, .ttc, extensionless build
+    outputs) are supported.
+
+    :param arg: (string) command line argument
+    :return: (boolean) True = existing file path that is not an option, an archive member path, or a UFO source path
+    """
+    return (
+        not arg.startswith("-")
+        and not is_archive_path(arg)
+        and not is_ufo_source_path(arg)
+        and file_exists(arg)
+    )
+
+
+def _split_groups_by_git_root(groups):
+    """
+    Splits identical content groups of font paths into groups that share a git repository root.
+
+    :param groups: (list) of lists of font paths
+    :return: (list) of lists of font paths
+    """
+    split_groups = []
+    for group in groups:
+        root_map = {}
+        for fontpath in group:
+            root_map.setdefault(get_git_root_path(fontpath), []).append(fontpath)
+        split_groups.extend(root_map.values())
+    return split_groups
+
+
+def _is_git_selection_request(c):
+    """
+    Tests for the --staged and --changed-since options that request git based font selection.
+
+    :param c: (fontv.commandlines.Command) the parsed command
+    :return: (boolean)
+    """
+    return "--staged" in c.argv or c.contains_definitions("changed-since")
+
+
+def _get_git_selection(c):
+    """
+    Returns the list of fontv.gitfiles.ChangedFont objects that were requested with the --staged and/or
+    --changed-since options.  Exits with status code 1 on git errors.
+
+    :param c: (fontv.commandlines.Command) the parsed command
+    :return: (list) of fontv.gitfiles.ChangedFont objects
+    """
+    since = None
+    if c.contains_definitions("changed-since"):
+        since = c.get_definition("changed-since")
+    try:
+        count("git_calls")
+        with span("git.changed_fonts"):
+            return get_changed_fonts(staged="--staged" in c.argv, since=since)
+    except (GitCommandError, InvalidGitRepositoryError) as e:
+        sys.stderr.write(
+            "[font-v] ERROR: unable to identify changed fonts with git: "
+            + str(e)
+            + os.linesep
+        )
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
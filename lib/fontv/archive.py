@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+import copy
+import io
+import os
+import shutil
+import struct
+import tarfile
+import tempfile
+import zipfile
+
+from fontv.utilities import NamedBytesIO, is_font
+
+# separates the archive file path from the archive member path (e.g. "fonts.zip!ttf/Example-Regular.ttf")
+ARCHIVE_MEMBER_SEPARATOR = "!"
+
+ZIP_EXTENSIONS = (".zip",)
+TAR_EXTENSIONS = {
+    ".tar": "",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tbz2": "bz2",
+    ".tar.xz": "xz",
+    ".txz": "xz",
+}
+
+# zip local file header structure size and general purpose flag bits (see the PKWARE APPNOTE.TXT specification)
+_ZIP_LOCAL_HEADER_SIZE = 30
+_ZIP_FLAG_ENCRYPTED = 0x01
+_ZIP_FLAG_DATA_DESCRIPTOR = 0x08
+# zipfile.ZipFile attributes that the raw zip member copy modifies
+_ZIP_RAW_COPY_ATTRIBUTES = ("fp", "filelist", "NameToInfo", "start_dir")
+
+
+def is_zip(filepath):
+    """Tests filepath argument for a .zip archive file extension"""
+    return filepath.lower().endswith(ZIP_EXTENSIONS)
+
+
+def is_tar(filepath):
+    """Tests filepath argument for a tar archive file extension (uncompressed, gzip, bzip2, or xz compressed)"""
+    return filepath.lower().endswith(tuple(TAR_EXTENSIONS.keys()))
+
+
+def is_archive(filepath):
+    """Tests filepath argument for a supported zip or tar archive file extension"""
+    return is_zip(filepath) or is_tar(filepath)
+
+
+def is_archive_path(filepath):
+    """
+    Tests filepath argument to determine if it is a path to a supported archive file or a path to a member of a
+    supported archive file with `archive.zip!path/to/Font.ttf` syntax.
+
+    :param filepath: (string) file path for testing
+    :return: (boolean) True = archive or archive member path; False = not an archive path
+    """
+    if ARCHIVE_MEMBER_SEPARATOR in filepath:
+        archive_path = filepath.split(ARCHIVE_MEMBER_SEPARATOR, 1)[0]
+        return is_archive(archive_path)
+    return is_archive(filepath)
+
+
+def split_archive_path(filepath):
+    """
+    Splits an archive path into a tuple of (archive file path, member path).  The member path is None when filepath
+    is a path to the archive file.
+
+    :param filepath: (string) archive or archive member path
+    :return: (tuple) (string, string or None)
+    :raises: ValueError if filepath is not an archive path
+    """
+    if not is_archive_path(filepath):
+        raise ValueError(filepath + " is not a path to a supported zip or tar archive")
+    if ARCHIVE_MEMBER_SEPARATOR in filepath:
+        archive_path, member = filepath.split(ARCHIVE_MEMBER_SEPARATOR, 1)
+        return archive_path, member
+    return filepath, None
+
+
+def join_archive_path(archive_path, member):
+    """Returns the `archive.zip!path/to/Font.ttf` formatted path for an archive member"""
+    return archive_path + ARCHIVE_MEMBER_SEPARATOR + member
+
+
+def read_archive_font(filepath):
+    """
+    Reads a single font from an archive into memory.
+
+    :param filepath: (string) archive member path with `archive.zip!path/to/Font.ttf` syntax
+    :return: fontv.utilities.NamedBytesIO with the name attribute set to filepath
+    :raises: KeyError if the member is not found in the archive
+    """
+    archive_path, member = split_archive_path(filepath)
+    if member is None:
+        raise ValueError(filepath + " does not include an archive member path")
+    if is_zip(archive_path):
+        with zipfile.ZipFile(archive_path) as zin:
+            return NamedBytesIO(zin.read(member), filepath)
+    else:
+        with tarfile.open(archive_path, "r:*") as tin:
+            tarinfo = tin.getmember(member)
+            return NamedBytesIO(tin.extractfile(tarinfo).read(), filepath)
+
+
+def iter_archive_fonts(archive_path, members=None):
+    """
+    Generator that streams the .ttf and .otf fonts in an archive through memory.  The archive is opened once and
+    member fonts are read in archive order.
+
+    :param archive_path: (string) path to a zip or tar archive
+    :param members: (iterable) optional archive member paths.  Default = all .ttf and .otf members
+    :return: generator of fontv.utilities.NamedBytesIO objects with `archive.zip!path/to/Font.ttf` names
+    """
+    if members is not None:
+        members = set(members)
+
+    if is_zip(archive_path):
+        with zipfile.ZipFile(archive_path) as zin:
+            for zinfo in zin.infolist():
+                if _is_requested_member(zinfo.filename, zinfo.is_dir(), members):
+                    yield NamedBytesIO(
+                        zin.read(zinfo), join_archive_path(archive_path, zinfo.filename)
+                    )
+    else:
+        with tarfile.open(archive_path, "r:*") as tin:
+            for tarinfo in tin:
+                if _is_requested_member(tarinfo.name, not tarinfo.isfile(), members):
+                    yield NamedBytesIO(
+                        tin.extractfile(tarinfo).read(),
+                        join_archive_path(archive_path, tarinfo.name),
+                    )
+
+
+def write_archive(archive_path, replacements, outpath=None):
+    """
+    Writes a new archive in which the members in the replacements dictionary are replaced with new data.  zip archive
+    members that are not replaced are copied in their compressed form without decompression or re-compression.  The
+    new archive is written to a temporary file and moved to outpath when the write completes.
+
+    :param archive_path: (string) path to the source zip or tar archive
+    :param replacements: (dict) {archive member path : (bytes) new member data} map
+    :param outpath: (string) optional path for the new archive.  Default = replace the source archive
+    :return: None
+    :raises: KeyError if a replacement member is not found in the source archive
+    """
+    if outpath is None:
+        outpath = archive_path
+
+    fd, temp_path = tempfile.mkstemp(
+        prefix=".font-v-", suffix=".tmp", dir=os.path.dirname(os.path.abspath(outpath))
+    )
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            if is_zip(archive_path):
+                _write_zip_archive(archive_path, replacements, fout)
+            else:
+                _write_tar_archive(archive_path, replacements, fout)
+        # mkstemp files are only readable by the owner
+        shutil.copymode(archive_path, temp_path)
+        os.replace(temp_path, outpath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _is_requested_member(name, is_dir, members):
+    if is_dir:
+        return False
+    if members is None:
+        return is_font(name)
+    return name in members
+
+
+def _write_zip_archive(archive_path, replacements, fout):
+    pending = set(replacements.keys())
+    with zipfile.ZipFile(archive_path) as zin:
+        with zipfile.ZipFile(fout, "w") as zout:
+            for zinfo in zin.infolist():
+                if zinfo.filename in replacements:
+                    new_zinfo = copy.copy(zinfo)
+                    zout.writestr(
+                        new_zinfo,
+                        replacements[zinfo.filename],
+                        compress_type=zinfo.compress_type,
+                    )
+                    pending.discard(zinfo.filename)
+                elif _supports_raw_zip_copy(zin, zout):
+                    _copy_zip_member_raw(zin, zout, zinfo)
+                else:
+                    zout.writestr(
+                        copy.copy(zinfo),
+                        zin.read(zinfo),
+                        compress_type=zinfo.compress_type,
+                    )
+    if len(pending) > 0:
+        raise KeyError(
+            "Unable to find archive member(s) "
+            + ", ".join(sorted(pending))
+            + " in "
+            + archive_path
+        )
+
+
+def _supports_raw_zip_copy(zin, zout):
+    """Tests for the zipfile.ZipFile and zipfile.ZipInfo implementation details that _copy_zip_member_raw uses"""
+    return (
+        hasattr(zin, "fp")
+        and all(hasattr(zout, name) for name in _ZIP_RAW_COPY_ATTRIBUTES)
+        and hasattr(zipfile.ZipInfo, "FileHeader")
+    )
+
+
+def _copy_zip_member_raw(zin, zout, zinfo):
+    """
+    Copies the compressed data for a zip member to the output archive without a decompress/compress cycle.  The copy
+    uses the ZipFile fp, filelist, NameToInfo, and start_dir attributes and the ZipInfo.FileHeader() method.  These
+    are CPython zipfile implementation details (tested with CPython 3.11).  Interpreters without them use a
+    decompress/compress member copy, see _supports_raw_zip_copy().
+    """
+    if zinfo.flag_bits & _ZIP_FLAG_ENCRYPTED:
+        raise ValueError(
+            "Encrypted zip archive members are not supported: " + zinfo.filename
+        )
+    # skip the variable length file name and extra fields of the source local file header
+    zin.fp.seek(zinfo.header_offset)
+    local_header = zin.fp.read(_ZIP_LOCAL_HEADER_SIZE)
+    filename_length, extra_length = struct.unpack("<HH", local_header[26:30])
+    zin.fp.seek(
+        zinfo.header_offset + _ZIP_LOCAL_HEADER_SIZE + filename_length + extra_length
+    )
+    compressed_data = zin.fp.read(zinfo.compress_size)
+
+    # the CRC and sizes are known, write them in the local header rather than in a trailing data descriptor
+    new_zinfo = copy.copy(zinfo)
+    new_zinfo.flag_bits &= ~_ZIP_FLAG_DATA_DESCRIPTOR
+    new_zinfo.header_offset = zout.fp.tell()
+    zout.fp.write(new_zinfo.FileHeader())
+    zout.fp.write(compressed_data)
+    zout.filelist.append(new_zinfo)
+    zout.NameToInfo[new_zinfo.filename] = new_zinfo
+    zout.start_dir = zout.fp.tell()
+
+
+def _write_tar_archive(archive_path, replacements, fout):
+    pending = set(replacements.keys())
+    compression = ""
+    for extension, tar_compression in TAR_EXTENSIONS.items():
+        if archive_path.lower().endswith(extension):
+            compression = tar_compression
+    with tarfile.open(archive_path, "r:*") as tin:
+        with tarfile.open(fileobj=fout, mode="w:" + compression) as tout:
+            for tarinfo in tin:
+                if tarinfo.name in replacements:
+                    new_tarinfo = copy.copy(tarinfo)
+                    new_tarinfo.size = len(replacements[tarinfo.name])
+                    tout.addfile(new_tarinfo, io.BytesIO(replacements[tarinfo.name]))
+                    pending.discard(tarinfo.name)
+                elif tarinfo.isfile():
+                    tout.addfile(tarinfo, tin.extractfile(tarinfo))
+                else:
+                    tout.addfile(tarinfo)
+    if len(pending) > 0:
+        raise KeyError(
+            "Unable to find archive member(s) "
+            + ", ".join(sorted(pending))
+            + " in "
+            + archive_path
+        )
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fontv.libfv import get_git_commit_sha1
+from fontv.telemetry import TelemetryRecorder, is_enabled
+from fontv.utilities import get_git_root_path
+
+
+class WriteRequest(object):
+    """
+    The version number, state, and status modifications that a write request applies to each font.  WriteRequest
+    objects are plain data objects that can be passed to worker processes.
+
+    :parameter version_number: (string) new version number in X.XXX format, or None to keep the current version number
+
+    :parameter sha1: (boolean) True = add git commit sha1 short hash state metadata
+
+    :parameter development: (boolean) True = add development status metadata
+
+    :parameter release: (boolean) True = add release status metadata
+
+    :parameter propagate: (boolean) True = also write a new version number to the nameID 3 records and the CFF top
+                          DICT version, see FontVersion.propagate_version
+
+    :raises: ValueError if both development and release are True
+    """
+
+    def __init__(
+        self, version_number=None, sha1=False, development=False, release=False, propagate=False
+    ):
+        if development and release:
+            raise ValueError(
+                "development and release status modifications are mutually exclusive"
+            )
+        self.version_number = version_number
+        self.sha1 = sha1
+        self.development = development
+        self.release = release
+        self.propagate = propagate
+
+    def has_changes(self):
+        """
+        Returns a boolean that indicates whether the request includes any modifications.
+
+        :return: (boolean)
+        """
+        return (
+            self.version_number is not None
+            or self.sha1
+            or self.development
+            or self.release
+        )
+
+    def to_dict(self):
+        """
+        Returns the modifications as a JSON serializable dictionary.
+
+        :return: (dict)
+        """
+        return {
+            "version_number": self.version_number,
+            "sha1": self.sha1,
+            "development": self.development,
+            "release": self.release,
+            "propagate": self.propagate,
+        }
+
+    def apply(self, fv):
+        """
+        Applies the modifications to a FontVersion object in memory.  The font file is not written.
+
+        :param fv: (fontv.libfv.FontVersion) the font to modify
+        :return: None
+        """
+        fv.propagate_version = self.propagate
+
+        # define a new version number substring
+        if self.version_number is not None:
+            fv.set_version_number(self.version_number)
+
+        # define new state +/- status metadata substring
+        if self.sha1:
+            fv.set_state_git_commit_sha1(
+                development=self.development, release=self.release
+            )
+        elif self.development:
+            # define new status metadata substring only
+            fv.set_development_status()
+        elif self.release:
+            fv.set_release_status()
+
+
+def get_git_sha1_cache(fontpaths, git_sha1_cache=None):
+    """
+    Returns a {git root path : short git commit SHA1 hash string} map for the git repositories that contain fontpaths.
+    One git call is made per repository.  Pass the map to worker processes as the FontVersion.git_sha1_cache
+    attribute so that workers do not make git calls.
+
+    :param fontpaths: (iterable) font file paths
+    :param git_sha1_cache: (dict) optional existing map to update
+    :return: (dict)
+    :raises: IOError if the git repository root cannot be identified for a font path
+    """
+    if git_sha1_cache is None:
+        git_sha1_cache = {}
+    for fontpath in fontpaths:
+        gitroot_path = get_git_root_path(fontpath)
+        if gitroot_path not in git_sha1_cache:
+            git_sha1_cache[gitroot_path] = get_git_commit_sha1(gitroot_path)
+    return git_sha1_cache
+
+
+def map_parallel(function, tasks, jobs=None):
+    """
+    Maps function over tasks in a process pool and returns the results in task order.  function must be a module
+    level function and tasks must be picklable.  fontv.telemetry spans and counters in the worker processes are
+    reported to the callbacks that are registered in the calling process.
+
+    :param function: (callable) the function to call with each task
+    :param tasks: (list) function arguments
+    :param jobs: (int) number of worker processes.  Default = number of CPUs.  1 = run in the calling process
+    :return: (list) function return values
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(tasks))
+    if jobs <= 1:
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if not is_enabled():
+            return list(executor.map(function, tasks, chunksize=4))
+        results = []
+        for result, recorder in executor.map(
+            _call_with_telemetry, [(function, task) for task in tasks], chunksize=4
+        ):
+            recorder.replay()
+            results.append(result)
+        return results
+
+
+def _call_with_telemetry(function_task):
+    """Worker process function that records the telemetry of a function call for replay in the calling process"""
+    function, task = function_task
+    recorder = TelemetryRecorder()
+    recorder.start()
+    try:
+        return function(task), recorder
+    finally:
+        recorder.stop()
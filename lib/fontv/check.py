@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Version data consistency checks of font files and font families for `font-v check`.
+
+Each font is checked for a head.fontRevision version number that does not match the nameID 5 version number and
+for nameID 5 records that do not share the same version string.  Fonts are grouped by family name and each family
+is checked for fonts with different version numbers, statuses, or states.  Fonts are read in parallel worker
+processes.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import os
+
+from fontTools.ttLib import TTCollection, TTFont
+
+from fontv.batch import map_parallel
+from fontv.libfv import FontVersion
+from fontv.telemetry import span
+from fontv.utilities import SNIFF_SIZE, sniff_font_flavor
+
+# file extensions of the font files that are included in directory scans
+CHECK_FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".woff", ".woff2")
+
+# check issue kinds
+HEAD_NAME_MISMATCH = "head-name-mismatch"
+DIVERGENT_RECORDS = "divergent-records"
+FAMILY_VERSION = "family-version"
+FAMILY_STATUS = "family-status"
+FAMILY_STATE = "family-state"
+READ_ERROR = "read-error"
+
+
+class FontCheck(object):
+    """
+    The version data of a font that are used in consistency checks.  FontCheck objects hold strings and numbers only
+    and can be returned from worker processes.
+
+    :parameter fontpath: (string) font file path
+
+    :parameter font_number: (int) index of the font in a font collection file or None for single font files
+
+    :parameter family_name: (string) typographic family name of the font or an empty string
+
+    :parameter name_ID5_dict: (dict) {(platformID, platEncID, langID) : version string} map for every nameID 5 record
+
+    :parameter head_fontRevision: (float) head.fontRevision version number
+
+    :parameter version_number: (string) nameID 5 version number in X.XXX format or an empty string
+
+    :parameter status: (string) "dev", "rel", or an empty string
+
+    :parameter state: (string) nameID 5 state substring or an empty string
+    """
+
+    def __init__(
+        self,
+        fontpath,
+        font_number,
+        family_name,
+        name_ID5_dict,
+        head_fontRevision,
+        version_number,
+        status,
+        state,
+    ):
+        self.fontpath = fontpath
+        self.font_number = font_number
+        self.family_name = family_name
+        self.name_ID5_dict = name_ID5_dict
+        self.head_fontRevision = head_fontRevision
+        self.version_number = version_number
+        self.status = status
+        self.state = state
+
+    @property
+    def label(self):
+        """The font path, with a #N font number suffix for fonts in collection files"""
+        if self.font_number is None:
+            return self.fontpath
+        return self.fontpath + "#" + str(self.font_number)
+
+    @classmethod
+    def from_font_version(cls, fv, family_name, font_number=None):
+        """
+        Returns a FontCheck with the version data of a FontVersion object.
+
+        :param fv: (fontv.libfv.FontVersion) the font
+        :param family_name: (string) typographic family name of the font
+        :param font_number: (int) index of the font in a font collection file or None for single font files
+        :return: (FontCheck)
+        """
+        status = ""
+        if fv.is_development:
+            status = "dev"
+        elif fv.is_release:
+            status = "rel"
+        return cls(
+            fv.fontpath,
+            font_number,
+            family_name,
+            dict(fv.name_ID5_dict),
+            fv.get_head_fontrevision_version_number(),
+            fv.get_version_number_string(),
+            status,
+            fv.state,
+        )
+
+    def to_dict(self):
+        return {
+            "path": self.fontpath,
+            "font_number": self.font_number,
+            "family": self.family_name,
+            "version_strings": sorted(set(self.name_ID5_dict.values())),
+            "head_fontRevision": round(self.head_fontRevision, 3),
+            "version_number": self.version_number,
+            "status": self.status,
+            "state": self.state,
+        }
+
+
+class CheckIssue(object):
+    """
+    A version data consistency problem.
+
+    :parameter kind: (string) one of HEAD_NAME_MISMATCH, DIVERGENT_RECORDS, FAMILY_VERSION, FAMILY_STATUS,
+                     FAMILY_STATE, READ_ERROR
+
+    :parameter subject: (string) font path for font issues, or family name for family issues
+
+    :parameter message: (string) issue description
+
+    :parameter paths: (list) paths of the fonts with the issue
+    """
+
+    def __init__(self, kind, subject, message, paths):
+        self.kind = kind
+        self.subject = subject
+        self.message = message
+        self.paths = paths
+
+    def __str__(self):
+        return "[X] " + self.kind + ": " + self.subject + ": " + self.message
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "subject": self.subject,
+            "message": self.message,
+            "paths": self.paths,
+        }
+
+
+class CheckReport(object):
+    """
+    The results of a consistency check run.
+
+    :parameter fonts: (list) of FontCheck objects that were read
+
+    :parameter issues: (list) of CheckIssue objects
+    """
+
+    def __init__(self, fonts, issues):
+        self.fonts = fonts
+        self.issues = issues
+
+    def has_issues(self):
+        return len(self.issues) > 0
+
+    def __str__(self):
+        families = set(font.family_name for font in self.fonts)
+        lines = [str(issue) for issue in self.issues]
+        lines.append(
+            "[font-v] check: "
+            + _plural(len(self.fonts), "font", "fonts")
+            + " in "
+            + _plural(len(families), "family", "families")
+            + ", "
+            + _plural(len(self.issues), "issue", "issues")
+        )
+        return os.linesep.join(lines)
+
+    def to_dict(self):
+        return {
+            "fonts": [font.to_dict() for font in self.fonts],
+            "issues": [issue.to_dict() for issue in self.issues],
+            "font_count": len(self.fonts),
+            "issue_count": len(self.issues),
+        }
+
+
+def find_font_files(paths):
+    """
+    Returns the font file paths of a list of file and directory paths.  Directories are scanned recursively for files
+    with a font file extension (see CHECK_FONT_EXTENSIONS).  File paths are included without an extension test.
+
+    :param paths: (list) file and directory paths
+    :return: (list) file paths in command line order and sorted directory order without duplicates
+    """
+    fontpaths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if os.path.splitext(filename)[1].lower() in CHECK_FONT_EXTENSIONS:
+                        fontpaths.append(os.path.join(dirpath, filename))
+        else:
+            fontpaths.append(path)
+    return list(collections.OrderedDict.fromkeys(fontpaths))
+
+
+def read_font_checks(fontpath):
+    """
+    Reads the version data of a font file for consistency checks.  Collection files (.ttc) return one FontCheck for
+    each font in the collection.
+
+    :param fontpath: (string) font file path
+    :return: (list) of FontCheck objects
+    :raises: ValueError if the file is not a font file
+    :raises: IndexError if a font does not include nameID 5 records
+    """
+    with span("font.load"), open(fontpath, "rb") as f:
+        flavor = sniff_font_flavor(f.read(SNIFF_SIZE))
+        if flavor is None:
+            raise ValueError("not a font file")
+        f.seek(0)
+        if flavor == "ttc":
+            ttc = TTCollection(f, lazy=True, recalcTimestamp=False)
+            return [
+                _read_font_check(ttf, font_number)
+                for font_number, ttf in enumerate(ttc.fonts)
+            ]
+        return [_read_font_check(TTFont(f, lazy=True, recalcTimestamp=False))]
+
+
+def check_fonts(fontpaths, jobs=None):
+    """
+    Reads the version data of font files in parallel worker processes and checks each font and each font family for
+    version data consistency.  A read error in one font does not stop checks of other fonts.
+
+    :param fontpaths: (list) font file paths
+    :param jobs: (int) number of worker processes.  Default = number of CPUs.  1 = read in the calling process
+    :return: (CheckReport)
+    """
+    fonts = []
+    issues = []
+    for fontpath, font_checks, error in map_parallel(_check_font, fontpaths, jobs):
+        if error != "":
+            issues.append(CheckIssue(READ_ERROR, fontpath, error, [fontpath]))
+            continue
+        fonts.extend(font_checks)
+        for font_check in font_checks:
+            issues.extend(get_font_issues(font_check))
+    issues.extend(get_family_issues(fonts))
+    return CheckReport(fonts, issues)
+
+
+def get_font_issues(font_check):
+    """
+    Returns the head / name version number and nameID 5 record consistency issues of a font.
+
+    :param font_check: (FontCheck) the font
+    :return: (list) of CheckIssue objects
+    """
+    issues = []
+    head_version_number = "{:.3f}".format(font_check.head_fontRevision)
+    if (
+        font_check.version_number != ""
+        and "{:.3f}".format(float(font_check.version_number)) != head_version_number
+    ):
+        issues.append(
+            CheckIssue(
+                HEAD_NAME_MISMATCH,
+                font_check.label,
+                "head.fontRevision "
+                + head_version_number
+                + " does not match the nameID 5 version number "
+                + font_check.version_number,
+                [font_check.label],
+            )
+        )
+    if len(set(font_check.name_ID5_dict.values())) > 1:
+        records = [
+            str(record) + " '" + version_string + "'"
+            for record, version_string in sorted(font_check.name_ID5_dict.items())
+        ]
+        issues.append(
+            CheckIssue(
+                DIVERGENT_RECORDS,
+                font_check.label,
+                "nameID 5 records have different version strings: " + ", ".join(records),
+                [font_check.label],
+            )
+        )
+    return issues
+
+
+def get_family_issues(font_checks):
+    """
+    Groups fonts by family name and returns the issues of families with fonts that have different version numbers,
+    statuses, or states.
+
+    :param font_checks: (list) of FontCheck objects
+    :return: (list) of CheckIssue objects
+    """
+    families = collections.OrderedDict()
+    for font_check in font_checks:
+        families.setdefault(font_check.family_name, []).append(font_check)
+
+    issues = []
+    for family_name, family_fonts in families.items():
+        for kind, attribute, description in (
+            (FAMILY_VERSION, "version_number", "version numbers"),
+            (FAMILY_STATUS, "status", "statuses"),
+            (FAMILY_STATE, "state", "states"),
+        ):
+            # {value : list of font labels} map
+            values = collections.OrderedDict()
+            for font_check in family_fonts:
+                value = getattr(font_check, attribute)
+                values.setdefault(value, []).append(font_check.label)
+            if len(values) < 2:
+                continue
+            value_descriptions = [
+                "'" + value + "' (" + _plural(len(labels), "font", "fonts") + ")"
+                for value, labels in values.items()
+            ]
+            issues.append(
+                CheckIssue(
+                    kind,
+                    family_name,
+                    "family fonts have "
+                    + str(len(values))
+                    + " different "
+                    + description
+                    + ": "
+                    + ", ".join(value_descriptions),
+                    [font_check.label for font_check in family_fonts],
+                )
+            )
+    return issues
+
+
+def _read_font_check(ttf, font_number=None):
+    family_name = ttf["name"].getBestFamilyName() or ""
+    with FontVersion(ttf) as fv:
+        return FontCheck.from_font_version(fv, family_name, font_number)
+
+
+def _check_font(fontpath):
+    """Worker process function that returns the (font path, list of FontCheck objects, error message) of a font"""
+    try:
+        return fontpath, read_font_checks(fontpath), ""
+    except Exception as e:
+        return fontpath, [], type(e).__name__ + ": " + str(e)
+
+
+def _plural(number, singular, plural):
+    return str(number) + " " + (singular if number == 1 else plural)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# streaming digest block size
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Linux FICLONE ioctl request number (copy-on-write clone of a whole file on btrfs, xfs, bcachefs, ...)
+FICLONE = 0x40049409
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+# os.link() errors that fall back to a clone: cross-device links, file systems without hard link support, and
+# inodes at the hard link limit
+_LINK_FALLBACK_ERRNOS = (errno.EXDEV, errno.EPERM, errno.EMLINK)
+
+
+class DedupeStats(object):
+    """
+    Summary of the work that content deduplication saved in a batch operation.
+
+    :parameter files: (int) number of file paths in the batch
+
+    :parameter unique: (int) number of unique file contents in the batch
+
+    :parameter bytes_hashed: (int) number of bytes read to compute content digests
+
+    :parameter bytes_deduplicated: (int) number of bytes in duplicate files that were not parsed
+    """
+
+    def __init__(self, files=0, unique=0, bytes_hashed=0, bytes_deduplicated=0):
+        self.files = files
+        self.unique = unique
+        self.bytes_hashed = bytes_hashed
+        self.bytes_deduplicated = bytes_deduplicated
+
+    @property
+    def duplicates(self):
+        return self.files - self.unique
+
+    def __str__(self):
+        return (
+            "[font-v] deduplication: "
+            + str(self.files)
+            + " files, "
+            + str(self.unique)
+            + " unique, "
+            + str(self.duplicates)
+            + " parses avoided ("
+            + str(self.bytes_deduplicated)
+            + " bytes)"
+        )
+
+
+def file_digest(filepath, blocksize=HASH_BLOCK_SIZE):
+    """
+    Returns the hexadecimal SHA-256 digest of the file contents.  The file is read in blocks so that memory use does
+    not grow with file size.
+
+    :param filepath: (string) path to the file
+    :param blocksize: (int) read block size in bytes
+    :return: (string) hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(blocksize), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stream_digest(stream, blocksize=HASH_BLOCK_SIZE):
+    """
+    Returns the hexadecimal SHA-256 digest of the contents of a seekable binary stream.  The stream position is
+    restored.
+
+    :param stream: seekable binary stream
+    :param blocksize: (int) read block size in bytes
+    :return: (string) hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    position = stream.tell()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(blocksize), b""):
+        digest.update(block)
+    stream.seek(position)
+    return digest.hexdigest()
+
+
+def group_identical_files(filepaths):
+    """
+    Groups file paths by identical file contents.  Files are first grouped by size with a stat call.  Only files that
+    share a size with another file are hashed, and paths that refer to the same inode are grouped without a read.
+
+    :param filepaths: (iterable) file paths
+    :return: (tuple) (list of lists of file paths in first seen order, DedupeStats)
+    """
+    stats = DedupeStats()
+    ordered_paths = []
+    size_map = {}
+    stat_map = {}
+    for filepath in filepaths:
+        if filepath in stat_map:
+            continue  # the same path more than once on the command line
+        st = os.stat(filepath)
+        stat_map[filepath] = st
+        ordered_paths.append(filepath)
+        size_map.setdefault(st.st_size, []).append(filepath)
+
+    # {path : group key} map.  Paths with a unique size are their own group without a digest
+    key_map = {}
+    for size, size_group in size_map.items():
+        if len(size_group) == 1:
+            key_map[size_group[0]] = ("path", size_group[0])
+            continue
+        inode_keys = {}
+        for filepath in size_group:
+            st = stat_map[filepath]
+            inode_key = (st.st_dev, st.st_ino)
+            if inode_key not in inode_keys:
+                inode_keys[inode_key] = ("digest", size, file_digest(filepath))
+                stats.bytes_hashed += size
+            key_map[filepath] = inode_keys[inode_key]
+
+    groups = []
+    group_map = {}
+    for filepath in ordered_paths:
+        key = key_map[filepath]
+        if key in group_map:
+            group_map[key].append(filepath)
+            stats.bytes_deduplicated += stat_map[filepath].st_size
+        else:
+            group_map[key] = [filepath]
+            groups.append(group_map[key])
+
+    stats.files = len(ordered_paths)
+    stats.unique = len(groups)
+    return groups, stats
+
+
+def fan_out(source_path, target_path, mode="copy"):
+    """
+    Materializes the contents of source_path at target_path.  The target is replaced atomically with a rename from
+    a temporary file in the target directory.
+
+    :param source_path: (string) path to the file with the new contents
+    :param target_path: (string) path to the file that is replaced
+    :param mode: (string) "copy" = byte copy; "hardlink" = hard link to the source inode with a fallback to a
+                 "reflink" clone when the target is on another file system or the file system does not support hard
+                 links; "reflink" = copy-on-write clone with a fallback to an in-kernel copy or a byte copy on file
+                 systems that do not support clones
+    :return: None
+    :raises: ValueError if mode is not a supported link mode
+    :raises: IOError if a file cannot be read or written
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(
+            "Unsupported link mode '" + mode + "'. Use one of " + ", ".join(LINK_MODES)
+        )
+    target_dir = os.path.dirname(os.path.abspath(target_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".font-v-", suffix=".tmp", dir=target_dir)
+    os.close(fd)
+    try:
+        linked = False
+        if mode == "hardlink":
+            os.remove(temp_path)
+            try:
+                os.link(source_path, temp_path)
+                linked = True
+            except OSError as e:
+                if e.errno not in _LINK_FALLBACK_ERRNOS:
+                    raise
+        if not linked:
+            if mode == "copy":
+                shutil.copyfile(source_path, temp_path)
+            else:
+                clone_file(source_path, temp_path)
+            if os.path.exists(target_path):
+                # mkstemp files are only readable by the owner.  Keep the mode of the replaced target file
+                shutil.copymode(target_path, temp_path)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def clone_file(source_path, target_path):
+    """
+    Copies the contents of source_path to target_path with the least data movement that the file system supports:
+    a copy-on-write clone (FICLONE ioctl), then an in-kernel copy (os.copy_file_range), then a byte copy.
+
+    :param source_path: (string) path to the file to copy
+    :param target_path: (string) path to the file that is written
+    :return: (string) the copy method: "reflink", "copy_file_range", or "copy"
+    :raises: IOError if a file cannot be read or written
+    """
+    with open(source_path, "rb") as fsrc, open(target_path, "wb") as fdst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                return "reflink"
+            except OSError:
+                pass  # file system does not support clones
+        if hasattr(os, "copy_file_range"):
+            try:
+                size = os.fstat(fsrc.fileno()).st_size
+                copied = 0
+                while copied < size:
+                    length = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                    if length == 0:
+                        break
+                    copied += length
+                if copied == size:
+                    return "copy_file_range"
+            except OSError:
+                pass  # e.g. copies across file systems on older kernels
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst)
+        return "copy"
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Version data differences between two directory trees of fonts for `font-v diff`.
+
+Fonts are paired by the path relative to the tree root.  Fonts without a relative path match are paired by
+PostScript name when the name is unique in both trees.  The fonts of both trees are read ahead with the
+fontv.prefetch byte range reads of the table directory and the name and head tables on a thread pool.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import os
+
+from fontTools.ttLib import TTCollection, TTFont
+
+from fontv.check import find_font_files
+from fontv.libfv import FontVersion
+from fontv.prefetch import DEFAULT_PREFETCH_DEPTH, FontPrefetcher
+from fontv.telemetry import span
+from fontv.utilities import SNIFF_SIZE, sniff_font_flavor
+
+# font change kinds
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+# per-side font fields of FontDiff.to_dict() lines
+DIFF_FONT_FIELDS = (
+    "path",
+    "postscript_name",
+    "version_string",
+    "fontRevision",
+    "status",
+    "state",
+)
+
+
+class DiffFont(object):
+    """
+    The version data of a font in a diff tree.
+
+    :parameter relpath: (string) "/" separated font path relative to the tree root, with a #N font number suffix for
+                        fonts in collection files
+
+    :parameter postscript_name: (string) nameID 6 PostScript name or an empty string
+
+    :parameter version_string: (string) the name ID 5 version string
+
+    :parameter head_fontRevision: (float) head.fontRevision version number
+
+    :parameter version_tuple: (tuple) FontVersion.get_version_number_tuple() value or None
+
+    :parameter status: (string) "dev", "rel", or an empty string
+
+    :parameter state: (string) nameID 5 state substring or an empty string
+    """
+
+    def __init__(
+        self,
+        relpath,
+        postscript_name,
+        version_string,
+        head_fontRevision,
+        version_tuple,
+        status,
+        state,
+    ):
+        self.relpath = relpath
+        self.postscript_name = postscript_name
+        self.version_string = version_string
+        self.head_fontRevision = head_fontRevision
+        self.version_tuple = version_tuple
+        self.status = status
+        self.state = state
+
+
+class FontDiff(object):
+    """
+    An added, removed, or changed font.
+
+    :parameter change: (string) ADDED, REMOVED, or CHANGED
+
+    :parameter old: (DiffFont) the font in the old tree or None for added fonts
+
+    :parameter new: (DiffFont) the font in the new tree or None for removed fonts
+
+    :parameter paired_by: (string) "path" or "postscript_name" for changed fonts, None otherwise
+    """
+
+    def __init__(self, change, old=None, new=None, paired_by=None):
+        self.change = change
+        self.old = old
+        self.new = new
+        self.paired_by = paired_by
+
+    @property
+    def version_delta(self):
+        """Component-wise new - old version number tuple difference, or None if a version number is not available"""
+        if self.old is None or self.new is None:
+            return None
+        return get_version_delta(self.old.version_tuple, self.new.version_tuple)
+
+    def __str__(self):
+        if self.change == ADDED:
+            return "[+] " + self.new.relpath + ": " + self.new.version_string
+        if self.change == REMOVED:
+            return "[-] " + self.old.relpath + ": " + self.old.version_string
+        label = self.new.relpath
+        if self.old.relpath != self.new.relpath:
+            label = self.old.relpath + " → " + self.new.relpath
+        return (
+            "[~] "
+            + label
+            + ": "
+            + self.old.version_string
+            + " → "
+            + self.new.version_string
+            + " | head.fontRevision "
+            + "{:.3f}".format(self.old.head_fontRevision)
+            + " → "
+            + "{:.3f}".format(self.new.head_fontRevision)
+            + " | version delta "
+            + str(self.version_delta)
+        )
+
+    def to_dict(self):
+        data = {"change": self.change, "paired_by": self.paired_by}
+        for side, font in (("old", self.old), ("new", self.new)):
+            if font is None:
+                for field in DIFF_FONT_FIELDS:
+                    data[side + "_" + field] = None
+                continue
+            data[side + "_path"] = font.relpath
+            data[side + "_postscript_name"] = font.postscript_name
+            data[side + "_version_string"] = font.version_string
+            data[side + "_fontRevision"] = round(font.head_fontRevision, 3)
+            data[side + "_status"] = font.status
+            data[side + "_state"] = font.state
+        delta = self.version_delta
+        data["version_delta"] = list(delta) if delta is not None else None
+        return data
+
+
+class TreeDiff(object):
+    """
+    The version data differences between two font trees.
+
+    :parameter diffs: (list) of FontDiff objects in relative path order
+
+    :parameter unchanged: (int) number of paired fonts with the same version data
+    """
+
+    def __init__(self, diffs, unchanged):
+        self.diffs = diffs
+        self.unchanged = unchanged
+
+    def has_changes(self):
+        return len(self.diffs) > 0
+
+    def count(self, change):
+        """Returns the number of FontDiff objects of a change kind"""
+        return sum(1 for diff in self.diffs if diff.change == change)
+
+    def __str__(self):
+        lines = [str(diff) for diff in self.diffs]
+        lines.append(
+            "[font-v] diff: "
+            + str(self.count(ADDED))
+            + " added, "
+            + str(self.count(REMOVED))
+            + " removed, "
+            + str(self.count(CHANGED))
+            + " changed, "
+            + str(self.unchanged)
+            + " unchanged"
+        )
+        return os.linesep.join(lines)
+
+
+def get_version_delta(old_tuple, new_tuple):
+    """
+    Returns the component-wise difference of two version number tuples.  The shorter tuple is padded with zeros.
+
+    :param old_tuple: (tuple) FontVersion.get_version_number_tuple() value or None
+    :param new_tuple: (tuple) FontVersion.get_version_number_tuple() value or None
+    :return: (tuple) of integers or None if either tuple is None
+    """
+    if old_tuple is None or new_tuple is None:
+        return None
+    length = max(len(old_tuple), len(new_tuple))
+    old_tuple = tuple(old_tuple) + (0,) * (length - len(old_tuple))
+    new_tuple = tuple(new_tuple) + (0,) * (length - len(new_tuple))
+    return tuple(new - old for old, new in zip(old_tuple, new_tuple))
+
+
+def read_diff_fonts(font, relpath):
+    """
+    Reads the version data of a font file for a diff.  Collection files (.ttc) return one DiffFont for each font in
+    the collection.
+
+    :param font: (string) font file path or a seekable binary stream, e.g. a fontv.prefetch.prefetch_font() value
+    :param relpath: (string) "/" separated font path relative to the tree root
+    :return: (list) of DiffFont objects
+    :raises: ValueError if the file is not a font file
+    :raises: IndexError if a font does not include nameID 5 records
+    """
+    if hasattr(font, "read"):
+        return _read_diff_fonts(font, relpath)
+    with open(font, "rb") as f:
+        return _read_diff_fonts(f, relpath)
+
+
+def diff_trees(old_root, new_root, prefetch_depth=DEFAULT_PREFETCH_DEPTH):
+    """
+    Reads the fonts of two directory trees and returns the added, removed, and changed fonts.  The fonts of both
+    trees are read ahead on a thread pool while the version data are parsed.
+
+    :param old_root: (string) old tree directory path
+    :param new_root: (string) new tree directory path
+    :param prefetch_depth: (int) maximum number of fonts that are read ahead
+    :return: (TreeDiff)
+    :raises: ValueError if a file with a font file extension is not a font file
+    :raises: IndexError if a font does not include nameID 5 records
+    """
+    old_paths = find_font_files([old_root])
+    new_paths = find_font_files([new_root])
+    old_fonts = collections.OrderedDict()
+    new_fonts = collections.OrderedDict()
+    with FontPrefetcher(old_paths + new_paths, prefetch_depth) as prefetcher:
+        for root, fontpaths, fonts in (
+            (old_root, old_paths, old_fonts),
+            (new_root, new_paths, new_fonts),
+        ):
+            for fontpath in fontpaths:
+                relpath = os.path.relpath(fontpath, root).replace(os.sep, "/")
+                for diff_font in read_diff_fonts(prefetcher.get(fontpath), relpath):
+                    fonts[diff_font.relpath] = diff_font
+    return compare_fonts(list(old_fonts.values()), list(new_fonts.values()))
+
+
+def compare_fonts(old_fonts, new_fonts):
+    """
+    Pairs the fonts of two trees by relative path and then by unique PostScript name, and returns the added,
+    removed, and changed fonts.
+
+    :param old_fonts: (list) of DiffFont objects in the old tree
+    :param new_fonts: (list) of DiffFont objects in the new tree
+    :return: (TreeDiff)
+    """
+    new_by_path = {font.relpath: font for font in new_fonts}
+    # (old DiffFont, new DiffFont, paired by) tuples
+    pairs = []
+    unpaired_old = []
+    for old_font in old_fonts:
+        new_font = new_by_path.pop(old_font.relpath, None)
+        if new_font is None:
+            unpaired_old.append(old_font)
+        else:
+            pairs.append((old_font, new_font, "path"))
+    unpaired_new = [font for font in new_fonts if font.relpath in new_by_path]
+
+    old_by_name = _get_unique_postscript_names(unpaired_old)
+    new_by_name = _get_unique_postscript_names(unpaired_new)
+    for name in set(old_by_name) & set(new_by_name):
+        pairs.append((old_by_name[name], new_by_name[name], "postscript_name"))
+        unpaired_old.remove(old_by_name[name])
+        unpaired_new.remove(new_by_name[name])
+
+    diffs = [FontDiff(REMOVED, old=font) for font in unpaired_old]
+    diffs.extend(FontDiff(ADDED, new=font) for font in unpaired_new)
+    unchanged = 0
+    for old_font, new_font, paired_by in pairs:
+        if (
+            old_font.version_string == new_font.version_string
+            and old_font.head_fontRevision == new_font.head_fontRevision
+        ):
+            unchanged += 1
+        else:
+            diffs.append(FontDiff(CHANGED, old_font, new_font, paired_by))
+    diffs.sort(key=lambda diff: (diff.new or diff.old).relpath)
+    return TreeDiff(diffs, unchanged)
+
+
+def _read_diff_fonts(f, relpath):
+    with span("font.load"):
+        flavor = sniff_font_flavor(f.read(SNIFF_SIZE))
+        if flavor is None:
+            raise ValueError(getattr(f, "name", relpath) + " is not a font file")
+        f.seek(0)
+        if flavor == "ttc":
+            ttc = TTCollection(f, lazy=True, recalcTimestamp=False)
+            return [
+                _read_diff_font(ttf, relpath + "#" + str(font_number))
+                for font_number, ttf in enumerate(ttc.fonts)
+            ]
+        return [_read_diff_font(TTFont(f, lazy=True, recalcTimestamp=False), relpath)]
+
+
+def _read_diff_font(ttf, relpath):
+    postscript_name = ttf["name"].getDebugName(6) or ""
+    with FontVersion(ttf) as fv:
+        status = ""
+        if fv.is_development:
+            status = "dev"
+        elif fv.is_release:
+            status = "rel"
+        return DiffFont(
+            relpath,
+            postscript_name,
+            fv.get_name_id5_version_string(),
+            fv.get_head_fontrevision_version_number(),
+            fv.get_version_number_tuple(),
+            status,
+            fv.state,
+        )
+
+
+def _get_unique_postscript_names(fonts):
+    """Returns a {PostScript name : DiffFont} map of the fonts with a PostScript name that is unique in fonts"""
+    names = collections.Counter(
+        font.postscript_name for font in fonts if font.postscript_name != ""
+    )
+    return {
+        font.postscript_name: font
+        for font in fonts
+        if names.get(font.postscript_name) == 1
+    }
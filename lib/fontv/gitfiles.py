@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+import os
+
+from git import Repo
+from gitdb.util import hex_to_bin
+
+from fontv.utilities import NamedBytesIO, is_font
+
+# the SHA1 that git reports in `git diff --raw` output for content that only exists in the working tree
+NULL_SHA1 = "0" * 40
+
+
+class ChangedFont(object):
+    """
+    A font file path that git reports as changed, along with the SHA1 of the blob that holds the new file
+    contents.  blob_sha1 is None when the new contents are only available in the working tree.
+
+    :parameter path: (string) file path to the font, relative to the current working directory
+
+    :parameter blob_sha1: (string) hexadecimal SHA1 of the git blob object, or None
+
+    :parameter repo: (git.Repo) the repository that reported the change.  ChangedFont objects from the same
+                     get_changed_fonts() call share this object and the git object database reader that it holds
+    """
+
+    def __init__(self, path, blob_sha1=None, repo=None):
+        self.path = path
+        self.blob_sha1 = blob_sha1
+        self.repo = repo
+
+    def __repr__(self):
+        return "<fontv.gitfiles.ChangedFont> " + self.path
+
+
+def get_changed_fonts(dirpath=".", staged=False, since=None):
+    """
+    Returns a list of ChangedFont objects for the .ttf and .otf files that git reports as added, copied, modified,
+    renamed, or type changed.  The paths are obtained with a single `git diff --raw` call so that the cost of the
+    request scales with the number of changed files rather than with the size of the repository.
+
+    :param dirpath: (string) path to a directory inside the git repository
+    :param staged: (boolean) True = compare the index with HEAD (i.e. fonts that are staged for commit)
+    :param since: (string) git revision.  Compare the working tree (or the index if staged is True) with this revision
+    :return: (list) of ChangedFont objects
+    :raises: git.exc.InvalidGitRepositoryError if dirpath is not inside a git repository
+    :raises: git.exc.GitCommandError if git is unable to resolve the revision
+    """
+    repo = Repo(dirpath, search_parent_directories=True)
+    diff_args = ["--raw", "-z", "--no-renames", "--diff-filter=ACMT", "--no-abbrev"]
+    if staged:
+        diff_args.append("--cached")
+    if since is not None:
+        diff_args.append(since)
+
+    # -z output format is ":<old mode> <new mode> <old sha1> <new sha1> <status>\0<path>\0" for each record
+    raw_output = repo.git.diff(*diff_args)
+    tokens = raw_output.split("\0")
+    changed_fonts = []
+    for meta, path in zip(tokens[0::2], tokens[1::2]):
+        if not is_font(path):
+            continue
+        new_sha1 = meta.split()[3]
+        blob_sha1 = None if new_sha1 == NULL_SHA1 else new_sha1
+        relpath = os.path.relpath(os.path.join(repo.working_tree_dir, path))
+        changed_fonts.append(ChangedFont(relpath, blob_sha1, repo))
+
+    return changed_fonts
+
+
+def read_changed_font(changed_font):
+    """
+    Returns a binary stream with the new contents of a ChangedFont.  Contents that are stored in a git blob (e.g. staged
+    changes) are read from the git object database without a working tree read.  Working tree changes are read from disk.
+
+    :param changed_font: (ChangedFont) the font to read
+    :return: fontv.utilities.NamedBytesIO with name attribute set to the ChangedFont path
+    """
+    if changed_font.blob_sha1 is None:
+        with open(changed_font.path, "rb") as f:
+            return NamedBytesIO(f.read(), changed_font.path)
+
+    repo = changed_font.repo
+    if repo is None:
+        repo = Repo(
+            os.path.dirname(os.path.abspath(changed_font.path)),
+            search_parent_directories=True,
+        )
+    ostream = repo.odb.stream(hex_to_bin(changed_font.blob_sha1))
+    return NamedBytesIO(ostream.read(), changed_font.path)
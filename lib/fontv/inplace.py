@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+In-place version data writes for fonts whose new nameID 5 strings have the same encoded length as the current
+strings (e.g. a git commit SHA1 state substring that is replaced with another SHA1 of the same length).
+
+The nameID 5 string bytes and the head.fontRevision record are overwritten through a memory map of the font file and
+the name and head table checksums and the head.checkSumAdjustment are updated.  Only these byte ranges of the file
+are written.  Fonts that cannot be patched in place are written with fontTools.ttLib.TTFont.save().
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import mmap
+import struct
+
+from fontTools.misc.fixedTools import floatToFixed
+from fontTools.ttLib import newTable
+from fontTools.ttLib.sfnt import calcChecksum
+
+from fontv.sfnt import (
+    SFNT_HEADER_SIZE,
+    TABLE_RECORD_SIZE,
+    parse_sfnt_header,
+    parse_table_directory,
+)
+
+# head.checkSumAdjustment = CHECKSUM_MAGIC - sum of the font file checksums
+CHECKSUM_MAGIC = 0xB1B0AFBA
+# head table offsets of the fontRevision and checkSumAdjustment records
+HEAD_FONT_REVISION_OFFSET = 4
+HEAD_CHECKSUM_ADJUSTMENT_OFFSET = 8
+# name table header: format, count, stringOffset
+NAME_HEADER_FORMAT = ">HHH"
+# name record: platformID, encodingID, languageID, nameID, length, offset
+NAME_RECORD_FORMAT = ">HHHHHH"
+NAME_RECORD_SIZE = struct.calcsize(NAME_RECORD_FORMAT)
+# table record offset of the checksum field
+_TABLE_RECORD_CHECKSUM_OFFSET = 4
+
+
+def write_version_in_place(ttf, fontpath):
+    """
+    Writes the nameID 5 records and head.fontRevision of a fontTools.ttLib.TTFont object to the font file that the
+    TTFont object was read from without a full font write.  The font file is patched only when:
+
+    - the font file is an uncompressed single font sfnt file
+    - every nameID 5 record in the file has a new string with the same encoded byte length as the current string
+    - the nameID 5 string bytes do not share storage with other name records or language tags
+    - every other name record and head table record in the file matches the TTFont object
+    - no other table of the TTFont object is loaded (and possibly modified)
+    - the name and head table checksums and head.checkSumAdjustment of the file are valid
+
+    :param ttf: (fontTools.ttLib.TTFont) the font with the new version data
+    :param fontpath: (string) path to the font file that ttf was read from
+    :return: (int) number of bytes written, or None if the font was not modified and requires a full write
+    :raises: IOError if the font file cannot be read or written
+    """
+    if ttf.flavor is not None:
+        return None
+    for tag in ttf.keys():
+        if tag not in ("GlyphOrder", "head", "name") and ttf.isLoaded(tag):
+            return None
+    with open(fontpath, "r+b") as f:
+        data = f.read(SFNT_HEADER_SIZE)
+        try:
+            num_tables = parse_sfnt_header(data)[1]
+            directory_size = SFNT_HEADER_SIZE + num_tables * TABLE_RECORD_SIZE
+            data += f.read(directory_size - SFNT_HEADER_SIZE)
+            tables = parse_table_directory(data[SFNT_HEADER_SIZE:], num_tables)
+        except ValueError:
+            return None
+        if "name" not in tables or "head" not in tables:
+            return None
+        name_record = tables["name"]
+        head_record = tables["head"]
+        if name_record.offset % 4 != 0 or head_record.offset % 4 != 0 or head_record.length < 54:
+            return None
+        f.seek(name_record.offset)
+        name_data = f.read(name_record.length)
+        f.seek(head_record.offset)
+        head_data = f.read(head_record.length)
+        if len(name_data) < name_record.length or len(head_data) < head_record.length:
+            return None
+
+        # the patched checksums are computed from the stored checksums.  Fonts with invalid checksums require a full
+        # write that recalculates every checksum.
+        if calcChecksum(name_data) != name_record.checksum:
+            return None
+        if calc_head_checksum(head_data) != head_record.checksum:
+            return None
+        old_adjustment = struct.unpack_from(">L", head_data, HEAD_CHECKSUM_ADJUSTMENT_OFFSET)[0]
+        if old_adjustment != calc_checksum_adjustment(data[:directory_size], tables):
+            return None
+
+        patches = _get_name_patches(ttf, name_data)
+        if patches is None or not _is_head_unchanged(ttf, head_data):
+            return None
+
+        new_name_data = bytearray(name_data)
+        for start, new_bytes in patches:
+            new_name_data[start : start + len(new_bytes)] = new_bytes
+        new_head_data = bytearray(head_data)
+        struct.pack_into(
+            ">l",
+            new_head_data,
+            HEAD_FONT_REVISION_OFFSET,
+            floatToFixed(ttf["head"].fontRevision, 16),
+        )
+        name_record.checksum = calcChecksum(bytes(new_name_data))
+        head_record.checksum = calc_head_checksum(bytes(new_head_data))
+        new_directory = bytearray(data[:directory_size])
+        for index, tag in enumerate(_get_directory_tags(data, num_tables)):
+            if tag in ("name", "head"):
+                struct.pack_into(
+                    ">L",
+                    new_directory,
+                    SFNT_HEADER_SIZE + index * TABLE_RECORD_SIZE + _TABLE_RECORD_CHECKSUM_OFFSET,
+                    tables[tag].checksum,
+                )
+        struct.pack_into(
+            ">L",
+            new_head_data,
+            HEAD_CHECKSUM_ADJUSTMENT_OFFSET,
+            calc_checksum_adjustment(bytes(new_directory), tables),
+        )
+
+        bytes_written = 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as fontmap:
+            for start, new_bytes in patches:
+                position = name_record.offset + start
+                fontmap[position : position + len(new_bytes)] = bytes(new_bytes)
+                bytes_written += len(new_bytes)
+            # fontRevision and checkSumAdjustment
+            position = head_record.offset + HEAD_FONT_REVISION_OFFSET
+            fontmap[position : position + 8] = bytes(
+                new_head_data[HEAD_FONT_REVISION_OFFSET : HEAD_CHECKSUM_ADJUSTMENT_OFFSET + 4]
+            )
+            bytes_written += 8
+            for index, tag in enumerate(_get_directory_tags(data, num_tables)):
+                if tag in ("name", "head"):
+                    position = (
+                        SFNT_HEADER_SIZE + index * TABLE_RECORD_SIZE + _TABLE_RECORD_CHECKSUM_OFFSET
+                    )
+                    fontmap[position : position + 4] = bytes(new_directory[position : position + 4])
+                    bytes_written += 4
+            fontmap.flush()
+    return bytes_written
+
+
+def write_tables_in_place(fontpath, table_data):
+    """
+    Overwrites whole tables of an uncompressed single font sfnt file with new table data of the same length and updates
+    the table directory checksums and head.checkSumAdjustment.  Only the table bytes and checksum records are written.
+
+    :param fontpath: (string) font file path
+    :param table_data: (dict) {table tag string : new table bytes} map
+    :return: (int) number of bytes written, or None if the font was not modified because a table is missing, has a
+             different length, or is not aligned to a four byte boundary
+    :raises: IOError if the font file cannot be read or written
+    """
+    with open(fontpath, "r+b") as f:
+        data = f.read(SFNT_HEADER_SIZE)
+        try:
+            num_tables = parse_sfnt_header(data)[1]
+            directory_size = SFNT_HEADER_SIZE + num_tables * TABLE_RECORD_SIZE
+            data += f.read(directory_size - SFNT_HEADER_SIZE)
+            tables = parse_table_directory(data[SFNT_HEADER_SIZE:], num_tables)
+        except ValueError:
+            return None
+        if "head" not in tables:
+            return None
+        for tag, new_data in table_data.items():
+            if tag not in tables:
+                return None
+            if len(new_data) != tables[tag].length or tables[tag].offset % 4 != 0:
+                return None
+        head_record = tables["head"]
+        if "head" in table_data:
+            new_head_data = bytearray(table_data["head"])
+        else:
+            f.seek(head_record.offset)
+            new_head_data = bytearray(f.read(head_record.length))
+        if len(new_head_data) < 54:
+            return None
+        for tag, new_data in table_data.items():
+            if tag == "head":
+                tables[tag].checksum = calc_head_checksum(bytes(new_head_data))
+            else:
+                tables[tag].checksum = calcChecksum(bytes(new_data))
+        new_directory = bytearray(data[:directory_size])
+        checksum_positions = []
+        for index, tag in enumerate(_get_directory_tags(data, num_tables)):
+            if tag in table_data:
+                position = SFNT_HEADER_SIZE + index * TABLE_RECORD_SIZE + _TABLE_RECORD_CHECKSUM_OFFSET
+                struct.pack_into(">L", new_directory, position, tables[tag].checksum)
+                checksum_positions.append(position)
+        struct.pack_into(
+            ">L",
+            new_head_data,
+            HEAD_CHECKSUM_ADJUSTMENT_OFFSET,
+            calc_checksum_adjustment(bytes(new_directory), tables),
+        )
+
+        bytes_written = 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as fontmap:
+            for tag, new_data in table_data.items():
+                if tag == "head":
+                    new_data = new_head_data
+                record = tables[tag]
+                fontmap[record.offset : record.offset + record.length] = bytes(new_data)
+                bytes_written += record.length
+            if "head" not in table_data:
+                position = head_record.offset + HEAD_CHECKSUM_ADJUSTMENT_OFFSET
+                fontmap[position : position + 4] = bytes(
+                    new_head_data[HEAD_CHECKSUM_ADJUSTMENT_OFFSET : HEAD_CHECKSUM_ADJUSTMENT_OFFSET + 4]
+                )
+                bytes_written += 4
+            for position in checksum_positions:
+                fontmap[position : position + 4] = bytes(new_directory[position : position + 4])
+                bytes_written += 4
+            fontmap.flush()
+    return bytes_written
+
+
+def calc_head_checksum(head_data):
+    """
+    Returns the head table checksum.  The checkSumAdjustment record is zero in the checksum calculation.
+
+    :param head_data: (bytes) head table bytes
+    :return: (int) checksum
+    """
+    return calcChecksum(
+        head_data[:HEAD_CHECKSUM_ADJUSTMENT_OFFSET]
+        + b"\0\0\0\0"
+        + head_data[HEAD_CHECKSUM_ADJUSTMENT_OFFSET + 4 :]
+    )
+
+
+def calc_checksum_adjustment(directory_data, tables):
+    """
+    Returns the head.checkSumAdjustment of a font from the table directory checksums.
+
+    :param directory_data: (bytes) sfnt header and table directory bytes
+    :param tables: (dict) {table tag string : fontv.sfnt.TableRecord} map with the table checksums
+    :return: (int) checkSumAdjustment
+    """
+    checksum = calcChecksum(directory_data)
+    for record in tables.values():
+        checksum = (checksum + record.checksum) & 0xFFFFFFFF
+    return (CHECKSUM_MAGIC - checksum) & 0xFFFFFFFF
+
+
+def _get_name_patches(ttf, name_data):
+    """
+    Returns a list of (name table offset, new string bytes) tuples for the nameID 5 records of the name table bytes,
+    or None if the name table cannot be patched in place.
+    """
+    if len(name_data) < 6:
+        return None
+    name_format, record_count, string_offset = struct.unpack_from(NAME_HEADER_FORMAT, name_data)
+    records_end = 6 + record_count * NAME_RECORD_SIZE
+    if name_format not in (0, 1) or len(name_data) < records_end:
+        return None
+
+    # {(platformID, platEncID, langID) : new string bytes} map of the nameID 5 records of the TTFont object
+    new_strings = {}
+    # (platformID, platEncID, langID, nameID, string bytes) of the other records of the TTFont object
+    other_records = collections.Counter()
+    for record in ttf["name"].names:
+        key = (record.platformID, record.platEncID, record.langID)
+        if record.nameID == 5:
+            new_strings[key] = record.toBytes()
+        else:
+            other_records[key + (record.nameID, record.toBytes())] += 1
+
+    # (start, end, nameID 5 record key or None) string storage ranges
+    ranges = []
+    file_keys = set()
+    for index in range(record_count):
+        platform_id, encoding_id, language_id, name_id, length, offset = struct.unpack_from(
+            NAME_RECORD_FORMAT, name_data, 6 + index * NAME_RECORD_SIZE
+        )
+        start = string_offset + offset
+        if start + length > len(name_data):
+            return None
+        key = (platform_id, encoding_id, language_id)
+        if name_id == 5:
+            if key not in new_strings or len(new_strings[key]) != length:
+                return None
+            file_keys.add(key)
+            ranges.append((start, start + length, key))
+        else:
+            record_id = key + (name_id, bytes(name_data[start : start + length]))
+            if other_records[record_id] == 0:
+                return None
+            other_records[record_id] -= 1
+            ranges.append((start, start + length, None))
+    if file_keys != set(new_strings) or sum(other_records.values()) != 0:
+        return None
+    if name_format == 1:
+        if len(name_data) < records_end + 2:
+            return None
+        lang_tag_count = struct.unpack_from(">H", name_data, records_end)[0]
+        if len(name_data) < records_end + 2 + lang_tag_count * 4:
+            return None
+        for index in range(lang_tag_count):
+            length, offset = struct.unpack_from(">HH", name_data, records_end + 2 + index * 4)
+            ranges.append((string_offset + offset, string_offset + offset + length, None))
+
+    # nameID 5 strings may share storage only with nameID 5 strings at the same range that have the same new string
+    ranges = sorted((r for r in ranges if r[1] > r[0]), key=lambda r: r[:2])
+    patches = []
+    cluster = []
+    cluster_end = -1
+    for string_range in ranges + [(len(name_data) + 1, len(name_data) + 1, None)]:
+        if string_range[0] >= cluster_end and len(cluster) > 0:
+            if not _is_patchable_cluster(cluster, new_strings):
+                return None
+            if cluster[0][2] is not None:
+                patches.append((cluster[0][0], new_strings[cluster[0][2]]))
+            cluster = []
+        cluster.append(string_range)
+        cluster_end = max(cluster_end, string_range[1])
+    return patches
+
+
+def _is_patchable_cluster(cluster, new_strings):
+    """Tests a group of overlapping name string storage ranges for an in-place write"""
+    if all(string_range[2] is None for string_range in cluster):
+        return True
+    first = cluster[0]
+    return all(
+        string_range[2] is not None
+        and string_range[:2] == first[:2]
+        and new_strings[string_range[2]] == new_strings[first[2]]
+        for string_range in cluster
+    )
+
+
+def _is_head_unchanged(ttf, head_data):
+    """Tests whether the head table records other than fontRevision and checkSumAdjustment match the TTFont object"""
+    head = newTable("head")
+    head.decompile(head_data, ttf)
+    current = vars(ttf["head"])
+    for attribute, value in vars(head).items():
+        if attribute in ("fontRevision", "checkSumAdjustment"):
+            continue
+        if current.get(attribute) != value:
+            return False
+    return True
+
+
+def _get_directory_tags(data, num_tables):
+    """Returns the table tags of an sfnt table directory in directory order"""
+    return [
+        data[offset : offset + 4].decode("latin-1")
+        for offset in range(SFNT_HEADER_SIZE, SFNT_HEADER_SIZE + num_tables * TABLE_RECORD_SIZE, TABLE_RECORD_SIZE)
+    ]
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Append-only checkpoint journal of completed font writes.
+
+Each completed font write appends one JSON line with the font path, the write request, the git commit SHA1 of
+`--sha1` requests, and the SHA-256 digests of the font file before and after the write.  An interrupted run is resumed
+by skipping the fonts that have a journal entry for the same write request and git commit SHA1 and whose current
+content digest matches the recorded output digest.
+"""
+
+from __future__ import unicode_literals
+
+import json
+import os
+
+from fontv.dedupe import file_digest
+
+# journal line format version
+JOURNAL_FORMAT = 1
+
+
+class JournalEntry(object):
+    """
+    A completed font write.
+
+    :parameter fontpath: (string) absolute font file path
+
+    :parameter request: (dict) the write request, see fontv.batch.WriteRequest.to_dict()
+
+    :parameter input_sha256: (string) hexadecimal SHA-256 digest of the font file before the write
+
+    :parameter output_sha256: (string) hexadecimal SHA-256 digest of the font file after the write
+
+    :parameter size: (int) font file size in bytes after the write
+
+    :parameter version_string: (string) the name ID 5 version string after the write
+
+    :parameter git_sha1: (string) the short git commit SHA1 hash string that was written with a git commit SHA1 state
+                         request or None
+    """
+
+    def __init__(
+        self, fontpath, request, input_sha256, output_sha256, size, version_string, git_sha1=None
+    ):
+        self.fontpath = fontpath
+        self.request = request
+        self.input_sha256 = input_sha256
+        self.output_sha256 = output_sha256
+        self.size = size
+        self.version_string = version_string
+        self.git_sha1 = git_sha1
+
+    def to_dict(self):
+        return {
+            "format": JOURNAL_FORMAT,
+            "path": self.fontpath,
+            "request": self.request,
+            "input_sha256": self.input_sha256,
+            "output_sha256": self.output_sha256,
+            "size": self.size,
+            "version_string": self.version_string,
+            "git_sha1": self.git_sha1,
+        }
+
+
+class WriteJournal(object):
+    """
+    Append-only JSON Lines journal of completed font writes.  Use as a context manager or call close() to close the
+    journal file.
+
+    :parameter filepath: (string) journal file path.  The file is created on the first record() call
+
+    :parameter entries: (dict) {absolute font path : JournalEntry} map of the last entry for each font that is read
+                        with load() or appended with record()
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.entries = {}
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def load(self):
+        """
+        Reads the existing journal entries.  A missing journal file has no entries.  Lines that cannot be parsed
+        (e.g. a partial last line of an interrupted run) are ignored.
+
+        :return: (int) number of entries read
+        :raises: IOError if the journal file exists and cannot be read
+        """
+        if not os.path.isfile(self.filepath):
+            return 0
+        entry_count = 0
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    entry = JournalEntry(
+                        data["path"],
+                        data["request"],
+                        data["input_sha256"],
+                        data["output_sha256"],
+                        data["size"],
+                        data["version_string"],
+                        data.get("git_sha1"),
+                    )
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.entries[entry.fontpath] = entry
+                entry_count += 1
+        return entry_count
+
+    def is_done(self, fontpath, write_request, git_sha1=None):
+        """
+        Tests whether a font write is complete.  The write is complete if the journal includes an entry for the font
+        path and the write request and the current font file contents match the recorded output digest.  A git
+        commit SHA1 state request is complete only if the entry was written with the current git commit SHA1.  Fonts
+        with a different file size are not hashed.
+
+        :param fontpath: (string) font file path
+        :param write_request: (fontv.batch.WriteRequest) the modifications of the run
+        :param git_sha1: (string) the current short git commit SHA1 hash string of the font's git repository for
+                         write requests with a git commit SHA1 state.  None = unknown, the write is not complete
+        :return: (boolean)
+        """
+        entry = self.entries.get(os.path.abspath(fontpath))
+        if entry is None or entry.request != write_request.to_dict():
+            return False
+        if write_request.sha1 and (git_sha1 is None or entry.git_sha1 != git_sha1):
+            return False
+        try:
+            if os.path.getsize(fontpath) != entry.size:
+                return False
+            return file_digest(fontpath) == entry.output_sha256
+        except (IOError, OSError):
+            return False
+
+    def record(
+        self, fontpath, write_request, input_sha256, output_sha256, version_string, git_sha1=None
+    ):
+        """
+        Appends a completed font write to the journal.  The line is flushed to the operating system before the
+        method returns so that it is preserved when the process is killed.
+
+        :param fontpath: (string) font file path
+        :param write_request: (fontv.batch.WriteRequest) the modifications that were written
+        :param input_sha256: (string) hexadecimal SHA-256 digest of the font file before the write
+        :param output_sha256: (string) hexadecimal SHA-256 digest of the font file after the write
+        :param version_string: (string) the name ID 5 version string after the write
+        :param git_sha1: (string) the short git commit SHA1 hash string that was written with a git commit SHA1 state
+                         request or None
+        :return: (JournalEntry)
+        :raises: IOError if the journal file cannot be written
+        """
+        entry = JournalEntry(
+            os.path.abspath(fontpath),
+            write_request.to_dict(),
+            input_sha256,
+            output_sha256,
+            os.path.getsize(fontpath),
+            version_string,
+            git_sha1,
+        )
+        if self._file is None:
+            self._file = open(self.filepath, "a", encoding="utf-8", newline="\n")
+        self._file.write(json.dumps(entry.to_dict(), sort_keys=True) + "\n")
+        self._file.flush()
+        self.entries[entry.fontpath] = entry
+        return entry
+
+    def close(self):
+        """
+        Closes the journal file.
+
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
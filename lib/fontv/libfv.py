@@ -15,15 +15,52 @@
 
 from __future__ import unicode_literals
 
+import io
 import os
 import re
 
 from fontTools import ttLib
+from fontTools.misc.fixedTools import floatToFixed
 from git import Repo
 
+from fontv.archive import (
+    is_archive_path,
+    read_archive_font,
+    split_archive_path,
+    write_archive,
+)
+from fontv.dedupe import file_digest, stream_digest
+from fontv.inplace import write_version_in_place
+from fontv.locking import FontLock
+from fontv.output import write_output_font
+from fontv.telemetry import count, has_counter_callbacks, span
 from fontv.utilities import get_git_root_path
 
 
+def get_git_commit_sha1(gitroot_path):
+    """
+    Makes a system git call via the GitPython library and returns a short git commit SHA1 hash string for the commit
+    at HEAD using `git rev-list`.
+
+    :param gitroot_path: (string) path to the root directory of the git repository
+
+    :return: (string) short git commit SHA1 hash string
+    """
+    count("git_calls")
+    with span("git.commit_sha1"):
+        repo = Repo(gitroot_path)
+        gitpy = repo.git
+        # git rev-list --abbrev-commit --max-count=1 --format="%h" HEAD - abbreviated unique sha1 for the repository
+        # number of sha1 hex characters determined by git (addresses https://github.com/source-foundry/font-v/issues/2)
+        full_git_sha_string = gitpy.rev_list(
+            "--abbrev-commit", "--max-count=1", '--format="%h"', "HEAD"
+        )
+    unicode_full_sha_string = full_git_sha_string
+    sha_string_list = unicode_full_sha_string.split("\n")
+    final_sha_string = sha_string_list[1].replace('"', "")
+    return final_sha_string
+
+
 class FontVersion(object):
     """
     FontVersion is a ttf and otf font version string class that provides support for font version string reads,
@@ -45,12 +82,22 @@ class FontVersion(object):
 
     fontpath: (string) The path to the font file
 
+    git_sha1_cache: (dictionary) optional {git root path : short git commit SHA1 hash string} map.  When defined, git
+                    commit SHA1 lookups are read from and added to this map.  Share one map across FontVersion objects
+                    to make one git call per repository in batch operations
+
     is_development: (boolean) boolean for presence of development status substring at version_string_parts[1]
 
     is_release: (boolean) boolean for presence of release status status substring at version_string_parts[1]
 
+    lock: (fontv.locking.FontLock) the font file lock that was acquired with the lock parameter or None
+
     metadata: (list) A list of metadata substrings in the version string. Either version_string_parts[1:] or empty list
 
+    propagate_version: (boolean) True = write_version_string() also writes a new version number to the name table
+                       ID 3 unique font identifier records and the CFF table top DICT version that include the current
+                       version number.  Default = False
+
     release_string: (string) The string to use for release builds in the absence of git commit SHA1 string
 
     sha1_develop: (string) The string to append to the git SHA1 hash string for development builds
@@ -59,7 +106,12 @@ class FontVersion(object):
 
     state: (string) The state metadata substring
 
-    ttf: (fontTools.ttLib.TTFont) for font file
+    updated_fields: (list) of (field name, old value string, new value string) tuples for each font field that was
+                    modified by the last write_version_string() call
+
+    ttf: (fontTools.ttLib.TTFont) for font file.  FontVersion objects that open the font file (i.e. that are not
+         instantiated from a TTFont object) keep the file open until close() is called.  Use close() or a `with`
+         statement to release the file handle and table data when the font is no longer needed
 
     version_string_parts: (list) List that maintains in memory semicolon parsed substrings of font version string
 
@@ -71,6 +123,8 @@ class FontVersion(object):
     _nameID_5_dict: (dictionary) {(platformID, platEncID,langID) : fontTools.ttLib.TTFont name record ID 5 object } map
 
     :parameter font: (string) file path to the .otf or .ttf font file OR (ttLib.TTFont) object for appropriate font file
+                     OR a binary stream with a `name` attribute (e.g. fontv.utilities.NamedBytesIO)
+                     OR (string) zip/tar archive member path with `archive.zip!path/to/Font.ttf` syntax
 
     :parameter develop: (string) the string to use for development builds in the absence of git commit SHA1 string
 
@@ -80,8 +134,14 @@ class FontVersion(object):
 
     :parameter sha1_release: (string) the string to append to the git SHA1 hash string for release builds
 
+    :parameter lock: (string) optional fontv.locking.LOCK_WAIT or LOCK_NOWAIT mode of an exclusive cross-process
+                     advisory lock on the font file (or the archive file of an archive member font) that is held from
+                     the font read until close() is called.  Default = no lock
+
     :raises: fontTools.ttLib.TTLibError if fontpath is not a ttf or otf font
 
+    :raises: fontv.locking.FontLockedError if the font file is locked by another process with lock = LOCK_NOWAIT
+
     :raises: IndexError if there are no nameID 5 records in the font name table
 
     :raises: IOError if fontpath does not exist
@@ -94,22 +154,73 @@ class FontVersion(object):
         release="RELEASE",
         sha1_develop="-dev",
         sha1_release="-release",
+        lock=None,
     ):
+        # cross-process font file lock that is held from the font read to close()
+        self.lock = None
         try:
             # assume that it is a ttLib.TTFont object and attempt to call object attributes
             self.fontpath = font.reader.file.name
             # if it does not raise AttributeError, we guessed correctly, can set the ttf attr here
             self.ttf = font
+            # the caller owns the TTFont object and its file handle
+            self._owns_ttf = False
+            # in-place writes are limited to fonts that are read from a file path
+            self._source_stat = None
         except AttributeError:
-            # if above attempt to call TTFont attribute raises AttributeError (as it would with string file path)
-            # then instantiate a ttLib.TTFont object and define the fontpath attribute with the file path string
-            self.ttf = ttLib.TTFont(file=font, recalcTimestamp=False)
-            self.fontpath = font
+            # if above attempt to call TTFont attribute raises AttributeError (as it would with string file path
+            # or a binary stream) then instantiate a ttLib.TTFont object and define the fontpath attribute with
+            # the file path string or the name of the binary stream
+            if lock is not None and isinstance(font, str):
+                lock_path = font
+                if is_archive_path(font):
+                    # archive member fonts lock the archive file
+                    lock_path = split_archive_path(font)[0]
+                self.lock = FontLock(lock_path, lock)
+                self.lock.acquire()
+            try:
+                if isinstance(font, str) and is_archive_path(font):
+                    # `archive.zip!path/to/Font.ttf` syntax paths are read from the archive into memory
+                    with span("archive.read"):
+                        font = read_archive_font(font)
+                self._source_stat = None
+                if isinstance(font, str):
+                    self._source_stat = _get_file_stat(font)
+                with span("font.load"):
+                    self.ttf = ttLib.TTFont(file=font, recalcTimestamp=False)
+            except BaseException:
+                if self.lock is not None:
+                    self.lock.release()
+                raise
+            self.fontpath = getattr(font, "name", font)
+            self._owns_ttf = True
+
+        self._init_version_data(develop, release, sha1_develop, sha1_release)
+
+        # object instantiation method call (truth test values updated in the following method)
+        try:
+            with span("font.name_decode"):
+                self._read_version_string()
+        except Exception:
+            self.close()
+            raise
+        count("fonts_processed")
+        if has_counter_callbacks():
+            count("bytes_read", _get_file_size(self.ttf.reader.file))
+
+    def _init_version_data(self, develop, release, sha1_develop, sha1_release):
+        """
+        Private method that defines the version data attributes with default values before the version data are read.
 
+        :return: None
+        """
         self.develop_string = develop
         self.release_string = release
         self.sha1_develop = sha1_develop
         self.sha1_release = sha1_release
+        self.git_sha1_cache = None
+        self.propagate_version = False
+        self.updated_fields = []
 
         # name.ID = 5 version string substring data
         self.name_ID5_dict = {}
@@ -132,8 +243,28 @@ class FontVersion(object):
         # head.fontRevision data.  float type
         self.head_fontRevision = 0.0
 
-        # object instantiation method call (truth test values updated in the following method)
-        self._read_version_string()
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """
+        Public method that closes the font file and releases the fontTools.ttLib.TTFont table data.  A TTFont object
+        that was passed to the FontVersion constructor is not closed because it is owned by the caller.  The
+        version string attributes remain available after the call.  The version string cannot be written after the
+        font is closed.  The font file lock is released.
+
+        :return: None
+        """
+        if self._owns_ttf and self.ttf is not None:
+            self.ttf.close()
+            # drop the reference so that the decompiled tables can be garbage collected
+            self.ttf = None
+        if self.lock is not None:
+            self.lock.release()
 
     def __eq__(self, otherfont):
         """
@@ -247,22 +378,20 @@ class FontVersion(object):
 
     def _get_repo_commit(self):
         """
-        Private method that makes a system git call via the GitPython library and returns a short git commit
-        SHA1 hash string for the commit at HEAD using `git rev-list`.
+        Private method that returns a short git commit SHA1 hash string for the commit at HEAD of the git repository
+        that contains the font.  The git call is skipped when the FontVersion.git_sha1_cache map already includes the
+        repository.
 
         :return: (string) short git commit SHA1 hash string
         """
-        repo = Repo(get_git_root_path(self.fontpath))
-        gitpy = repo.git
-        # git rev-list --abbrev-commit --max-count=1 --format="%h" HEAD - abbreviated unique sha1 for the repository
-        # number of sha1 hex characters determined by git (addresses https://github.com/source-foundry/font-v/issues/2)
-        full_git_sha_string = gitpy.rev_list(
-            "--abbrev-commit", "--max-count=1", '--format="%h"', "HEAD"
-        )
-        unicode_full_sha_string = full_git_sha_string
-        sha_string_list = unicode_full_sha_string.split("\n")
-        final_sha_string = sha_string_list[1].replace('"', "")
-        return final_sha_string
+        gitroot_path = get_git_root_path(self.fontpath)
+        if self.git_sha1_cache is None:
+            return get_git_commit_sha1(gitroot_path)
+        if gitroot_path in self.git_sha1_cache:
+            count("git_sha1_cache_hits")
+        else:
+            self.git_sha1_cache[gitroot_path] = get_git_commit_sha1(gitroot_path)
+        return self.git_sha1_cache[gitroot_path]
 
     def _parse_metadata(self):
         """
@@ -468,11 +597,7 @@ class FontVersion(object):
 
         :return: string (Python 3) or unicode (Python 2).  Empty string if unable to parse version number format
         """
-        match = re.search(r"\d{1,3}\.\d{1,3}", self.version)
-        if match:
-            return match.group(0)
-        else:
-            return ""
+        return parse_version_number(self.version)
 
     def get_version_number_tuple(self):
         """
@@ -656,7 +781,7 @@ class FontVersion(object):
         self._parse()
         self.head_fontRevision = float(self.get_version_number_string())
 
-    def write_version_string(self, fontpath=None):
+    def write_version_string(self, fontpath=None, in_place=True, snapshot=None, link=None):
         """
         Public method that writes the in memory version data to:
 
@@ -671,25 +796,239 @@ class FontVersion(object):
         The write is to a .otf file if the FontVersion object was instantiated from a .otf binary and a .ttf
         file if the FontVersion object was instantiated from a .ttf binary.  By default the write is to the same
         file path that was used for instantiation of the FontVersion object.  This write path default can be modified by
-        passing a new file path in the fontpath parameter.
+        passing a new file path in the fontpath parameter.  Writes to `archive.zip!path/to/Font.ttf` syntax paths
+        produce a new archive with the member font replaced.
 
-        :param fontpath: (string) optional file path to write out the font version string to a font binary
+        Writes to the font file that the FontVersion object was instantiated from are performed in place when every
+        new nameID 5 string has the same encoded length as the current string (e.g. a git commit SHA1 state substring
+        replacement).  The nameID 5 string bytes, head.fontRevision, and the name / head checksums are overwritten
+        without a full font write.  All other writes are full font writes.
+
+        :param fontpath: (string) optional file path to write out the font version string to a font binary, OR a
+                         writable binary stream
+
+        :param in_place: (boolean) False = always perform a full font write
+
+        :param snapshot: (fontv.snapshot.SnapshotWriter) optional snapshot file writer that records the original name
+                         and head tables of font file writes for `font-v revert`
+
+        :param link: (string) optional "reflink", "hardlink", or "copy" link mode for writes to a file path other than
+                     the source font file.  The source font file is materialized at fontpath with the link mode and
+                     the version data are patched in place, see fontv.output.write_output_font()
 
         :return: None
+
+        :raises: ValueError if the FontVersion object was closed
         """
+        if self.ttf is None:
+            raise ValueError("unable to write a closed FontVersion object for " + str(self.fontpath))
+
         # Write to name table ID 5 record
         version_string = self.get_name_id5_version_string()
         namerecord_list = self.ttf["name"].names
+        updated_fields = []
+        # the current version number of the font is replaced in related fields
+        current_version_number = ""
         for record in namerecord_list:
             if record.nameID == 5:
+                current_string = record.toUnicode()
+                if current_version_number == "":
+                    current_version_number = parse_version_number(current_string)
+                if current_string != version_string:
+                    updated_fields.append(
+                        (_get_name_field(record), current_string, version_string)
+                    )
                 # write to fonttools ttLib object name ID 5 table record for each nameID 5 record found in the font
                 record.string = version_string
 
-        # Write version number to head table fontRevision record
-        self.ttf["head"].fontRevision = self.head_fontRevision
+        # Write version number to head table fontRevision record.  The record is a 16.16 fixed-point number, compare
+        # the fixed-point values (e.g. 1.010 is read from the font as 1.0099945068359375)
+        if floatToFixed(self.ttf["head"].fontRevision, 16) != floatToFixed(
+            self.head_fontRevision, 16
+        ):
+            updated_fields.append(
+                (
+                    "head.fontRevision",
+                    "{:.3f}".format(self.ttf["head"].fontRevision),
+                    "{:.3f}".format(self.head_fontRevision),
+                )
+            )
+            self.ttf["head"].fontRevision = self.head_fontRevision
+
+        if self.propagate_version:
+            updated_fields.extend(
+                self._propagate_version_number(
+                    current_version_number, self.get_version_number_string()
+                )
+            )
+        self.updated_fields = updated_fields
+        count("fonts_written" if len(updated_fields) > 0 else "fonts_unchanged")
 
         # Write changes out to the font binary path
         if fontpath is None:
-            self.ttf.save(self.fontpath)
+            fontpath = self.fontpath
+
+        if isinstance(fontpath, str) and is_archive_path(fontpath):
+            archive_path, member = split_archive_path(fontpath)
+            fontbuffer = io.BytesIO()
+            with span("font.save"):
+                self.ttf.save(fontbuffer)
+            with span("archive.write"):
+                write_archive(archive_path, {member: fontbuffer.getvalue()})
+            count("bytes_written", fontbuffer.getbuffer().nbytes)
         else:
-            self.ttf.save(fontpath)
+            if snapshot is not None and isinstance(fontpath, str):
+                # the original table data and file contents are held by the fontTools reader
+                original_tables = (self.ttf.reader["name"], self.ttf.reader["head"])
+                input_sha256 = stream_digest(self.ttf.reader.file)
+            bytes_written = None
+            if (
+                link is not None
+                and isinstance(fontpath, str)
+                and fontpath != self.fontpath
+                and self._source_stat is not None
+                and self._source_stat == _get_file_stat(self.fontpath)
+            ):
+                with span("font.save"):
+                    bytes_written = write_output_font(
+                        self.ttf,
+                        self.fontpath,
+                        fontpath,
+                        len(updated_fields) > 0,
+                        link,
+                        in_place,
+                    )[0]
+            elif (
+                in_place
+                and fontpath == self.fontpath
+                and self._source_stat is not None
+                and self._source_stat == _get_file_stat(fontpath)
+            ):
+                with span("font.save"):
+                    bytes_written = write_version_in_place(self.ttf, fontpath)
+            if bytes_written is not None:
+                count("bytes_written", bytes_written)
+            else:
+                with span("font.save"):
+                    self.ttf.save(fontpath)
+                if has_counter_callbacks():
+                    count("bytes_written", _get_file_size(fontpath))
+            if fontpath == self.fontpath and self._source_stat is not None:
+                self._source_stat = _get_file_stat(fontpath)
+            if snapshot is not None and isinstance(fontpath, str):
+                snapshot.record(
+                    fontpath,
+                    original_tables[0],
+                    original_tables[1],
+                    input_sha256,
+                    file_digest(fontpath),
+                )
+
+    def _propagate_version_number(self, current_version_number, new_version_number):
+        """
+        Private method that replaces the current version number with a new version number in the name table ID 3
+        records and the CFF table top DICT version of the TTFont object.  A CFF version that is only a number is
+        replaced with the new version number.
+
+        :param current_version_number: (string) the current version number in X.XXX format
+        :param new_version_number: (string) the new version number in X.XXX format
+        :return: (list) of (field name, old value string, new value string) tuples for the modified fields
+        """
+        if current_version_number == "" or new_version_number == "":
+            return []
+        updated_fields = []
+        for record in self.ttf["name"].names:
+            if record.nameID == 3:
+                current_string = record.toUnicode()
+                new_string = replace_version_number(
+                    current_string, current_version_number, new_version_number
+                )
+                if new_string != current_string:
+                    record.string = new_string
+                    updated_fields.append(
+                        (_get_name_field(record), current_string, new_string)
+                    )
+        if "CFF " in self.ttf:
+            top_dict = self.ttf["CFF "].cff.topDictIndex[0]
+            current_string = getattr(top_dict, "version", None)
+            if current_string is not None:
+                if re.fullmatch(r"\d+(\.\d+)?", current_string):
+                    new_string = new_version_number
+                else:
+                    new_string = replace_version_number(
+                        current_string, current_version_number, new_version_number
+                    )
+                if new_string != current_string:
+                    top_dict.version = new_string
+                    updated_fields.append(("CFF.topDict.version", current_string, new_string))
+        return updated_fields
+
+
+def is_valid_version_number(version_number):
+    """
+    Tests whether a version number definition (e.g. a `write --ver` or manifest version) is in the X.XXX format where
+    X are integers.  Definitions that can be cast to a float type but are not version numbers (e.g. nan, inf, 1e3)
+    are not valid.
+
+    :param version_number: (string) version number
+
+    :return: (boolean)
+    """
+    return re.fullmatch(r"\d+\.\d+", version_number) is not None
+
+
+def parse_version_number(version_string):
+    """
+    Returns the X.XXX version number substring of a version string (e.g. a name ID 5 or UFO openTypeNameVersion
+    string).
+
+    :param version_string: (string) version string
+
+    :return: (string) version number substring or an empty string if the version string does not include a version
+             number
+    """
+    match = re.search(r"\d{1,3}\.\d{1,3}", version_string)
+    if match:
+        return match.group(0)
+    return ""
+
+
+def replace_version_number(string, current_version_number, new_version_number):
+    """
+    Replaces a version number in a string (e.g. a name ID 3 unique ID record) with a new version number.  Occurrences
+    that are part of a longer number are not replaced.
+
+    :param string: (string) the string that includes the version number
+    :param current_version_number: (string) the version number to replace
+    :param new_version_number: (string) the new version number
+
+    :return: (string) the string with the new version number
+    """
+    pattern = r"(?<![\d.])" + re.escape(current_version_number) + r"(?![\d])"
+    return re.sub(pattern, new_version_number, string)
+
+
+def _get_name_field(record):
+    """Returns the `name ID N (platformID, platEncID, langID)` field name of a name record"""
+    return (
+        "name ID "
+        + str(record.nameID)
+        + " "
+        + str((record.platformID, record.platEncID, record.langID))
+    )
+
+
+def _get_file_stat(filepath):
+    """Returns the (size, modification time) of a file path that is used to detect file changes after a read"""
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _get_file_size(file):
+    """Returns the size in bytes of a file path or a seekable binary stream"""
+    if isinstance(file, str):
+        return os.path.getsize(file)
+    position = file.tell()
+    size = file.seek(0, io.SEEK_END)
+    file.seek(position)
+    return size
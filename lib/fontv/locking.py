@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Cross-process advisory locks for font writes.
+
+A FontLock is an exclusive fcntl.flock() lock on the font file that is held from the font read through the font
+write so that concurrent font-v writers do not overwrite each other's modifications.  Writers that replace a font
+file with a rename (e.g. `write --transaction`) leave a new file at the path.  A lock is therefore acquired again when
+the locked file is no longer the file at the path.  The locks are advisory: they coordinate font-v processes and do not
+block other programs.  Locks are not supported (and are not acquired) on platforms without fcntl.
+
+Lock wait times are reported as `lock.wait` fontv.telemetry spans.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import time
+
+from fontv.telemetry import count, span
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# lock modes
+LOCK_WAIT = "wait"
+LOCK_NOWAIT = "nowait"
+LOCK_MODES = (LOCK_WAIT, LOCK_NOWAIT)
+
+# failure report message of the fonts that are skipped with LOCK_NOWAIT
+LOCKED_FAILURE_MESSAGE = "skipped: locked by another process"
+
+
+class FontLockedError(BlockingIOError):
+    """
+    Raised by a LOCK_NOWAIT lock request for a font that is locked by another process.  The fontpath attribute is the
+    path of the locked font.
+    """
+
+    def __init__(self, fontpath):
+        self.fontpath = fontpath
+        BlockingIOError.__init__(self, fontpath + " is locked by another process")
+
+
+class FontLock(object):
+    """
+    An exclusive advisory lock on a font file.  Use as a context manager or call acquire() and release().
+
+    :parameter fontpath: (string) font file path
+
+    :parameter mode: (string) LOCK_WAIT = wait for the lock; LOCK_NOWAIT = raise FontLockedError if the font is locked
+
+    :parameter wait_time: (float) seconds spent in the last acquire() call
+
+    :raises: ValueError if mode is not a supported lock mode
+    """
+
+    def __init__(self, fontpath, mode=LOCK_WAIT):
+        if mode not in LOCK_MODES:
+            raise ValueError(
+                "Unsupported lock mode '" + str(mode) + "'. Use one of " + ", ".join(LOCK_MODES)
+            )
+        self.fontpath = fontpath
+        self.mode = mode
+        self.wait_time = 0.0
+        self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    @property
+    def is_locked(self):
+        return self._fd is not None
+
+    def acquire(self):
+        """
+        Acquires the lock.  Waits for the lock in LOCK_WAIT mode.
+
+        :return: None
+        :raises: FontLockedError if the font is locked by another process in LOCK_NOWAIT mode
+        :raises: IOError if the font file cannot be opened
+        """
+        if fcntl is None or self._fd is not None:
+            return
+        operation = fcntl.LOCK_EX
+        if self.mode == LOCK_NOWAIT:
+            operation |= fcntl.LOCK_NB
+        start = time.perf_counter()
+        with span("lock.wait"):
+            while True:
+                fd = os.open(self.fontpath, os.O_RDONLY)
+                try:
+                    fcntl.flock(fd, operation)
+                    locked_stat = os.fstat(fd)
+                    path_stat = os.stat(self.fontpath)
+                except BlockingIOError:
+                    os.close(fd)
+                    count("fonts_locked")
+                    raise FontLockedError(self.fontpath)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                if (locked_stat.st_dev, locked_stat.st_ino) == (
+                    path_stat.st_dev,
+                    path_stat.st_ino,
+                ):
+                    self._fd = fd
+                    break
+                # the file was replaced while the lock was requested.  Lock the new file
+                os.close(fd)
+        self.wait_time = time.perf_counter() - start
+
+    def release(self):
+        """
+        Releases the lock.  A lock that is not held is not modified.
+
+        :return: None
+        """
+        if self._fd is not None:
+            # closing the file descriptor releases the flock() lock
+            os.close(self._fd)
+            self._fd = None
+
+
+def acquire_font_locks(fontpaths, mode=LOCK_WAIT):
+    """
+    Acquires the locks of a list of font files for a write that modifies all of them.  The locks are acquired in file
+    identity order so that writers with overlapping font lists do not deadlock.  Paths to the same file (e.g. hard
+    links) are locked once.  If a lock cannot be acquired, the locks that were acquired are released.
+
+    :param fontpaths: (list) font file paths
+    :param mode: (string) LOCK_WAIT or LOCK_NOWAIT
+    :return: (list) of acquired FontLock objects.  Release each lock after the write
+    :raises: FontLockedError if a font is locked by another process in LOCK_NOWAIT mode
+    :raises: IOError if a font file cannot be opened
+    """
+    # {(st_dev, st_ino) : font path} map
+    files = {}
+    for fontpath in fontpaths:
+        st = os.stat(fontpath)
+        files.setdefault((st.st_dev, st.st_ino), fontpath)
+    locks = []
+    try:
+        for file_id in sorted(files):
+            lock = FontLock(files[file_id], mode)
+            lock.acquire()
+            locks.append(lock)
+    except BaseException:
+        release_font_locks(locks)
+        raise
+    return locks
+
+
+def release_font_locks(locks):
+    """
+    Releases a list of FontLock objects.
+
+    :param locks: (list) of FontLock objects
+    :return: None
+    """
+    for lock in reversed(locks):
+        lock.release()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+import csv
+import glob
+import json
+import os
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from fontv.batch import WriteRequest, get_git_sha1_cache, map_parallel
+from fontv.libfv import FontVersion, is_valid_version_number
+from fontv.locking import LOCKED_FAILURE_MESSAGE, FontLockedError
+from fontv.utilities import is_font
+
+MANIFEST_FIELDS = ("path", "version", "status", "state")
+STATUS_VALUES = ("", "dev", "rel")
+STATE_VALUES = ("", "sha1")
+
+
+class ManifestError(ValueError):
+    """
+    Manifest validation exception.  The errors attribute is a list of all error message strings that were identified
+    in the manifest.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        ValueError.__init__(self, os.linesep.join(errors))
+
+
+class ManifestEntry(object):
+    """
+    A manifest entry that maps a font path or glob pattern to version number, status, and state assignments.
+
+    :parameter index: (int) one-based entry position in the manifest
+
+    :parameter path: (string) font path or glob pattern (relative paths are relative to the manifest directory)
+
+    :parameter version: (string) version number in X.XXX format or empty string to keep the current version number
+
+    :parameter status: (string) "dev", "rel", or empty string for no status change
+
+    :parameter state: (string) "sha1" or empty string for no state change
+    """
+
+    def __init__(self, index, path, version="", status="", state=""):
+        self.index = index
+        self.path = path
+        self.version = version
+        self.status = status
+        self.state = state
+        self.fontpaths = []  # defined by resolve_manifest()
+
+    def __repr__(self):
+        return "<fontv.manifest.ManifestEntry> " + str(self.index) + ": " + self.path
+
+    def get_write_request(self):
+        """
+        Returns the fontv.batch.WriteRequest for the entry assignments.
+
+        :return: (fontv.batch.WriteRequest)
+        """
+        return WriteRequest(
+            version_number=self.version if self.version != "" else None,
+            sha1=self.state == "sha1",
+            development=self.status == "dev",
+            release=self.status == "rel",
+        )
+
+
+class FontResult(object):
+    """
+    The result of a manifest font write.
+
+    :parameter fontpath: (string) path to the font
+
+    :parameter version_string: (string) the new name ID 5 version string, empty string on error
+
+    :parameter error: (string) error message, empty string on success
+    """
+
+    def __init__(self, fontpath, version_string="", error=""):
+        self.fontpath = fontpath
+        self.version_string = version_string
+        self.error = error
+
+
+def read_manifest(manifest_path):
+    """
+    Reads a .csv, .json, or .toml manifest file.
+
+    CSV manifests include a header row with path, version, status, and state columns.  JSON manifests define a list of
+    entry objects or an object with a "fonts" list of entry objects.  TOML manifests define a [[fonts]] array of tables.
+
+    :param manifest_path: (string) path to the manifest file
+    :return: (list) of ManifestEntry objects
+    :raises: ManifestError if the manifest format is not supported or the entries are not properly formatted
+    """
+    extension = os.path.splitext(manifest_path)[1].lower()
+    if extension == ".csv":
+        with open(manifest_path, newline="") as f:
+            records = list(csv.DictReader(f))
+    elif extension == ".json":
+        with open(manifest_path) as f:
+            records = json.load(f)
+    elif extension == ".toml":
+        if tomllib is None:
+            raise ManifestError(
+                [
+                    "TOML manifests require Python 3.11+ or the tomli package. "
+                    "Use `pip install tomli`."
+                ]
+            )
+        with open(manifest_path, "rb") as f:
+            records = tomllib.load(f)
+    else:
+        raise ManifestError(
+            [manifest_path + " is not a .csv, .json, or .toml manifest file"]
+        )
+
+    if isinstance(records, dict):
+        records = records.get("fonts", [])
+    if not isinstance(records, list):
+        raise ManifestError([manifest_path + " does not define a list of font entries"])
+
+    entries = []
+    errors = []
+    for index, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            errors.append("entry " + str(index) + ": entry is not a key:value mapping")
+            continue
+        unknown_fields = sorted(set(record.keys()) - set(MANIFEST_FIELDS))
+        if len(unknown_fields) > 0:
+            errors.append(
+                "entry " + str(index) + ": unsupported field(s) " + ", ".join(unknown_fields)
+            )
+            continue
+        fields = {}
+        for field in MANIFEST_FIELDS:
+            value = record.get(field)
+            if value is not None and not isinstance(value, str):
+                # e.g. an unquoted TOML or JSON version = 2.010 is read as the number 2.01
+                errors.append(
+                    "entry "
+                    + str(index)
+                    + ": "
+                    + field
+                    + " must be a quoted string, found "
+                    + repr(value)
+                )
+                continue
+            fields[field] = "" if value is None else value.strip()
+        if len(fields) == len(MANIFEST_FIELDS):
+            entries.append(ManifestEntry(index, **fields))
+
+    if len(errors) > 0:
+        raise ManifestError(errors)
+    return entries
+
+
+def resolve_manifest(entries, basedir="."):
+    """
+    Validates manifest entries and defines the ManifestEntry.fontpaths list of matched font paths for each entry.
+    All entries are validated before the function returns so that a manifest with any invalid entry is rejected
+    before any file is written.
+
+    :param entries: (list) of ManifestEntry objects
+    :param basedir: (string) directory for relative path and glob pattern resolution
+    :return: None
+    :raises: ManifestError with every identified error
+    """
+    errors = []
+    # {font path : first ManifestEntry that matched the path} map for conflict detection
+    claimed_paths = {}
+    for entry in entries:
+        label = "entry " + str(entry.index) + " (" + entry.path + "): "
+        if entry.path == "":
+            errors.append(label + "missing path")
+            continue
+        if entry.version != "":
+            entry.version = entry.version.replace("-", ".").replace("_", ".")
+            if not is_valid_version_number(entry.version):
+                errors.append(label + "invalid version number '" + entry.version + "'")
+        entry.status = entry.status.lower()
+        if entry.status not in STATUS_VALUES:
+            errors.append(label + "status must be one of dev, rel, or empty")
+        entry.state = entry.state.lower()
+        if entry.state not in STATE_VALUES:
+            errors.append(label + "state must be one of sha1 or empty")
+        if entry.version == "" and entry.status == "" and entry.state == "":
+            errors.append(label + "no version, status, or state changes specified")
+
+        pattern = entry.path
+        if not os.path.isabs(pattern):
+            pattern = os.path.join(basedir, pattern)
+        entry.fontpaths = sorted(
+            os.path.normpath(fontpath)
+            for fontpath in glob.glob(pattern, recursive=True)
+            if is_font(fontpath) and os.path.isfile(fontpath)
+        )
+        if len(entry.fontpaths) == 0:
+            errors.append(label + "no .ttf or .otf fonts match the path")
+        for fontpath in entry.fontpaths:
+            if fontpath in claimed_paths:
+                errors.append(
+                    label
+                    + fontpath
+                    + " is also assigned by entry "
+                    + str(claimed_paths[fontpath].index)
+                )
+            else:
+                claimed_paths[fontpath] = entry
+
+    if len(errors) > 0:
+        raise ManifestError(errors)
+
+
+def get_manifest_git_sha1_cache(entries):
+    """
+    Returns a {git root path : short git commit SHA1 hash string} map for the fonts in entries that request sha1 state
+    metadata.  One git call is made per repository.
+
+    :param entries: (list) of resolved ManifestEntry objects
+    :return: (dict)
+    :raises: ManifestError if a git repository cannot be identified for a font or the git call fails
+    """
+    git_sha1_cache = {}
+    errors = []
+    for entry in entries:
+        if entry.state != "sha1":
+            continue
+        try:
+            get_git_sha1_cache(entry.fontpaths, git_sha1_cache)
+        except Exception as e:
+            errors.append("entry " + str(entry.index) + " (" + entry.path + "): " + str(e))
+    if len(errors) > 0:
+        raise ManifestError(errors)
+    return git_sha1_cache
+
+
+def apply_manifest(entries, git_sha1_cache=None, jobs=None, lock=None):
+    """
+    Writes the version assignments of resolved manifest entries to the fonts.  Fonts are written in parallel worker
+    processes.  A write error in one font does not stop writes to other fonts.
+
+    :param entries: (list) of resolved ManifestEntry objects
+    :param git_sha1_cache: (dict) {git root path : short git commit SHA1 hash string} map shared with all workers
+    :param jobs: (int) number of worker processes.  Default = number of CPUs.  1 = write in the calling process
+    :param lock: (string) optional fontv.locking.LOCK_WAIT or LOCK_NOWAIT mode of the font file lock that each
+                 worker holds from the font read through the font write.  LOCK_NOWAIT fonts that are locked by
+                 another process fail with a fontv.locking.LOCKED_FAILURE_MESSAGE error.  Default = no locks
+    :return: (dict) {ManifestEntry index : list of FontResult objects} map
+    """
+    if git_sha1_cache is None:
+        git_sha1_cache = {}
+    tasks = []
+    for entry in entries:
+        for fontpath in entry.fontpaths:
+            tasks.append(
+                (entry.index, fontpath, entry.get_write_request(), git_sha1_cache, lock)
+            )
+
+    task_results = map_parallel(_apply_font, tasks, jobs)
+
+    results = {entry.index: [] for entry in entries}
+    for index, result in task_results:
+        results[index].append(result)
+    return results
+
+
+def format_results_table(entries, results):
+    """
+    Returns a per-entry text table of manifest write results followed by a list of font errors.
+
+    :param entries: (list) of resolved ManifestEntry objects
+    :param results: (dict) apply_manifest() return value
+    :return: (string)
+    """
+    rows = [("ENTRY", "PATH", "FONTS", "WRITTEN", "FAILED", "VERSION STRING")]
+    errors = []
+    for entry in entries:
+        entry_results = results[entry.index]
+        written = [result for result in entry_results if result.error == ""]
+        version_strings = set(result.version_string for result in written)
+        if len(version_strings) == 1:
+            version_string = version_strings.pop()
+        elif len(version_strings) > 1:
+            version_string = "(" + str(len(version_strings)) + " version strings)"
+        else:
+            version_string = "-"
+        rows.append(
+            (
+                str(entry.index),
+                entry.path,
+                str(len(entry_results)),
+                str(len(written)),
+                str(len(entry_results) - len(written)),
+                version_string,
+            )
+        )
+        for result in entry_results:
+            if result.error != "":
+                errors.append("[X] " + result.fontpath + ": " + result.error)
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = [
+        "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+        for row in rows
+    ]
+    return os.linesep.join(lines + errors)
+
+
+def _apply_font(task):
+    """Worker process function that applies one manifest assignment to one font and writes it to disk"""
+    index, fontpath, write_request, git_sha1_cache, lock = task
+    try:
+        with FontVersion(fontpath, lock=lock) as fv:
+            fv.git_sha1_cache = git_sha1_cache
+            write_request.apply(fv)
+            fv.write_version_string()
+            return index, FontResult(fontpath, fv.get_name_id5_version_string())
+    except FontLockedError:
+        # LOCK_NOWAIT fonts that are locked by another process are skipped
+        return index, FontResult(fontpath, error=LOCKED_FAILURE_MESSAGE)
+    except Exception as e:
+        return index, FontResult(fontpath, error=type(e).__name__ + ": " + str(e))
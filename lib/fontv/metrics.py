@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+import json
+import os
+import tempfile
+import time
+
+from fontv.telemetry import (
+    add_counter_callback,
+    add_span_callback,
+    remove_counter_callback,
+    remove_span_callback,
+)
+
+# counters that are included in every metrics file (see fontv.telemetry for definitions)
+COUNTERS = (
+    "fonts_processed",
+    "fonts_written",
+    "fonts_unchanged",
+    "errors",
+    "git_calls",
+    "git_sha1_cache_hits",
+    "dedupe_hits",
+    "bytes_read",
+    "bytes_written",
+    "bytes_cloned",
+    "fonts_locked",
+)
+
+# JSON run summary format version
+METRICS_FORMAT = 1
+
+_COUNTER_HELP = {
+    "fonts_processed": "Fonts read.",
+    "fonts_written": "Font files written.",
+    "fonts_unchanged": "Font writes with no version string or fontRevision change.",
+    "errors": "Font errors and fatal command errors.",
+    "git_calls": "git subprocess calls.",
+    "git_sha1_cache_hits": "git commit SHA1 lookups served from the cache.",
+    "dedupe_hits": "Font parses avoided with --dedupe.",
+    "bytes_read": "Font bytes read.",
+    "bytes_written": "Font bytes written.",
+    "bytes_cloned": "Font bytes materialized with a clone, an in-kernel copy, or a hard link.",
+    "fonts_locked": "Font lock requests that found the font locked by another process.",
+}
+
+
+class RunMetrics(object):
+    """
+    Collects the fontv.telemetry counters and phase wall times of a font-v run for export as a Prometheus
+    textfile collector file or a JSON run summary.  Collection runs between start() and stop() calls.
+
+    :parameter subcommand: (string) the font-v subcommand
+
+    :parameter counters: (dict) {counter name : value} map
+
+    :parameter phase_seconds: (dict) {phase name : total elapsed time in seconds} map
+
+    :parameter phase_counts: (dict) {phase name : number of spans} map
+
+    :parameter wall_time: (float) elapsed time in seconds between start() and stop()
+
+    :parameter exit_code: (int) process exit status code
+
+    :parameter timestamp: (float) start time in seconds since the epoch
+    """
+
+    def __init__(self, subcommand=""):
+        self.subcommand = subcommand
+        self.counters = {name: 0 for name in COUNTERS}
+        self.phase_seconds = {}
+        self.phase_counts = {}
+        self.wall_time = 0.0
+        self.exit_code = 0
+        self.timestamp = 0.0
+        self._start = 0.0
+
+    def add_count(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_span(self, name, elapsed):
+        self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+        self.phase_counts[name] = self.phase_counts.get(name, 0) + 1
+
+    def start(self):
+        """
+        Registers the telemetry callbacks and starts the wall time clock.
+
+        :return: None
+        """
+        self.timestamp = time.time()
+        self._start = time.perf_counter()
+        add_counter_callback(self.add_count)
+        add_span_callback(self.add_span)
+
+    def stop(self, exit_code=0):
+        """
+        Removes the telemetry callbacks and stops the wall time clock.
+
+        :param exit_code: (int) process exit status code
+        :return: None
+        """
+        self.wall_time = time.perf_counter() - self._start
+        self.exit_code = exit_code
+        remove_counter_callback(self.add_count)
+        remove_span_callback(self.add_span)
+
+    def format_json(self):
+        """
+        Returns the JSON run summary string.
+
+        :return: (string)
+        """
+        return json.dumps(
+            {
+                "format": METRICS_FORMAT,
+                "subcommand": self.subcommand,
+                "exit_code": self.exit_code,
+                "timestamp": self.timestamp,
+                "wall_time_seconds": self.wall_time,
+                "counters": self.counters,
+                "phases": {
+                    name: {
+                        "count": self.phase_counts[name],
+                        "total_seconds": self.phase_seconds[name],
+                    }
+                    for name in self.phase_seconds
+                },
+            },
+            indent=2,
+            sort_keys=True,
+        )
+
+    def format_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        :return: (string)
+        """
+        labels = '{subcommand="' + _escape_label_value(self.subcommand) + '"}'
+        lines = []
+        for name in sorted(self.counters):
+            metric = "fontv_" + name + "_total"
+            lines.append("# HELP " + metric + " " + _COUNTER_HELP.get(name, name))
+            lines.append("# TYPE " + metric + " counter")
+            lines.append(metric + labels + " " + str(self.counters[name]))
+        for metric, help_text, value in (
+            ("fontv_run_seconds", "Wall time of the font-v run.", repr(self.wall_time)),
+            ("fontv_run_exit_code", "Exit status code of the font-v run.", str(self.exit_code)),
+            (
+                "fontv_run_timestamp_seconds",
+                "Start time of the font-v run in seconds since the epoch.",
+                repr(self.timestamp),
+            ),
+        ):
+            lines.append("# HELP " + metric + " " + help_text)
+            lines.append("# TYPE " + metric + " gauge")
+            lines.append(metric + labels + " " + value)
+        for metric, help_text, values in (
+            ("fontv_phase_seconds_total", "Wall time per phase.", self.phase_seconds),
+            ("fontv_phase_spans_total", "Number of timed spans per phase.", self.phase_counts),
+        ):
+            lines.append("# HELP " + metric + " " + help_text)
+            lines.append("# TYPE " + metric + " counter")
+            for name in sorted(values):
+                lines.append(
+                    metric
+                    + '{subcommand="'
+                    + _escape_label_value(self.subcommand)
+                    + '",phase="'
+                    + _escape_label_value(name)
+                    + '"} '
+                    + repr(values[name])
+                )
+        # the exposition format uses line feed line endings on every platform
+        return "\n".join(lines) + "\n"
+
+    def write(self, filepath):
+        """
+        Writes the metrics to filepath.  Paths with a .json extension are written as JSON run summaries.  All other
+        paths are written in the Prometheus text exposition format (use a .prom extension for the node_exporter
+        textfile collector).  The file is replaced atomically so that collectors do not read partial files.
+
+        :param filepath: (string) output file path
+        :return: None
+        """
+        if filepath.lower().endswith(".json"):
+            text = self.format_json() + "\n"
+        else:
+            text = self.format_prometheus()
+        fd, temp_path = tempfile.mkstemp(
+            prefix=".font-v-", dir=os.path.dirname(os.path.abspath(filepath))
+        )
+        try:
+            with os.fdopen(fd, "w", newline="\n") as f:
+                f.write(text)
+            # mkstemp files are only readable by the owner
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def _escape_label_value(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Font writes to a separate output tree that mirrors the input tree for `font-v write --output-dir`.
+
+The output font is materialized from the source font file with the least data movement that the file system supports
+(a copy-on-write clone, an in-kernel copy, or a hard link for unchanged fonts) and the version data are then patched
+in place in the output file.  On copy-on-write file systems only the patched blocks of a modified font are written.
+Fonts that cannot be patched in place are written with a fontTools.ttLib.TTFont.save() call that copies the table
+data of the unmodified tables and compiles only the modified tables.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from fontv.dedupe import LINK_MODES, clone_file
+from fontv.inplace import write_version_in_place
+from fontv.telemetry import count
+
+
+def get_input_root(paths):
+    """
+    Returns the deepest common directory of a list of font file and directory paths.  The output tree mirrors the
+    directory structure below this directory.
+
+    :param paths: (list) font file paths and directory paths
+    :return: (string) absolute directory path
+    :raises: ValueError if paths is empty or the paths are on different drives
+    """
+    directories = [
+        os.path.abspath(path) if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+        for path in paths
+    ]
+    return os.path.commonpath(directories)
+
+
+def get_output_path(fontpath, input_root, output_dir):
+    """
+    Returns the output tree path of a font file.
+
+    :param fontpath: (string) font file path below input_root
+    :param input_root: (string) absolute input tree directory path, see get_input_root()
+    :param output_dir: (string) output tree directory path
+    :return: (string) output font file path
+    """
+    return os.path.join(output_dir, os.path.relpath(os.path.abspath(fontpath), input_root))
+
+
+def write_output_font(
+    ttf, source_path, output_path, modified=True, mode="reflink", in_place=True
+):
+    """
+    Materializes a font at an output path from the source font file and writes the version data of the TTFont object
+    to the output file.  The output file is replaced atomically with a rename from a temporary file in the output
+    directory.  Missing output directories are created.
+
+    :param ttf: (fontTools.ttLib.TTFont) the font with the new version data that was read from source_path
+    :param source_path: (string) path to the unmodified source font file
+    :param output_path: (string) output font file path
+    :param modified: (boolean) False = the TTFont object does not include version data changes and the source font
+                     file is materialized without a write
+    :param mode: (string) "reflink" = copy-on-write clone with a fallback to an in-kernel copy or a byte copy;
+                 "hardlink" = hard link unchanged fonts to the source inode and clone modified fonts; "copy" = byte
+                 copy
+    :param in_place: (boolean) False = always write modified fonts with a full font write
+    :return: (tuple) (number of bytes written, materialization method: "reflink", "copy_file_range", "copy", or
+             "hardlink")
+    :raises: ValueError if mode is not a supported link mode or if the output path is the source font file
+    :raises: IOError if a file cannot be read or written
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(
+            "Unsupported link mode '" + mode + "'. Use one of " + ", ".join(LINK_MODES)
+        )
+    if os.path.exists(output_path) and os.path.samefile(source_path, output_path):
+        raise ValueError(output_path + " is the source font file")
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".font-v-", suffix=".tmp", dir=output_dir)
+    os.close(fd)
+    source_size = os.path.getsize(source_path)
+    try:
+        if modified and not in_place:
+            ttf.save(temp_path)
+            shutil.copymode(source_path, temp_path)
+            os.replace(temp_path, output_path)
+            return os.path.getsize(output_path), "copy"
+        method = None
+        if not modified and mode == "hardlink":
+            os.remove(temp_path)
+            try:
+                os.link(source_path, temp_path)
+                method = "hardlink"
+            except OSError:
+                pass  # e.g. output tree on another file system, fall back to a clone
+        if method is None:
+            if mode == "copy":
+                shutil.copyfile(source_path, temp_path)
+                method = "copy"
+            else:
+                method = clone_file(source_path, temp_path)
+            # mkstemp files are only readable by the owner
+            shutil.copymode(source_path, temp_path)
+        bytes_written = 0
+        if method == "copy":
+            bytes_written = source_size
+        else:
+            count("bytes_cloned", source_size)
+        if modified:
+            bytes_patched = write_version_in_place(ttf, temp_path)
+            if bytes_patched is None:
+                ttf.save(temp_path)
+                bytes_patched = os.path.getsize(temp_path)
+            bytes_written += bytes_patched
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return bytes_written, method
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Read-ahead prefetch of the font version data of font files.
+
+A prefetch reads the sfnt header, the table directory, and the name and head table byte ranges of a font file on a
+thread pool and assembles an in-memory font with those tables.  The in-memory font is parsed with FontVersion for
+reports while the next fonts are read.  The kernel is hinted to read the byte ranges ahead with posix_fadvise where
+it is available.  Prefetched fonts contain only the tables that are needed for version reports and cannot be used
+for writes.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fontv.sfnt import (
+    SFNT_HEADER_SIZE,
+    TABLE_RECORD_SIZE,
+    build_sfnt,
+    parse_sfnt_header,
+    parse_table_directory,
+)
+from fontv.telemetry import span
+from fontv.utilities import NamedBytesIO
+
+# tables that are read for version reports
+PREFETCH_TABLES = ("head", "name")
+# default number of fonts that are read ahead
+DEFAULT_PREFETCH_DEPTH = 8
+# the first read includes the table directory of fonts with up to ~60 tables
+_FIRST_READ_SIZE = 1024
+
+
+def prefetch_font(fontpath):
+    """
+    Reads the version data byte ranges of a font file and returns an in-memory font with the head and name tables.
+    Fonts that are not single TrueType or CFF outline sfnt fonts (e.g. collections) are returned as the font path
+    so that they are read in full by FontVersion.
+
+    :param fontpath: (string) font file path
+    :return: (fontv.utilities.NamedBytesIO) named with fontpath, or (string) fontpath
+    :raises: IOError if the file cannot be read
+    """
+    with span("prefetch.read"), open(fontpath, "rb") as f:
+        fd = f.fileno()
+        _advise_willneed(fd, 0, _FIRST_READ_SIZE)
+        data = f.read(_FIRST_READ_SIZE)
+        try:
+            sfnt_version, num_tables = parse_sfnt_header(data)
+        except ValueError:
+            return fontpath
+        directory_end = SFNT_HEADER_SIZE + num_tables * TABLE_RECORD_SIZE
+        if len(data) < directory_end:
+            data += f.read(directory_end - len(data))
+        try:
+            tables = parse_table_directory(data[SFNT_HEADER_SIZE:], num_tables)
+        except ValueError:
+            return fontpath
+        records = [tables[tag] for tag in PREFETCH_TABLES if tag in tables]
+        if len(records) < len(PREFETCH_TABLES):
+            return fontpath
+        # start read ahead of every table range before the blocking reads
+        for record in records:
+            _advise_willneed(fd, record.offset, record.length)
+        table_data = {}
+        for record in records:
+            f.seek(record.offset)
+            table_data[record.tag] = f.read(record.length)
+            if len(table_data[record.tag]) < record.length:
+                return fontpath
+    return NamedBytesIO(build_sfnt(sfnt_version, table_data), fontpath)
+
+
+class FontPrefetcher(object):
+    """
+    Reads the version data of a sequence of font files ahead of use on a thread pool.  Call get() with the font paths
+    in sequence order.  Use as a context manager or call close() to shut down the thread pool.
+
+    :parameter fontpaths: (iterable) font file paths in the order of use
+
+    :parameter depth: (int) maximum number of fonts that are read ahead
+    """
+
+    def __init__(self, fontpaths, depth=DEFAULT_PREFETCH_DEPTH):
+        self._fontpaths = iter(fontpaths)
+        self._pending = collections.deque()
+        self._depth = max(1, depth)
+        self._executor = ThreadPoolExecutor(max_workers=self._depth)
+        for _ in range(self._depth):
+            self._submit_next()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _submit_next(self):
+        fontpath = next(self._fontpaths, None)
+        if fontpath is not None:
+            self._pending.append((fontpath, self._executor.submit(prefetch_font, fontpath)))
+
+    def get(self, fontpath):
+        """
+        Returns the prefetched font for fontpath.  A font path that is not next in the prefetch sequence is returned
+        without a prefetch.  Prefetch errors return the font path so that FontVersion reports the error.
+
+        :param fontpath: (string) font file path
+        :return: (fontv.utilities.NamedBytesIO) or (string) fontpath.  Both can be passed to FontVersion
+        """
+        if len(self._pending) == 0 or self._pending[0][0] != fontpath:
+            return fontpath
+        future = self._pending.popleft()[1]
+        self._submit_next()
+        try:
+            return future.result()
+        except Exception:
+            return fontpath
+
+    def close(self):
+        """
+        Cancels pending prefetches and shuts down the thread pool.
+
+        :return: None
+        """
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=True)
+
+
+def _advise_willneed(fd, offset, length):
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, offset, length, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+from fontTools.ttLib import TTCollection, TTLibError
+
+from fontv.libfv import FontVersion
+from fontv.telemetry import span
+from fontv.utilities import SNIFF_SIZE, sniff_font_flavor
+
+
+class FontReport(object):
+    """
+    The version data of a font that is reported with `font-v report`.  FontReport objects hold strings and numbers
+    only.  They do not hold a reference to the font file or the fontTools.ttLib.TTFont table data.
+
+    :parameter fontpath: (string) path to the font
+
+    :parameter version_string: (string) the name ID 5 version string
+
+    :parameter name_ID5_dict: (dict) {(platformID, platEncID, langID) : version string} map for every nameID 5 record
+
+    :parameter head_fontRevision: (float) head.fontRevision version number
+
+    :parameter font_number: (int) index of the font in a font collection file or None for single font files
+    """
+
+    def __init__(
+        self, fontpath, version_string, name_ID5_dict, head_fontRevision, font_number=None
+    ):
+        self.fontpath = fontpath
+        self.version_string = version_string
+        self.name_ID5_dict = name_ID5_dict
+        self.head_fontRevision = head_fontRevision
+        self.font_number = font_number
+
+    @classmethod
+    def from_font_version(cls, fv, font_number=None):
+        """
+        Returns a FontReport with the version data of a FontVersion object.
+
+        :param fv: (fontv.libfv.FontVersion) the font
+        :param font_number: (int) index of the font in a font collection file or None for single font files
+        :return: (FontReport)
+        """
+        return cls(
+            fv.fontpath,
+            fv.get_name_id5_version_string(),
+            dict(fv.name_ID5_dict),
+            fv.get_head_fontrevision_version_number(),
+            font_number,
+        )
+
+
+def read_font_report(font):
+    """
+    Reads the version data of a font and closes the font before the function returns.
+
+    :param font: any font argument that is supported by the fontv.libfv.FontVersion constructor
+    :return: (FontReport)
+    """
+    with FontVersion(font) as fv:
+        return FontReport.from_font_version(fv)
+
+
+def read_font_reports(font):
+    """
+    Reads the version data of a font file with the reader for the font flavor that is identified by the magic bytes
+    at the beginning of the file.  The file extension is not used.  Files are opened once for the flavor test and
+    the font read.  Collection files (.ttc) return one report for each font in the collection.
+
+    :param font: (string) font file path or a seekable binary stream with a `name` attribute
+    :return: (list) of FontReport objects
+    :raises: fontTools.ttLib.TTLibError if the file is not a ttf, otf, ttc, woff, or woff2 font file
+    """
+    if hasattr(font, "read"):
+        return _read_font_reports(font)
+    with open(font, "rb") as f:
+        return _read_font_reports(f)
+
+
+def _read_font_reports(f):
+    flavor = sniff_font_flavor(f.read(SNIFF_SIZE))
+    f.seek(0)
+    if flavor is None:
+        raise TTLibError("not a font file")
+    if flavor != "ttc":
+        return [read_font_report(f)]
+    # lazy loads read only the name and head tables of each font in the collection
+    with span("font.load"):
+        collection = TTCollection(f, lazy=True, recalcTimestamp=False)
+    try:
+        reports = []
+        for font_number, ttf in enumerate(collection.fonts):
+            with FontVersion(ttf) as fv:
+                reports.append(FontReport.from_font_version(fv, font_number))
+        return reports
+    finally:
+        collection.close()
+
+
+def iter_font_reports(fonts):
+    """
+    Generator that reads the version data of each font and closes the font before the report is yielded.  At most
+    one font is open at a time so that memory use and open file descriptors do not grow with the number of fonts.
+
+    :param fonts: (iterable) of fonts in any format that is supported by the fontv.libfv.FontVersion constructor
+    :return: (generator) of FontReport objects
+    """
+    for font in fonts:
+        yield read_font_report(font)
@@ -35,7 +35,9 @@ Include a subcommand and desired options in your command line request:
 Subcommands and options:
 
  report - report OpenType name table ID 5 and head table fontRevision records
-    --dev - include all name table ID 5 x platformID records in report
+    --dev          - include all name table ID 5 x platformID records in report
+    --prefetch=[n] - read the version data of the next n fonts ahead on a
+                     thread pool (for high latency storage)
 
  write - write version number to head table fontRevision records and
          version string to name table ID 5 records.  The following options
@@ -46,6 +48,80 @@ Subcommands and options:
      --dev  - add development status metadata (mutually exclusive with --rel)
      --rel  - add release status metadata (mutually exclusive with --dev)
      --sha1 - add git commit sha1 short hash state metadata
+   write options:
+     --transaction - write all fonts or no fonts.  Modified fonts are staged
+                     and verified in temporary files before they replace
+                     the original fonts
+     --jobs=[n]    - number of parallel --transaction staging processes
+     --journal=[path] - append each completed font write to a checkpoint
+                        journal file
+     --resume      - skip the fonts that the --journal file records as
+                     written with the same request and that are unchanged
+     --snapshot=[path] - record the original name and head tables of each
+                         written font in a snapshot file for `font-v revert`
+     --verify      - re-read the version data and table checksums of each
+                     written font and report mismatches
+     --propagate   - also replace the version number in name ID 3 unique ID
+                     records and the CFF top DICT version, and list every
+                     modified field
+     --output-dir=[path] - write the fonts to an output tree that mirrors
+                           the input tree.  Directory arguments are scanned
+                           recursively.  Source fonts are cloned (--link:
+                           reflink (default), hardlink, copy) and patched
+     --skip-locked - skip and report the fonts that are locked by another
+                     font-v write instead of waiting for the locks
+
+ apply - write per-font version number, status, and state assignments from
+         a .csv, .json, or .toml manifest file in one pass
+   font-v apply [manifest file path] (--jobs=[n]) (--skip-locked)
+     --jobs=[n] - number of parallel worker processes (default: number of CPUs)
+     --skip-locked - skip and report the fonts that are locked by another
+                     font-v write instead of waiting for the locks
+
+ revert - restore the original name and head tables of the fonts in a
+          write --snapshot file
+   font-v revert [snapshot file path] (--jobs=[n]) (--force)
+     --jobs=[n] - number of parallel worker processes (default: number of CPUs)
+     --force    - revert fonts that were modified after the snapshot write
+
+ diff - report the fonts that were added, removed, or changed version
+        data between two font directory trees.  Fonts are paired by relative
+        path and then by PostScript name
+   font-v diff [old directory path] [new directory path] (--ndjson)
+     --ndjson       - print one JSON line per added, removed, or changed font
+     --prefetch=[n] - number of fonts read ahead (default: 8)
+
+ watch - report the fonts in a directory tree and the version data changes of
+         fonts that are written, added, or removed until Ctrl+C
+   font-v watch [directory path] (--debounce=[ms]) (--poll=[ms])
+     --debounce=[ms] - quiet time before a burst of changes is reported
+                       (default: 500)
+     --poll=[ms]     - use stat polling at a `ms` interval (default on
+                       platforms without inotify: 1000)
+
+ check - check head fontRevision / name ID 5 version number agreement,
+         name ID 5 record agreement, and font family version number,
+         status, and state agreement.  Directories are scanned recursively.
+         Exits with status code 1 if any issue is found
+   font-v check [font file or directory path ...] (--jobs=[n]) (--json)
+     --jobs=[n] - number of parallel worker processes (default: number of CPUs)
+     --json     - print a JSON report
+
+ batch options (report and write):
+    --dedupe               - parse byte-identical font files once
+    --link=[mode]          - write --dedupe fan out mode: copy (default), hardlink, reflink
+                             and write --output-dir materialization mode
+    --keep-going           - continue with the next font after a font error and
+                             report all errors at the end of the run
+
+ profile and metrics options (all subcommands):
+    --profile              - print a per-phase timing table to stderr
+    --metrics=[path]       - write run metrics to a Prometheus textfile
+                             (.prom) or JSON (.json) file
+
+ git font selection options (report and write):
+    --staged               - use the fonts that are staged for commit
+    --changed-since=[rev]  - use the fonts that changed since git revision `rev`
 
 NOTES:
 
@@ -61,6 +137,16 @@ You can include version number, status, and state options in the same request to
 
 The write subcommand modifies all nameID 5 records identified in the OpenType name table of the font (i.e. across all platformID).
 
+Fonts in zip and tar archives are read and written without extraction.  Use the archive file path to include all .ttf and .otf fonts in the archive or `archive.zip!path/to/Font.ttf` syntax to include a single archive member font.  The write subcommand replaces the archive with a new archive that contains the modified fonts.
+
+Font files are identified by the magic bytes at the beginning of the file.  Files without a .ttf or .otf extension are
+included when they contain a ttf, otf, woff, or woff2 font.  The report subcommand reads every font in .ttc font
+collections.  Files with a .ttf or .otf extension that are not fonts are reported as errors.
+
+UFO sources (.ufo directories) and the UFO sources of .designspace files are read and written by the report and write subcommands without font compiles.  The version string is read from the fontinfo.plist openTypeNameVersion field and the version number from the versionMajor and versionMinor fields.  The write --transaction, --journal, --snapshot, and --dedupe options apply to font files only.
+
+The --staged and --changed-since options replace font file path arguments with the .ttf and .otf files that git reports as changed.  The report subcommand reads staged fonts from the git index.  The write subcommand modifies the working tree files.
+
 """
 
 # ------------------------------------------------------------------------------
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Low-level OpenType sfnt header and table directory support for byte range reads of individual tables.
+"""
+
+from __future__ import unicode_literals
+
+import struct
+
+# sfnt header: sfntVersion, numTables, searchRange, entrySelector, rangeShift
+SFNT_HEADER_FORMAT = ">4sHHHH"
+SFNT_HEADER_SIZE = struct.calcsize(SFNT_HEADER_FORMAT)
+# table record: tableTag, checksum, offset, length
+TABLE_RECORD_FORMAT = ">4sLLL"
+TABLE_RECORD_SIZE = struct.calcsize(TABLE_RECORD_FORMAT)
+
+# sfntVersion tags of single font TrueType and CFF outline fonts
+SFNT_VERSIONS = (b"\x00\x01\x00\x00", b"OTTO", b"true")
+
+
+class TableRecord(object):
+    """
+    An sfnt table directory record.
+
+    :parameter tag: (string) four character table tag
+
+    :parameter checksum: (int) table checksum
+
+    :parameter offset: (int) table offset from the beginning of the font file
+
+    :parameter length: (int) table length in bytes (without padding)
+    """
+
+    def __init__(self, tag, checksum, offset, length):
+        self.tag = tag
+        self.checksum = checksum
+        self.offset = offset
+        self.length = length
+
+
+def parse_sfnt_header(data):
+    """
+    Parses the sfnt header.
+
+    :param data: (bytes) at least SFNT_HEADER_SIZE bytes from the beginning of the font file
+    :return: (tuple) (sfntVersion bytes, number of tables)
+    :raises: ValueError if the data is not the header of a single TrueType or CFF outline font
+    """
+    if len(data) < SFNT_HEADER_SIZE:
+        raise ValueError("sfnt header is truncated")
+    sfnt_version, num_tables = struct.unpack(SFNT_HEADER_FORMAT, data[:SFNT_HEADER_SIZE])[:2]
+    if sfnt_version not in SFNT_VERSIONS:
+        raise ValueError("unsupported sfnt version " + repr(sfnt_version))
+    return sfnt_version, num_tables
+
+
+def parse_table_directory(data, num_tables):
+    """
+    Parses the table records of an sfnt table directory.
+
+    :param data: (bytes) the table records that follow the sfnt header
+    :param num_tables: (int) number of table records
+    :return: (dict) {table tag string : TableRecord} map
+    :raises: ValueError if the table directory is truncated
+    """
+    if len(data) < num_tables * TABLE_RECORD_SIZE:
+        raise ValueError("sfnt table directory is truncated")
+    tables = {}
+    for index in range(num_tables):
+        tag, checksum, offset, length = struct.unpack_from(
+            TABLE_RECORD_FORMAT, data, index * TABLE_RECORD_SIZE
+        )
+        tag = tag.decode("latin-1")
+        tables[tag] = TableRecord(tag, checksum, offset, length)
+    return tables
+
+
+def read_table_directory(f):
+    """
+    Reads the sfnt header and table directory from a binary file object.
+
+    :param f: seekable binary file object
+    :return: (tuple) (sfntVersion bytes, {table tag string : TableRecord} map)
+    :raises: ValueError if the file is not a single TrueType or CFF outline font
+    """
+    f.seek(0)
+    sfnt_version, num_tables = parse_sfnt_header(f.read(SFNT_HEADER_SIZE))
+    return sfnt_version, parse_table_directory(f.read(num_tables * TABLE_RECORD_SIZE), num_tables)
+
+
+def build_sfnt(sfnt_version, table_data):
+    """
+    Returns the bytes of an sfnt font that includes only the tables in table_data.  Table checksums and the head table
+    checkSumAdjustment are not recalculated.
+
+    :param sfnt_version: (bytes) sfntVersion tag
+    :param table_data: (dict) {table tag string : table bytes} map
+    :return: (bytes)
+    """
+    num_tables = len(table_data)
+    entry_selector = max(num_tables.bit_length() - 1, 0)
+    search_range = (2 ** entry_selector) * 16
+    range_shift = num_tables * 16 - search_range
+    header = struct.pack(
+        SFNT_HEADER_FORMAT, sfnt_version, num_tables, search_range, entry_selector, range_shift
+    )
+    records = []
+    tables = []
+    offset = SFNT_HEADER_SIZE + num_tables * TABLE_RECORD_SIZE
+    for tag in sorted(table_data):
+        data = table_data[tag]
+        records.append(struct.pack(TABLE_RECORD_FORMAT, tag.encode("latin-1"), 0, offset, len(data)))
+        # tables are padded to four byte boundaries
+        padded = data + b"\0" * (-len(data) % 4)
+        tables.append(padded)
+        offset += len(padded)
+    return header + b"".join(records) + b"".join(tables)
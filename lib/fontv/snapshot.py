@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Snapshots of the original name and head tables of written fonts for `font-v revert`.
+
+A snapshot file is a JSON Lines file with one line per written font.  Each line includes the font path, the
+zlib compressed original name table bytes, the original head table bytes, and the SHA-256 digests of the font file
+before and after the write.  Reverts restore the original tables in place when the table lengths are unchanged and
+with a full font write otherwise.
+"""
+
+from __future__ import unicode_literals
+
+import base64
+import collections
+import json
+import os
+import zlib
+
+from fontTools.ttLib import TTFont, newTable
+
+from fontv.batch import map_parallel
+from fontv.dedupe import file_digest
+from fontv.inplace import write_tables_in_place
+from fontv.telemetry import span
+
+# snapshot line format version
+SNAPSHOT_FORMAT = 1
+
+
+class SnapshotEntry(object):
+    """
+    The original version data tables of a written font.
+
+    :parameter fontpath: (string) absolute font file path
+
+    :parameter name_data: (bytes) original name table bytes
+
+    :parameter head_data: (bytes) original head table bytes
+
+    :parameter input_sha256: (string) hexadecimal SHA-256 digest of the font file before the write
+
+    :parameter output_sha256: (string) hexadecimal SHA-256 digest of the font file after the write
+    """
+
+    def __init__(self, fontpath, name_data, head_data, input_sha256, output_sha256):
+        self.fontpath = fontpath
+        self.name_data = name_data
+        self.head_data = head_data
+        self.input_sha256 = input_sha256
+        self.output_sha256 = output_sha256
+
+    def to_dict(self):
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "path": self.fontpath,
+            "name": base64.b64encode(zlib.compress(self.name_data)).decode("ascii"),
+            "head": base64.b64encode(self.head_data).decode("ascii"),
+            "input_sha256": self.input_sha256,
+            "output_sha256": self.output_sha256,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Returns a SnapshotEntry for a snapshot line dictionary.
+
+        :param data: (dict) snapshot line
+        :return: (SnapshotEntry)
+        :raises: ValueError if the dictionary is not a valid snapshot line
+        """
+        try:
+            return cls(
+                data["path"],
+                zlib.decompress(base64.b64decode(data["name"])),
+                base64.b64decode(data["head"]),
+                data["input_sha256"],
+                data["output_sha256"],
+            )
+        except (KeyError, TypeError, zlib.error) as e:
+            raise ValueError("invalid snapshot line: " + str(e))
+
+
+class SnapshotWriter(object):
+    """
+    Appends SnapshotEntry lines to a snapshot file.  Use as a context manager or call close() to close the snapshot
+    file.
+
+    :parameter filepath: (string) snapshot file path.  The file is created on the first record() call
+
+    :parameter last_entry: (SnapshotEntry) the last recorded entry or None
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.last_entry = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def record(self, fontpath, name_data, head_data, input_sha256, output_sha256):
+        """
+        Appends the original tables of a written font to the snapshot file.  The line is flushed to the operating
+        system before the method returns.
+
+        :param fontpath: (string) font file path
+        :param name_data: (bytes) original name table bytes
+        :param head_data: (bytes) original head table bytes
+        :param input_sha256: (string) hexadecimal SHA-256 digest of the font file before the write
+        :param output_sha256: (string) hexadecimal SHA-256 digest of the font file after the write
+        :return: (SnapshotEntry)
+        :raises: IOError if the snapshot file cannot be written
+        """
+        entry = SnapshotEntry(
+            os.path.abspath(fontpath), name_data, head_data, input_sha256, output_sha256
+        )
+        if self._file is None:
+            self._file = open(self.filepath, "a", encoding="utf-8", newline="\n")
+        self._file.write(json.dumps(entry.to_dict(), sort_keys=True) + "\n")
+        self._file.flush()
+        self.last_entry = entry
+        return entry
+
+    def close(self):
+        """
+        Closes the snapshot file.
+
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RevertResult(object):
+    """
+    The result of a font revert.
+
+    :parameter fontpath: (string) font file path
+
+    :parameter error: (string) error message, or an empty string if the revert succeeded
+
+    :parameter identical: (boolean) True = the reverted font file is byte-identical to the font file before the write
+
+    :parameter in_place: (boolean) True = the tables were restored in place without a full font write
+    """
+
+    def __init__(self, fontpath, error="", identical=False, in_place=False):
+        self.fontpath = fontpath
+        self.error = error
+        self.identical = identical
+        self.in_place = in_place
+
+
+def read_snapshot(filepath):
+    """
+    Reads a snapshot file.  A font with more than one line (e.g. several runs that append to the same snapshot file)
+    is reverted to the tables of its first line, and the current font file is compared with the output digest of its
+    last line.  Lines that cannot be parsed (e.g. a partial last line of an interrupted run) are ignored.
+
+    :param filepath: (string) snapshot file path
+    :return: (list) of SnapshotEntry objects in the order of the first line of each font
+    :raises: IOError if the snapshot file cannot be read
+    """
+    entries = collections.OrderedDict()
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = SnapshotEntry.from_dict(json.loads(line))
+            except ValueError:
+                continue
+            if entry.fontpath in entries:
+                entries[entry.fontpath].output_sha256 = entry.output_sha256
+            else:
+                entries[entry.fontpath] = entry
+    return list(entries.values())
+
+
+def revert_font(entry, force=False):
+    """
+    Restores the original name and head tables of a font.  The tables are written in place when the current tables
+    have the same lengths as the original tables.
+
+    :param entry: (SnapshotEntry) the original tables
+    :param force: (boolean) True = revert fonts that were modified after the snapshot write
+    :return: (RevertResult)
+    :raises: ValueError if the font was modified after the snapshot write and force is False
+    :raises: IOError if the font file cannot be read or written
+    """
+    if not force and file_digest(entry.fontpath) != entry.output_sha256:
+        raise ValueError("the font was modified after the snapshot write.  Use --force to revert")
+    with span("font.save"):
+        bytes_written = write_tables_in_place(
+            entry.fontpath, {"name": entry.name_data, "head": entry.head_data}
+        )
+        if bytes_written is None:
+            ttf = TTFont(entry.fontpath, recalcTimestamp=False)
+            try:
+                for tag, data in (("name", entry.name_data), ("head", entry.head_data)):
+                    table = newTable(tag)
+                    table.decompile(data, ttf)
+                    ttf[tag] = table
+                ttf.save(entry.fontpath)
+            finally:
+                ttf.close()
+    return RevertResult(
+        entry.fontpath,
+        identical=file_digest(entry.fontpath) == entry.input_sha256,
+        in_place=bytes_written is not None,
+    )
+
+
+def revert_fonts(entries, force=False, jobs=None):
+    """
+    Restores the original name and head tables of a sequence of fonts in parallel worker processes.  A revert error
+    in one font does not stop reverts of other fonts.
+
+    :param entries: (list) of SnapshotEntry objects
+    :param force: (boolean) True = revert fonts that were modified after the snapshot write
+    :param jobs: (int) number of worker processes.  Default = number of CPUs.  1 = revert in the calling process
+    :return: (list) of RevertResult objects in the order of entries
+    """
+    return map_parallel(_revert_font, [(entry, force) for entry in entries], jobs)
+
+
+def _revert_font(task):
+    """Worker process function that reverts a font and returns a RevertResult"""
+    entry, force = task
+    try:
+        return revert_font(entry, force)
+    except Exception as e:
+        return RevertResult(entry.fontpath, error=type(e).__name__ + ": " + str(e))
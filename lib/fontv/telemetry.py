@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Timing spans and counters for the phases of FontVersion reads and writes and font-v subcommands.
+
+Phases are timed only while at least one span callback is registered with add_span_callback().  A callback is
+called with the phase name and the elapsed wall time in seconds at the end of each span.  With no registered
+callbacks, span() returns a shared no-op context manager.
+
+Counters are reported only while at least one counter callback is registered with add_counter_callback().  A
+callback is called with the counter name and the increment at each count() call.
+
+Phase names:
+
+    font.load         fontTools.ttLib.TTFont instantiation (sfnt table directory read)
+    font.name_decode  name table nameID 5 and head table reads and version string parse
+    font.save         fontTools.ttLib.TTFont.save compile and write
+    archive.read      archive member font read into memory
+    prefetch.read     version data byte range read ahead (thread pool)
+    archive.write     archive rewrite with modified member fonts
+    git.commit_sha1   git commit SHA1 short hash call
+    git.changed_fonts git diff call for --staged and --changed-since font selection
+    dedupe.group      identical file grouping for --dedupe
+    dedupe.fan_out    identical file fan out for write --dedupe
+    lock.wait         cross-process font file lock acquisition for write
+    cli.[subcommand]  font-v subcommand run
+
+Counter names:
+
+    fonts_processed      fonts read with FontVersion
+    fonts_written        font files written (including write --dedupe fan out targets)
+    fonts_unchanged      font writes with no nameID 5 or head.fontRevision change
+    errors               font errors and fatal command errors
+    git_calls            git subprocess calls
+    git_sha1_cache_hits  git commit SHA1 lookups served by FontVersion.git_sha1_cache
+    dedupe_hits          font parses avoided with --dedupe
+    bytes_read           font bytes read
+    bytes_written        font bytes written
+    bytes_cloned         font bytes materialized with a clone, an in-kernel copy, or a hard link (write --output-dir)
+    fonts_locked         font lock requests that found the font locked by another process (write --skip-locked)
+"""
+
+from __future__ import unicode_literals
+
+import os
+import threading
+import time
+
+# registered span and counter callbacks
+_span_callbacks = []
+_counter_callbacks = []
+# serializes callback calls from threads (e.g. fontv.prefetch reads) so that callbacks do not need locks
+_callback_lock = threading.RLock()
+
+
+class _Span(object):
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start
+        with _callback_lock:
+            for callback in tuple(_span_callbacks):
+                callback(self.name, elapsed)
+        return False
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """
+    Returns a context manager that times the phase `name` and reports the elapsed time to the registered span
+    callbacks.  Spans are reported when the phase raises an exception.
+
+    :param name: (string) phase name
+    :return: context manager
+    """
+    if len(_span_callbacks) == 0:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def add_span_callback(callback):
+    """
+    Registers a span callback.  callback is called as callback(name, elapsed) with the phase name string and the
+    elapsed wall time in seconds (float) at the end of every span in the calling process.
+
+    :param callback: (callable) the span callback
+    :return: None
+    """
+    _span_callbacks.append(callback)
+
+
+def remove_span_callback(callback):
+    """
+    Removes a registered span callback.
+
+    :param callback: (callable) the span callback
+    :return: None
+    :raises: ValueError if callback is not registered
+    """
+    _span_callbacks.remove(callback)
+
+
+def count(name, value=1):
+    """
+    Reports a counter increment to the registered counter callbacks.
+
+    :param name: (string) counter name
+    :param value: (int) increment
+    :return: None
+    """
+    if len(_counter_callbacks) == 0:
+        return
+    with _callback_lock:
+        for callback in tuple(_counter_callbacks):
+            callback(name, value)
+
+
+def has_counter_callbacks():
+    """
+    Tests for registered counter callbacks.  Use to skip work that is only needed to define a count() increment.
+
+    :return: (boolean)
+    """
+    return len(_counter_callbacks) > 0
+
+
+def add_counter_callback(callback):
+    """
+    Registers a counter callback.  callback is called as callback(name, value) with the counter name string and the
+    integer increment at every count() call in the calling process.
+
+    :param callback: (callable) the counter callback
+    :return: None
+    """
+    _counter_callbacks.append(callback)
+
+
+def remove_counter_callback(callback):
+    """
+    Removes a registered counter callback.
+
+    :param callback: (callable) the counter callback
+    :return: None
+    :raises: ValueError if callback is not registered
+    """
+    _counter_callbacks.remove(callback)
+
+
+def is_enabled():
+    """
+    Tests for registered span or counter callbacks.
+
+    :return: (boolean)
+    """
+    return len(_span_callbacks) > 0 or len(_counter_callbacks) > 0
+
+
+class TelemetryRecorder(object):
+    """
+    Records the spans and counter increments of a process so that they can be replayed in another process.  Worker
+    processes use a recorder to return their telemetry to the parent process callbacks.
+
+    :parameter spans: (list) of (phase name, elapsed time in seconds) tuples
+
+    :parameter counts: (list) of (counter name, increment) tuples
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.counts = []
+
+    def _add_span(self, name, elapsed):
+        self.spans.append((name, elapsed))
+
+    def _add_count(self, name, value):
+        self.counts.append((name, value))
+
+    def start(self):
+        add_span_callback(self._add_span)
+        add_counter_callback(self._add_count)
+
+    def stop(self):
+        remove_span_callback(self._add_span)
+        remove_counter_callback(self._add_count)
+
+    def replay(self):
+        """
+        Reports the recorded spans and counter increments to the callbacks that are registered in the calling process.
+
+        :return: None
+        """
+        with _callback_lock:
+            for callback in tuple(_span_callbacks):
+                for name, elapsed in self.spans:
+                    callback(name, elapsed)
+        for name, value in self.counts:
+            count(name, value)
+
+
+class PhaseProfile(object):
+    """
+    A span callback that collects the elapsed times of each phase for an aggregate per-phase report.
+
+    Register with add_span_callback(profile).
+
+    :parameter durations: (dict) {phase name : list of elapsed times in seconds} map
+    """
+
+    def __init__(self):
+        self.durations = {}
+
+    def __call__(self, name, elapsed):
+        self.durations.setdefault(name, []).append(elapsed)
+
+    def get_summary(self):
+        """
+        Returns the per-phase count, total, median (p50), and 95th percentile (p95) elapsed times in seconds.
+
+        :return: (list) of (phase name, count, total, p50, p95) tuples sorted by phase name
+        """
+        summary = []
+        for name, durations in sorted(self.durations.items()):
+            sorted_durations = sorted(durations)
+            summary.append(
+                (
+                    name,
+                    len(sorted_durations),
+                    sum(sorted_durations),
+                    _percentile(sorted_durations, 50),
+                    _percentile(sorted_durations, 95),
+                )
+            )
+        return summary
+
+    def format_table(self):
+        """
+        Returns the per-phase summary as a text table with times in milliseconds.
+
+        :return: (string)
+        """
+        rows = [("PHASE", "COUNT", "TOTAL ms", "P50 ms", "P95 ms")]
+        for name, span_count, total, p50, p95 in self.get_summary():
+            rows.append(
+                (
+                    name,
+                    str(span_count),
+                    "{:.3f}".format(total * 1000),
+                    "{:.3f}".format(p50 * 1000),
+                    "{:.3f}".format(p95 * 1000),
+                )
+            )
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+        lines = []
+        for row in rows:
+            # left align the phase names, right align the numbers
+            values = [row[0].ljust(widths[0])]
+            values.extend(value.rjust(width) for value, width in zip(row[1:], widths[1:]))
+            lines.append("  ".join(values))
+        return os.linesep.join(lines)
+
+
+def _percentile(sorted_values, percent):
+    """Returns the nearest-rank percentile of a sorted list"""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from fontv.batch import get_git_sha1_cache, map_parallel
+from fontv.libfv import FontVersion
+from fontv.locking import FontLockedError, acquire_font_locks, release_font_locks
+from fontv.report import read_font_report
+
+# head.fontRevision is stored as a 16.16 fixed point number
+FONTREVISION_TOLERANCE = 1.0 / 65536
+
+
+class TransactionError(Exception):
+    """
+    Transactional write exception.  The errors attribute is a list of (font path, error message) tuples.  No font
+    was modified when this exception is raised.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        Exception.__init__(
+            self,
+            os.linesep.join(fontpath + ": " + message for fontpath, message in errors),
+        )
+
+
+class StagedFont(object):
+    """
+    A modified font that is written to a temporary file in the directory of the target font path.
+
+    :parameter fontpath: (string) path to the target font file
+
+    :parameter staged_path: (string) path to the temporary file with the modified font
+
+    :parameter version_string: (string) the new name ID 5 version string
+    """
+
+    def __init__(self, fontpath, staged_path, version_string):
+        self.fontpath = fontpath
+        self.staged_path = staged_path
+        self.version_string = version_string
+
+
+def write_fonts_transactional(fontpaths, write_request, jobs=None, lock=None):
+    """
+    Writes a WriteRequest to a list of fonts as an all-or-nothing transaction.  Every modified font is staged in a
+    temporary file and verified with a read of the staged file in parallel worker processes.  The staged fonts are
+    renamed to the target paths only when every font was staged and verified.  A failure during the renames restores
+    the fonts that were already replaced.
+
+    :param fontpaths: (list) font file paths
+    :param write_request: (fontv.batch.WriteRequest) the modifications to write to each font
+    :param jobs: (int) number of worker processes.  Default = number of CPUs.  1 = stage in the calling process
+    :param lock: (string) optional fontv.locking.LOCK_WAIT or LOCK_NOWAIT mode of the font file locks that are held
+                 by the calling process from the first font read through the commit.  Default = no locks
+    :return: (list) of StagedFont objects for the committed fonts
+    :raises: TransactionError if any font fails or is locked by another process.  No font is modified
+    """
+    locks = []
+    if lock is not None:
+        try:
+            locks = acquire_font_locks(fontpaths, lock)
+        except FontLockedError as e:
+            raise TransactionError([(e.fontpath, "locked by another process")])
+        except (IOError, OSError) as e:
+            raise TransactionError([(e.filename or "lock", str(e))])
+    try:
+        git_sha1_cache = {}
+        if write_request.sha1:
+            try:
+                git_sha1_cache = get_git_sha1_cache(fontpaths)
+            except Exception as e:
+                raise TransactionError([("git", str(e))])
+
+        tasks = [(fontpath, write_request, git_sha1_cache) for fontpath in fontpaths]
+        staged_fonts = []
+        errors = []
+        for fontpath, staged_font, error in map_parallel(_stage_font, tasks, jobs):
+            if staged_font is not None:
+                staged_fonts.append(staged_font)
+            else:
+                errors.append((fontpath, error))
+
+        if len(errors) > 0:
+            _remove_staged_files(staged_fonts)
+            raise TransactionError(errors)
+
+        _commit(staged_fonts)
+    finally:
+        release_font_locks(locks)
+    return staged_fonts
+
+
+def _stage_font(task):
+    """Worker process function that writes a modified font to a temporary file and verifies the write"""
+    fontpath, write_request, git_sha1_cache = task
+    staged_path = None
+    try:
+        with FontVersion(fontpath) as fv:
+            fv.git_sha1_cache = git_sha1_cache
+            write_request.apply(fv)
+            fd, staged_path = tempfile.mkstemp(
+                prefix=".font-v-",
+                suffix=os.path.splitext(fontpath)[1],
+                dir=os.path.dirname(os.path.abspath(fontpath)),
+            )
+            os.close(fd)
+            fv.write_version_string(fontpath=staged_path)
+        # mkstemp files are only readable by the owner.  The staged font replaces the target font
+        shutil.copymode(fontpath, staged_path)
+        version_string = fv.get_name_id5_version_string()
+        _verify_staged_font(staged_path, version_string, fv.head_fontRevision)
+        return fontpath, StagedFont(fontpath, staged_path, version_string), ""
+    except Exception as e:
+        if staged_path is not None and os.path.exists(staged_path):
+            os.remove(staged_path)
+        return fontpath, None, type(e).__name__ + ": " + str(e)
+
+
+def _verify_staged_font(staged_path, version_string, head_fontrevision):
+    staged_report = read_font_report(staged_path)
+    for record, staged_version_string in staged_report.name_ID5_dict.items():
+        if staged_version_string != version_string:
+            raise ValueError(
+                "staged nameID 5 record "
+                + str(record)
+                + " is '"
+                + staged_version_string
+                + "', expected '"
+                + version_string
+                + "'"
+            )
+    if abs(staged_report.head_fontRevision - head_fontrevision) > FONTREVISION_TOLERANCE:
+        raise ValueError(
+            "staged head.fontRevision is "
+            + str(staged_report.head_fontRevision)
+            + ", expected "
+            + str(head_fontrevision)
+        )
+
+
+def _commit(staged_fonts):
+    # (target font path, backup path) tuples for the fonts that were already replaced
+    backups = []
+    try:
+        for staged_font in staged_fonts:
+            backup_path = _backup(staged_font.fontpath)
+            backups.append((staged_font.fontpath, backup_path))
+            os.replace(staged_font.staged_path, staged_font.fontpath)
+    except BaseException:
+        # roll back: restore every original font that was replaced, then remove the staged files
+        for fontpath, backup_path in reversed(backups):
+            if os.path.samefile(backup_path, fontpath):
+                # the font was not replaced.  rename() between hard links to the same file is a no-op
+                os.remove(backup_path)
+            else:
+                os.replace(backup_path, fontpath)
+        _remove_staged_files(staged_fonts)
+        raise
+    for _, backup_path in backups:
+        os.remove(backup_path)
+
+
+def _backup(fontpath):
+    """Creates a hard link (or a copy where hard links are not supported) of fontpath and returns the backup path"""
+    backup_path = fontpath + ".font-v-backup"
+    if os.path.exists(backup_path):
+        os.remove(backup_path)
+    try:
+        os.link(fontpath, backup_path)
+    except OSError:
+        shutil.copy2(fontpath, backup_path)
+    return backup_path
+
+
+def _remove_staged_files(staged_fonts):
+    for staged_font in staged_fonts:
+        if os.path.exists(staged_font.staged_path):
+            os.remove(staged_font.staged_path)
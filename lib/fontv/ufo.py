@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Version data reads and writes of UFO font sources.
+
+UFOVersion applies the FontVersion version number, state, status, and git commit SHA1 rules to the versionMajor,
+versionMinor, and openTypeNameVersion fields of the UFO fontinfo.plist file.  Only the fontinfo.plist file is read
+and written.  The glyph data are not read and no font binaries are compiled.  The UFO sources of a .designspace file
+are versioned together.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import os
+import shutil
+import tempfile
+
+from fontTools.designspaceLib import DesignSpaceDocument
+from fontTools.misc import plistlib
+
+from fontv.libfv import FontVersion, parse_version_number, replace_version_number
+from fontv.locking import FontLock
+from fontv.report import FontReport
+from fontv.telemetry import count, span
+
+UFO_EXTENSION = ".ufo"
+DESIGNSPACE_EXTENSION = ".designspace"
+FONTINFO_FILENAME = "fontinfo.plist"
+
+
+class UFOVersion(FontVersion):
+    """
+    UFOVersion is a FontVersion class for UFO font sources.  The nameID 5 version string is read from the
+    fontinfo.plist openTypeNameVersion field and the head.fontRevision version number is read from the versionMajor
+    and versionMinor fields.  A version string is derived in the `Version X.XXX` format of font compilers when the
+    openTypeNameVersion field is not defined.  All FontVersion version data getter and setter methods are supported.
+
+    The FontVersion.name_ID5_dict attribute is an {"openTypeNameVersion" : version string} map and the ttf attribute
+    is None.  With FontVersion.propagate_version = True, the version number is also replaced in the
+    openTypeNameUniqueID field.
+
+    :parameter ufo_path: (string) path to the .ufo source directory
+
+    :parameter develop: (string) the string to use for development builds in the absence of git commit SHA1 string
+
+    :parameter release: (string) the string to use for release builds in the absence of a git commit SHA1 string
+
+    :parameter sha1_develop: (string) the string to append to the git SHA1 hash string for development builds
+
+    :parameter sha1_release: (string) the string to append to the git SHA1 hash string for release builds
+
+    :parameter lock: (string) optional fontv.locking.LOCK_WAIT or LOCK_NOWAIT mode of a lock on the fontinfo.plist
+                     file that is held until close() is called.  Default = no lock
+
+    :raises: IOError if the fontinfo.plist file does not exist
+
+    :raises: ValueError if the fontinfo.plist file is not a property list dictionary
+    """
+
+    def __init__(
+        self,
+        ufo_path,
+        develop="DEV",
+        release="RELEASE",
+        sha1_develop="-dev",
+        sha1_release="-release",
+        lock=None,
+    ):
+        self.fontpath = ufo_path.rstrip("/" + os.sep) or ufo_path
+        self.ttf = None
+        self._owns_ttf = False
+        self._source_stat = None
+        self.lock = None
+        self._init_version_data(develop, release, sha1_develop, sha1_release)
+        # fontinfo.plist field data
+        self.fontinfo = {}
+        if lock is not None:
+            self.lock = FontLock(os.path.join(self.fontpath, FONTINFO_FILENAME), lock)
+            self.lock.acquire()
+        try:
+            with span("ufo.read"):
+                self.fontinfo = read_fontinfo(self.fontpath)
+                self._read_version_string()
+        except BaseException:
+            self.close()
+            raise
+        count("fonts_processed")
+
+    def __str__(self):
+        return (
+            "<fontv.ufo.UFOVersion> "
+            + os.linesep
+            + self.get_name_id5_version_string()
+            + os.linesep
+            + "file path:"
+            " " + self.fontpath
+        )
+
+    def _read_version_string(self):
+        """
+        Private method that reads the fontinfo.plist version data and sets FontVersion object properties.
+
+        :return: None
+        """
+        version_major = self.fontinfo.get("versionMajor", 0)
+        version_minor = self.fontinfo.get("versionMinor", 0)
+        version_string = self.fontinfo.get("openTypeNameVersion")
+        if version_string is None:
+            version_string = get_default_version_string(version_major, version_minor)
+        self.name_ID5_dict = {"openTypeNameVersion": version_string}
+        self._parse_version_substrings(version_string)
+        self.head_fontRevision = round(version_major + version_minor * 0.001, 3)
+        self._parse()
+
+    def write_version_string(self, fontpath=None):
+        """
+        Public method that writes the in memory version data to the fontinfo.plist openTypeNameVersion,
+        versionMajor, and versionMinor fields.  versionMinor is defined as the thousandths of the version number
+        (e.g. 1.1 and 1.100 = versionMinor 100).  An undefined openTypeNameVersion field is only added when the
+        version string differs from the `Version X.XXX` default.  The fontinfo.plist file is not rewritten when the
+        fields do not change so that the file modification time is preserved.
+
+        :param fontpath: (string) optional path to a .ufo directory to write the fontinfo.plist file to.  Default =
+                         the source UFO path
+
+        :return: None
+        """
+        version_string = self.get_name_id5_version_string()
+        version_major = int(self.head_fontRevision)
+        version_minor = int(round((self.head_fontRevision - version_major) * 1000))
+        fontinfo = dict(self.fontinfo)
+        updated_fields = []
+        current_version_number = parse_version_number(
+            self.name_ID5_dict["openTypeNameVersion"]
+        )
+        for field, value in (("versionMajor", version_major), ("versionMinor", version_minor)):
+            if fontinfo.get(field) != value:
+                updated_fields.append((field, str(fontinfo.get(field, "")), str(value)))
+                fontinfo[field] = value
+        default_version_string = get_default_version_string(version_major, version_minor)
+        if "openTypeNameVersion" in fontinfo or version_string != default_version_string:
+            current_string = fontinfo.get("openTypeNameVersion", "")
+            if current_string != version_string:
+                updated_fields.append(("openTypeNameVersion", current_string, version_string))
+                fontinfo["openTypeNameVersion"] = version_string
+        if self.propagate_version and "openTypeNameUniqueID" in fontinfo:
+            new_version_number = self.get_version_number_string()
+            if current_version_number != "" and new_version_number != "":
+                current_string = fontinfo["openTypeNameUniqueID"]
+                new_string = replace_version_number(
+                    current_string, current_version_number, new_version_number
+                )
+                if new_string != current_string:
+                    updated_fields.append(("openTypeNameUniqueID", current_string, new_string))
+                    fontinfo["openTypeNameUniqueID"] = new_string
+        self.updated_fields = updated_fields
+        count("fonts_written" if len(updated_fields) > 0 else "fonts_unchanged")
+
+        if fontpath is None:
+            fontpath = self.fontpath
+            if len(updated_fields) == 0:
+                return
+        with span("ufo.write"):
+            write_fontinfo(fontpath, fontinfo)
+        if fontpath == self.fontpath:
+            self.fontinfo = fontinfo
+            self.name_ID5_dict = {"openTypeNameVersion": version_string}
+
+
+def is_ufo_source_path(path):
+    """
+    Tests a path for a .ufo or .designspace file extension.  The path is not tested for existence.
+
+    :param path: (string) file or directory path
+    :return: (boolean)
+    """
+    extension = os.path.splitext(path.rstrip("/" + os.sep))[1].lower()
+    return extension in (UFO_EXTENSION, DESIGNSPACE_EXTENSION)
+
+
+def get_ufo_paths(source_paths):
+    """
+    Returns the UFO source paths of a list of .ufo and .designspace paths.  .designspace paths are replaced with the
+    path of each UFO source in the designspace document.  UFO sources that are referenced more than once (e.g. sparse
+    layer sources) are included once.
+
+    :param source_paths: (list) .ufo directory paths and .designspace file paths
+    :return: (list) UFO directory paths in source order without duplicates
+    :raises: IOError if a .designspace file cannot be read
+    :raises: fontTools.designspaceLib.DesignSpaceDocumentError if a .designspace file is not valid
+    """
+    ufo_paths = []
+    for source_path in source_paths:
+        if source_path.lower().endswith(DESIGNSPACE_EXTENSION):
+            ufo_paths.extend(read_designspace_sources(source_path))
+        else:
+            ufo_paths.append(source_path.rstrip("/" + os.sep) or source_path)
+    return list(collections.OrderedDict.fromkeys(ufo_paths))
+
+
+def read_ufo_reports(source_path):
+    """
+    Reads the version data of each UFO source of a .ufo or .designspace path.
+
+    :param source_path: (string) .ufo directory path or .designspace file path
+    :return: (list) of fontv.report.FontReport objects
+    :raises: IOError if a fontinfo.plist file or the .designspace file cannot be read
+    """
+    reports = []
+    for ufo_path in get_ufo_paths([source_path]):
+        with UFOVersion(ufo_path) as uv:
+            reports.append(FontReport.from_font_version(uv))
+    return reports
+
+
+def read_designspace_sources(designspace_path):
+    """
+    Returns the UFO source paths of a .designspace file.  Relative source filenames are resolved against the
+    directory of the .designspace file.
+
+    :param designspace_path: (string) .designspace file path
+    :return: (list) UFO directory paths in designspace source order without duplicates
+    :raises: IOError if the file cannot be read
+    :raises: fontTools.designspaceLib.DesignSpaceDocumentError if the file is not valid
+    :raises: ValueError if a source does not define a UFO path
+    """
+    with span("designspace.read"):
+        document = DesignSpaceDocument.fromfile(designspace_path)
+    ufo_paths = []
+    for source in document.sources:
+        if source.filename is not None and not os.path.isabs(source.filename):
+            ufo_path = os.path.normpath(
+                os.path.join(os.path.dirname(designspace_path), source.filename)
+            )
+        elif source.path is not None:
+            ufo_path = source.path
+        else:
+            raise ValueError(
+                "designspace source "
+                + str(source.name)
+                + " in "
+                + designspace_path
+                + " does not define a UFO path"
+            )
+        ufo_paths.append(ufo_path)
+    return list(collections.OrderedDict.fromkeys(ufo_paths))
+
+
+def read_fontinfo(ufo_path):
+    """
+    Reads the fontinfo.plist file of a UFO source.
+
+    :param ufo_path: (string) .ufo directory path
+    :return: (dict) fontinfo.plist field data
+    :raises: IOError if the fontinfo.plist file does not exist
+    :raises: ValueError if the fontinfo.plist file is not a property list dictionary
+    """
+    fontinfo_path = os.path.join(ufo_path, FONTINFO_FILENAME)
+    with open(fontinfo_path, "rb") as f:
+        try:
+            fontinfo = plistlib.load(f)
+        except Exception as e:
+            raise ValueError(fontinfo_path + " is not a valid property list: " + str(e))
+    if not isinstance(fontinfo, dict):
+        raise ValueError(fontinfo_path + " is not a property list dictionary")
+    return fontinfo
+
+
+def write_fontinfo(ufo_path, fontinfo):
+    """
+    Writes the fontinfo.plist file of a UFO source in the fontTools.ufoLib property list format.  The file is
+    replaced atomically so that an interrupted write does not leave a partial file.
+
+    :param ufo_path: (string) .ufo directory path
+    :param fontinfo: (dict) fontinfo.plist field data
+    :return: None
+    """
+    data = plistlib.dumps(fontinfo)
+    fontinfo_path = os.path.join(ufo_path, FONTINFO_FILENAME)
+    fd, temp_path = tempfile.mkstemp(prefix=".font-v-", suffix=".tmp", dir=ufo_path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp files are only readable by the owner.  Keep the mode of the replaced fontinfo.plist file
+        if os.path.exists(fontinfo_path):
+            shutil.copymode(fontinfo_path, temp_path)
+        else:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, fontinfo_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    count("bytes_written", len(data))
+
+
+def verify_ufo_version(ufo_path, version_string, head_fontRevision):
+    """
+    Verifies the version data of a written UFO source with a new read of the fontinfo.plist file.
+
+    :param ufo_path: (string) .ufo directory path
+    :param version_string: (string) expected version string
+    :param head_fontRevision: (float) expected version number
+    :return: (list) of mismatch description strings.  An empty list = the source is verified
+    :raises: IOError if the fontinfo.plist file cannot be read
+    """
+    with span("font.verify"):
+        with UFOVersion(ufo_path) as uv:
+            mismatches = []
+            if uv.get_name_id5_version_string() != version_string:
+                mismatches.append(
+                    "openTypeNameVersion is '"
+                    + uv.get_name_id5_version_string()
+                    + "', expected '"
+                    + version_string
+                    + "'"
+                )
+            if "{:.3f}".format(uv.head_fontRevision) != "{:.3f}".format(head_fontRevision):
+                mismatches.append(
+                    "versionMajor.versionMinor is "
+                    + "{:.3f}".format(uv.head_fontRevision)
+                    + ", expected "
+                    + "{:.3f}".format(head_fontRevision)
+                )
+            return mismatches
+
+
+def get_default_version_string(version_major, version_minor):
+    """
+    Returns the `Version X.XXX` version string that font compilers derive from the versionMajor and versionMinor
+    fields when the openTypeNameVersion field is not defined.
+
+    :param version_major: (int) versionMajor field value
+    :param version_minor: (int) versionMinor field value
+    :return: (string)
+    """
+    return "Version %d.%03d" % (version_major, version_minor)
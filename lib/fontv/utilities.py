@@ -8,8 +8,39 @@
 
 from __future__ import unicode_literals
 
+import io
 import os
 
+# {first four bytes of the file : font flavor} map
+FONT_SIGNATURES = {
+    b"\x00\x01\x00\x00": "ttf",
+    b"true": "ttf",
+    b"OTTO": "otf",
+    b"ttcf": "ttc",
+    b"wOFF": "woff",
+    b"wOF2": "woff2",
+}
+# number of bytes at the beginning of a file that are read to identify the font flavor
+SNIFF_SIZE = 12
+# sfntVersion tags of the fonts in WOFF and WOFF2 files
+_WRAPPED_SFNT_VERSIONS = (b"\x00\x01\x00\x00", b"OTTO", b"true")
+# TrueType / OpenType collection header versions
+_TTC_VERSIONS = (b"\x00\x01\x00\x00", b"\x00\x02\x00\x00")
+
+
+class NamedBytesIO(io.BytesIO):
+    """
+    An in memory binary stream with a `name` attribute.  The name is used as the font file path label when a FontVersion
+    object is instantiated from font data that are not read from the file system (e.g. a git blob)
+
+    :parameter initial_bytes: (bytes) the stream contents
+    :parameter name: (string) the file path label for the stream contents
+    """
+
+    def __init__(self, initial_bytes, name):
+        io.BytesIO.__init__(self, initial_bytes)
+        self.name = name
+
 
 def dir_exists(dirpath):
     """Tests for existence of a directory on the string filepath"""
@@ -68,3 +99,41 @@ def is_font(filepath):
             return False
     else:
         return False
+
+
+def sniff_font_flavor(data):
+    """
+    Identifies the font flavor of a file from the magic bytes at the beginning of the file.  The file extension is
+    not used.
+
+    :param data: (bytes) at least SNIFF_SIZE bytes from the beginning of the file
+    :return: (string) one of "ttf", "otf", "ttc", "woff", "woff2", or None if the data are not the beginning of a
+             font file
+    """
+    if len(data) < SNIFF_SIZE:
+        return None
+    flavor = FONT_SIGNATURES.get(bytes(data[0:4]))
+    if flavor in ("ttf", "otf"):
+        # numTables
+        if data[4:6] == b"\x00\x00":
+            return None
+    elif flavor in ("woff", "woff2"):
+        if bytes(data[4:8]) not in _WRAPPED_SFNT_VERSIONS:
+            return None
+    elif flavor == "ttc":
+        # numFonts follows the version
+        if bytes(data[4:8]) not in _TTC_VERSIONS or data[8:12] == b"\x00\x00\x00\x00":
+            return None
+    return flavor
+
+
+def get_font_flavor(filepath):
+    """
+    Reads the first SNIFF_SIZE bytes of a file and returns the font flavor.  See sniff_font_flavor().
+
+    :param filepath: (string) file path
+    :return: (string) font flavor or None if the file is not a font file
+    :raises: IOError if the file cannot be read
+    """
+    with open(filepath, "rb") as f:
+        return sniff_font_flavor(f.read(SNIFF_SIZE))
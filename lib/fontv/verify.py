@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Post-write verification of the version data of font files.
+
+Verification reads the sfnt table directory and the name and head tables only.  The nameID 5 records, the
+head.fontRevision record, the name and head table checksums, and the head.checkSumAdjustment are compared with the
+expected values.  The other tables of the font are not read.
+"""
+
+from __future__ import unicode_literals
+
+import io
+import struct
+
+from fontTools.misc.fixedTools import floatToFixed
+from fontTools.ttLib import TTFont, newTable
+from fontTools.ttLib.sfnt import calcChecksum
+
+from fontv.inplace import (
+    HEAD_CHECKSUM_ADJUSTMENT_OFFSET,
+    HEAD_FONT_REVISION_OFFSET,
+    calc_checksum_adjustment,
+    calc_head_checksum,
+)
+from fontv.sfnt import (
+    SFNT_HEADER_SIZE,
+    TABLE_RECORD_SIZE,
+    parse_sfnt_header,
+    parse_table_directory,
+)
+from fontv.utilities import SNIFF_SIZE, sniff_font_flavor
+from fontv.telemetry import span
+
+
+def verify_font_version(font, version_string, head_fontRevision):
+    """
+    Verifies the version data and the name / head table checksums of a written font.  WOFF and WOFF2 fonts are
+    verified with a fontTools read of the name and head tables without checksum tests.
+
+    :param font: (string) font file path, (bytes) font data, or a seekable binary stream
+    :param version_string: (string) expected version string of every nameID 5 record
+    :param head_fontRevision: (float) expected head.fontRevision version number
+    :return: (list) of mismatch description strings.  An empty list = the font is verified
+    :raises: IOError if the font file cannot be read
+    """
+    with span("font.verify"):
+        if isinstance(font, bytes):
+            return _verify(io.BytesIO(font), version_string, head_fontRevision)
+        if hasattr(font, "read"):
+            return _verify(font, version_string, head_fontRevision)
+        with open(font, "rb") as f:
+            return _verify(f, version_string, head_fontRevision)
+
+
+def _verify(f, version_string, head_fontRevision):
+    f.seek(0)
+    if sniff_font_flavor(f.read(SNIFF_SIZE)) in ("woff", "woff2"):
+        return _verify_with_fonttools(f, version_string, head_fontRevision)
+    f.seek(0)
+    directory_data = f.read(SFNT_HEADER_SIZE)
+    try:
+        num_tables = parse_sfnt_header(directory_data)[1]
+        directory_data += f.read(num_tables * TABLE_RECORD_SIZE)
+        tables = parse_table_directory(directory_data[SFNT_HEADER_SIZE:], num_tables)
+    except ValueError as e:
+        return ["unable to read the sfnt table directory: " + str(e)]
+    mismatches = []
+    table_data = {}
+    for tag in ("name", "head"):
+        if tag not in tables:
+            mismatches.append("the " + tag + " table is missing")
+            continue
+        f.seek(tables[tag].offset)
+        table_data[tag] = f.read(tables[tag].length)
+        if len(table_data[tag]) < tables[tag].length:
+            mismatches.append("the " + tag + " table is truncated")
+    if len(mismatches) > 0:
+        return mismatches
+
+    name_data = table_data["name"]
+    head_data = table_data["head"]
+    if calcChecksum(name_data) != tables["name"].checksum:
+        mismatches.append("name table checksum mismatch")
+    if len(head_data) < 54:
+        return mismatches + ["the head table is truncated"]
+    if calc_head_checksum(head_data) != tables["head"].checksum:
+        mismatches.append("head table checksum mismatch")
+    adjustment = struct.unpack_from(">L", head_data, HEAD_CHECKSUM_ADJUSTMENT_OFFSET)[0]
+    if adjustment != calc_checksum_adjustment(directory_data, tables):
+        mismatches.append("head.checkSumAdjustment mismatch")
+
+    font_revision = struct.unpack_from(">l", head_data, HEAD_FONT_REVISION_OFFSET)[0] / 65536.0
+    mismatches.extend(_compare_font_revision(font_revision, head_fontRevision))
+
+    name = newTable("name")
+    try:
+        name.decompile(name_data, None)
+    except Exception as e:
+        return mismatches + ["unable to decode the name table: " + str(e)]
+    mismatches.extend(_compare_name_records(name.names, version_string))
+    return mismatches
+
+
+def _verify_with_fonttools(f, version_string, head_fontRevision):
+    f.seek(0)
+    # the TTFont is not closed so that the caller stream remains open
+    ttf = TTFont(f, lazy=True)
+    mismatches = _compare_font_revision(ttf["head"].fontRevision, head_fontRevision)
+    mismatches.extend(_compare_name_records(ttf["name"].names, version_string))
+    return mismatches
+
+
+def _compare_font_revision(font_revision, head_fontRevision):
+    # fontRevision is a 16.16 fixed point number
+    if floatToFixed(font_revision, 16) != floatToFixed(head_fontRevision, 16):
+        return [
+            "head.fontRevision is "
+            + "{:.3f}".format(font_revision)
+            + ", expected "
+            + "{:.3f}".format(head_fontRevision)
+        ]
+    return []
+
+
+def _compare_name_records(name_records, version_string):
+    mismatches = []
+    name_id5_records = [record for record in name_records if record.nameID == 5]
+    if len(name_id5_records) == 0:
+        mismatches.append("no nameID 5 records")
+    for record in name_id5_records:
+        record_version_string = record.toUnicode()
+        if record_version_string != version_string:
+            mismatches.append(
+                "nameID 5 record "
+                + str((record.platformID, record.platEncID, record.langID))
+                + " is '"
+                + record_version_string
+                + "', expected '"
+                + version_string
+                + "'"
+            )
+    return mismatches
@@ -0,0 +1,413 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ====================================================
+# Copyright 2018 Christopher Simpkins
+# MIT License
+# ====================================================
+
+"""
+Incremental version data reports of the fonts in a directory tree for `font-v watch`.
+
+A FontWatcher keeps an in-memory table of the version data of every font in the tree with the file size,
+modification time, and inode of the parsed file.  File system changes are detected with Linux inotify through
+ctypes, or with stat polling of the tree on other platforms.  Bursts of events (e.g. a build tool that writes many
+fonts) are collected until the tree is quiet for the debounce interval.  Only the files that changed are parsed.
+"""
+
+from __future__ import unicode_literals
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+from fontv.check import CHECK_FONT_EXTENSIONS, find_font_files
+from fontv.report import read_font_reports
+from fontv.telemetry import span
+
+# default quiet interval in seconds before a burst of file changes is reported
+DEFAULT_DEBOUNCE = 0.5
+# default stat poll interval in seconds
+DEFAULT_POLL_INTERVAL = 1.0
+
+# font change kinds
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+ERROR = "error"
+
+# inotify event masks, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+# struct inotify_event header: wd, mask, cookie, len
+_INOTIFY_EVENT_FORMAT = "iIII"
+_INOTIFY_EVENT_SIZE = struct.calcsize(_INOTIFY_EVENT_FORMAT)
+_INOTIFY_READ_SIZE = 64 * 1024
+
+
+class WatchChange(object):
+    """
+    A change in the version data of a watched font file.
+
+    :parameter change: (string) ADDED, REMOVED, CHANGED, or ERROR
+
+    :parameter fontpath: (string) font file path
+
+    :parameter old_reports: (list) of fontv.report.FontReport objects before the change, empty for added fonts
+
+    :parameter new_reports: (list) of fontv.report.FontReport objects after the change, empty for removed fonts
+
+    :parameter error: (string) error message of ERROR changes, otherwise an empty string
+    """
+
+    def __init__(self, change, fontpath, old_reports=(), new_reports=(), error=""):
+        self.change = change
+        self.fontpath = fontpath
+        self.old_reports = list(old_reports)
+        self.new_reports = list(new_reports)
+        self.error = error
+
+    def __str__(self):
+        if self.change == ERROR:
+            return "[X] " + self.fontpath + ": " + self.error
+        if self.change == REMOVED:
+            return "[-] " + self.fontpath
+        lines = []
+        for index, report in enumerate(self.new_reports):
+            label = _get_report_label(report)
+            old_report = None
+            if index < len(self.old_reports):
+                old_report = self.old_reports[index]
+            if old_report is None:
+                lines.append("[+] " + label + ": " + report.version_string)
+            elif _get_version_data(old_report) != _get_version_data(report):
+                lines.append(
+                    "[~] "
+                    + label
+                    + ": "
+                    + old_report.version_string
+                    + " → "
+                    + report.version_string
+                    + " | head.fontRevision "
+                    + "{:.3f}".format(old_report.head_fontRevision)
+                    + " → "
+                    + "{:.3f}".format(report.head_fontRevision)
+                )
+        for report in self.old_reports[len(self.new_reports) :]:
+            lines.append("[-] " + _get_report_label(report))
+        return os.linesep.join(lines)
+
+
+class FontWatcher(object):
+    """
+    Watches the fonts in a directory tree and reports version data changes.  Use as a context manager or call close()
+    to release the inotify file descriptor.
+
+    :parameter root: (string) directory path
+
+    :parameter debounce: (float) quiet interval in seconds before a burst of file changes is reported
+
+    :parameter poll_interval: (float) stat poll interval in seconds when inotify is not used
+
+    :parameter use_inotify: (boolean) False = always use stat polling
+
+    :parameter fonts: (dict) {font path : (stat key, list of fontv.report.FontReport objects)} map of the parsed fonts
+
+    :parameter backend: (string) "inotify" or "poll"
+    """
+
+    def __init__(
+        self,
+        root,
+        debounce=DEFAULT_DEBOUNCE,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        use_inotify=True,
+    ):
+        self.root = root
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.fonts = {}
+        self._inotify = None
+        if use_inotify and is_inotify_available():
+            self._inotify = _Inotify(root)
+            self.backend = "inotify"
+        else:
+            self.backend = "poll"
+        # {path : stat key} map of the last poll
+        self._poll_stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def scan(self):
+        """
+        Parses every font in the tree and returns a WatchChange for each font.  Call once before
+        wait_for_changes().
+
+        :return: (list) of WatchChange objects
+        """
+        fontpaths = find_font_files([self.root])
+        if self.backend == "poll":
+            self._poll_stats = _stat_paths(fontpaths)
+        return self.update(fontpaths)
+
+    def wait_for_changes(self, timeout=None):
+        """
+        Blocks until files in the tree change and the tree is quiet for the debounce interval.
+
+        :param timeout: (float) maximum time in seconds to wait for the first change or None to wait forever
+        :return: (set) of changed file paths.  Empty if the timeout expired without changes
+        """
+        paths = self._wait(timeout)
+        if len(paths) == 0:
+            return paths
+        # a burst of events is collected until no event arrives for the debounce interval
+        while True:
+            more_paths = self._wait(self.debounce)
+            if len(more_paths) == 0:
+                return paths
+            paths |= more_paths
+
+    def update(self, paths):
+        """
+        Parses the font files that were modified or created and returns the version data changes.  Files with the
+        same size, modification time, and inode as the parsed file are not parsed.
+
+        :param paths: (iterable) changed file paths
+        :return: (list) of WatchChange objects in path order.  Fonts with unchanged version data are not included
+        """
+        changes = []
+        with span("watch.update"):
+            for path in sorted(set(paths)):
+                change = self._update_path(path)
+                if change is not None:
+                    changes.append(change)
+        return changes
+
+    def iter_changes(self):
+        """
+        Yields the list of version data changes of each burst of file changes.  The generator does not return.
+
+        :return: (generator) of lists of WatchChange objects
+        """
+        while True:
+            changes = self.update(self.wait_for_changes())
+            if len(changes) > 0:
+                yield changes
+
+    def close(self):
+        """
+        Releases the inotify file descriptor.
+
+        :return: None
+        """
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _wait(self, timeout):
+        if self._inotify is not None:
+            paths = self._inotify.read_events(timeout)
+            if paths is None:
+                # the event queue overflowed.  Every font in the tree is tested
+                paths = set(find_font_files([self.root])) | set(self.fonts.keys())
+            return paths
+        return self._poll(timeout)
+
+    def _poll(self, timeout):
+        """Returns the paths with a new stat key after up to timeout seconds of stat polls of the tree"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            interval = self.poll_interval
+            if deadline is not None:
+                interval = min(interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(interval)
+            with span("watch.poll"):
+                stats = _stat_paths(find_font_files([self.root]))
+            paths = set(
+                path
+                for path in set(stats) | set(self._poll_stats)
+                if stats.get(path) != self._poll_stats.get(path)
+            )
+            self._poll_stats = stats
+            if len(paths) > 0 or (deadline is not None and time.monotonic() >= deadline):
+                return paths
+
+    def _update_path(self, path):
+        if os.path.splitext(path)[1].lower() not in CHECK_FONT_EXTENSIONS:
+            return None
+        old_stat_key, old_reports = self.fonts.get(path, (None, []))
+        try:
+            stat_key = _get_stat_key(path)
+        except OSError:
+            if path not in self.fonts:
+                return None
+            del self.fonts[path]
+            return WatchChange(REMOVED, path, old_reports=old_reports)
+        if stat_key == old_stat_key:
+            return None
+        try:
+            new_reports = read_font_reports(path)
+        except Exception as e:
+            # e.g. a partially written font.  The font is parsed again after the next write
+            self.fonts[path] = (stat_key, old_reports)
+            return WatchChange(ERROR, path, error=type(e).__name__ + ": " + str(e))
+        self.fonts[path] = (stat_key, new_reports)
+        if len(old_reports) == 0:
+            return WatchChange(ADDED, path, new_reports=new_reports)
+        old_data = [_get_version_data(report) for report in old_reports]
+        new_data = [_get_version_data(report) for report in new_reports]
+        if old_data == new_data:
+            return None
+        return WatchChange(CHANGED, path, old_reports, new_reports)
+
+
+def is_inotify_available():
+    """
+    Tests whether the Linux inotify API is available through the C library.
+
+    :return: (boolean)
+    """
+    return sys.platform.startswith("linux") and _get_libc() is not None
+
+
+class _Inotify(object):
+    """ctypes wrapper of an inotify instance with recursive directory watches"""
+
+    def __init__(self, root):
+        self._libc = _get_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        # {watch descriptor : directory path} map
+        self._watches = {}
+        self._add_tree(root)
+
+    def _add_tree(self, root):
+        """Adds watches for root and its subdirectories and returns the font file paths in the tree"""
+        for dirpath, _, _ in os.walk(root):
+            self._add_watch(dirpath)
+        return find_font_files([root])
+
+    def _add_watch(self, dirpath):
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(dirpath), WATCH_MASK | IN_ONLYDIR
+        )
+        if wd >= 0:
+            self._watches[wd] = dirpath
+
+    def read_events(self, timeout):
+        """
+        Returns the paths of the file events that arrive within timeout seconds.
+
+        :return: (set) of file paths, or None if the event queue overflowed
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if len(readable) == 0:
+            return set()
+        paths = set()
+        while True:
+            try:
+                data = os.read(self._fd, _INOTIFY_READ_SIZE)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return paths
+                raise
+            offset = 0
+            while offset + _INOTIFY_EVENT_SIZE <= len(data):
+                wd, mask, _, name_length = struct.unpack_from(
+                    _INOTIFY_EVENT_FORMAT, data, offset
+                )
+                name = data[
+                    offset + _INOTIFY_EVENT_SIZE : offset + _INOTIFY_EVENT_SIZE + name_length
+                ].rstrip(b"\0")
+                offset += _INOTIFY_EVENT_SIZE + name_length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                dirpath = self._watches.get(wd)
+                if dirpath is None or len(name) == 0:
+                    continue
+                path = os.path.join(dirpath, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # fonts can be written to a new directory before its watch is added
+                        paths.update(self._add_tree(path))
+                    continue
+                paths.add(path)
+
+    def close(self):
+        os.close(self._fd)
+
+
+_libc = None
+
+
+def _get_libc():
+    """Returns the ctypes C library with the inotify functions, or None if inotify is not available"""
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        except (OSError, AttributeError):
+            return None
+        _libc = libc
+    return _libc
+
+
+def _get_stat_key(path):
+    """Returns the (size, modification time, inode) of a file path that is used to detect file changes"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def _stat_paths(paths):
+    """Returns a {path : stat key} map of the paths that exist"""
+    stats = {}
+    for path in paths:
+        try:
+            stats[path] = _get_stat_key(path)
+        except OSError:
+            continue
+    return stats
+
+
+def _get_version_data(report):
+    return report.name_ID5_dict, report.head_fontRevision
+
+
+def _get_report_label(report):
+    if report.font_number is None:
+        return report.fontpath
+    return report.fontpath + "#" + str(report.font_number)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Synthetic font and font corpus generator for scaling tests and benchmarks.
+
+Fonts are built with the fontTools FontBuilder and are parameterized by glyph count, name record count,
+name table platforms, and version string shape.  Corpora are generated deterministically from a seed.
+"""
+
+from __future__ import unicode_literals
+
+import os
+import random
+import shutil
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+# (platformID, platEncID, langID) for the English name records of each supported platform
+PLATFORMS = {
+    "unicode": (0, 3, 0),
+    "mac": (1, 0, 0),
+    "windows": (3, 1, 0x409),
+}
+
+# version string shapes.  {version} = version number, {sha1} = 7 character hexadecimal string
+VERSION_STRING_SHAPES = (
+    "Version {version}",
+    "Version {version};DEV",
+    "Version {version};RELEASE",
+    "Version {version};[{sha1}]",
+    "Version {version};[{sha1}]-dev",
+    "Version {version};[{sha1}]-release",
+    "Version {version};[{sha1}]-dev;metadata string",
+    "Version {version};metadata string",
+    "Version {version};metadata string;another metadata string",
+    "{version}",
+)
+
+# name table string offsets are 16-bit.  Short localized strings keep large record counts below the limit
+_MAX_NAME_RECORDS = 4000
+_MAX_POST_GLYPH_NAMES = 32768
+# CFF charsets reference glyph names by 16-bit string IDs that follow the 391 standard strings
+_MAX_CFF_GLYPHS = 65535 - 391
+
+
+class FontSpec(object):
+    """
+    Parameters of a synthetic font.
+
+    :parameter glyph_count: (int) number of glyphs including .notdef (maximum 65535 ttf, 65144 otf)
+
+    :parameter name_record_count: (int) number of additional localized Windows platform name records
+
+    :parameter nameid5_record_count: (int) number of additional localized Windows platform nameID 5 records
+
+    :parameter platforms: (tuple) name table platforms for the English name records ("unicode", "mac", "windows")
+
+    :parameter version_string: (string) the nameID 5 version string
+
+    :parameter font_revision: (float) head.fontRevision value
+
+    :parameter flavor: (string) "ttf" = glyf outlines; "otf" = CFF outlines
+
+    :parameter family_name: (string) nameID 1 family name
+
+    :parameter style_name: (string) nameID 2 style name
+    """
+
+    def __init__(
+        self,
+        glyph_count=4,
+        name_record_count=0,
+        nameid5_record_count=0,
+        platforms=("mac", "windows"),
+        version_string="Version 1.000",
+        font_revision=1.0,
+        flavor="ttf",
+        family_name="Synthetic",
+        style_name="Regular",
+    ):
+        if name_record_count + nameid5_record_count > _MAX_NAME_RECORDS:
+            raise ValueError(
+                "name_record_count + nameid5_record_count must be <= " + str(_MAX_NAME_RECORDS)
+            )
+        if glyph_count > (65535 if flavor == "ttf" else _MAX_CFF_GLYPHS):
+            raise ValueError("glyph_count exceeds the maximum for the " + flavor + " flavor")
+        self.glyph_count = glyph_count
+        self.name_record_count = name_record_count
+        self.nameid5_record_count = nameid5_record_count
+        self.platforms = tuple(platforms)
+        self.version_string = version_string
+        self.font_revision = font_revision
+        self.flavor = flavor
+        self.family_name = family_name
+        self.style_name = style_name
+
+    @property
+    def extension(self):
+        return "." + self.flavor
+
+
+def build_font(spec):
+    """
+    Builds a fontTools.ttLib.TTFont from a FontSpec.
+
+    :param spec: (FontSpec) the font parameters
+    :return: (fontTools.ttLib.TTFont)
+    """
+    is_ttf = spec.flavor == "ttf"
+    fb = FontBuilder(unitsPerEm=1000, isTTF=is_ttf)
+    glyph_order = [".notdef"] + ["g" + str(index) for index in range(1, spec.glyph_count)]
+    fb.setupGlyphOrder(glyph_order)
+    # map glyphs to code points in the Basic Multilingual Plane, skipping the surrogate range
+    cmap = {}
+    codepoint = 0x20
+    for glyph_name in glyph_order[1:]:
+        if 0xD800 <= codepoint <= 0xDFFF:
+            codepoint = 0xE000
+        if codepoint > 0xFFFF:
+            break
+        cmap[codepoint] = glyph_name
+        codepoint += 1
+    fb.setupCharacterMap(cmap)
+
+    ps_name = (spec.family_name + "-" + spec.style_name).replace(" ", "")
+    if is_ttf:
+        pen = TTGlyphPen(None)
+        _draw_box(pen)
+        notdef = pen.glyph()
+        empty = TTGlyphPen(None).glyph()
+        glyphs = {glyph_name: empty for glyph_name in glyph_order}
+        glyphs[".notdef"] = notdef
+        fb.setupGlyf(glyphs)
+    else:
+        pen = T2CharStringPen(500, None)
+        _draw_box(pen)
+        notdef = pen.getCharString()
+        charstrings = {}
+        for glyph_name in glyph_order:
+            if glyph_name == ".notdef":
+                charstrings[glyph_name] = notdef
+            else:
+                charstrings[glyph_name] = T2CharStringPen(500, None).getCharString()
+        fb.setupCFF(ps_name, {"FullName": ps_name}, charstrings, {})
+
+    fb.setupHorizontalMetrics({glyph_name: (500, 0) for glyph_name in glyph_order})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable(
+        {
+            "familyName": spec.family_name,
+            "styleName": spec.style_name,
+            "uniqueFontIdentifier": spec.version_string.replace("Version ", "") + ";" + ps_name,
+            "fullName": spec.family_name + " " + spec.style_name,
+            "version": spec.version_string,
+            "psName": ps_name,
+        },
+        windows=False,
+        mac=False,
+    )
+    _setup_name_records(fb.font["name"], spec)
+    fb.setupOS2(sTypoAscender=800, usWinAscent=800, usWinDescent=200)
+    # post format 2.0 glyph name indices overflow in fonts with ~65k glyphs.  Use format 3.0 (no glyph names)
+    fb.setupPost(keepGlyphNames=spec.glyph_count <= _MAX_POST_GLYPH_NAMES)
+    fb.updateHead(fontRevision=spec.font_revision)
+    return fb.font
+
+
+def write_font(spec, fontpath):
+    """
+    Builds a font from a FontSpec and writes it to fontpath.
+
+    :param spec: (FontSpec) the font parameters
+    :param fontpath: (string) output file path
+    :return: (string) fontpath
+    """
+    build_font(spec).save(fontpath)
+    return fontpath
+
+
+def random_version_string(rng, shapes=VERSION_STRING_SHAPES):
+    """
+    Returns a (version string, head.fontRevision) tuple with a random version number and shape.
+
+    :param rng: (random.Random) seeded random number generator
+    :param shapes: (tuple) version string shapes to choose from
+    :return: (tuple) (string, float)
+    """
+    version = str(rng.randint(0, 9)) + "." + str(rng.randint(0, 999)).zfill(3)
+    sha1 = "".join(rng.choice("0123456789abcdef") for _ in range(7))
+    shape = rng.choice(shapes)
+    return shape.format(version=version, sha1=sha1), float(version)
+
+
+def generate_specs(seed, count, **spec_ranges):
+    """
+    Returns a deterministic list of FontSpec objects.
+
+    spec_ranges keyword arguments define the candidate values of each FontSpec parameter as a sequence.  A value is
+    chosen at random for each font.  The version_string and font_revision parameters are defined with
+    random_version_string() unless version_string shapes are passed as version_string_shapes.
+
+    :param seed: (int) random number generator seed
+    :param count: (int) number of specs
+    :return: (list) of FontSpec objects
+    """
+    rng = random.Random(seed)
+    shapes = spec_ranges.pop("version_string_shapes", VERSION_STRING_SHAPES)
+    specs = []
+    for index in range(count):
+        params = {name: rng.choice(list(values)) for name, values in sorted(spec_ranges.items())}
+        version_string, font_revision = random_version_string(rng, shapes)
+        params.setdefault("version_string", version_string)
+        params.setdefault("font_revision", font_revision)
+        params.setdefault("style_name", "Style" + str(index))
+        specs.append(FontSpec(**params))
+    return specs
+
+
+def generate_corpus(dirpath, seed, count, unique=None, files_per_directory=1000, **spec_ranges):
+    """
+    Writes a deterministic corpus of synthetic fonts to dirpath and returns the list of font paths.
+
+    Fonts are written to numbered subdirectories with up to files_per_directory fonts each.  Large corpora (e.g. 100k
+    files) can define a smaller number of unique fonts.  The unique fonts are built and the remaining paths are byte
+    copies of them in round robin order.
+
+    :param dirpath: (string) output directory
+    :param seed: (int) random number generator seed
+    :param count: (int) number of font files
+    :param unique: (int) number of unique fonts.  Default = count
+    :param files_per_directory: (int) maximum number of fonts per subdirectory
+    :param spec_ranges: FontSpec parameter candidate values (see generate_specs)
+    :return: (list) of font file paths
+    """
+    if unique is None:
+        unique = count
+    unique = min(unique, count)
+    specs = generate_specs(seed, unique, **spec_ranges)
+    fontpaths = []
+    for index in range(count):
+        spec = specs[index % unique]
+        subdir = os.path.join(dirpath, str(index // files_per_directory).zfill(4))
+        if index % files_per_directory == 0:
+            os.makedirs(subdir, exist_ok=True)
+        fontpath = os.path.join(subdir, "Font" + str(index).zfill(6) + spec.extension)
+        if index < unique:
+            write_font(spec, fontpath)
+        else:
+            shutil.copyfile(fontpaths[index % unique], fontpath)
+        fontpaths.append(fontpath)
+    return fontpaths
+
+
+def _draw_box(pen):
+    pen.moveTo((50, 0))
+    pen.lineTo((450, 0))
+    pen.lineTo((450, 700))
+    pen.lineTo((50, 700))
+    pen.closePath()
+
+
+def _setup_name_records(name_table, spec):
+    strings = {
+        1: spec.family_name,
+        2: spec.style_name,
+        3: spec.version_string.replace("Version ", "")
+        + ";"
+        + (spec.family_name + "-" + spec.style_name).replace(" ", ""),
+        4: spec.family_name + " " + spec.style_name,
+        5: spec.version_string,
+        6: (spec.family_name + "-" + spec.style_name).replace(" ", ""),
+    }
+    name_table.names = []
+    for platform in spec.platforms:
+        platform_id, plat_enc_id, lang_id = PLATFORMS[platform]
+        for name_id, string in sorted(strings.items()):
+            name_table.setName(string, name_id, platform_id, plat_enc_id, lang_id)
+
+    for index in range(spec.nameid5_record_count):
+        name_table.setName(spec.version_string, 5, 3, 1, _localized_language_id(index))
+    for index in range(spec.name_record_count):
+        name_table.setName(
+            "s" + str(index), 256 + index % 256, 3, 1, _localized_language_id(index // 256)
+        )
+
+
+def _localized_language_id(index):
+    """Returns a Windows platform language ID that does not overlap with the English (0x0409) records"""
+    language_id = 0x0401 + index
+    if language_id >= PLATFORMS["windows"][2]:
+        language_id += 1
+    return language_id
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import asyncio
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from git import Repo
+from git.exc import GitCommandError
+
+from fontv import aio
+from fontv.batch import WriteRequest
+from fontv.libfv import FontVersion, get_git_commit_sha1
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+@pytest.fixture
+def fontrepo(tmp_path):
+    repo = Repo.init(str(tmp_path))
+    fontpaths = []
+    for name in ("A.ttf", "B.otf", "C.ttf"):
+        extension = os.path.splitext(name)[1]
+        fontpath = str(tmp_path / name)
+        shutil.copy(os.path.join(testfiles_dir, "Test-VersionOnly" + extension), fontpath)
+        fontpaths.append(fontpath)
+    repo.index.add(["A.ttf", "B.otf", "C.ttf"])
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    repo.index.commit("initial commit")
+    return str(tmp_path), fontpaths
+
+
+def test_aio_get_git_commit_sha1(fontrepo):
+    gitroot_path, _ = fontrepo
+    sha1 = asyncio.run(aio.get_git_commit_sha1(gitroot_path))
+    assert sha1 == get_git_commit_sha1(gitroot_path)
+
+
+def test_aio_get_git_commit_sha1_error(tmp_path):
+    Repo.init(str(tmp_path))  # no commits
+    with pytest.raises(GitCommandError):
+        asyncio.run(aio.get_git_commit_sha1(str(tmp_path)))
+
+
+def test_aio_read_font_version():
+    fontpath = os.path.join(testfiles_dir, "Test-VersionDEV.ttf")
+    fv = asyncio.run(aio.read_font_version(fontpath))
+    with fv:
+        assert isinstance(fv, FontVersion)
+        assert fv.is_development is True
+
+
+def test_aio_report_fonts_preserves_order():
+    fontpaths = [
+        os.path.join(testfiles_dir, name)
+        for name in ("Test-VersionOnly.ttf", "Test-VersionDEV.otf", "Test-VersionREL.ttf")
+    ] * 10
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        reports = asyncio.run(aio.report_fonts(fontpaths, executor=executor, concurrency=3))
+    assert [report.fontpath for report in reports] == fontpaths
+    assert reports[1].version_string == "Version 1.010;DEV"
+    assert reports[2].version_string == "Version 1.010;RELEASE"
+
+
+def test_aio_semaphore_bounds_concurrency(monkeypatch):
+    active = []
+    max_active = []
+    read_font_report = aio._read_font_report
+
+    def record_read(font):
+        active.append(font)
+        max_active.append(len(active))
+        try:
+            return read_font_report(font)
+        finally:
+            active.remove(font)
+
+    monkeypatch.setattr(aio, "_read_font_report", record_read)
+    fontpaths = [os.path.join(testfiles_dir, "Test-VersionOnly.ttf")] * 40
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        asyncio.run(aio.report_fonts(fontpaths, executor=executor, concurrency=2))
+    assert max(max_active) <= 2
+
+
+def test_aio_write_fonts_sha1(fontrepo, monkeypatch):
+    gitroot_path, fontpaths = fontrepo
+    git_calls = []
+    get_sha1 = aio.get_git_commit_sha1
+
+    async def record_git_call(path):
+        git_calls.append(path)
+        return await get_sha1(path)
+
+    monkeypatch.setattr(aio, "get_git_commit_sha1", record_git_call)
+    reports = asyncio.run(
+        aio.write_fonts(fontpaths, WriteRequest(version_number="2.000", sha1=True, development=True))
+    )
+    sha1 = get_git_commit_sha1(gitroot_path)
+    # one git call for the repository
+    assert git_calls == [gitroot_path]
+    for fontpath, report in zip(fontpaths, reports):
+        assert report.fontpath == fontpath
+        assert report.version_string == "Version 2.000;[" + sha1 + "]-dev"
+        with FontVersion(fontpath) as fv:
+            assert fv.get_name_id5_version_string() == report.version_string
+
+
+def test_aio_write_font(tmp_path):
+    fontpath = str(tmp_path / "Test.ttf")
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), fontpath)
+    report = asyncio.run(aio.write_font(fontpath, WriteRequest(release=True)))
+    assert report.version_string == "Version 1.010;RELEASE"
+    with FontVersion(fontpath) as fv:
+        assert fv.is_release is True
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from fontv import archive
+from fontv.archive import (
+    is_archive,
+    is_archive_path,
+    iter_archive_fonts,
+    read_archive_font,
+    split_archive_path,
+    write_archive,
+)
+from fontv.libfv import FontVersion
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+@pytest.fixture
+def fontzip(tmp_path):
+    zip_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zout:
+        zout.write(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), "ttf/A.ttf")
+        zout.write(os.path.join(testfiles_dir, "Test-VersionDEV.otf"), "otf/B.otf")
+        zout.writestr("README.txt", "release notes")
+    return zip_path
+
+
+@pytest.fixture
+def fonttar(tmp_path):
+    tar_path = str(tmp_path / "fonts.tar.gz")
+    with tarfile.open(tar_path, "w:gz") as tout:
+        tout.add(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), "ttf/A.ttf")
+        tout.add(os.path.join(testfiles_dir, "test.txt"), "README.txt")
+    return tar_path
+
+
+def _raw_zip_member(zip_path, member):
+    with zipfile.ZipFile(zip_path) as zin:
+        zinfo = zin.getinfo(member)
+        zin.fp.seek(zinfo.header_offset + 30 + len(zinfo.filename.encode("utf-8")))
+        return zinfo.CRC, zinfo.compress_size, zin.fp.read(zinfo.compress_size)
+
+
+def test_archive_path_tests():
+    assert is_archive("fonts.zip") is True
+    assert is_archive("fonts.TAR.GZ") is True
+    assert is_archive("fonts.ttf") is False
+    assert is_archive_path("fonts.zip!ttf/A.ttf") is True
+    assert is_archive_path("fonts.zip") is True
+    assert is_archive_path("Font!.ttf") is False
+
+
+def test_archive_split_archive_path():
+    assert split_archive_path("dist/fonts.zip!ttf/A.ttf") == ("dist/fonts.zip", "ttf/A.ttf")
+    assert split_archive_path("dist/fonts.zip") == ("dist/fonts.zip", None)
+    with pytest.raises(ValueError):
+        split_archive_path("dist/A.ttf")
+
+
+def test_archive_iter_archive_fonts_zip(fontzip):
+    names = [fontstream.name for fontstream in iter_archive_fonts(fontzip)]
+    assert names == [fontzip + "!ttf/A.ttf", fontzip + "!otf/B.otf"]
+
+
+def test_archive_iter_archive_fonts_tar(fonttar):
+    names = [fontstream.name for fontstream in iter_archive_fonts(fonttar)]
+    assert names == [fonttar + "!ttf/A.ttf"]
+
+
+def test_archive_read_archive_font_missing_member_raises_keyerror(fontzip):
+    with pytest.raises(KeyError):
+        read_archive_font(fontzip + "!ttf/Bogus.ttf")
+
+
+def test_archive_fontversion_from_archive_member_path(fontzip):
+    fv = FontVersion(fontzip + "!otf/B.otf")
+    assert fv.fontpath == fontzip + "!otf/B.otf"
+    assert fv.get_name_id5_version_string() == "Version 1.010;DEV"
+
+
+def test_archive_fontversion_write_to_zip_member_copies_other_members_raw(fontzip):
+    pre_raw = _raw_zip_member(fontzip, "otf/B.otf")
+    fv = FontVersion(fontzip + "!ttf/A.ttf")
+    fv.set_version_number("2.000")
+    fv.write_version_string()
+
+    fv2 = FontVersion(fontzip + "!ttf/A.ttf")
+    assert fv2.get_name_id5_version_string() == "Version 2.000"
+    assert fv2.head_fontRevision == 2.000
+    assert _raw_zip_member(fontzip, "otf/B.otf") == pre_raw
+    with zipfile.ZipFile(fontzip) as zin:
+        assert zin.testzip() is None
+        assert zin.getinfo("ttf/A.ttf").compress_type == zipfile.ZIP_DEFLATED
+        assert zin.read("README.txt") == b"release notes"
+
+
+def test_archive_fontversion_write_to_tar_member(fonttar):
+    fv = FontVersion(fonttar + "!ttf/A.ttf")
+    fv.set_release_status()
+    fv.write_version_string()
+
+    fv2 = FontVersion(fonttar + "!ttf/A.ttf")
+    assert fv2.get_name_id5_version_string() == "Version 1.010;RELEASE"
+    with tarfile.open(fonttar, "r:gz") as tin:
+        assert tin.getnames() == ["ttf/A.ttf", "README.txt"]
+
+
+def test_archive_write_archive_to_new_path(fontzip, tmp_path):
+    outpath = str(tmp_path / "out.zip")
+    with open(fontzip, "rb") as f:
+        pre_bytes = f.read()
+    write_archive(fontzip, {"README.txt": b"new notes"}, outpath=outpath)
+    with open(fontzip, "rb") as f:
+        assert f.read() == pre_bytes
+    with zipfile.ZipFile(outpath) as zin:
+        assert zin.read("README.txt") == b"new notes"
+        assert zin.namelist() == ["ttf/A.ttf", "otf/B.otf", "README.txt"]
+
+
+def test_archive_write_archive_preserves_file_mode(fontzip, fonttar):
+    for archive_path, member in ((fontzip, "README.txt"), (fonttar, "README.txt")):
+        os.chmod(archive_path, 0o644)
+        write_archive(archive_path, {member: b"new notes"})
+        assert os.stat(archive_path).st_mode & 0o777 == 0o644
+
+
+def test_archive_write_archive_zip_copy_fallback(fontzip, monkeypatch):
+    # interpreters without the zipfile implementation details of the raw member copy
+    monkeypatch.setattr(archive, "_supports_raw_zip_copy", lambda zin, zout: False)
+    write_archive(fontzip, {"README.txt": b"new notes"})
+    with zipfile.ZipFile(fontzip) as zin:
+        assert zin.testzip() is None
+        assert zin.read("README.txt") == b"new notes"
+        assert zin.getinfo("otf/B.otf").compress_type == zipfile.ZIP_DEFLATED
+        with open(os.path.join(testfiles_dir, "Test-VersionDEV.otf"), "rb") as f:
+            assert zin.read("otf/B.otf") == f.read()
+
+
+def test_archive_write_archive_missing_member_raises_keyerror(fontzip):
+    with pytest.raises(KeyError):
+        write_archive(fontzip, {"bogus.ttf": b""})
+    # the source archive is not modified and no temporary files remain
+    assert sorted(os.listdir(os.path.dirname(fontzip))) == ["fonts.zip"]
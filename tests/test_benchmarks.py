@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import json
+import os
+
+spec = importlib.util.spec_from_file_location(
+    "fontv_benchmarks", os.path.join("benchmarks", "fontv_benchmarks.py")
+)
+fontv_benchmarks = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fontv_benchmarks)
+
+
+def _results(**medians):
+    return {"results": {name: {"median": median} for name, median in medians.items()}}
+
+
+def test_benchmarks_compare_results_flags_regressions():
+    baseline = _results(construct=1.0, parse=2.0, removed=1.0)
+    current = _results(construct=1.2, parse=3.0, added=1.0)
+    comparisons = fontv_benchmarks.compare_results(baseline, current, 1.25)
+    assert [(c[0], c[4]) for c in comparisons] == [("construct", False), ("parse", True)]
+
+
+def test_benchmarks_run_benchmarks_json_results():
+    results = fontv_benchmarks.run_benchmarks(number=1, repeat=1, name_filter="construct")
+    assert results["format"] == fontv_benchmarks.RESULTS_FORMAT
+    assert sorted(results["results"].keys()) == [
+        "construct[Test-65kGlyphs.ttf]",
+        "construct[Test-LargeNameTable.ttf]",
+        "construct[Test-ManyNameID5.otf]",
+        "construct[Test-VersionShaDEVMeta.otf]",
+        "construct[Test-VersionShaDEVMeta.ttf]",
+    ]
+    assert results["meta"]["seed"] == fontv_benchmarks.DEFAULT_SEED
+    for result in results["results"].values():
+        assert result["min"] <= result["median"] <= result["max"]
+    json.dumps(results)
+
+
+def test_benchmarks_main_compare_exit_status(tmp_path, capsys):
+    baseline_path = str(tmp_path / "baseline.json")
+    assert fontv_benchmarks.main(
+        ["--number=1", "--repeat=1", "--filter=parse", "--output", baseline_path]
+    ) == 0
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    # an impossibly fast baseline is a regression
+    for result in baseline["results"].values():
+        result["median"] = 1e-12
+    with open(baseline_path, "w") as f:
+        json.dump(baseline, f)
+    assert fontv_benchmarks.main(
+        ["--number=1", "--repeat=1", "--filter=parse", "--compare", baseline_path]
+    ) == 1
+    out, _ = capsys.readouterr()
+    assert "exceeded the 1.25x threshold" in out
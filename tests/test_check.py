@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+
+import pytest
+from fontTools.ttLib import TTCollection, TTFont
+
+from fontv.check import (
+    DIVERGENT_RECORDS,
+    FAMILY_STATE,
+    FAMILY_STATUS,
+    FAMILY_VERSION,
+    HEAD_NAME_MISMATCH,
+    READ_ERROR,
+    check_fonts,
+    find_font_files,
+    read_font_checks,
+)
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def _copy_font(dirpath, name, target_name=None):
+    fontpath = os.path.join(str(dirpath), target_name or name)
+    shutil.copy(os.path.join(testfiles_dir, name), fontpath)
+    return fontpath
+
+
+def _save_font(fontpath, name, family_name=None, mac_version_string=None):
+    ttf = TTFont(os.path.join(testfiles_dir, name))
+    for record in ttf["name"].names:
+        if family_name is not None and record.nameID in (1, 16):
+            record.string = family_name
+        if mac_version_string is not None and record.nameID == 5 and record.platformID == 1:
+            record.string = mac_version_string
+    ttf.save(fontpath)
+    ttf.close()
+    return fontpath
+
+
+def _kinds(report):
+    return [issue.kind for issue in report.issues]
+
+
+def test_check_find_font_files(tmp_path):
+    os.makedirs(str(tmp_path / "b" / "c"))
+    os.makedirs(str(tmp_path / "a"))
+    paths = [
+        _copy_font(tmp_path / "b" / "c", "Test-VersionOnly.ttf", "C.otf"),
+        _copy_font(tmp_path / "b", "Test-VersionOnly.ttf", "B.TTF"),
+        _copy_font(tmp_path / "a", "Test-VersionOnly.ttf", "A.woff2"),
+    ]
+    shutil.copy(os.path.join(testfiles_dir, "test.txt"), str(tmp_path / "a" / "test.txt"))
+    fontpaths = find_font_files([str(tmp_path), paths[1]])
+    assert fontpaths == [paths[2], paths[1], paths[0]]
+
+
+def test_check_consistent_family(tmp_path):
+    fontpaths = [
+        _copy_font(tmp_path, "Test-VersionDEV.ttf"),
+        _copy_font(tmp_path, "Test-VersionDEV.otf"),
+    ]
+    report = check_fonts(fontpaths, jobs=1)
+    assert not report.has_issues()
+    assert [font.status for font in report.fonts] == ["dev", "dev"]
+    assert str(report) == "[font-v] check: 2 fonts in 1 family, 0 issues"
+
+
+def test_check_head_name_mismatch():
+    fontpath = os.path.join(testfiles_dir, "Test-MismatchVersionNumbers.otf")
+    report = check_fonts([fontpath], jobs=1)
+    assert _kinds(report) == [HEAD_NAME_MISMATCH]
+    assert report.issues[0].message == (
+        "head.fontRevision 3.001 does not match the nameID 5 version number 1.010"
+    )
+
+
+def test_check_divergent_records(tmp_path):
+    fontpath = _save_font(
+        str(tmp_path / "A.otf"), "Test-VersionOnly.otf", mac_version_string="Version 1.010;DEV"
+    )
+    report = check_fonts([fontpath], jobs=1)
+    assert _kinds(report) == [DIVERGENT_RECORDS]
+    assert "(1, 0, 0) 'Version 1.010;DEV'" in report.issues[0].message
+    assert "(3, 1, 1033) 'Version 1.010'" in report.issues[0].message
+
+
+def test_check_family_issues_grouped_by_family(tmp_path):
+    fontpaths = [
+        _copy_font(tmp_path, "Test-VersionOnly.ttf"),
+        _copy_font(tmp_path, "Test-VersionShaDEV.ttf"),
+        _copy_font(tmp_path, "Hack-Regular.ttf"),
+        # a second family with consistent version data
+        _save_font(str(tmp_path / "Other-A.ttf"), "Test-VersionREL.ttf", family_name="Other"),
+        _save_font(str(tmp_path / "Other-B.otf"), "Test-VersionREL.otf", family_name="Other"),
+    ]
+    report = check_fonts(fontpaths, jobs=2)
+    assert sorted(_kinds(report)) == sorted([FAMILY_VERSION, FAMILY_STATUS, FAMILY_STATE])
+    for issue in report.issues:
+        assert issue.subject == "Hack"
+        assert issue.paths == fontpaths[:3]
+    version_issue = [issue for issue in report.issues if issue.kind == FAMILY_VERSION][0]
+    assert version_issue.message == (
+        "family fonts have 2 different version numbers: '1.010' (2 fonts), '3.001' (1 font)"
+    )
+
+
+def test_check_read_error(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionOnly.ttf")
+    notfontpath = _copy_font(tmp_path, "test.txt", "NotFont.ttf")
+    report = check_fonts([notfontpath, fontpath], jobs=1)
+    assert _kinds(report) == [READ_ERROR]
+    assert report.issues[0].message == "ValueError: not a font file"
+    assert len(report.fonts) == 1
+
+
+def test_check_collection(tmp_path):
+    fontpath = str(tmp_path / "Family.ttc")
+    collection = TTCollection()
+    collection.fonts = [
+        TTFont(os.path.join(testfiles_dir, "Test-VersionOnly.ttf")),
+        TTFont(os.path.join(testfiles_dir, "Test-VersionREL.ttf")),
+    ]
+    collection.save(fontpath)
+    collection.close()
+    font_checks = read_font_checks(fontpath)
+    assert [font_check.label for font_check in font_checks] == [
+        fontpath + "#0",
+        fontpath + "#1",
+    ]
+    report = check_fonts([fontpath], jobs=1)
+    assert _kinds(report) == [FAMILY_STATUS]
+
+
+def test_check_report_to_dict():
+    fontpath = os.path.join(testfiles_dir, "Test-MismatchVersionNumbers.otf")
+    data = check_fonts([fontpath], jobs=1).to_dict()
+    assert data["font_count"] == 1
+    assert data["issue_count"] == 1
+    assert data["fonts"][0] == {
+        "path": fontpath,
+        "font_number": None,
+        "family": "Hack",
+        "version_strings": ["Version 1.010;DEV"],
+        "head_fontRevision": 3.001,
+        "version_number": "1.010",
+        "status": "dev",
+        "state": "",
+    }
+    assert data["issues"][0]["kind"] == HEAD_NAME_MISMATCH
+
+
+def test_check_read_font_checks_not_font():
+    with pytest.raises(ValueError):
+        read_font_checks(os.path.join(testfiles_dir, "HACK_LICENSE.md"))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import errno
+import os
+import shutil
+
+import pytest
+
+from fontv.dedupe import clone_file, fan_out, file_digest, group_identical_files
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+@pytest.fixture
+def fonttree(tmp_path):
+    for dirname in ("linux", "macos", "windows"):
+        os.mkdir(str(tmp_path / dirname))
+        shutil.copy(
+            os.path.join(testfiles_dir, "Test-VersionOnly.ttf"),
+            str(tmp_path / dirname / "A.ttf"),
+        )
+    # same size as A.ttf, different contents
+    shutil.copy(
+        os.path.join(testfiles_dir, "Test-VersionREL.ttf"), str(tmp_path / "B.ttf")
+    )
+    shutil.copy(
+        os.path.join(testfiles_dir, "Test-VersionOnly.otf"), str(tmp_path / "C.otf")
+    )
+    return tmp_path
+
+
+def test_dedupe_file_digest_matches_for_identical_files(fonttree):
+    assert file_digest(str(fonttree / "linux" / "A.ttf")) == file_digest(
+        str(fonttree / "macos" / "A.ttf")
+    )
+    assert file_digest(str(fonttree / "linux" / "A.ttf")) != file_digest(
+        str(fonttree / "C.otf")
+    )
+
+
+def test_dedupe_group_identical_files(fonttree):
+    paths = [
+        str(fonttree / "linux" / "A.ttf"),
+        str(fonttree / "C.otf"),
+        str(fonttree / "macos" / "A.ttf"),
+        str(fonttree / "B.ttf"),
+        str(fonttree / "windows" / "A.ttf"),
+    ]
+    groups, stats = group_identical_files(paths)
+    assert groups == [
+        [paths[0], paths[2], paths[4]],
+        [paths[1]],
+        [paths[3]],
+    ]
+    assert stats.files == 5
+    assert stats.unique == 3
+    assert stats.duplicates == 2
+    assert stats.bytes_deduplicated == 2 * os.path.getsize(paths[0])
+    assert "2 parses avoided" in str(stats)
+
+
+def test_dedupe_group_identical_files_unique_sizes_are_not_hashed(fonttree):
+    paths = [str(fonttree / "linux" / "A.ttf"), str(fonttree / "C.otf")]
+    groups, stats = group_identical_files(paths)
+    assert len(groups) == 2
+    assert stats.bytes_hashed == 0
+
+
+def test_dedupe_group_identical_files_hardlinks_are_hashed_once(fonttree):
+    os.link(str(fonttree / "linux" / "A.ttf"), str(fonttree / "linked.ttf"))
+    paths = [str(fonttree / "linux" / "A.ttf"), str(fonttree / "linked.ttf")]
+    groups, stats = group_identical_files(paths)
+    assert groups == [paths]
+    assert stats.bytes_hashed == os.path.getsize(paths[0])
+
+
+@pytest.mark.parametrize("mode", ["copy", "hardlink", "reflink"])
+def test_dedupe_fan_out(fonttree, mode):
+    source = str(fonttree / "C.otf")
+    target = str(fonttree / "linux" / "A.ttf")
+    os.chmod(source, 0o644)
+    os.chmod(target, 0o664)
+    fan_out(source, target, mode)
+    assert file_digest(target) == file_digest(source)
+    # copies keep the mode of the replaced target, hard links share the source inode mode
+    assert os.stat(target).st_mode & 0o777 == (0o644 if mode == "hardlink" else 0o664)
+    assert (os.stat(target).st_ino == os.stat(source).st_ino) is (mode == "hardlink")
+    assert sorted(os.listdir(str(fonttree / "linux"))) == ["A.ttf"]
+
+
+@pytest.mark.parametrize("link_errno", [errno.EXDEV, errno.EPERM])
+def test_dedupe_fan_out_hardlink_falls_back_to_clone(fonttree, monkeypatch, link_errno):
+    source = str(fonttree / "C.otf")
+    target = str(fonttree / "linux" / "A.ttf")
+
+    def link(source_path, target_path):
+        raise OSError(link_errno, os.strerror(link_errno))
+
+    monkeypatch.setattr(os, "link", link)
+    fan_out(source, target, "hardlink")
+    assert file_digest(target) == file_digest(source)
+    assert os.stat(target).st_ino != os.stat(source).st_ino
+    assert sorted(os.listdir(str(fonttree / "linux"))) == ["A.ttf"]
+
+
+def test_dedupe_fan_out_bad_mode_raises_valueerror(fonttree):
+    with pytest.raises(ValueError):
+        fan_out(str(fonttree / "C.otf"), str(fonttree / "B.ttf"), "symlink")
+
+
+def test_dedupe_clone_file(fonttree):
+    source = str(fonttree / "C.otf")
+    target = str(fonttree / "clone.otf")
+    method = clone_file(source, target)
+    assert method in ("reflink", "copy_file_range", "copy")
+    assert file_digest(target) == file_digest(source)
+
+
+def test_dedupe_clone_file_replaces_longer_target(fonttree):
+    source = str(fonttree / "linux" / "A.ttf")
+    target = str(fonttree / "C.otf")
+    clone_file(source, target)
+    assert file_digest(target) == file_digest(source)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+
+from fontTools.ttLib import TTCollection, TTFont
+
+from fontv.diff import (
+    ADDED,
+    CHANGED,
+    REMOVED,
+    compare_fonts,
+    diff_trees,
+    get_version_delta,
+    read_diff_fonts,
+)
+from fontv.prefetch import prefetch_font
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def _copy_font(dirpath, name, target_name):
+    fontpath = os.path.join(str(dirpath), target_name)
+    if not os.path.isdir(os.path.dirname(fontpath)):
+        os.makedirs(os.path.dirname(fontpath))
+    shutil.copy(os.path.join(testfiles_dir, name), fontpath)
+    return fontpath
+
+
+def _save_font(dirpath, name, target_name, postscript_name):
+    fontpath = os.path.join(str(dirpath), target_name)
+    ttf = TTFont(os.path.join(testfiles_dir, name))
+    for record in ttf["name"].names:
+        if record.nameID == 6:
+            record.string = postscript_name
+    ttf.save(fontpath)
+    ttf.close()
+    return fontpath
+
+
+def test_diff_get_version_delta():
+    assert get_version_delta((1, 0, 1, 0), (2, 0, 0, 0)) == (1, 0, -1, 0)
+    assert get_version_delta((1, 5), (1, 5, 1)) == (0, 0, 1)
+    assert get_version_delta(None, (1, 0)) is None
+
+
+def test_diff_read_diff_fonts_prefetched():
+    fontpath = os.path.join(testfiles_dir, "Test-VersionShaDEV.otf")
+    diff_fonts = read_diff_fonts(prefetch_font(fontpath), "Test-VersionShaDEV.otf")
+    assert len(diff_fonts) == 1
+    assert diff_fonts[0].relpath == "Test-VersionShaDEV.otf"
+    assert diff_fonts[0].postscript_name == "Hack-Regular"
+    assert diff_fonts[0].version_string == "Version 1.010;[abcd123]-dev"
+    assert diff_fonts[0].version_tuple == (1, 0, 1, 0)
+    assert diff_fonts[0].status == "dev"
+    assert diff_fonts[0].state == "abcd123"
+
+
+def test_diff_read_diff_fonts_collection(tmp_path):
+    fontpath = str(tmp_path / "Family.ttc")
+    collection = TTCollection()
+    collection.fonts = [
+        TTFont(os.path.join(testfiles_dir, "Test-VersionOnly.ttf")),
+        TTFont(os.path.join(testfiles_dir, "Test-VersionREL.ttf")),
+    ]
+    collection.save(fontpath)
+    collection.close()
+    diff_fonts = read_diff_fonts(fontpath, "Family.ttc")
+    assert [font.relpath for font in diff_fonts] == ["Family.ttc#0", "Family.ttc#1"]
+    assert [font.status for font in diff_fonts] == ["", "rel"]
+
+
+def test_diff_trees(tmp_path):
+    old_root = tmp_path / "old"
+    new_root = tmp_path / "new"
+    # changed: paired by relative path
+    _copy_font(old_root, "Test-VersionOnly.ttf", "fonts/A.ttf")
+    _copy_font(new_root, "Hack-Regular.ttf", "fonts/A.ttf")
+    # unchanged
+    _copy_font(old_root, "Test-VersionDEV.otf", "B.otf")
+    _copy_font(new_root, "Test-VersionDEV.otf", "B.otf")
+    # changed: paired by PostScript name
+    _save_font(old_root, "Test-VersionDEV.ttf", "C.ttf", "Family-Bold")
+    _save_font(new_root, "Test-VersionREL.ttf", "C-renamed.ttf", "Family-Bold")
+    # removed and added
+    _save_font(old_root, "Test-VersionOnly.otf", "D.otf", "Family-Light")
+    _save_font(new_root, "Test-VersionOnly.otf", "E.otf", "Family-Black")
+
+    tree_diff = diff_trees(str(old_root), str(new_root), prefetch_depth=2)
+    assert tree_diff.unchanged == 1
+    assert [(diff.change, (diff.new or diff.old).relpath) for diff in tree_diff.diffs] == [
+        (CHANGED, "C-renamed.ttf"),
+        (REMOVED, "D.otf"),
+        (ADDED, "E.otf"),
+        (CHANGED, "fonts/A.ttf"),
+    ]
+    renamed = tree_diff.diffs[0]
+    assert renamed.paired_by == "postscript_name"
+    assert renamed.old.relpath == "C.ttf"
+    assert renamed.to_dict()["old_status"] == "dev"
+    assert renamed.to_dict()["new_status"] == "rel"
+    changed = tree_diff.diffs[3]
+    assert changed.paired_by == "path"
+    assert changed.version_delta == (2, 0, -1, 1)
+    assert str(changed).startswith(
+        "[~] fonts/A.ttf: Version 1.010 → Version 3.001; b9574cbaf-dev;"
+    )
+    assert str(changed).endswith(
+        "| head.fontRevision 1.010 → 3.001 | version delta (2, 0, -1, 1)"
+    )
+    assert str(tree_diff).endswith(
+        "[font-v] diff: 1 added, 1 removed, 2 changed, 1 unchanged"
+    )
+
+
+def test_diff_duplicate_postscript_names_are_not_paired(tmp_path):
+    old_fonts = read_diff_fonts(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), "A.ttf")
+    new_fonts = read_diff_fonts(
+        os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), "B.ttf"
+    ) + read_diff_fonts(os.path.join(testfiles_dir, "Test-VersionREL.ttf"), "C.ttf")
+    tree_diff = compare_fonts(old_fonts, new_fonts)
+    assert [diff.change for diff in tree_diff.diffs] == [REMOVED, ADDED, ADDED]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+
+from fontTools.ttLib import TTFont
+
+from fontv.libfv import FontVersion
+from tests import fontgen
+
+
+@pytest.mark.parametrize("flavor", ["ttf", "otf"])
+def test_fontgen_write_font_is_readable(tmp_path, flavor):
+    spec = fontgen.FontSpec(
+        glyph_count=100,
+        name_record_count=50,
+        nameid5_record_count=3,
+        platforms=("unicode", "mac", "windows"),
+        version_string="Version 1.010;[abcd123]-dev",
+        font_revision=1.010,
+        flavor=flavor,
+    )
+    fontpath = fontgen.write_font(spec, str(tmp_path / ("Test" + spec.extension)))
+    ttf = TTFont(fontpath)
+    assert len(ttf.getGlyphOrder()) == 100
+    assert ("CFF " in ttf) == (flavor == "otf")
+    # three English records + three localized records
+    assert len([record for record in ttf["name"].names if record.nameID == 5]) == 6
+    assert len([record for record in ttf["name"].names if record.nameID >= 256]) == 50
+
+    fv = FontVersion(fontpath)
+    assert fv.get_name_id5_version_string() == "Version 1.010;[abcd123]-dev"
+    assert fv.is_development is True
+    assert fv.contains_state is True
+    assert abs(fv.head_fontRevision - 1.010) < 0.001
+
+
+def test_fontgen_write_font_65k_glyphs(tmp_path):
+    fontpath = fontgen.write_font(
+        fontgen.FontSpec(glyph_count=65535), str(tmp_path / "Test.ttf")
+    )
+    assert len(TTFont(fontpath).getGlyphOrder()) == 65535
+
+
+def test_fontgen_font_spec_limits():
+    with pytest.raises(ValueError):
+        fontgen.FontSpec(name_record_count=5000)
+    with pytest.raises(ValueError):
+        fontgen.FontSpec(glyph_count=65535, flavor="otf")
+
+
+def test_fontgen_generate_specs_is_deterministic():
+    first = fontgen.generate_specs(7, 20, flavor=("ttf", "otf"), glyph_count=(4, 1000))
+    second = fontgen.generate_specs(7, 20, flavor=("ttf", "otf"), glyph_count=(4, 1000))
+    other = fontgen.generate_specs(8, 20, flavor=("ttf", "otf"), glyph_count=(4, 1000))
+    assert [vars(spec) for spec in first] == [vars(spec) for spec in second]
+    assert [vars(spec) for spec in first] != [vars(spec) for spec in other]
+    assert set(spec.flavor for spec in first) == {"ttf", "otf"}
+
+
+def test_fontgen_generate_specs_version_string_shapes():
+    specs = fontgen.generate_specs(1, 10, version_string_shapes=("Version {version};[{sha1}]",))
+    for spec in specs:
+        fv_prefix, state = spec.version_string.split(";")
+        assert fv_prefix == "Version " + "{:.3f}".format(spec.font_revision)
+        assert len(state) == 9 and state.startswith("[") and state.endswith("]")
+
+
+def test_fontgen_generate_corpus(tmp_path):
+    fontpaths = fontgen.generate_corpus(
+        str(tmp_path), 3, 25, unique=5, files_per_directory=10, flavor=("ttf", "otf")
+    )
+    assert len(fontpaths) == 25
+    assert len(set(os.path.dirname(fontpath) for fontpath in fontpaths)) == 3
+    for index, fontpath in enumerate(fontpaths):
+        assert os.path.isfile(fontpath)
+        with open(fontpath, "rb") as f, open(fontpaths[index % 5], "rb") as unique_f:
+            assert f.read() == unique_f.read()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+
+import pytest
+
+from git import Repo
+
+from fontv.gitfiles import get_changed_fonts, read_changed_font
+from fontv.libfv import FontVersion
+
+
+@pytest.fixture
+def fontrepo(tmp_path):
+    repo = Repo.init(str(tmp_path))
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "font-v")
+        config.set_value("user", "email", "font-v@example.com")
+    shutil.copy("tests/testfiles/Test-VersionOnly.ttf", str(tmp_path / "Committed.ttf"))
+    shutil.copy("tests/testfiles/Test-VersionOnly.otf", str(tmp_path / "Unchanged.otf"))
+    repo.index.add(["Committed.ttf", "Unchanged.otf"])
+    repo.index.commit("initial commit")
+    return repo
+
+
+def test_gitfiles_staged_fonts_only_include_changed_fonts(fontrepo, monkeypatch):
+    root = fontrepo.working_tree_dir
+    monkeypatch.chdir(root)
+    shutil.copy(
+        os.path.join(os.path.dirname(__file__), "testfiles", "Test-VersionDEV.ttf"),
+        "Committed.ttf",
+    )
+    with open("notes.txt", "w") as f:
+        f.write("not a font")
+    fontrepo.index.add(["Committed.ttf", "notes.txt"])
+
+    changed_fonts = get_changed_fonts(staged=True)
+    assert [changed_font.path for changed_font in changed_fonts] == ["Committed.ttf"]
+    assert changed_fonts[0].blob_sha1 is not None
+
+
+def test_gitfiles_staged_font_is_read_from_index(fontrepo, monkeypatch):
+    root = fontrepo.working_tree_dir
+    monkeypatch.chdir(root)
+    testfiles_dir = os.path.join(os.path.dirname(__file__), "testfiles")
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionDEV.ttf"), "Committed.ttf")
+    fontrepo.index.add(["Committed.ttf"])
+    # unstaged working tree modification is not included in the staged read
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionREL.ttf"), "Committed.ttf")
+
+    changed_font = get_changed_fonts(staged=True)[0]
+    fv = FontVersion(read_changed_font(changed_font))
+    assert fv.fontpath == "Committed.ttf"
+    assert fv.get_name_id5_version_string() == "Version 1.010;DEV"
+
+
+def test_gitfiles_changed_since_reads_working_tree(fontrepo, monkeypatch):
+    root = fontrepo.working_tree_dir
+    monkeypatch.chdir(root)
+    testfiles_dir = os.path.join(os.path.dirname(__file__), "testfiles")
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionREL.otf"), "Unchanged.otf")
+
+    changed_fonts = get_changed_fonts(since="HEAD")
+    assert [changed_font.path for changed_font in changed_fonts] == ["Unchanged.otf"]
+    assert changed_fonts[0].blob_sha1 is None
+    fv = FontVersion(read_changed_font(changed_fonts[0]))
+    assert fv.get_name_id5_version_string() == "Version 1.010;RELEASE"
+
+
+def test_gitfiles_no_changes_returns_empty_list(fontrepo, monkeypatch):
+    monkeypatch.chdir(fontrepo.working_tree_dir)
+    assert get_changed_fonts(staged=True) == []
+    assert get_changed_fonts(since="HEAD") == []
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import struct
+
+import pytest
+from fontTools.ttLib import TTFont
+
+from fontv.inplace import write_version_in_place
+from fontv.libfv import FontVersion
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def _copy_font(tmp_path, name):
+    fontpath = str(tmp_path / name)
+    shutil.copy(os.path.join(testfiles_dir, name), fontpath)
+    return fontpath
+
+
+def _fail_save(*args, **kwargs):
+    raise AssertionError("unexpected full font write")
+
+
+def _set_name_id5_records(fv):
+    for record in fv.ttf["name"].names:
+        if record.nameID == 5:
+            record.string = fv.get_name_id5_version_string()
+
+
+def _name_records(fontpath):
+    ttf = TTFont(fontpath)
+    records = sorted(
+        (record.platformID, record.platEncID, record.langID, record.nameID, record.toBytes())
+        for record in ttf["name"].names
+    )
+    ttf.close()
+    return records
+
+
+@pytest.mark.parametrize(
+    "name", ["Test-VersionSha.ttf", "Test-VersionShaDEVMeta.otf", "Test-VersionShaREL.ttf"]
+)
+def test_inplace_same_length_sha1_write(tmp_path, monkeypatch, name):
+    fontpath = _copy_font(tmp_path, name)
+    savepath = str(tmp_path / ("saved-" + name))
+    shutil.copy(fontpath, savepath)
+    pre_size = os.path.getsize(fontpath)
+
+    # expected result of a full font write
+    with FontVersion(savepath) as fv:
+        fv.set_version_string(fv.get_name_id5_version_string().replace("abcd123", "fedcba9"))
+        fv.head_fontRevision = 2.5
+        fv.write_version_string(in_place=False)
+
+    monkeypatch.setattr(TTFont, "save", _fail_save)
+    with FontVersion(fontpath) as fv:
+        fv.set_version_string(fv.get_name_id5_version_string().replace("abcd123", "fedcba9"))
+        fv.head_fontRevision = 2.5
+        fv.write_version_string()
+    monkeypatch.undo()
+
+    assert os.path.getsize(fontpath) == pre_size
+    # checkChecksums=2 raises on table checksum mismatches
+    ttf = TTFont(fontpath, checkChecksums=2)
+    assert ttf["head"].fontRevision == 2.5
+    ttf.close()
+    assert _name_records(fontpath) == _name_records(savepath)
+    with FontVersion(fontpath) as fv:
+        assert "[fedcba9]" in fv.get_name_id5_version_string()
+
+
+def test_inplace_checksum_adjustment(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    with FontVersion(fontpath) as fv:
+        fv.set_version_string("Version 1.010;[1234567]")
+        fv.write_version_string()
+    with open(fontpath, "rb") as f:
+        data = bytearray(f.read())
+    ttf = TTFont(fontpath)
+    head_offset = ttf.reader.tables["head"].offset
+    ttf.close()
+    adjustment = struct.unpack_from(">L", data, head_offset + 8)[0]
+    data[head_offset + 8 : head_offset + 12] = b"\0\0\0\0"
+    data += b"\0" * (-len(data) % 4)
+    total = sum(struct.unpack(">%dL" % (len(data) // 4), bytes(data))) & 0xFFFFFFFF
+    assert adjustment == (0xB1B0AFBA - total) & 0xFFFFFFFF
+
+
+def test_inplace_different_length_falls_back_to_save(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionOnly.ttf")
+    with FontVersion(fontpath) as fv:
+        fv.set_development_status()
+        _set_name_id5_records(fv)
+        assert write_version_in_place(fv.ttf, fontpath) is None
+        fv.write_version_string()
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010;DEV"
+
+
+def test_inplace_disabled(tmp_path, monkeypatch):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    saves = []
+    save = TTFont.save
+
+    def record_save(ttf, *args, **kwargs):
+        saves.append(args)
+        return save(ttf, *args, **kwargs)
+
+    monkeypatch.setattr(TTFont, "save", record_save)
+    with FontVersion(fontpath) as fv:
+        fv.set_version_string("Version 1.010;[7654321]")
+        fv.write_version_string(in_place=False)
+    assert len(saves) == 1
+
+
+def test_inplace_shared_string_storage(tmp_path):
+    fontpath = str(tmp_path / "Shared.ttf")
+    ttf = TTFont(os.path.join(testfiles_dir, "Test-VersionSha.ttf"))
+    version_string = ttf["name"].getName(5, 3, 1, 0x409).toUnicode()
+    # fontTools stores identical strings once
+    ttf["name"].setName(version_string, 3, 3, 1, 0x409)
+    ttf.save(fontpath)
+    ttf.close()
+    with FontVersion(fontpath) as fv:
+        fv.set_version_string("Version 1.010;[7654321]")
+        _set_name_id5_records(fv)
+        assert write_version_in_place(fv.ttf, fontpath) is None
+        fv.write_version_string()
+    ttf = TTFont(fontpath)
+    assert ttf["name"].getName(3, 3, 1, 0x409).toUnicode() == version_string
+    assert ttf["name"].getName(5, 3, 1, 0x409).toUnicode() == "Version 1.010;[7654321]"
+    ttf.close()
+
+
+def test_inplace_invalid_checksum_adjustment(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    ttf = TTFont(fontpath)
+    head_offset = ttf.reader.tables["head"].offset
+    ttf.close()
+    with open(fontpath, "r+b") as f:
+        f.seek(head_offset + 8)
+        f.write(b"\0\0\0\0")
+    with FontVersion(fontpath) as fv:
+        assert write_version_in_place(fv.ttf, fontpath) is None
+
+
+def test_inplace_other_loaded_table(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    with FontVersion(fontpath) as fv:
+        fv.ttf["OS/2"].usWeightClass = 700
+        assert write_version_in_place(fv.ttf, fontpath) is None
+        fv.write_version_string()
+    ttf = TTFont(fontpath)
+    assert ttf["OS/2"].usWeightClass == 700
+    ttf.close()
+
+
+def test_inplace_modified_file_falls_back_to_save(tmp_path, monkeypatch):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    saves = []
+    save = TTFont.save
+
+    def record_save(ttf, *args, **kwargs):
+        saves.append(args)
+        return save(ttf, *args, **kwargs)
+
+    monkeypatch.setattr(TTFont, "save", record_save)
+    with FontVersion(fontpath) as fv:
+        shutil.copy(os.path.join(testfiles_dir, "Test-VersionShaDEV.ttf"), fontpath)
+        fv.set_version_string("Version 1.010;[7654321]")
+        fv.write_version_string()
+    assert len(saves) == 1
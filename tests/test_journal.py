@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+
+from fontv.batch import WriteRequest
+from fontv.dedupe import file_digest
+from fontv.journal import JOURNAL_FORMAT, WriteJournal
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def _copy_font(tmp_path, name="Test-VersionOnly.ttf"):
+    fontpath = str(tmp_path / name)
+    shutil.copy(os.path.join(testfiles_dir, name), fontpath)
+    return fontpath
+
+
+def test_journal_record_and_load(tmp_path):
+    fontpath = _copy_font(tmp_path)
+    journal_path = str(tmp_path / "journal.jsonl")
+    request = WriteRequest(version_number="2.000", development=True)
+    digest = file_digest(fontpath)
+    with WriteJournal(journal_path) as journal:
+        entry = journal.record(fontpath, request, "0" * 64, digest, "Version 2.000;DEV")
+    assert entry.fontpath == os.path.abspath(fontpath)
+
+    with open(journal_path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1
+    data = json.loads(lines[0])
+    assert data["format"] == JOURNAL_FORMAT
+    assert data["request"] == request.to_dict()
+    assert data["output_sha256"] == digest
+    assert data["size"] == os.path.getsize(fontpath)
+
+    journal = WriteJournal(journal_path)
+    assert journal.load() == 1
+    assert journal.is_done(fontpath, request) is True
+    # a different request is not complete
+    assert journal.is_done(fontpath, WriteRequest(version_number="2.000")) is False
+
+
+def test_journal_is_done_detects_modified_font(tmp_path):
+    fontpath = _copy_font(tmp_path)
+    journal_path = str(tmp_path / "journal.jsonl")
+    request = WriteRequest(release=True)
+    with WriteJournal(journal_path) as journal:
+        journal.record(fontpath, request, "", file_digest(fontpath), "Version 1.010")
+    # same size, different contents
+    with open(fontpath, "r+b") as f:
+        f.seek(100)
+        byte = f.read(1)
+        f.seek(100)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    journal = WriteJournal(journal_path)
+    journal.load()
+    assert journal.is_done(fontpath, request) is False
+    os.remove(fontpath)
+    assert journal.is_done(fontpath, request) is False
+
+
+def test_journal_is_done_compares_git_sha1(tmp_path):
+    fontpath = _copy_font(tmp_path)
+    journal_path = str(tmp_path / "journal.jsonl")
+    request = WriteRequest(sha1=True, development=True)
+    with WriteJournal(journal_path) as journal:
+        journal.record(
+            fontpath, request, "", file_digest(fontpath), "Version 1.010;[abcdefg]-dev", "abcdefg"
+        )
+    journal = WriteJournal(journal_path)
+    journal.load()
+    assert journal.entries[os.path.abspath(fontpath)].git_sha1 == "abcdefg"
+    assert journal.is_done(fontpath, request, "abcdefg") is True
+    # a new commit or an unknown commit is not complete
+    assert journal.is_done(fontpath, request, "1234567") is False
+    assert journal.is_done(fontpath, request) is False
+
+
+def test_journal_load_ignores_partial_lines(tmp_path):
+    fontpath = _copy_font(tmp_path)
+    journal_path = str(tmp_path / "journal.jsonl")
+    request = WriteRequest(release=True)
+    with WriteJournal(journal_path) as journal:
+        journal.record(fontpath, request, "", file_digest(fontpath), "Version 1.010")
+    with open(journal_path, "a") as f:
+        f.write('{"path": "/interrupted/Fo')
+    journal = WriteJournal(journal_path)
+    assert journal.load() == 1
+    assert journal.is_done(fontpath, request) is True
+
+
+def test_journal_load_missing_file(tmp_path):
+    journal = WriteJournal(str(tmp_path / "missing.jsonl"))
+    assert journal.load() == 0
+    assert journal.entries == {}
@@ -7,12 +7,19 @@ import math
 import os
 import os.path
 import re
+import shutil
 
 import pytest
 
 from fontTools.ttLib import TTFont, TTLibError
 
-from fontv.libfv import FontVersion
+from fontv.libfv import (
+    FontVersion,
+    is_valid_version_number,
+    parse_version_number,
+    replace_version_number,
+)
+from fontv.utilities import NamedBytesIO
 
 # TEST FONT FILE CREATION
 # fv = FontVersion("testfiles/Hack-Regular.ttf")
@@ -278,6 +285,16 @@ def test_libfv_fontversion_obj_instantiation_with_ttfont_object(allfonts):
     assert fv1.is_development == fv2.is_development
 
 
+def test_libfv_fontversion_obj_instantiation_with_named_binary_stream(allfonts):
+    with open(allfonts, "rb") as f:
+        fontbytes = f.read()
+    fv1 = FontVersion(NamedBytesIO(fontbytes, allfonts))
+    fv2 = FontVersion(allfonts)
+    assert fv1.fontpath == allfonts
+    assert fv1.version_string_parts == fv2.version_string_parts
+    assert fv1.head_fontRevision == fv2.head_fontRevision
+
+
 def test_libfv_version_string_property_set_on_instantiation(allfonts):
     fv = FontVersion(allfonts)
     assert fv.version == "Version 1.010"
@@ -692,6 +709,25 @@ def test_libfv_get_version_number_string(allfonts):
     assert fv.get_version_number_string() == "1.010"
 
 
+def test_libfv_is_valid_version_number():
+    assert is_valid_version_number("1.010") is True
+    assert is_valid_version_number("12.5") is True
+    for version_number in ("nan", "inf", "1e3", "2", "1.0.0", "x.xxx", " 1.000"):
+        assert is_valid_version_number(version_number) is False
+
+
+def test_libfv_parse_version_number():
+    assert parse_version_number("Version 1.010;DEV") == "1.010"
+    assert parse_version_number("Version 2.5") == "2.5"
+    assert parse_version_number("Version x.xxx") == ""
+
+
+def test_libfv_replace_version_number():
+    assert replace_version_number("1.010;UKWN;Font-Regular", "1.010", "2.000") == "2.000;UKWN;Font-Regular"
+    # occurrences that are part of a longer number are not replaced
+    assert replace_version_number("11.010 1.0101", "1.010", "2.000") == "11.010 1.0101"
+
+
 def test_libfv_get_version_number_string_bad_version_number():
     fv = FontVersion("tests/testfiles/Test-VersionOnly.ttf")
 
@@ -1075,3 +1111,119 @@ def test_libfv_write_version_string_method_ttfont_object(allfonts):
     assert fv3.head_fontRevision == 3.000
 
     os.remove(temp_out_file_path)
+
+
+def test_libfv_close_method(allfonts):
+    fv = FontVersion(allfonts)
+    fontfile = fv.ttf.reader.file
+    fv.close()
+    assert fontfile.closed is True
+    assert fv.ttf is None
+    # version data remains available
+    assert fv.get_name_id5_version_string().startswith("Version 1.010")
+    fv.close()  # repeat calls are a no-op
+    with pytest.raises(ValueError):
+        fv.write_version_string()
+
+
+def test_libfv_context_manager(allfonts):
+    with FontVersion(allfonts) as fv:
+        fontfile = fv.ttf.reader.file
+        assert fontfile.closed is False
+    assert fontfile.closed is True
+
+
+def test_libfv_close_method_does_not_close_ttfont_object(allfonts):
+    ttf = TTFont(allfonts)
+    with FontVersion(ttf) as fv:
+        pass
+    assert fv.ttf is ttf
+    assert ttf.reader.file.closed is False
+    ttf.close()
+
+
+def _save_font_with_unique_id(fontpath, sourcepath, unique_id):
+    ttf = TTFont(sourcepath)
+    for record in ttf["name"].names:
+        if record.nameID == 3:
+            record.string = unique_id
+    ttf.save(fontpath)
+    ttf.close()
+
+
+def test_libfv_write_version_string_updated_fields(tmp_path):
+    fontpath = str(tmp_path / "Test.ttf")
+    _save_font_with_unique_id(
+        fontpath, os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), "1.010;UKWN;Hack"
+    )
+    with FontVersion(fontpath) as fv:
+        fv.set_version_number("2.000")
+        fv.write_version_string()
+        # related fields are not modified by default
+        assert fv.updated_fields == [
+            ("name ID 5 (3, 1, 1033)", "Version 1.010", "Version 2.000"),
+            ("head.fontRevision", "1.010", "2.000"),
+        ]
+        fv.write_version_string()
+        assert fv.updated_fields == []
+    ttf = TTFont(fontpath)
+    assert ttf["name"].getName(3, 3, 1, 1033).toUnicode() == "1.010;UKWN;Hack"
+    ttf.close()
+
+
+def test_libfv_write_version_string_same_version_number_updates_no_fields(tmp_path):
+    fontpath = str(tmp_path / "Test.otf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.otf"), fontpath)
+    with FontVersion(fontpath) as fv:
+        # the 16.16 fixed-point head.fontRevision of 1.010 is read as 1.0099945068359375
+        assert fv.ttf["head"].fontRevision != 1.010
+        fv.propagate_version = True
+        fv.set_version_number("1.010")
+        fv.write_version_string()
+        assert fv.updated_fields == []
+
+
+def test_libfv_write_version_string_propagate_version(tmp_path):
+    fontpath = str(tmp_path / "Test.otf")
+    _save_font_with_unique_id(
+        fontpath,
+        os.path.join("tests", "testfiles", "Test-VersionDEV.otf"),
+        "1.010;UKWN;Hack-Regular 11.010",
+    )
+    with FontVersion(fontpath) as fv:
+        fv.propagate_version = True
+        fv.set_version_number("2.000")
+        fv.write_version_string()
+        fields = [field for field, _, _ in fv.updated_fields]
+        assert fields == [
+            "name ID 5 (1, 0, 0)",
+            "name ID 5 (3, 1, 1033)",
+            "head.fontRevision",
+            "name ID 3 (1, 0, 0)",
+            "name ID 3 (3, 1, 1033)",
+            "CFF.topDict.version",
+        ]
+        assert fv.updated_fields[3][2] == "2.000;UKWN;Hack-Regular 11.010"
+    ttf = TTFont(fontpath)
+    assert ttf["name"].getName(3, 3, 1, 1033).toUnicode() == "2.000;UKWN;Hack-Regular 11.010"
+    assert ttf["CFF "].cff.topDictIndex[0].version == "2.000;DEV"
+    ttf.close()
+
+
+def test_libfv_write_version_string_propagate_version_without_number_change(tmp_path):
+    fontpath = str(tmp_path / "Test.otf")
+    _save_font_with_unique_id(
+        fontpath, os.path.join("tests", "testfiles", "Test-MismatchVersionNumbers.otf"), "1.010;UKWN"
+    )
+    with FontVersion(fontpath) as fv:
+        fv.propagate_version = True
+        fv.set_release_status()
+        fv.write_version_string()
+        assert [field for field, _, _ in fv.updated_fields] == [
+            "name ID 5 (1, 0, 0)",
+            "name ID 5 (3, 1, 1033)",
+        ]
+    ttf = TTFont(fontpath)
+    # the CFF version of this font is "1.010;DEV" and includes the unchanged version number
+    assert ttf["CFF "].cff.topDictIndex[0].version == "1.010;DEV"
+    ttf.close()
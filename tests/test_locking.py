@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from fontv.batch import WriteRequest
+from fontv.libfv import FontVersion
+from fontv.locking import (
+    LOCK_NOWAIT,
+    LOCK_WAIT,
+    FontLock,
+    FontLockedError,
+    acquire_font_locks,
+    release_font_locks,
+)
+from fontv.telemetry import (
+    add_counter_callback,
+    add_span_callback,
+    remove_counter_callback,
+    remove_span_callback,
+)
+from fontv.transaction import TransactionError, write_fonts_transactional
+
+fcntl = pytest.importorskip("fcntl")
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+@pytest.fixture
+def fontpath(tmp_path):
+    path = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), path)
+    return path
+
+
+def test_locking_lock_and_release(fontpath):
+    lock = FontLock(fontpath)
+    assert lock.is_locked is False
+    with lock:
+        assert lock.is_locked is True
+        # a second lock request (a separate open file description) fails while the lock is held
+        with pytest.raises(FontLockedError) as excinfo:
+            FontLock(fontpath, LOCK_NOWAIT).acquire()
+        assert excinfo.value.fontpath == fontpath
+    assert lock.is_locked is False
+    with FontLock(fontpath, LOCK_NOWAIT) as other:
+        assert other.is_locked is True
+
+
+def test_locking_invalid_mode_raises_valueerror(fontpath):
+    with pytest.raises(ValueError):
+        FontLock(fontpath, "bogus")
+
+
+def test_locking_missing_file_raises_ioerror(tmp_path):
+    with pytest.raises(IOError):
+        FontLock(str(tmp_path / "missing.ttf")).acquire()
+
+
+def test_locking_wait_reports_span_and_locked_counter(fontpath):
+    spans = []
+    counters = {}
+
+    def record_span(name, elapsed):
+        spans.append(name)
+
+    def record_counter(name, value):
+        counters[name] = counters.get(name, 0) + value
+
+    add_span_callback(record_span)
+    add_counter_callback(record_counter)
+    try:
+        with FontLock(fontpath):
+            with pytest.raises(FontLockedError):
+                FontLock(fontpath, LOCK_NOWAIT).acquire()
+    finally:
+        remove_span_callback(record_span)
+        remove_counter_callback(record_counter)
+    assert spans.count("lock.wait") == 2
+    assert counters == {"fonts_locked": 1}
+
+
+def test_locking_wait_locks_replaced_file(fontpath, tmp_path):
+    first = FontLock(fontpath)
+    first.acquire()
+    second = FontLock(fontpath, LOCK_WAIT)
+    thread = threading.Thread(target=second.acquire)
+    thread.start()
+    time.sleep(0.1)
+    # a rename replaces the locked file while the second writer waits for the lock
+    replacement = str(tmp_path / "replacement.ttf")
+    shutil.copy(fontpath, replacement)
+    os.replace(replacement, fontpath)
+    first.release()
+    thread.join(5)
+    assert second.is_locked is True
+    assert os.fstat(second._fd).st_ino == os.stat(fontpath).st_ino
+    assert second.wait_time > 0
+    second.release()
+
+
+def test_locking_acquire_font_locks_dedupes_links(fontpath, tmp_path):
+    link_path = str(tmp_path / "B.ttf")
+    os.link(fontpath, link_path)
+    other_path = str(tmp_path / "C.ttf")
+    shutil.copy(fontpath, other_path)
+    locks = acquire_font_locks([other_path, link_path, fontpath])
+    try:
+        assert len(locks) == 2
+        assert all(lock.is_locked for lock in locks)
+    finally:
+        release_font_locks(locks)
+    assert not any(lock.is_locked for lock in locks)
+
+
+def test_locking_acquire_font_locks_releases_on_failure(fontpath, tmp_path):
+    other_path = str(tmp_path / "C.ttf")
+    shutil.copy(fontpath, other_path)
+    with FontLock(other_path):
+        with pytest.raises(FontLockedError):
+            acquire_font_locks([fontpath, other_path], LOCK_NOWAIT)
+        # the lock of the first font was released
+        with FontLock(fontpath, LOCK_NOWAIT) as lock:
+            assert lock.is_locked is True
+
+
+def test_locking_fontversion_holds_lock_until_close(fontpath):
+    fv = FontVersion(fontpath, lock=LOCK_NOWAIT)
+    assert fv.lock.is_locked is True
+    with pytest.raises(FontLockedError):
+        FontVersion(fontpath, lock=LOCK_NOWAIT)
+    fv.set_version_number("2.000")
+    fv.write_version_string()
+    fv.close()
+    assert fv.lock.is_locked is False
+    with FontVersion(fontpath, lock=LOCK_NOWAIT) as fv:
+        assert fv.get_name_id5_version_string().startswith("Version 2.000")
+    assert FontVersion(fontpath).lock is None
+
+
+def test_locking_transaction_locked_font_fails(fontpath, tmp_path):
+    other_path = str(tmp_path / "C.ttf")
+    shutil.copy(fontpath, other_path)
+    write_request = WriteRequest(version_number="2.000")
+    with FontLock(other_path):
+        with pytest.raises(TransactionError) as excinfo:
+            write_fonts_transactional(
+                [fontpath, other_path], write_request, jobs=1, lock=LOCK_NOWAIT
+            )
+    assert excinfo.value.errors == [(other_path, "locked by another process")]
+    with FontVersion(fontpath) as fv:
+        assert fv.get_version_number_string() == "1.010"
+
+    staged_fonts = write_fonts_transactional(
+        [fontpath, other_path], write_request, jobs=1, lock=LOCK_NOWAIT
+    )
+    assert len(staged_fonts) == 2
+    with FontLock(fontpath, LOCK_NOWAIT) as lock:
+        assert lock.is_locked is True
@@ -1,5 +1,915 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import json
+import os
+import shutil
+import subprocess
 import sys
+import zipfile
+
 import pytest
+
+from fontTools.designspaceLib import DesignSpaceDocument, SourceDescriptor
+from git import Repo
+
+from fontv import app
+from fontv.app import main
+from fontv.libfv import FontVersion
+from fontv.locking import FontLock
+from fontv.ufo import read_fontinfo, write_fontinfo
+
+
+def _run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["font-v"] + list(args))
+    try:
+        main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def test_main_report_staged_reads_only_staged_fonts(tmp_path, monkeypatch, capsys):
+    testfiles_dir = os.path.abspath(os.path.join("tests", "testfiles"))
+    repo = Repo.init(str(tmp_path))
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), str(tmp_path / "A.ttf"))
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionDEV.ttf"), str(tmp_path / "B.ttf"))
+    repo.index.add(["A.ttf"])
+    monkeypatch.chdir(str(tmp_path))
+
+    assert _run_main(monkeypatch, "report", "--staged") == 0
+    out, _ = capsys.readouterr()
+    assert "A.ttf:" in out
+    assert "Version 1.010" in out
+    assert "B.ttf" not in out
+
+
+def test_main_report_changed_since_bad_revision_fails(tmp_path, monkeypatch, capsys):
+    Repo.init(str(tmp_path))
+    monkeypatch.chdir(str(tmp_path))
+
+    assert _run_main(monkeypatch, "report", "--changed-since=bogus-rev") == 1
+    _, err = capsys.readouterr()
+    assert "[font-v] ERROR" in err
+
+
+def test_main_report_archive(tmp_path, monkeypatch, capsys):
+    zip_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(zip_path, "w") as zout:
+        zout.write(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), "A.ttf")
+        zout.write(os.path.join("tests", "testfiles", "Test-VersionREL.otf"), "B.otf")
+
+    assert _run_main(monkeypatch, "report", zip_path) == 0
+    out, _ = capsys.readouterr()
+    assert zip_path + "!A.ttf:" in out
+    assert "Version 1.010;RELEASE" in out
+
+    assert _run_main(monkeypatch, "report", zip_path + "!Bogus.ttf") == 1
+
+
+def test_main_write_archive(tmp_path, monkeypatch, capsys):
+    zip_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(zip_path, "w") as zout:
+        zout.write(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), "A.ttf")
+        zout.write(os.path.join("tests", "testfiles", "Test-VersionREL.otf"), "B.otf")
+
+    assert _run_main(monkeypatch, "write", "--ver=2.000", "--dev", zip_path + "!A.ttf") == 0
+    capsys.readouterr()
+    assert _run_main(monkeypatch, "report", zip_path) == 0
+    out, _ = capsys.readouterr()
+    assert "Version 2.000;DEV" in out
+    assert "Version 1.010;RELEASE" in out
+
+    assert _run_main(monkeypatch, "write", "--rel", zip_path + "!Bogus.ttf") == 1
+
+
+def test_main_write_dedupe_fans_out_identical_fonts(tmp_path, monkeypatch, capsys):
+    paths = []
+    for name in ("A.ttf", "B.ttf", "C.ttf"):
+        paths.append(str(tmp_path / name))
+        shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), paths[-1])
+    paths.append(str(tmp_path / "D.ttf"))
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionREL.ttf"), paths[-1])
+
+    assert _run_main(monkeypatch, "write", "--dedupe", "--link=hardlink", "--dev", *paths) == 0
+    out, _ = capsys.readouterr()
+    assert "4 files, 2 unique, 2 parses avoided" in out
+    assert os.stat(paths[0]).st_ino == os.stat(paths[2]).st_ino
+
+    assert _run_main(monkeypatch, "report", "--dedupe", *paths) == 0
+    out, _ = capsys.readouterr()
+    assert out.count("Version 1.010;DEV") == 4
+    assert "4 files, 1 unique, 3 parses avoided" in out
+
+
+def test_main_write_dedupe_fan_out_error_continues(tmp_path, monkeypatch, capsys):
+    paths = []
+    for name in ("A.ttf", "B.ttf", "C.ttf"):
+        paths.append(str(tmp_path / name))
+        shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), paths[-1])
+    fan_out = app.fan_out
+
+    def failing_fan_out(source_path, target_path, mode="copy"):
+        if target_path == paths[1]:
+            raise OSError(18, "Invalid cross-device link")
+        fan_out(source_path, target_path, mode)
+
+    monkeypatch.setattr(app, "fan_out", failing_fan_out)
+    assert _run_main(monkeypatch, "write", "--dedupe", "--ver=2.500", *paths) == 1
+    out, err = capsys.readouterr()
+    assert paths[1] + ": OSError: [Errno 18] Invalid cross-device link" in err
+    assert "1 of 3 fonts failed." in err
+    assert "[✓] " + paths[1] not in out
+    for fontpath, version_string in zip(
+        paths, ("Version 2.500", "Version 1.010", "Version 2.500")
+    ):
+        with FontVersion(fontpath) as fv:
+            assert fv.get_name_id5_version_string() == version_string
+
+
+def test_main_write_dedupe_fan_out_error_keep_going(tmp_path, monkeypatch, capsys):
+    paths = []
+    for name in ("A.ttf", "B.ttf", "C.ttf"):
+        paths.append(str(tmp_path / name))
+        shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), paths[-1])
+    fan_out = app.fan_out
+
+    def failing_fan_out(source_path, target_path, mode="copy"):
+        if target_path == paths[1]:
+            raise ValueError("bad target")
+        fan_out(source_path, target_path, mode)
+
+    monkeypatch.setattr(app, "fan_out", failing_fan_out)
+    with pytest.raises(ValueError):
+        _run_main(monkeypatch, "write", "--dedupe", "--ver=2.500", *paths)
+    capsys.readouterr()
+
+    for fontpath in paths:
+        shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    assert _run_main(monkeypatch, "write", "--dedupe", "--keep-going", "--ver=3.000", *paths) == 1
+    _, err = capsys.readouterr()
+    assert paths[1] + ": ValueError: bad target" in err
+    assert "1 of 3 fonts failed." in err
+    with FontVersion(paths[2]) as fv:
+        assert fv.get_name_id5_version_string() == "Version 3.000"
+
+
+def test_main_write_dedupe_copy_preserves_file_mode(tmp_path, monkeypatch, capsys):
+    paths = []
+    for name in ("A.ttf", "B.ttf"):
+        paths.append(str(tmp_path / name))
+        shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), paths[-1])
+        os.chmod(paths[-1], 0o644)
+
+    assert _run_main(monkeypatch, "write", "--dedupe", "--ver=2.500", *paths) == 0
+    capsys.readouterr()
+    for fontpath in paths:
+        assert os.stat(fontpath).st_mode & 0o777 == 0o644
+
+
+def test_main_write_bad_link_mode_fails(monkeypatch, capsys):
+    assert _run_main(
+        monkeypatch, "write", "--dedupe", "--link=symlink", "--dev", "tests/testfiles/Test-VersionOnly.ttf"
+    ) == 1
+
+
+def test_main_apply_manifest(tmp_path, monkeypatch, capsys):
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), str(tmp_path / "A.ttf"))
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.otf"), str(tmp_path / "B.otf"))
+    manifest_path = str(tmp_path / "manifest.csv")
+    with open(manifest_path, "w") as f:
+        f.write("path,version,status\nA.ttf,3.000,rel\nB.otf,4.000,\n")
+
+    assert _run_main(monkeypatch, "apply", manifest_path, "--jobs=1") == 0
+    out, _ = capsys.readouterr()
+    assert "Version 3.000;RELEASE" in out
+    assert "Version 4.000" in out
+
+
+def test_main_apply_skip_locked(tmp_path, monkeypatch, capsys):
+    locked_path = str(tmp_path / "A.ttf")
+    fontpath = str(tmp_path / "B.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), locked_path)
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    manifest_path = str(tmp_path / "manifest.csv")
+    with open(manifest_path, "w") as f:
+        f.write("path,version,status\nA.ttf,3.000,rel\nB.ttf,3.000,rel\n")
+    metrics_path = str(tmp_path / "metrics.json")
+
+    # another process holds the lock of A.ttf until its standard input is closed
+    holder = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import fcntl, sys; f = open(sys.argv[1], 'rb'); fcntl.flock(f, fcntl.LOCK_EX); "
+            "print('locked', flush=True); sys.stdin.read()",
+            locked_path,
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        assert holder.stdout.readline().strip() == b"locked"
+        assert (
+            _run_main(
+                monkeypatch,
+                "apply",
+                manifest_path,
+                "--jobs=2",
+                "--skip-locked",
+                "--metrics=" + metrics_path,
+            )
+            == 1
+        )
+    finally:
+        holder.communicate()
+    out, _ = capsys.readouterr()
+    assert "[X] " + locked_path + ": skipped: locked by another process" in out
+    with open(metrics_path) as f:
+        assert json.load(f)["counters"]["fonts_locked"] == 1
+    with FontVersion(locked_path) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010"
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 3.000;RELEASE"
+
+
+def test_main_apply_options_before_manifest_path(tmp_path, monkeypatch, capsys):
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), str(tmp_path / "A.ttf"))
+    manifest_path = str(tmp_path / "manifest.csv")
+    with open(manifest_path, "w") as f:
+        f.write("path,version,status\nA.ttf,3.000,rel\n")
+
+    assert _run_main(monkeypatch, "apply", "--jobs=1", manifest_path) == 0
+    out, _ = capsys.readouterr()
+    assert "Version 3.000;RELEASE" in out
+
+    assert _run_main(monkeypatch, "apply", "--jobs=1") == 1
+    _, err = capsys.readouterr()
+    assert "Command is missing necessary arguments" in err
+
+
+def test_main_apply_invalid_manifest_writes_nothing(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    with open(fontpath, "rb") as f:
+        pre_bytes = f.read()
+    manifest_path = str(tmp_path / "manifest.csv")
+    with open(manifest_path, "w") as f:
+        f.write("path,version,status\nA.ttf,3.000,rel\nMissing.ttf,4.000,\n")
+
+    assert _run_main(monkeypatch, "apply", manifest_path) == 1
+    _, err = capsys.readouterr()
+    assert "Missing.ttf" in err
+    with open(fontpath, "rb") as f:
+        assert f.read() == pre_bytes
+
+
+def test_main_write_transaction_failure(tmp_path, monkeypatch, capsys):
+    goodpath = str(tmp_path / "A.ttf")
+    badpath = str(tmp_path / "B.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), goodpath)
+    with open(goodpath, "rb") as f:
+        pre_bytes = f.read()
+    # a truncated font passes the magic byte test and fails in the transaction
+    with open(badpath, "wb") as f:
+        f.write(pre_bytes[:100])
+
+    assert _run_main(monkeypatch, "write", "--transaction", "--jobs=1", "--dev", goodpath, badpath) == 1
+    _, err = capsys.readouterr()
+    assert "No fonts were modified" in err
+    with open(goodpath, "rb") as f:
+        assert f.read() == pre_bytes
+
+    os.remove(badpath)
+    assert _run_main(monkeypatch, "write", "--transaction", "--dev", goodpath) == 0
+    out, _ = capsys.readouterr()
+    assert "Version 1.010;DEV" in out
+
+
+def test_main_report_prefetch(monkeypatch, capsys):
+    fontpaths = [
+        os.path.join("tests", "testfiles", name)
+        for name in ("Test-VersionOnly.ttf", "Test-VersionDEV.otf", "Test-VersionREL.ttf")
+    ]
+    assert _run_main(monkeypatch, "report", "--dev", *fontpaths) == 0
+    expected, _ = capsys.readouterr()
+    assert _run_main(monkeypatch, "report", "--dev", "--prefetch=2", *fontpaths) == 0
+    out, _ = capsys.readouterr()
+    assert out == expected
+
+
+def test_main_report_prefetch_invalid_depth(monkeypatch, capsys):
+    fontpath = os.path.join("tests", "testfiles", "Test-VersionOnly.ttf")
+    assert _run_main(monkeypatch, "report", "--prefetch=0", fontpath) == 1
+    _, err = capsys.readouterr()
+    assert "--prefetch must be defined as a positive integer" in err
+
+
+def test_main_report_detects_fonts_by_magic_bytes(tmp_path, monkeypatch, capsys):
+    shutil.copy(
+        os.path.join("tests", "testfiles", "Test-VersionDEV.ttf"), str(tmp_path / "Font")
+    )
+    shutil.copy(
+        os.path.join("tests", "testfiles", "HACK_LICENSE.md"), str(tmp_path / "LICENSE")
+    )
+    assert _run_main(monkeypatch, "report", str(tmp_path / "Font")) == 0
+    out, _ = capsys.readouterr()
+    assert "Font:" in out
+    assert "Version 1.010;DEV" in out
+
+
+def test_main_report_and_write_reject_named_non_font_file(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "Font")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionDEV.ttf"), fontpath)
+    licensepath = str(tmp_path / "LICENSE")
+    shutil.copy(os.path.join("tests", "testfiles", "HACK_LICENSE.md"), licensepath)
+    assert _run_main(monkeypatch, "report", fontpath, licensepath) == 1
+    out, err = capsys.readouterr()
+    assert "Version 1.010;DEV" in out
+    assert "[font-v] ERROR: " + licensepath + " does not appear to be a valid font file" in err
+    assert _run_main(monkeypatch, "write", "--rel", licensepath) == 1
+    _, err = capsys.readouterr()
+    assert licensepath + " does not appear to be a valid font file" in err
+
+    assert _run_main(monkeypatch, "report", "--keep-going", licensepath, fontpath) == 1
+    out, err = capsys.readouterr()
+    assert "Version 1.010;DEV" in out
+    assert "[font-v] ERROR: " + licensepath + ": not a font file" in err
+    assert "1 of 2 fonts failed." in err
+
+
+def test_main_report_corrupt_font_error(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "Corrupt")
+    with open(os.path.join("tests", "testfiles", "Test-VersionDEV.ttf"), "rb") as f:
+        data = f.read(100)
+    with open(fontpath, "wb") as f:
+        f.write(data)
+    assert _run_main(monkeypatch, "report", fontpath) == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert "[font-v] ERROR: " + fontpath + " does not appear to be a valid font file: " in err
+    assert "unexpected end of table directory" in err
+
+
+def test_main_report_font_collection(tmp_path, monkeypatch, capsys):
+    from fontTools.ttLib import TTCollection, TTFont
+
+    fontpath = str(tmp_path / "Family.ttc")
+    collection = TTCollection()
+    collection.fonts = [
+        TTFont(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf")),
+        TTFont(os.path.join("tests", "testfiles", "Test-VersionREL.ttf")),
+    ]
+    collection.save(fontpath)
+    collection.close()
+    assert _run_main(monkeypatch, "report", "--prefetch=2", fontpath) == 0
+    out, _ = capsys.readouterr()
+    assert fontpath + "#0:" in out
+    assert fontpath + "#1:" in out
+    assert "Version 1.010;RELEASE" in out
+
+    assert _run_main(monkeypatch, "write", "--rel", fontpath) == 1
+    _, err = capsys.readouterr()
+    assert "Font collections are not supported" in err
+
+
+def test_main_report_and_write_reject_non_font_with_font_extension(
+    tmp_path, monkeypatch, capsys
+):
+    fontpath = str(tmp_path / "Bogus.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "HACK_LICENSE.md"), fontpath)
+    assert _run_main(monkeypatch, "report", fontpath) == 1
+    _, err = capsys.readouterr()
+    assert "does not appear to be a valid font file" in err
+    assert _run_main(monkeypatch, "write", "--rel", fontpath) == 1
+    _, err = capsys.readouterr()
+    assert "does not appear to be a valid font file" in err
+
+
+def test_main_write_font_without_extension(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "Font")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    assert _run_main(monkeypatch, "write", "--dev", fontpath) == 0
+    out, _ = capsys.readouterr()
+    assert "Version 1.010;DEV" in out
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010;DEV"
+
+
+def _save_font_without_nameid5(fontpath):
+    from fontTools.ttLib import TTFont
+
+    ttf = TTFont(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"))
+    ttf["name"].names = [record for record in ttf["name"].names if record.nameID != 5]
+    ttf.save(fontpath)
+    ttf.close()
+
+
+def test_main_report_keep_going(tmp_path, monkeypatch, capsys):
+    goodpath = os.path.join("tests", "testfiles", "Test-VersionDEV.ttf")
+    nonamepath = str(tmp_path / "NoName.ttf")
+    _save_font_without_nameid5(nonamepath)
+    missingpath = str(tmp_path / "Missing.ttf")
+    truncatedpath = str(tmp_path / "Truncated.otf")
+    with open(os.path.join("tests", "testfiles", "Test-VersionOnly.otf"), "rb") as f:
+        with open(truncatedpath, "wb") as g:
+            g.write(f.read()[:200])
+
+    args = ["report", "--keep-going", nonamepath, missingpath, truncatedpath, goodpath]
+    assert _run_main(monkeypatch, *args) == 1
+    out, err = capsys.readouterr()
+    assert "Version 1.010;DEV" in out
+    assert nonamepath + ": IndexError" in err
+    assert missingpath + ": file not found" in err
+    assert truncatedpath + ": " in err
+    assert "3 of 4 fonts failed." in err
+
+    # without --keep-going the first error stops the run
+    with pytest.raises(IndexError):
+        _run_main(monkeypatch, "report", nonamepath, goodpath)
+    out, _ = capsys.readouterr()
+    assert "Version 1.010;DEV" not in out
+
+
+def test_main_write_keep_going(tmp_path, monkeypatch, capsys):
+    goodpath = str(tmp_path / "Good.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), goodpath)
+    nonamepath = str(tmp_path / "NoName.ttf")
+    _save_font_without_nameid5(nonamepath)
+    missingpath = str(tmp_path / "Missing.ttf")
+
+    args = ["write", "--keep-going", "--dev", nonamepath, missingpath, goodpath]
+    assert _run_main(monkeypatch, *args) == 1
+    out, err = capsys.readouterr()
+    assert goodpath + " version string was successfully changed" in out
+    assert nonamepath + ": IndexError" in err
+    assert missingpath + ": file not found" in err
+    assert "2 of 3 fonts failed." in err
+    with FontVersion(goodpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010;DEV"
+
+
+def test_main_write_keep_going_all_fonts_succeed(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "Good.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    assert _run_main(monkeypatch, "write", "--keep-going", "--rel", fontpath) == 0
+    _, err = capsys.readouterr()
+    assert err == ""
+
+
+def test_main_write_keep_going_transaction_conflict(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "Good.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    assert _run_main(monkeypatch, "write", "--keep-going", "--transaction", "--rel", fontpath) == 1
+    _, err = capsys.readouterr()
+    assert "either --transaction or --keep-going" in err
+
+
+def test_main_write_keep_going_archive_missing_member(tmp_path, monkeypatch, capsys):
+    archive_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(archive_path, "w") as z:
+        z.write(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), "A.ttf")
+    with open(archive_path, "rb") as f:
+        pre_bytes = f.read()
+    assert _run_main(monkeypatch, "write", "--keep-going", "--rel", archive_path + "!B.ttf") == 1
+    _, err = capsys.readouterr()
+    assert archive_path + ": archive member(s) not found: B.ttf" in err
+    with open(archive_path, "rb") as f:
+        assert f.read() == pre_bytes
+
+
+def test_main_write_journal_resume(tmp_path, monkeypatch, capsys):
+    fontpaths = []
+    for name in ("A.ttf", "B.ttf", "C.ttf"):
+        fontpath = str(tmp_path / name)
+        shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+        fontpaths.append(fontpath)
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    # an interrupted run that wrote A.ttf
+    assert _run_main(monkeypatch, "write", "--dev", "--journal=" + journal_path, fontpaths[0]) == 0
+    capsys.readouterr()
+    with open(fontpaths[0], "rb") as f:
+        written_bytes = f.read()
+
+    assert (
+        _run_main(monkeypatch, "write", "--dev", "--journal=" + journal_path, "--resume", *fontpaths)
+        == 0
+    )
+    out, _ = capsys.readouterr()
+    assert "1 of 3 fonts were already written" in out
+    assert fontpaths[0] + " version string" not in out
+    assert fontpaths[1] + " version string" in out
+    assert fontpaths[2] + " version string" in out
+    with open(fontpaths[0], "rb") as f:
+        assert f.read() == written_bytes
+    with open(journal_path) as f:
+        assert len(f.read().splitlines()) == 3
+
+    # a different request writes every font
+    assert (
+        _run_main(monkeypatch, "write", "--rel", "--journal=" + journal_path, "--resume", *fontpaths)
+        == 0
+    )
+    out, _ = capsys.readouterr()
+    assert "0 of 3 fonts were already written" in out
+
+
+def test_main_write_journal_resume_sha1_new_commit(tmp_path, monkeypatch, capsys):
+    repo = Repo.init(str(tmp_path))
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    repo.index.add(["A.ttf"])
+    repo.index.commit("add font")
+    journal_path = str(tmp_path / "journal.jsonl")
+    args = ("write", "--sha1", "--dev", "--journal=" + journal_path, "--resume", fontpath)
+
+    assert _run_main(monkeypatch, *args) == 0
+    assert _run_main(monkeypatch, *args) == 0
+    out, _ = capsys.readouterr()
+    assert "1 of 1 fonts were already written" in out
+
+    # a new commit changes the git commit SHA1 state and the font is written again
+    with open(str(tmp_path / "README.md"), "w") as f:
+        f.write("notes")
+    repo.index.add(["README.md"])
+    repo.index.commit("add notes")
+    assert _run_main(monkeypatch, *args) == 0
+    out, _ = capsys.readouterr()
+    assert "0 of 1 fonts were already written" in out
+    with FontVersion(fontpath) as fv:
+        assert repo.head.commit.hexsha.startswith(fv.state)
+
+
+def test_main_write_journal_skips_verification_failures(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    journal_path = str(tmp_path / "journal.jsonl")
+    monkeypatch.setattr(
+        "fontv.app.verify_font_version", lambda *args: ["nameID 5 mismatch"]
+    )
+    digests = []
+    monkeypatch.setattr("fontv.app.file_digest", lambda path: digests.append(path) or "0" * 64)
+
+    assert (
+        _run_main(monkeypatch, "write", "--verify", "--dev", "--journal=" + journal_path, fontpath)
+        == 1
+    )
+    _, err = capsys.readouterr()
+    assert "verification failed: nameID 5 mismatch" in err
+    # the input digest is computed before the write, no output digest is computed and no entry is journaled
+    assert digests == [fontpath]
+    assert not os.path.exists(journal_path)
+
+
+def test_main_write_invalid_version_number_fails(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    for version in ("nan", "inf", "1e3"):
+        assert _run_main(monkeypatch, "write", "--ver=" + version, fontpath) == 1
+        _, err = capsys.readouterr()
+        assert "--ver=" + version + " is not a valid version number" in err
+    assert _run_main(monkeypatch, "write", "--ver=2-500", fontpath) == 0
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 2.500"
+
+
+def test_main_write_resume_requires_journal(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    assert _run_main(monkeypatch, "write", "--dev", "--resume", fontpath) == 1
+    _, err = capsys.readouterr()
+    assert "--resume requires a --journal=[path] definition" in err
+
+
+def test_main_write_snapshot_and_revert(tmp_path, monkeypatch, capsys):
+    fontpaths = []
+    for name in ("Test-VersionSha.ttf", "Test-VersionOnly.otf"):
+        fontpath = str(tmp_path / name)
+        shutil.copy(os.path.join("tests", "testfiles", name), fontpath)
+        fontpaths.append(fontpath)
+    with open(fontpaths[0], "rb") as f:
+        pre_bytes = f.read()
+    snapshot_path = str(tmp_path / "snapshot.jsonl")
+
+    assert _run_main(monkeypatch, "write", "--dev", "--snapshot=" + snapshot_path, *fontpaths) == 0
+    capsys.readouterr()
+
+    # options are accepted before the snapshot path
+    assert _run_main(monkeypatch, "revert", "--jobs=1", snapshot_path) == 0
+    out, _ = capsys.readouterr()
+    assert out.count("name and head tables were restored") == 2
+    with open(fontpaths[0], "rb") as f:
+        assert f.read() == pre_bytes
+    for fontpath in fontpaths:
+        with FontVersion(fontpath) as fv:
+            assert fv.get_name_id5_version_string() in ("Version 1.010;[abcd123]", "Version 1.010")
+
+    # the fonts no longer match the snapshot output digests
+    assert _run_main(monkeypatch, "revert", snapshot_path, "--jobs=1") == 1
+    _, err = capsys.readouterr()
+    assert "modified after the snapshot write" in err
+
+
+def test_main_revert_missing_snapshot(tmp_path, monkeypatch, capsys):
+    assert _run_main(monkeypatch, "revert", str(tmp_path / "missing.jsonl")) == 1
+    _, err = capsys.readouterr()
+    assert "does not appear to be a valid snapshot file path" in err
+
+
+def test_main_write_verify(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    archive_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(archive_path, "w") as z:
+        z.write(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), "B.ttf")
+
+    assert _run_main(monkeypatch, "write", "--verify", "--rel", fontpath, archive_path + "!B.ttf") == 0
+    out, err = capsys.readouterr()
+    assert fontpath + " version string was successfully changed" in out
+    assert archive_path + "!B.ttf version string was successfully changed" in out
+    assert err == ""
+
+
+def test_main_write_verify_failure(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    archive_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(archive_path, "w") as z:
+        z.write(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), "B.ttf")
+    with open(archive_path, "rb") as f:
+        pre_bytes = f.read()
+    monkeypatch.setattr(
+        "fontv.app.verify_font_version",
+        lambda font, version_string, head_fontRevision: ["head table checksum mismatch"],
+    )
+
+    assert _run_main(monkeypatch, "write", "--verify", "--rel", fontpath, archive_path + "!B.ttf") == 1
+    out, err = capsys.readouterr()
+    assert "successfully changed" not in out
+    assert fontpath + ": verification failed: head table checksum mismatch" in err
+    assert archive_path + "!B.ttf: verification failed: head table checksum mismatch" in err
+    assert "2 of 2 fonts failed." in err
+    # an archive with a font that fails verification is not modified
+    with open(archive_path, "rb") as f:
+        assert f.read() == pre_bytes
+
+
+def test_main_check_directory(tmp_path, monkeypatch, capsys):
+    for name in ("Test-VersionREL.ttf", "Test-VersionREL.otf"):
+        shutil.copy(os.path.join("tests", "testfiles", name), str(tmp_path / name))
+    assert _run_main(monkeypatch, "check", "--jobs=1", str(tmp_path)) == 0
+    out, _ = capsys.readouterr()
+    assert "[font-v] check: 2 fonts in 1 family, 0 issues" in out
+
+
+def test_main_check_json_issues_exit_status(monkeypatch, capsys):
+    fontpath = os.path.join("tests", "testfiles", "Test-MismatchVersionNumbers.otf")
+    assert _run_main(monkeypatch, "check", "--json", "--jobs=1", fontpath) == 1
+    out, _ = capsys.readouterr()
+    data = json.loads(out)
+    assert data["issue_count"] == 1
+    assert data["issues"][0]["kind"] == "head-name-mismatch"
+
+
+def test_main_check_missing_path(tmp_path, monkeypatch, capsys):
+    assert _run_main(monkeypatch, "check", str(tmp_path / "missing")) == 1
+    _, err = capsys.readouterr()
+    assert "does not appear to be a valid font file or directory path" in err
+
+
+def test_main_diff_ndjson(tmp_path, monkeypatch, capsys):
+    old_root = tmp_path / "old"
+    new_root = tmp_path / "new"
+    os.makedirs(str(old_root))
+    os.makedirs(str(new_root))
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), str(old_root / "A.ttf"))
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionREL.ttf"), str(new_root / "A.ttf"))
+
+    assert _run_main(monkeypatch, "diff", "--ndjson", str(old_root), str(new_root)) == 0
+    out, _ = capsys.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 1
+    data = json.loads(lines[0])
+    assert data["change"] == "changed"
+    assert data["old_version_string"] == "Version 1.010"
+    assert data["new_version_string"] == "Version 1.010;RELEASE"
+    assert data["version_delta"] == [0, 0, 0, 0]
+
+
+def test_main_diff_missing_directory(tmp_path, monkeypatch, capsys):
+    assert _run_main(monkeypatch, "diff", str(tmp_path), str(tmp_path / "missing")) == 1
+    _, err = capsys.readouterr()
+    assert "does not appear to be a valid directory path" in err
+
+
+def test_main_watch(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+
+    def iter_changes(watcher):
+        with FontVersion(fontpath) as fv:
+            fv.set_development_status()
+            fv.write_version_string()
+        yield watcher.update([fontpath])
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("fontv.app.FontWatcher.iter_changes", iter_changes)
+    assert _run_main(monkeypatch, "watch", "--poll=50", str(tmp_path)) == 0
+    out, _ = capsys.readouterr()
+    assert "[+] " + fontpath + ": Version 1.010" in out
+    assert "[font-v] watching 1 fonts in " + str(tmp_path) + " (poll)" in out
+    assert "[~] " + fontpath + ": Version 1.010 → Version 1.010;DEV" in out
+
+
+def test_main_write_propagate(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.otf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.otf"), fontpath)
+
+    assert _run_main(monkeypatch, "write", "--propagate", "--ver=2.000", fontpath) == 0
+    out, _ = capsys.readouterr()
+    assert "    name ID 5 (3, 1, 1033): 'Version 1.010' → 'Version 2.000'" in out
+    assert "    head.fontRevision: '1.010' → '2.000'" in out
+    assert "    CFF.topDict.version: '1.010' → '2.000'" in out
+
+
+def test_main_write_propagate_same_version(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.otf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.otf"), fontpath)
+
+    assert _run_main(monkeypatch, "write", "--propagate", "--ver=1.010", fontpath) == 0
+    out, _ = capsys.readouterr()
+    assert "head.fontRevision" not in out
+    assert "→" not in out
+
+
+def _make_ufo(dirpath, name, version_major, version_minor):
+    ufo_path = os.path.join(str(dirpath), name)
+    os.mkdir(ufo_path)
+    write_fontinfo(
+        ufo_path,
+        {
+            "familyName": "Example",
+            "versionMajor": version_major,
+            "versionMinor": version_minor,
+        },
+    )
+    return ufo_path
+
+
+def test_main_report_ufo(tmp_path, monkeypatch, capsys):
+    ufo_path = _make_ufo(tmp_path, "A.ufo", 1, 10)
+    assert _run_main(monkeypatch, "report", ufo_path) == 0
+    out, _ = capsys.readouterr()
+    assert ufo_path + ":" in out
+    assert "Version 1.010" in out
+    assert "1.010" in out
+
+
+def test_main_write_designspace_sources(tmp_path, monkeypatch, capsys):
+    regular = _make_ufo(tmp_path, "Example-Regular.ufo", 1, 0)
+    bold = _make_ufo(tmp_path, "Example-Bold.ufo", 1, 0)
+    document = DesignSpaceDocument()
+    document.addAxisDescriptor(name="weight", tag="wght", minimum=400, default=400, maximum=700)
+    for index, filename in enumerate(["Example-Regular.ufo", "Example-Bold.ufo"]):
+        source = SourceDescriptor()
+        source.filename = filename
+        source.location = {"weight": 400 + 300 * index}
+        document.addSource(source)
+    designspace_path = str(tmp_path / "Example.designspace")
+    document.write(designspace_path)
+
+    assert (
+        _run_main(monkeypatch, "write", "--verify", "--ver=2.000", "--rel", designspace_path)
+        == 0
+    )
+    out, _ = capsys.readouterr()
+    for ufo_path in (regular, bold):
+        assert "[✓] " + ufo_path + " version string was successfully changed to:" in out
+        fontinfo = read_fontinfo(ufo_path)
+        assert fontinfo["versionMajor"] == 2
+        assert fontinfo["versionMinor"] == 0
+        assert fontinfo["openTypeNameVersion"] == "Version 2.000;RELEASE"
+
+
+def test_main_write_ufo_missing_path(tmp_path, monkeypatch, capsys):
+    missing_path = str(tmp_path / "Missing.ufo")
+    assert _run_main(monkeypatch, "write", "--ver=2.000", missing_path) == 1
+    _, err = capsys.readouterr()
+    assert "does not appear to be a valid UFO or designspace path" in err
+
+    assert _run_main(monkeypatch, "write", "--keep-going", "--ver=2.000", missing_path) == 1
+    _, err = capsys.readouterr()
+    assert missing_path + ": file not found" in err
+
+
+def test_main_write_ufo_transaction_rejected(tmp_path, monkeypatch, capsys):
+    ufo_path = _make_ufo(tmp_path, "A.ufo", 1, 0)
+    assert _run_main(monkeypatch, "write", "--transaction", "--ver=2.000", ufo_path) == 1
+    _, err = capsys.readouterr()
+    assert "--transaction does not support UFO sources" in err
+    assert read_fontinfo(ufo_path)["versionMajor"] == 1
+
+
+def test_main_write_archive_transaction_rejected(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    zip_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(zip_path, "w") as zout:
+        zout.write(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), "B.ttf")
+    with open(zip_path, "rb") as f:
+        pre_bytes = f.read()
+
+    assert (
+        _run_main(monkeypatch, "write", "--transaction", "--ver=2.000", fontpath, zip_path) == 1
+    )
+    _, err = capsys.readouterr()
+    assert "--transaction does not support archive fonts" in err
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010"
+    with open(zip_path, "rb") as f:
+        assert f.read() == pre_bytes
+
+
+def test_main_write_output_dir(tmp_path, monkeypatch, capsys):
+    input_dir = tmp_path / "fonts"
+    os.makedirs(str(input_dir / "static"))
+    shutil.copy(
+        os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), str(input_dir / "A.ttf")
+    )
+    shutil.copy(
+        os.path.join("tests", "testfiles", "Test-VersionOnly.otf"),
+        str(input_dir / "static" / "B.otf"),
+    )
+    output_dir = str(tmp_path / "dist")
+
+    assert (
+        _run_main(
+            monkeypatch,
+            "write",
+            "--verify",
+            "--ver=2.000",
+            "--output-dir=" + output_dir,
+            str(input_dir),
+        )
+        == 0
+    )
+    out, _ = capsys.readouterr()
+    for relpath in ("A.ttf", os.path.join("static", "B.otf")):
+        output_path = os.path.join(output_dir, relpath)
+        assert "[✓] " + output_path + " version string was successfully changed to:" in out
+        with FontVersion(output_path) as fv:
+            assert fv.get_name_id5_version_string() == "Version 2.000"
+        with FontVersion(str(input_dir / relpath)) as fv:
+            assert fv.get_name_id5_version_string() == "Version 1.010"
+
+
+def test_main_write_output_dir_rejects_input_directory(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "A.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+    assert (
+        _run_main(monkeypatch, "write", "--ver=2.000", "--output-dir=" + str(tmp_path), fontpath)
+        == 1
+    )
+    _, err = capsys.readouterr()
+    assert "--output-dir must be a directory other than the input directory" in err
+
+    assert (
+        _run_main(
+            monkeypatch,
+            "write",
+            "--ver=2.000",
+            "--transaction",
+            "--output-dir=" + str(tmp_path / "dist"),
+            fontpath,
+        )
+        == 1
+    )
+    _, err = capsys.readouterr()
+    assert "--output-dir cannot be used with --transaction." in err
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010"
+
+
+def test_main_write_skip_locked(tmp_path, monkeypatch, capsys):
+    locked_path = str(tmp_path / "A.ttf")
+    fontpath = str(tmp_path / "B.ttf")
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), locked_path)
+    shutil.copy(os.path.join("tests", "testfiles", "Test-VersionOnly.ttf"), fontpath)
+
+    # the lock of another writer
+    with FontLock(locked_path):
+        assert (
+            _run_main(
+                monkeypatch, "write", "--skip-locked", "--ver=2.000", locked_path, fontpath
+            )
+            == 1
+        )
+    out, err = capsys.readouterr()
+    assert "[✓] " + fontpath + " version string was successfully changed to:" in out
+    assert locked_path + ": skipped: locked by another process" in err
+    assert "1 of 2 fonts failed." in err
+    with FontVersion(locked_path) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010"
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 2.000"
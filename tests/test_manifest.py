@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+
+import pytest
+
+from git import Repo
+
+from fontv.libfv import FontVersion
+from fontv.manifest import (
+    ManifestError,
+    apply_manifest,
+    format_results_table,
+    get_manifest_git_sha1_cache,
+    read_manifest,
+    resolve_manifest,
+)
+
+testfiles_dir = os.path.abspath(os.path.join("tests", "testfiles"))
+
+
+@pytest.fixture
+def fonttree(tmp_path):
+    for family in ("Sans", "Serif"):
+        os.mkdir(str(tmp_path / family))
+        for style in ("Regular", "Bold"):
+            shutil.copy(
+                os.path.join(testfiles_dir, "Test-VersionMeta.ttf"),
+                str(tmp_path / family / (family + "-" + style + ".ttf")),
+            )
+    return tmp_path
+
+
+def _write_json_manifest(dirpath, entries):
+    manifest_path = str(dirpath / "manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump({"fonts": entries}, f)
+    return manifest_path
+
+
+def test_manifest_read_csv(tmp_path):
+    manifest_path = str(tmp_path / "manifest.csv")
+    with open(manifest_path, "w") as f:
+        f.write("path,version,status,state\nSans/*.ttf,2.000,dev,\nSerif/*.ttf,,rel,sha1\n")
+    entries = read_manifest(manifest_path)
+    assert [(e.index, e.path, e.version, e.status, e.state) for e in entries] == [
+        (1, "Sans/*.ttf", "2.000", "dev", ""),
+        (2, "Serif/*.ttf", "", "rel", "sha1"),
+    ]
+
+
+def test_manifest_read_toml(tmp_path):
+    pytest.importorskip("tomllib")
+    manifest_path = str(tmp_path / "manifest.toml")
+    with open(manifest_path, "w") as f:
+        f.write('[[fonts]]\npath = "Sans/*.ttf"\nversion = "2.000"\n')
+    entries = read_manifest(manifest_path)
+    assert entries[0].path == "Sans/*.ttf"
+    assert entries[0].version == "2.000"
+
+
+def test_manifest_read_toml_unquoted_version_raises_manifesterror(tmp_path):
+    pytest.importorskip("tomllib")
+    manifest_path = str(tmp_path / "manifest.toml")
+    with open(manifest_path, "w") as f:
+        f.write('[[fonts]]\npath = "Sans/*.ttf"\nversion = 2.010\n')
+    with pytest.raises(ManifestError) as e:
+        read_manifest(manifest_path)
+    assert e.value.errors == ["entry 1: version must be a quoted string, found 2.01"]
+
+
+def test_manifest_read_json_non_string_state_raises_manifesterror(tmp_path):
+    manifest_path = _write_json_manifest(tmp_path, [{"path": "a.ttf", "state": True}])
+    with pytest.raises(ManifestError) as e:
+        read_manifest(manifest_path)
+    assert e.value.errors == ["entry 1: state must be a quoted string, found True"]
+
+
+def test_manifest_read_unsupported_format_raises_manifesterror(tmp_path):
+    with pytest.raises(ManifestError):
+        read_manifest(str(tmp_path / "manifest.yaml"))
+
+
+def test_manifest_read_unknown_field_raises_manifesterror(tmp_path):
+    manifest_path = _write_json_manifest(tmp_path, [{"path": "a.ttf", "verison": "1.0"}])
+    with pytest.raises(ManifestError) as e:
+        read_manifest(manifest_path)
+    assert "verison" in e.value.errors[0]
+
+
+@pytest.mark.parametrize("version", ["nan", "inf", "1e3", "1.5e3", "2", ".5", "1.0.0"])
+def test_manifest_resolve_rejects_invalid_version_numbers(fonttree, version):
+    manifest_path = _write_json_manifest(
+        fonttree, [{"path": "Sans/*.ttf", "version": version}]
+    )
+    entries = read_manifest(manifest_path)
+    with pytest.raises(ManifestError) as e:
+        resolve_manifest(entries, str(fonttree))
+    assert e.value.errors == [
+        "entry 1 (Sans/*.ttf): invalid version number '" + version + "'"
+    ]
+
+
+def test_manifest_resolve_reports_every_error(fonttree):
+    manifest_path = _write_json_manifest(
+        fonttree,
+        [
+            {"path": "Sans/*.ttf", "version": "two"},
+            {"path": "Sans/Sans-Bold.ttf", "status": "beta"},
+            {"path": "Mono/*.ttf", "status": "dev"},
+            {"path": "Serif/*.ttf"},
+        ],
+    )
+    entries = read_manifest(manifest_path)
+    with pytest.raises(ManifestError) as e:
+        resolve_manifest(entries, str(fonttree))
+    errors = e.value.errors
+    assert len(errors) == 5
+    assert "invalid version number" in errors[0]
+    assert "status must be" in errors[1]
+    assert "also assigned by entry 1" in errors[2]
+    assert "no .ttf or .otf fonts match" in errors[3]
+    assert "no version, status, or state changes" in errors[4]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_manifest_apply(fonttree, jobs):
+    manifest_path = _write_json_manifest(
+        fonttree,
+        [
+            {"path": "Sans/*.ttf", "version": "2_000", "status": "dev"},
+            {"path": "Serif/Serif-Regular.ttf", "status": "rel"},
+        ],
+    )
+    entries = read_manifest(manifest_path)
+    resolve_manifest(entries, str(fonttree))
+    results = apply_manifest(entries, jobs=jobs)
+
+    assert len(results[1]) == 2
+    assert len(results[2]) == 1
+    fv = FontVersion(str(fonttree / "Sans" / "Sans-Bold.ttf"))
+    assert fv.get_name_id5_version_string() == "Version 2.000;DEV;metadata string"
+    assert fv.head_fontRevision == 2.000
+    fv = FontVersion(str(fonttree / "Serif" / "Serif-Regular.ttf"))
+    assert fv.get_name_id5_version_string() == "Version 1.010;RELEASE;metadata string"
+    fv = FontVersion(str(fonttree / "Serif" / "Serif-Bold.ttf"))
+    assert fv.get_name_id5_version_string() == "Version 1.010;metadata string"
+
+    table = format_results_table(entries, results)
+    assert "Version 2.000;DEV;metadata string" in table
+    assert table.splitlines()[0].split() == [
+        "ENTRY", "PATH", "FONTS", "WRITTEN", "FAILED", "VERSION", "STRING"
+    ]
+
+
+def test_manifest_apply_font_error_does_not_stop_other_writes(fonttree):
+    shutil.copy(os.path.join(testfiles_dir, "test.txt"), str(fonttree / "Sans" / "Sans-Bad.ttf"))
+    manifest_path = _write_json_manifest(fonttree, [{"path": "Sans/*.ttf", "status": "dev"}])
+    entries = read_manifest(manifest_path)
+    resolve_manifest(entries, str(fonttree))
+    results = apply_manifest(entries, jobs=1)
+
+    errors = [result for result in results[1] if result.error != ""]
+    assert len(errors) == 1
+    assert errors[0].fontpath.endswith("Sans-Bad.ttf")
+    fv = FontVersion(str(fonttree / "Sans" / "Sans-Regular.ttf"))
+    assert fv.is_development is True
+    assert "[X] " in format_results_table(entries, results)
+
+
+def test_manifest_git_sha1_cache_one_entry_per_repository(fonttree):
+    repo = Repo.init(str(fonttree))
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "font-v")
+        config.set_value("user", "email", "font-v@example.com")
+    repo.index.add(["Sans/Sans-Regular.ttf"])
+    commit = repo.index.commit("initial commit")
+
+    manifest_path = _write_json_manifest(
+        fonttree, [{"path": "**/*.ttf", "state": "sha1", "status": "dev"}]
+    )
+    entries = read_manifest(manifest_path)
+    resolve_manifest(entries, str(fonttree))
+    git_sha1_cache = get_manifest_git_sha1_cache(entries)
+    assert list(git_sha1_cache.keys()) == [str(fonttree)]
+    assert commit.hexsha.startswith(git_sha1_cache[str(fonttree)])
+
+    apply_manifest(entries, git_sha1_cache, jobs=2)
+    fv = FontVersion(str(fonttree / "Serif" / "Serif-Bold.ttf"))
+    assert fv.state == git_sha1_cache[str(fonttree)]
+    assert fv.is_development is True
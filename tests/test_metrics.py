@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+from fontv import telemetry
+from fontv.app import main
+from fontv.batch import map_parallel
+from fontv.libfv import FontVersion
+from fontv.metrics import COUNTERS, RunMetrics
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def _run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["font-v"] + list(args))
+    try:
+        main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def _copy_font(tmp_path, name, testfile="Test-VersionOnly.ttf"):
+    fontpath = str(tmp_path / name)
+    shutil.copy(os.path.join(testfiles_dir, testfile), fontpath)
+    return fontpath
+
+
+def _read_version_string(task):
+    return FontVersion(task).get_name_id5_version_string()
+
+
+@pytest.fixture
+def run_metrics():
+    run_metrics = RunMetrics("write")
+    run_metrics.start()
+    yield run_metrics
+    if run_metrics.add_count in telemetry._counter_callbacks:
+        run_metrics.stop()
+
+
+def test_metrics_counter_callbacks():
+    calls = []
+    callback = lambda name, value: calls.append((name, value))  # noqa: E731
+    assert telemetry.has_counter_callbacks() is False
+    telemetry.count("fonts_processed")
+    telemetry.add_counter_callback(callback)
+    assert telemetry.has_counter_callbacks() is True
+    telemetry.count("fonts_processed")
+    telemetry.count("bytes_read", 100)
+    telemetry.remove_counter_callback(callback)
+    assert calls == [("fonts_processed", 1), ("bytes_read", 100)]
+
+
+def test_metrics_fontversion_counters(tmp_path, run_metrics):
+    fontpath = _copy_font(tmp_path, "Test.ttf")
+    fontsize = os.path.getsize(fontpath)
+    fv = FontVersion(fontpath)
+    fv.write_version_string()  # no changes
+    fv.set_version_number("2.000")
+    fv.write_version_string()
+    run_metrics.stop()
+    assert run_metrics.counters["fonts_processed"] == 1
+    assert run_metrics.counters["fonts_unchanged"] == 1
+    assert run_metrics.counters["fonts_written"] == 1
+    assert run_metrics.counters["bytes_read"] == fontsize
+    assert run_metrics.counters["bytes_written"] > 0
+    assert run_metrics.phase_counts["font.save"] == 2
+
+
+def test_metrics_git_sha1_cache_counters(run_metrics):
+    fv = FontVersion(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"))
+    fv.git_sha1_cache = {}
+    fv._get_repo_commit()
+    fv._get_repo_commit()
+    run_metrics.stop()
+    assert run_metrics.counters["git_calls"] == 1
+    assert run_metrics.counters["git_sha1_cache_hits"] == 1
+
+
+def test_metrics_map_parallel_replays_worker_telemetry(run_metrics):
+    fontpaths = [os.path.join(testfiles_dir, "Test-VersionOnly.ttf")] * 3
+    results = map_parallel(_read_version_string, fontpaths, jobs=2)
+    run_metrics.stop()
+    assert results == ["Version 1.010"] * 3
+    assert run_metrics.counters["fonts_processed"] == 3
+    assert run_metrics.phase_counts["font.load"] == 3
+
+
+def test_metrics_format_json():
+    run_metrics = RunMetrics("report")
+    run_metrics.add_count("fonts_processed", 2)
+    run_metrics.add_span("font.load", 0.25)
+    run_metrics.add_span("font.load", 0.5)
+    summary = json.loads(run_metrics.format_json())
+    assert summary["subcommand"] == "report"
+    assert sorted(summary["counters"].keys()) == sorted(COUNTERS)
+    assert summary["counters"]["fonts_processed"] == 2
+    assert summary["phases"] == {"font.load": {"count": 2, "total_seconds": 0.75}}
+
+
+def test_metrics_format_prometheus():
+    run_metrics = RunMetrics("write")
+    run_metrics.add_count("fonts_written", 3)
+    run_metrics.add_span("font.save", 0.5)
+    text = run_metrics.format_prometheus()
+    lines = text.split("\n")
+    assert text.endswith("\n")
+    assert "# TYPE fontv_fonts_written_total counter" in lines
+    assert 'fontv_fonts_written_total{subcommand="write"} 3' in lines
+    assert 'fontv_phase_seconds_total{subcommand="write",phase="font.save"} 0.5' in lines
+    assert 'fontv_phase_spans_total{subcommand="write",phase="font.save"} 1' in lines
+    assert 'fontv_run_exit_code{subcommand="write"} 0' in lines
+    for line in lines:
+        if line != "" and not line.startswith("#"):
+            assert line.startswith("fontv_")
+
+
+def test_metrics_main_write_json(tmp_path, monkeypatch, capsys):
+    fontpath = _copy_font(tmp_path, "Test.ttf")
+    metrics_path = str(tmp_path / "metrics.json")
+    assert _run_main(monkeypatch, "write", "--metrics=" + metrics_path, "--ver=2.000", fontpath) == 0
+    capsys.readouterr()
+    with open(metrics_path) as f:
+        summary = json.load(f)
+    assert summary["exit_code"] == 0
+    assert summary["counters"]["fonts_processed"] == 1
+    assert summary["counters"]["fonts_written"] == 1
+    assert summary["counters"]["errors"] == 0
+    assert "cli.write" in summary["phases"]
+    assert len(telemetry._counter_callbacks) == 0
+    assert len(telemetry._span_callbacks) == 0
+
+
+def test_metrics_main_write_same_version_is_unchanged(tmp_path, monkeypatch, capsys):
+    fontpath = _copy_font(tmp_path, "Test.ttf")
+    metrics_path = str(tmp_path / "metrics.json")
+    assert _run_main(monkeypatch, "write", "--metrics=" + metrics_path, "--ver=1.010", fontpath) == 0
+    capsys.readouterr()
+    with open(metrics_path) as f:
+        summary = json.load(f)
+    assert summary["counters"]["fonts_unchanged"] == 1
+    assert summary["counters"]["fonts_written"] == 0
+
+
+def test_metrics_main_report_dedupe_prometheus(tmp_path, monkeypatch, capsys):
+    fontpaths = [_copy_font(tmp_path, name) for name in ("A.ttf", "B.ttf", "C.ttf")]
+    metrics_path = str(tmp_path / "font-v.prom")
+    assert _run_main(monkeypatch, "report", "--dedupe", "--metrics", metrics_path, *fontpaths) == 0
+    capsys.readouterr()
+    with open(metrics_path) as f:
+        lines = f.read().split("\n")
+    assert 'fontv_fonts_processed_total{subcommand="report"} 1' in lines
+    assert 'fontv_dedupe_hits_total{subcommand="report"} 2' in lines
+
+
+def test_metrics_main_error_exit(tmp_path, monkeypatch, capsys):
+    metrics_path = str(tmp_path / "metrics.json")
+    assert _run_main(monkeypatch, "report", "--metrics=" + metrics_path, "Missing.ttf") == 1
+    capsys.readouterr()
+    with open(metrics_path) as f:
+        summary = json.load(f)
+    assert summary["exit_code"] == 1
+    assert summary["counters"]["errors"] == 1
+
+
+def test_metrics_main_unhandled_exception(tmp_path, monkeypatch, capsys):
+    fontpath = _copy_font(tmp_path, "Test.ttf")
+    metrics_path = str(tmp_path / "metrics.json")
+
+    def crash(self, *args, **kwargs):
+        raise IndexError("no nameID 5 records")
+
+    monkeypatch.setattr(FontVersion, "write_version_string", crash)
+    with pytest.raises(IndexError):
+        _run_main(monkeypatch, "write", "--metrics=" + metrics_path, "--ver=2.000", fontpath)
+    capsys.readouterr()
+    with open(metrics_path) as f:
+        summary = json.load(f)
+    assert summary["exit_code"] == 1
+    assert summary["counters"]["errors"] == 1
+    assert len(telemetry._counter_callbacks) == 0
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+
+import pytest
+
+from fontv.dedupe import file_digest
+from fontv.libfv import FontVersion
+from fontv.output import get_input_root, get_output_path, write_output_font
+from fontv.telemetry import add_counter_callback, remove_counter_callback
+from fontv.verify import verify_font_version
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+@pytest.fixture
+def inputtree(tmp_path):
+    os.makedirs(str(tmp_path / "in" / "sub"))
+    shutil.copy(
+        os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), str(tmp_path / "in" / "A.ttf")
+    )
+    shutil.copy(
+        os.path.join(testfiles_dir, "Test-VersionOnly.otf"),
+        str(tmp_path / "in" / "sub" / "B.otf"),
+    )
+    return tmp_path / "in"
+
+
+def test_output_get_input_root(inputtree):
+    fontpath = str(inputtree / "sub" / "B.otf")
+    assert get_input_root([fontpath]) == str(inputtree / "sub")
+    assert get_input_root([str(inputtree / "A.ttf"), fontpath]) == str(inputtree)
+    assert get_input_root([str(inputtree / "sub"), fontpath]) == str(inputtree / "sub")
+
+
+def test_output_get_output_path(inputtree, tmp_path):
+    fontpath = str(inputtree / "sub" / "B.otf")
+    output_path = get_output_path(fontpath, str(inputtree), str(tmp_path / "out"))
+    assert output_path == str(tmp_path / "out" / "sub" / "B.otf")
+
+
+@pytest.mark.parametrize("mode", ["reflink", "hardlink", "copy"])
+def test_output_write_modified_font_is_patched(inputtree, tmp_path, mode):
+    fontpath = str(inputtree / "A.ttf")
+    source_digest = file_digest(fontpath)
+    output_path = str(tmp_path / "out" / "A.ttf")
+    counters = {}
+
+    def callback(name, value):
+        counters[name] = counters.get(name, 0) + value
+
+    add_counter_callback(callback)
+    try:
+        with FontVersion(fontpath) as fv:
+            # a same length version string is patched in place in the output file
+            fv.set_version_number("2.000")
+            fv.write_version_string(fontpath=output_path, link=mode)
+    finally:
+        remove_counter_callback(callback)
+    patch_size = counters["bytes_written"]
+    if mode == "copy":
+        patch_size -= os.path.getsize(fontpath)
+    assert 0 < patch_size < 100
+    assert file_digest(fontpath) == source_digest
+    assert os.stat(output_path).st_ino != os.stat(fontpath).st_ino
+    assert verify_font_version(output_path, "Version 2.000", 2.0) == []
+    assert os.path.getsize(output_path) == os.path.getsize(fontpath)
+    assert sorted(os.listdir(str(tmp_path / "out"))) == ["A.ttf"]
+
+
+def test_output_write_modified_font_full_write(inputtree, tmp_path):
+    fontpath = str(inputtree / "sub" / "B.otf")
+    output_path = str(tmp_path / "out" / "sub" / "B.otf")
+    with FontVersion(fontpath) as fv:
+        fv.set_development_status()
+        fv.write_version_string(fontpath=output_path, link="reflink")
+    assert verify_font_version(output_path, "Version 1.010;DEV", 1.01) == []
+    with FontVersion(fontpath) as fv:
+        assert fv.get_name_id5_version_string() == "Version 1.010"
+
+
+def test_output_write_unchanged_font_hardlink(inputtree, tmp_path):
+    fontpath = str(inputtree / "A.ttf")
+    output_path = str(tmp_path / "out" / "A.ttf")
+    with FontVersion(fontpath) as fv:
+        bytes_written, method = write_output_font(
+            fv.ttf, fontpath, output_path, modified=False, mode="hardlink"
+        )
+    assert (bytes_written, method) == (0, "hardlink")
+    assert os.stat(output_path).st_ino == os.stat(fontpath).st_ino
+
+
+def test_output_write_unchanged_font_clone(inputtree, tmp_path):
+    fontpath = str(inputtree / "A.ttf")
+    output_path = str(tmp_path / "out" / "A.ttf")
+    counters = {}
+
+    def callback(name, value):
+        counters[name] = counters.get(name, 0) + value
+
+    add_counter_callback(callback)
+    try:
+        with FontVersion(fontpath) as fv:
+            bytes_written, method = write_output_font(
+                fv.ttf, fontpath, output_path, modified=False
+            )
+    finally:
+        remove_counter_callback(callback)
+    assert method in ("reflink", "copy_file_range", "copy")
+    assert file_digest(output_path) == file_digest(fontpath)
+    assert os.stat(output_path).st_mode == os.stat(fontpath).st_mode
+    if method == "copy":
+        assert bytes_written == os.path.getsize(fontpath)
+    else:
+        assert bytes_written == 0
+        assert counters["bytes_cloned"] == os.path.getsize(fontpath)
+
+
+def test_output_write_to_source_font_raises_valueerror(inputtree):
+    fontpath = str(inputtree / "A.ttf")
+    with FontVersion(fontpath) as fv:
+        with pytest.raises(ValueError):
+            write_output_font(fv.ttf, fontpath, fontpath)
+
+
+def test_output_write_bad_mode_raises_valueerror(inputtree, tmp_path):
+    fontpath = str(inputtree / "A.ttf")
+    with FontVersion(fontpath) as fv:
+        with pytest.raises(ValueError):
+            write_output_font(fv.ttf, fontpath, str(tmp_path / "A.ttf"), mode="symlink")
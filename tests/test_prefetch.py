@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import glob
+import os
+
+import pytest
+
+from fontv.libfv import FontVersion
+from fontv.prefetch import FontPrefetcher, prefetch_font
+from fontv.utilities import NamedBytesIO
+
+testfiles_dir = os.path.join("tests", "testfiles")
+testfonts = sorted(glob.glob(os.path.join(testfiles_dir, "Test-*.[ot]tf")))
+
+
+@pytest.mark.parametrize("fontpath", testfonts)
+def test_prefetch_font_version_data_matches_full_read(fontpath):
+    prefetched = prefetch_font(fontpath)
+    assert isinstance(prefetched, NamedBytesIO)
+    assert len(prefetched.getvalue()) < os.path.getsize(fontpath)
+    with FontVersion(fontpath) as fv, FontVersion(prefetched) as prefetched_fv:
+        assert prefetched_fv.fontpath == fontpath
+        assert prefetched_fv.name_ID5_dict == fv.name_ID5_dict
+        assert prefetched_fv.head_fontRevision == fv.head_fontRevision
+
+
+def test_prefetch_font_unsupported_returns_path(tmp_path):
+    fontpath = str(tmp_path / "Test.ttf")
+    with open(fontpath, "wb") as f:
+        f.write(b"ttcf" + b"\0" * 100)
+    assert prefetch_font(fontpath) == fontpath
+
+
+def test_prefetch_font_prefetcher_sequence():
+    fontpaths = testfonts[:5]
+    with FontPrefetcher(fontpaths, depth=2) as prefetcher:
+        for fontpath in fontpaths:
+            assert isinstance(prefetcher.get(fontpath), NamedBytesIO)
+        # paths that are not next in the sequence are not prefetched
+        assert prefetcher.get(fontpaths[0]) == fontpaths[0]
+
+
+def test_prefetch_font_prefetcher_out_of_order_and_errors(tmp_path):
+    missing = str(tmp_path / "Missing.ttf")
+    fontpaths = [testfonts[0], missing, testfonts[1]]
+    with FontPrefetcher(fontpaths, depth=4) as prefetcher:
+        assert prefetcher.get(testfonts[1]) == testfonts[1]
+        assert isinstance(prefetcher.get(testfonts[0]), NamedBytesIO)
+        # prefetch errors are returned as the font path for a FontVersion read
+        assert prefetcher.get(missing) == missing
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+from fontTools.ttLib import TTCollection, TTFont, TTLibError
+
+from fontv.libfv import FontVersion
+from fontv.report import (
+    FontReport,
+    iter_font_reports,
+    read_font_report,
+    read_font_reports,
+)
+from fontv.utilities import NamedBytesIO
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def test_report_from_font_version():
+    with FontVersion(os.path.join(testfiles_dir, "Test-VersionShaDEVMeta.ttf")) as fv:
+        report = FontReport.from_font_version(fv)
+        assert report.fontpath == fv.fontpath
+        assert report.version_string == fv.get_name_id5_version_string()
+        assert report.name_ID5_dict == fv.name_ID5_dict
+        assert report.name_ID5_dict is not fv.name_ID5_dict
+        assert report.head_fontRevision == fv.get_head_fontrevision_version_number()
+
+
+def test_report_read_font_report_closes_font(monkeypatch):
+    closed = []
+    close = FontVersion.close
+
+    def record_close(fv):
+        closed.append(fv.fontpath)
+        close(fv)
+
+    monkeypatch.setattr(FontVersion, "close", record_close)
+    fontpath = os.path.join(testfiles_dir, "Test-VersionOnly.ttf")
+    report = read_font_report(fontpath)
+    assert report.version_string == "Version 1.010"
+    assert closed == [fontpath]
+
+
+def test_report_read_font_report_binary_stream():
+    fontpath = os.path.join(testfiles_dir, "Test-VersionDEV.otf")
+    with open(fontpath, "rb") as f:
+        fontstream = NamedBytesIO(f.read(), fontpath)
+    report = read_font_report(fontstream)
+    assert report.fontpath == fontpath
+    assert report.version_string == "Version 1.010;DEV"
+
+
+def test_report_iter_font_reports_is_lazy():
+    fontpaths = [
+        os.path.join(testfiles_dir, "Test-VersionOnly.ttf"),
+        os.path.join(testfiles_dir, "Missing.ttf"),
+    ]
+    reports = iter_font_reports(fontpaths)
+    assert next(reports).version_string == "Version 1.010"
+    with pytest.raises(IOError):
+        next(reports)
+
+
+def test_report_read_font_reports_without_extension(tmp_path):
+    fontpath = str(tmp_path / "Font")
+    with open(os.path.join(testfiles_dir, "Test-VersionDEV.ttf"), "rb") as f:
+        with open(fontpath, "wb") as g:
+            g.write(f.read())
+    reports = read_font_reports(fontpath)
+    assert len(reports) == 1
+    assert reports[0].fontpath == fontpath
+    assert reports[0].version_string == "Version 1.010;DEV"
+    assert reports[0].font_number is None
+
+
+def test_report_read_font_reports_woff(tmp_path):
+    fontpath = str(tmp_path / "Font.woff")
+    ttf = TTFont(os.path.join(testfiles_dir, "Test-VersionREL.otf"))
+    ttf.flavor = "woff"
+    ttf.save(fontpath)
+    ttf.close()
+    reports = read_font_reports(fontpath)
+    assert [report.version_string for report in reports] == ["Version 1.010;RELEASE"]
+
+
+def test_report_read_font_reports_collection(tmp_path):
+    fontpath = str(tmp_path / "Family.ttc")
+    collection = TTCollection()
+    collection.fonts = [
+        TTFont(os.path.join(testfiles_dir, "Test-VersionOnly.ttf")),
+        TTFont(os.path.join(testfiles_dir, "Test-VersionDEV.ttf")),
+    ]
+    collection.save(fontpath)
+    collection.close()
+    reports = read_font_reports(fontpath)
+    assert [report.font_number for report in reports] == [0, 1]
+    assert [report.version_string for report in reports] == [
+        "Version 1.010",
+        "Version 1.010;DEV",
+    ]
+    assert reports[1].fontpath == fontpath
+
+
+def test_report_read_font_reports_not_font():
+    with pytest.raises(TTLibError):
+        read_font_reports(os.path.join(testfiles_dir, "HACK_LICENSE.md"))
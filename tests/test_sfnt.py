@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import io
+import os
+
+import pytest
+
+from fontTools.ttLib import TTFont
+
+from fontv.sfnt import build_sfnt, read_table_directory
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def test_sfnt_read_table_directory():
+    fontpath = os.path.join(testfiles_dir, "Test-VersionOnly.ttf")
+    with open(fontpath, "rb") as f:
+        sfnt_version, tables = read_table_directory(f)
+    ttf = TTFont(fontpath)
+    assert sfnt_version == b"\x00\x01\x00\x00"
+    assert sorted(tables.keys()) == sorted(ttf.reader.keys())
+    for tag, record in tables.items():
+        assert record.offset == ttf.reader.tables[tag].offset
+        assert record.length == ttf.reader.tables[tag].length
+
+
+def test_sfnt_read_table_directory_unsupported():
+    with pytest.raises(ValueError):
+        read_table_directory(io.BytesIO(b"wOFF" + b"\0" * 8))
+    with pytest.raises(ValueError):
+        read_table_directory(io.BytesIO(b"OTTO"))
+
+
+def test_sfnt_build_sfnt():
+    data = build_sfnt(b"OTTO", {"name": b"abc", "head": b"defgh"})
+    sfnt_version, tables = read_table_directory(io.BytesIO(data))
+    assert sfnt_version == b"OTTO"
+    assert tables["head"].offset % 4 == 0 and tables["name"].offset % 4 == 0
+    assert data[tables["name"].offset : tables["name"].offset + 3] == b"abc"
+    assert data[tables["head"].offset : tables["head"].offset + 5] == b"defgh"
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+
+import pytest
+from fontTools.ttLib import TTFont
+
+from fontv.dedupe import file_digest
+from fontv.inplace import write_tables_in_place
+from fontv.libfv import FontVersion
+from fontv.snapshot import SnapshotWriter, read_snapshot, revert_font, revert_fonts
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def _copy_font(tmp_path, name):
+    fontpath = str(tmp_path / name)
+    shutil.copy(os.path.join(testfiles_dir, name), fontpath)
+    return fontpath
+
+
+def _write(fontpath, snapshot, version_string, in_place=True):
+    with FontVersion(fontpath) as fv:
+        fv.set_version_string(version_string)
+        fv.head_fontRevision = 2.0
+        fv.write_version_string(in_place=in_place, snapshot=snapshot)
+
+
+def test_snapshot_revert_in_place_write_is_byte_identical(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    original_digest = file_digest(fontpath)
+    snapshot_path = str(tmp_path / "snapshot.jsonl")
+    with SnapshotWriter(snapshot_path) as snapshot:
+        _write(fontpath, snapshot, "Version 1.010;[7654321]")
+    assert file_digest(fontpath) != original_digest
+
+    entries = read_snapshot(snapshot_path)
+    assert len(entries) == 1
+    assert entries[0].fontpath == os.path.abspath(fontpath)
+    assert entries[0].input_sha256 == original_digest
+    assert entries[0].output_sha256 == file_digest(fontpath)
+
+    result = revert_font(entries[0])
+    assert result.error == ""
+    assert result.in_place is True
+    assert result.identical is True
+    assert file_digest(fontpath) == original_digest
+
+
+def test_snapshot_revert_full_write(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionOnly.otf")
+    snapshot_path = str(tmp_path / "snapshot.jsonl")
+    with SnapshotWriter(snapshot_path) as snapshot:
+        _write(fontpath, snapshot, "Version 2.000;DEV;a longer version string", in_place=False)
+
+    result = revert_font(read_snapshot(snapshot_path)[0])
+    assert result.error == ""
+    assert result.in_place is False
+    ttf = TTFont(fontpath, checkChecksums=2)
+    assert ttf["name"].getName(5, 3, 1, 0x409).toUnicode() == "Version 1.010"
+    assert abs(ttf["head"].fontRevision - 1.010) < 0.001
+    ttf.close()
+
+
+def test_snapshot_revert_modified_font(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    snapshot_path = str(tmp_path / "snapshot.jsonl")
+    with SnapshotWriter(snapshot_path) as snapshot:
+        _write(fontpath, snapshot, "Version 1.010;[7654321]")
+    _write(fontpath, None, "Version 1.010;[1111111]")
+    entry = read_snapshot(snapshot_path)[0]
+    with pytest.raises(ValueError):
+        revert_font(entry)
+    assert revert_font(entry, force=True).identical is True
+
+
+def test_snapshot_read_keeps_first_tables_and_last_digest(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    original_digest = file_digest(fontpath)
+    snapshot_path = str(tmp_path / "snapshot.jsonl")
+    with SnapshotWriter(snapshot_path) as snapshot:
+        _write(fontpath, snapshot, "Version 1.010;[7654321]")
+    with SnapshotWriter(snapshot_path) as snapshot:
+        _write(fontpath, snapshot, "Version 1.010;[1111111]")
+    with open(snapshot_path, "a") as f:
+        f.write('{"path": "/interrupted')
+    entries = read_snapshot(snapshot_path)
+    assert len(entries) == 1
+    assert entries[0].input_sha256 == original_digest
+    assert entries[0].output_sha256 == file_digest(fontpath)
+    results = revert_fonts(entries, jobs=1)
+    assert results[0].identical is True
+
+
+def test_snapshot_write_tables_in_place_length_mismatch(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionSha.ttf")
+    ttf = TTFont(fontpath)
+    name_data = ttf.reader["name"]
+    ttf.close()
+    assert write_tables_in_place(fontpath, {"name": name_data + b"\0\0\0\0"}) is None
+    assert write_tables_in_place(fontpath, {"name": name_data}) == len(name_data) + 8
+    TTFont(fontpath, checkChecksums=2).close()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Scaling tests with synthetic fonts and corpora from tests/fontgen.py.  The corpus size is multiplied by the
+FONTV_STRESS_SCALE environment variable (default = 1).  For example, FONTV_STRESS_SCALE=1000 runs the corpus tests
+with 100k font files.
+"""
+
+from __future__ import unicode_literals
+
+import itertools
+import os
+import sys
+
+import pytest
+
+from fontv.app import main
+from fontv.libfv import FontVersion
+from fontv.report import iter_font_reports
+from tests import fontgen
+
+STRESS_SCALE = int(os.environ.get("FONTV_STRESS_SCALE", "1"))
+STRESS_SEED = 20180101
+CORPUS_SIZE = 100 * STRESS_SCALE
+CORPUS_UNIQUE = min(CORPUS_SIZE, 20)
+
+
+def _run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["font-v"] + list(args))
+    try:
+        main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    return fontgen.generate_corpus(
+        str(tmp_path_factory.mktemp("corpus")),
+        STRESS_SEED,
+        CORPUS_SIZE,
+        unique=CORPUS_UNIQUE,
+        name_record_count=(0, 100, 1000),
+        nameid5_record_count=(0, 10),
+        platforms=(("windows",), ("mac", "windows"), ("unicode", "mac", "windows")),
+        flavor=("ttf", "otf"),
+    )
+
+
+def test_stress_report_corpus(corpus, monkeypatch, capsys):
+    assert _run_main(monkeypatch, "report", *corpus) == 0
+    out, _ = capsys.readouterr()
+    for fontpath in corpus:
+        assert fontpath in out
+
+
+def test_stress_write_corpus_dedupe(corpus, monkeypatch, capsys):
+    assert _run_main(monkeypatch, "write", "--ver=9.999", "--rel", "--dedupe", *corpus) == 0
+    capsys.readouterr()
+    for fontpath in corpus[:CORPUS_UNIQUE] + corpus[-CORPUS_UNIQUE:]:
+        fv = FontVersion(fontpath)
+        assert fv.get_version_number_string() == "9.999"
+        assert fv.is_release is True
+        # every nameID 5 record, including localized records, is updated
+        assert set(fv.name_ID5_dict.values()) == {fv.get_name_id5_version_string()}
+
+
+@pytest.mark.parametrize("flavor, glyph_count", [("ttf", 65535), ("otf", 65000)])
+def test_stress_write_65k_glyph_font(tmp_path, flavor, glyph_count):
+    spec = fontgen.FontSpec(
+        glyph_count=glyph_count,
+        name_record_count=3000,
+        nameid5_record_count=200,
+        platforms=("unicode", "mac", "windows"),
+        flavor=flavor,
+    )
+    fontpath = fontgen.write_font(spec, str(tmp_path / ("CJK" + spec.extension)))
+    fv = FontVersion(fontpath)
+    fv.set_version_number("2.000")
+    fv.set_development_status()
+    fv.write_version_string()
+
+    fv = FontVersion(fontpath)
+    assert fv.get_name_id5_version_string() == "Version 2.000;DEV"
+    assert len(fv.name_ID5_dict) == 203
+    assert set(fv.name_ID5_dict.values()) == {"Version 2.000;DEV"}
+    assert len(fv.ttf.getGlyphOrder()) == glyph_count
+
+
+@pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="requires /proc/self file descriptor and memory data"
+)
+def test_stress_streaming_report_memory_and_file_descriptors(tmp_path):
+    fontpaths = fontgen.generate_corpus(
+        str(tmp_path), STRESS_SEED, 10000, unique=10, name_record_count=(0, 100)
+    )
+    page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def get_rss():
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * page_size
+
+    baseline_fds = len(os.listdir("/proc/self/fd"))
+    reports = iter_font_reports(fontpaths)
+    # warm up imports and allocator pools before the RSS baseline
+    for report in itertools.islice(reports, 1000):
+        pass
+    baseline_rss = get_rss()
+    max_fds = 0
+    for index, report in enumerate(reports):
+        assert report.version_string != ""
+        if index % 500 == 0:
+            max_fds = max(max_fds, len(os.listdir("/proc/self/fd")))
+    assert max_fds <= baseline_fds + 1
+    # RSS does not grow with the number of fonts (retaining 9000 TTFont objects adds > 100 MB)
+    assert get_rss() - baseline_rss < 16 * 1024 * 1024
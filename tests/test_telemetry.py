@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import sys
+
+import pytest
+
+from fontv import telemetry
+from fontv.app import main
+from fontv.libfv import FontVersion
+from fontv.telemetry import PhaseProfile, add_span_callback, remove_span_callback, span
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+@pytest.fixture
+def profile():
+    profile = PhaseProfile()
+    add_span_callback(profile)
+    yield profile
+    remove_span_callback(profile)
+
+
+def test_telemetry_span_without_callbacks_is_shared_noop():
+    assert span("a") is span("b")
+    with span("a"):
+        pass
+
+
+def test_telemetry_span_callback(profile):
+    with span("phase"):
+        pass
+    with pytest.raises(ValueError):
+        with span("phase"):
+            raise ValueError()
+    assert list(profile.durations.keys()) == ["phase"]
+    assert len(profile.durations["phase"]) == 2
+    assert all(elapsed >= 0 for elapsed in profile.durations["phase"])
+
+
+def test_telemetry_remove_span_callback():
+    calls = []
+    callback = lambda name, elapsed: calls.append(name)  # noqa: E731
+    add_span_callback(callback)
+    with span("phase"):
+        pass
+    remove_span_callback(callback)
+    with span("phase"):
+        pass
+    assert calls == ["phase"]
+    assert len(telemetry._span_callbacks) == 0
+    with pytest.raises(ValueError):
+        remove_span_callback(callback)
+
+
+def test_telemetry_phase_profile_summary():
+    profile = PhaseProfile()
+    for elapsed in range(1, 101):
+        profile("b", elapsed / 1000.0)
+    profile("a", 0.5)
+    summary = profile.get_summary()
+    assert [row[0] for row in summary] == ["a", "b"]
+    assert summary[0][1:] == (1, 0.5, 0.5, 0.5)
+    name, count, total, p50, p95 = summary[1]
+    assert count == 100
+    assert total == pytest.approx(5.05)
+    assert p50 == pytest.approx(0.050)
+    assert p95 == pytest.approx(0.095)
+    table = profile.format_table().split(os.linesep)
+    assert table[0].split() == ["PHASE", "COUNT", "TOTAL", "ms", "P50", "ms", "P95", "ms"]
+    assert table[2].split() == ["b", "100", "5050.000", "50.000", "95.000"]
+
+
+def test_telemetry_fontversion_phases(tmp_path, profile):
+    fontpath = str(tmp_path / "Test.ttf")
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), fontpath)
+    fv = FontVersion(fontpath)
+    fv.set_version_number("2.000")
+    fv.write_version_string()
+    assert sorted(profile.durations.keys()) == ["font.load", "font.name_decode", "font.save"]
+
+
+def test_telemetry_main_profile_option(tmp_path, monkeypatch, capsys):
+    fontpath = str(tmp_path / "Test.ttf")
+    shutil.copy(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"), fontpath)
+    monkeypatch.setattr(sys, "argv", ["font-v", "write", "--profile", "--ver=2.000", fontpath])
+    main()
+    out, err = capsys.readouterr()
+    assert "version string was successfully changed" in out
+    assert "[font-v] profile:" in err
+    phases = [line.split()[0] for line in err.strip().split(os.linesep)[2:]]
+    assert phases == ["cli.write", "font.load", "font.name_decode", "font.save", "lock.wait"]
+    assert len(telemetry._span_callbacks) == 0
+
+
+def test_telemetry_main_profile_option_on_error_exit(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["font-v", "report", "--profile", "Missing.ttf"])
+    with pytest.raises(SystemExit):
+        main()
+    _, err = capsys.readouterr()
+    assert "[font-v] profile:" in err
+    assert len(telemetry._span_callbacks) == 0
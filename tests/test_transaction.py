@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+
+import pytest
+
+from fontv.batch import WriteRequest
+from fontv.libfv import FontVersion
+from fontv.transaction import TransactionError, write_fonts_transactional
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+@pytest.fixture
+def family(tmp_path):
+    fontpaths = []
+    for style in ("Regular", "Italic", "Bold", "BoldItalic"):
+        fontpaths.append(str(tmp_path / ("Family-" + style + ".ttf")))
+        shutil.copy(os.path.join(testfiles_dir, "Test-VersionMeta.ttf"), fontpaths[-1])
+    return fontpaths
+
+
+def _read_all(fontpaths):
+    contents = []
+    for fontpath in fontpaths:
+        with open(fontpath, "rb") as f:
+            contents.append(f.read())
+    return contents
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_transaction_writes_all_fonts(family, jobs):
+    staged_fonts = write_fonts_transactional(
+        family, WriteRequest(version_number="2.000", release=True), jobs
+    )
+    assert [staged_font.fontpath for staged_font in staged_fonts] == family
+    for fontpath in family:
+        fv = FontVersion(fontpath)
+        assert fv.get_name_id5_version_string() == "Version 2.000;RELEASE;metadata string"
+        assert fv.head_fontRevision == 2.000
+    # no staged or backup files remain
+    assert sorted(os.listdir(os.path.dirname(family[0]))) == sorted(
+        os.path.basename(fontpath) for fontpath in family
+    )
+
+
+def test_transaction_preserves_font_file_mode(family):
+    os.chmod(family[0], 0o644)
+    os.chmod(family[1], 0o664)
+    write_fonts_transactional(family[:2], WriteRequest(version_number="2.000"), 1)
+    assert os.stat(family[0]).st_mode & 0o777 == 0o644
+    assert os.stat(family[1]).st_mode & 0o777 == 0o664
+
+
+def test_transaction_failure_modifies_no_fonts(family, tmp_path):
+    # a font without nameID 5 records fails in the staging phase
+    badpath = str(tmp_path / "Family-Bad.ttf")
+    shutil.copy(os.path.join(testfiles_dir, "test.txt"), badpath)
+    fontpaths = family[:2] + [badpath] + family[2:]
+    pre_contents = _read_all(fontpaths)
+
+    with pytest.raises(TransactionError) as e:
+        write_fonts_transactional(fontpaths, WriteRequest(version_number="2.000"), 1)
+    assert [fontpath for fontpath, _ in e.value.errors] == [badpath]
+    assert _read_all(fontpaths) == pre_contents
+    assert len(os.listdir(str(tmp_path))) == len(fontpaths)
+
+
+def test_transaction_rename_failure_rolls_back(family, monkeypatch):
+    pre_contents = _read_all(family)
+    real_replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 3:
+            raise OSError("simulated rename failure")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        write_fonts_transactional(family, WriteRequest(development=True), 1)
+    monkeypatch.undo()
+
+    assert _read_all(family) == pre_contents
+    assert len(os.listdir(os.path.dirname(family[0]))) == len(family)
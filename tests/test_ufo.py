@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+from fontTools.designspaceLib import DesignSpaceDocument, SourceDescriptor
+from git import Repo
+
+from fontv.locking import LOCK_NOWAIT, FontLockedError
+from fontv.ufo import (
+    UFOVersion,
+    get_default_version_string,
+    get_ufo_paths,
+    is_ufo_source_path,
+    read_designspace_sources,
+    read_fontinfo,
+    read_ufo_reports,
+    verify_ufo_version,
+    write_fontinfo,
+)
+
+
+def _make_ufo(dirpath, name, **fontinfo):
+    ufo_path = os.path.join(str(dirpath), name)
+    os.mkdir(ufo_path)
+    fontinfo.setdefault("familyName", "Example")
+    write_fontinfo(ufo_path, fontinfo)
+    return ufo_path
+
+
+def _make_designspace(dirpath, ufo_filenames):
+    document = DesignSpaceDocument()
+    document.addAxisDescriptor(
+        name="weight", tag="wght", minimum=400, default=400, maximum=700
+    )
+    for index, filename in enumerate(ufo_filenames):
+        source = SourceDescriptor()
+        source.filename = filename
+        source.location = {"weight": 400 + 300 * index}
+        document.addSource(source)
+    designspace_path = os.path.join(str(dirpath), "Example.designspace")
+    document.write(designspace_path)
+    return designspace_path
+
+
+def test_ufo_read_version_data(tmp_path):
+    ufo_path = _make_ufo(
+        tmp_path,
+        "Example-Regular.ufo",
+        versionMajor=1,
+        versionMinor=10,
+        openTypeNameVersion="Version 1.010;[abcdefg]-dev",
+    )
+    with UFOVersion(ufo_path + "/") as uv:
+        assert uv.fontpath == ufo_path
+        assert uv.ttf is None
+        assert uv.get_name_id5_version_string() == "Version 1.010;[abcdefg]-dev"
+        assert uv.get_head_fontrevision_version_number() == 1.01
+        assert uv.get_version_number_tuple() == (1, 0, 1, 0)
+        assert uv.is_development is True
+        assert uv.state == "abcdefg"
+        assert uv.name_ID5_dict == {"openTypeNameVersion": "Version 1.010;[abcdefg]-dev"}
+
+
+def test_ufo_read_default_version_string(tmp_path):
+    ufo_path = _make_ufo(tmp_path, "A.ufo", versionMajor=2, versionMinor=5)
+    with UFOVersion(ufo_path) as uv:
+        assert uv.get_name_id5_version_string() == "Version 2.005"
+        assert uv.get_head_fontrevision_version_number() == 2.005
+        assert uv.contains_metadata is False
+
+
+def test_ufo_read_missing_fontinfo_raises_ioerror(tmp_path):
+    ufo_path = str(tmp_path / "A.ufo")
+    os.mkdir(ufo_path)
+    with pytest.raises(IOError):
+        UFOVersion(ufo_path)
+
+
+def test_ufo_read_invalid_fontinfo_raises_valueerror(tmp_path):
+    ufo_path = str(tmp_path / "A.ufo")
+    os.mkdir(ufo_path)
+    with open(os.path.join(ufo_path, "fontinfo.plist"), "wb") as f:
+        f.write(b"not a plist")
+    with pytest.raises(ValueError):
+        read_fontinfo(ufo_path)
+
+
+def test_ufo_write_version_number_and_status(tmp_path):
+    ufo_path = _make_ufo(
+        tmp_path,
+        "A.ufo",
+        versionMajor=1,
+        versionMinor=10,
+        openTypeNameVersion="Version 1.010;DEV;other",
+    )
+    with UFOVersion(ufo_path) as uv:
+        uv.set_version_number("2.1")
+        uv.set_release_status()
+        uv.write_version_string()
+        assert uv.updated_fields == [
+            ("versionMajor", "1", "2"),
+            ("versionMinor", "10", "100"),
+            (
+                "openTypeNameVersion",
+                "Version 1.010;DEV;other",
+                "Version 2.1;RELEASE;other",
+            ),
+        ]
+
+    fontinfo = read_fontinfo(ufo_path)
+    assert fontinfo["versionMajor"] == 2
+    assert fontinfo["versionMinor"] == 100
+    assert fontinfo["openTypeNameVersion"] == "Version 2.1;RELEASE;other"
+    # fields that are not version data are preserved
+    assert fontinfo["familyName"] == "Example"
+    with UFOVersion(ufo_path) as uv:
+        assert uv.is_release is True
+        assert uv.get_head_fontrevision_version_number() == 2.1
+
+
+def test_ufo_write_default_version_string_is_not_added(tmp_path):
+    ufo_path = _make_ufo(tmp_path, "A.ufo", versionMajor=1, versionMinor=0)
+    with UFOVersion(ufo_path) as uv:
+        uv.set_version_number("1.200")
+        uv.write_version_string()
+    fontinfo = read_fontinfo(ufo_path)
+    assert fontinfo["versionMinor"] == 200
+    assert "openTypeNameVersion" not in fontinfo
+
+    with UFOVersion(ufo_path) as uv:
+        uv.set_development_status()
+        uv.write_version_string()
+    assert read_fontinfo(ufo_path)["openTypeNameVersion"] == "Version 1.200;DEV"
+
+
+def test_ufo_write_unchanged_does_not_rewrite_fontinfo(tmp_path):
+    ufo_path = _make_ufo(
+        tmp_path,
+        "A.ufo",
+        versionMajor=1,
+        versionMinor=0,
+        openTypeNameVersion="Version 1.000;DEV",
+    )
+    fontinfo_path = os.path.join(ufo_path, "fontinfo.plist")
+    os.utime(fontinfo_path, ns=(1000000000, 1000000000))
+    with UFOVersion(ufo_path) as uv:
+        uv.set_development_status()
+        uv.write_version_string()
+        assert uv.updated_fields == []
+    assert os.stat(fontinfo_path).st_mtime_ns == 1000000000
+
+
+def test_ufo_write_fontinfo_preserves_file_mode(tmp_path):
+    ufo_path = _make_ufo(tmp_path, "A.ufo", versionMajor=1, versionMinor=0)
+    fontinfo_path = os.path.join(ufo_path, "fontinfo.plist")
+    assert os.stat(fontinfo_path).st_mode & 0o777 == 0o644
+    for mode in (0o664, 0o600):
+        os.chmod(fontinfo_path, mode)
+        write_fontinfo(ufo_path, {"versionMajor": 2})
+        assert os.stat(fontinfo_path).st_mode & 0o777 == mode
+
+
+def test_ufo_write_propagate_unique_id(tmp_path):
+    ufo_path = _make_ufo(
+        tmp_path,
+        "A.ufo",
+        versionMajor=1,
+        versionMinor=10,
+        openTypeNameUniqueID="1.010;UKWN;Example-Regular",
+    )
+    with UFOVersion(ufo_path) as uv:
+        uv.propagate_version = True
+        uv.set_version_number("2.000")
+        uv.write_version_string()
+        assert (
+            "openTypeNameUniqueID",
+            "1.010;UKWN;Example-Regular",
+            "2.000;UKWN;Example-Regular",
+        ) in uv.updated_fields
+    assert read_fontinfo(ufo_path)["openTypeNameUniqueID"] == "2.000;UKWN;Example-Regular"
+
+
+def test_ufo_write_git_commit_sha1(tmp_path):
+    repo = Repo.init(str(tmp_path))
+    ufo_path = _make_ufo(tmp_path, "A.ufo", versionMajor=1, versionMinor=0)
+    repo.index.add([os.path.join("A.ufo", "fontinfo.plist")])
+    repo.index.commit("add source")
+    commit_sha1 = repo.head.commit.hexsha
+    with UFOVersion(ufo_path) as uv:
+        uv.set_state_git_commit_sha1(development=True)
+        uv.write_version_string()
+    assert read_fontinfo(ufo_path)["openTypeNameVersion"].startswith("Version 1.000;[")
+    with UFOVersion(ufo_path) as uv:
+        assert uv.is_development is True
+        assert len(uv.state) >= 7
+        assert commit_sha1.startswith(uv.state)
+
+
+def test_ufo_verify(tmp_path):
+    ufo_path = _make_ufo(
+        tmp_path,
+        "A.ufo",
+        versionMajor=1,
+        versionMinor=0,
+        openTypeNameVersion="Version 1.000",
+    )
+    assert verify_ufo_version(ufo_path, "Version 1.000", 1.0) == []
+    mismatches = verify_ufo_version(ufo_path, "Version 2.000", 2.0)
+    assert mismatches == [
+        "openTypeNameVersion is 'Version 1.000', expected 'Version 2.000'",
+        "versionMajor.versionMinor is 1.000, expected 2.000",
+    ]
+
+
+def test_ufo_designspace_sources(tmp_path):
+    regular = _make_ufo(tmp_path, "Example-Regular.ufo", versionMajor=1, versionMinor=0)
+    bold = _make_ufo(tmp_path, "Example-Bold.ufo", versionMajor=1, versionMinor=1)
+    designspace_path = _make_designspace(
+        tmp_path, ["Example-Regular.ufo", "Example-Bold.ufo", "Example-Regular.ufo"]
+    )
+    assert read_designspace_sources(designspace_path) == [regular, bold]
+    assert get_ufo_paths([designspace_path, bold + "/"]) == [regular, bold]
+
+    reports = read_ufo_reports(designspace_path)
+    assert [report.fontpath for report in reports] == [regular, bold]
+    assert [report.version_string for report in reports] == [
+        "Version 1.000",
+        "Version 1.001",
+    ]
+
+
+def test_ufo_is_ufo_source_path():
+    assert is_ufo_source_path("Example-Regular.ufo") is True
+    assert is_ufo_source_path("sources/Example-Regular.UFO/") is True
+    assert is_ufo_source_path("Example.designspace") is True
+    assert is_ufo_source_path("Example-Regular.ttf") is False
+
+
+def test_ufo_get_default_version_string():
+    assert get_default_version_string(1, 10) == "Version 1.010"
+    assert get_default_version_string(12, 345) == "Version 12.345"
+
+
+def test_ufo_lock_fontinfo(tmp_path):
+    ufo_path = _make_ufo(tmp_path, "A.ufo", versionMajor=1, versionMinor=0)
+    with UFOVersion(ufo_path, lock=LOCK_NOWAIT) as uv:
+        assert uv.lock.fontpath == os.path.join(ufo_path, "fontinfo.plist")
+        with pytest.raises(FontLockedError):
+            UFOVersion(ufo_path, lock=LOCK_NOWAIT)
+        uv.set_version_number("2.000")
+        uv.write_version_string()
+    assert uv.lock.is_locked is False
+    assert read_fontinfo(ufo_path)["versionMajor"] == 2
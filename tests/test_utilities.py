@@ -5,7 +5,14 @@ import os
 
 import pytest
 
-from fontv.utilities import file_exists, dir_exists, get_git_root_path, is_font
+from fontv.utilities import (
+    file_exists,
+    dir_exists,
+    get_font_flavor,
+    get_git_root_path,
+    is_font,
+    sniff_font_flavor,
+)
 
 
 def test_utilities_file_exists_function_passes():
@@ -88,3 +95,39 @@ def test_utilities_is_font_badpath_bad_extension():
 
 def test_utilities_is_font_badpath_too_short():
     assert is_font(".ttf") is False
+
+
+@pytest.mark.parametrize(
+    "data, flavor",
+    [
+        (b"\x00\x01\x00\x00\x00\x10" + b"\x00" * 6, "ttf"),
+        (b"true\x00\x10" + b"\x00" * 6, "ttf"),
+        (b"OTTO\x00\x0c" + b"\x00" * 6, "otf"),
+        (b"ttcf\x00\x01\x00\x00\x00\x00\x00\x02", "ttc"),
+        (b"wOFFOTTO" + b"\x00" * 4, "woff"),
+        (b"wOF2\x00\x01\x00\x00" + b"\x00" * 4, "woff2"),
+    ],
+)
+def test_utilities_sniff_font_flavor(data, flavor):
+    assert sniff_font_flavor(data) == flavor
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"OTTO",
+        b"GIF89a" + b"\x00" * 6,
+        b"OTTO\x00\x00" + b"\x00" * 6,
+        b"wOFFGIF8" + b"\x00" * 4,
+        b"ttcf\x00\x01\x00\x00\x00\x00\x00\x00",
+    ],
+)
+def test_utilities_sniff_font_flavor_not_font(data):
+    assert sniff_font_flavor(data) is None
+
+
+def test_utilities_get_font_flavor():
+    assert get_font_flavor("tests/testfiles/Hack-Regular.ttf") == "ttf"
+    assert get_font_flavor("tests/testfiles/Test-VersionOnly.otf") == "otf"
+    assert get_font_flavor("tests/testfiles/HACK_LICENSE.md") is None
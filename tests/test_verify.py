@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import struct
+
+from fontTools.ttLib import TTFont
+
+from fontv.libfv import FontVersion
+from fontv.sfnt import SFNT_HEADER_SIZE, parse_sfnt_header, parse_table_directory
+from fontv.verify import verify_font_version
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+
+def _write(tmp_path, name, version_string, head_fontRevision, in_place=True):
+    fontpath = str(tmp_path / name)
+    shutil.copy(os.path.join(testfiles_dir, name), fontpath)
+    with FontVersion(fontpath) as fv:
+        fv.set_version_string(version_string)
+        fv.head_fontRevision = head_fontRevision
+        fv.write_version_string(in_place=in_place)
+    return fontpath
+
+
+def _get_table_record(fontpath, tag):
+    with open(fontpath, "rb") as f:
+        data = f.read()
+    num_tables = parse_sfnt_header(data)[1]
+    return parse_table_directory(data[SFNT_HEADER_SIZE:], num_tables)[tag]
+
+
+def _overwrite(fontpath, offset, data):
+    with open(fontpath, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def test_verify_in_place_write(tmp_path):
+    fontpath = _write(tmp_path, "Test-VersionSha.ttf", "Version 1.010;[7654321]", 1.010)
+    assert verify_font_version(fontpath, "Version 1.010;[7654321]", 1.010) == []
+
+
+def test_verify_full_write_ttf_and_otf(tmp_path):
+    for name in ("Test-VersionOnly.ttf", "Test-VersionOnly.otf"):
+        fontpath = _write(tmp_path, name, "Version 2.000;RELEASE", 2.0, in_place=False)
+        assert verify_font_version(fontpath, "Version 2.000;RELEASE", 2.0) == []
+
+
+def test_verify_bytes_and_stream(tmp_path):
+    fontpath = _write(tmp_path, "Test-VersionOnly.ttf", "Version 2.000", 2.0)
+    with open(fontpath, "rb") as f:
+        data = f.read()
+    assert verify_font_version(data, "Version 2.000", 2.0) == []
+    assert verify_font_version(io.BytesIO(data), "Version 2.000", 2.0) == []
+
+
+def test_verify_version_mismatches(tmp_path):
+    fontpath = _write(tmp_path, "Test-VersionOnly.ttf", "Version 2.000", 2.0)
+    mismatches = verify_font_version(fontpath, "Version 2.001", 2.001)
+    assert "head.fontRevision is 2.000, expected 2.001" in mismatches
+    assert "nameID 5 record (3, 1, 1033) is 'Version 2.000', expected 'Version 2.001'" in mismatches
+
+
+def test_verify_name_table_checksum_mismatch(tmp_path):
+    fontpath = _write(tmp_path, "Test-VersionOnly.ttf", "Version 2.000", 2.0)
+    record = _get_table_record(fontpath, "name")
+    # the last byte of the name table is string data that is not a nameID 5 record
+    _overwrite(fontpath, record.offset + record.length - 1, b"\xff")
+    mismatches = verify_font_version(fontpath, "Version 2.000", 2.0)
+    assert "name table checksum mismatch" in mismatches
+
+
+def test_verify_checksum_adjustment_mismatch(tmp_path):
+    fontpath = _write(tmp_path, "Test-VersionOnly.ttf", "Version 2.000", 2.0)
+    record = _get_table_record(fontpath, "head")
+    _overwrite(fontpath, record.offset + 8, struct.pack(">L", 0))
+    assert verify_font_version(fontpath, "Version 2.000", 2.0) == [
+        "head.checkSumAdjustment mismatch"
+    ]
+
+
+def test_verify_head_table_checksum_mismatch(tmp_path):
+    fontpath = _write(tmp_path, "Test-VersionOnly.ttf", "Version 2.000", 2.0)
+    record = _get_table_record(fontpath, "head")
+    # head.fontRevision changed without a checksum update
+    _overwrite(fontpath, record.offset + 4, struct.pack(">l", 0x00030000))
+    mismatches = verify_font_version(fontpath, "Version 2.000", 2.0)
+    assert "head table checksum mismatch" in mismatches
+    assert "head.fontRevision is 3.000, expected 2.000" in mismatches
+
+
+def test_verify_truncated_font(tmp_path):
+    fontpath = _write(tmp_path, "Test-VersionOnly.ttf", "Version 2.000", 2.0)
+    with open(fontpath, "rb") as f:
+        data = f.read()
+    assert verify_font_version(data[:8], "Version 2.000", 2.0)[0].startswith(
+        "unable to read the sfnt table directory"
+    )
+    record = _get_table_record(fontpath, "name")
+    assert "the name table is truncated" in verify_font_version(
+        data[: record.offset + 10], "Version 2.000", 2.0
+    )
+
+
+def test_verify_woff(tmp_path):
+    ttf = TTFont(os.path.join(testfiles_dir, "Test-VersionOnly.ttf"))
+    ttf.flavor = "woff"
+    fontbuffer = io.BytesIO()
+    ttf.save(fontbuffer)
+    assert verify_font_version(fontbuffer, "Version 1.010", 1.010) == []
+    assert verify_font_version(fontbuffer, "Version 2.000", 1.010) == [
+        "nameID 5 record (3, 1, 1033) is 'Version 1.010', expected 'Version 2.000'"
+    ]
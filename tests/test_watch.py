@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from fontv.libfv import FontVersion
+from fontv.report import read_font_reports
+from fontv.watch import (
+    ADDED,
+    CHANGED,
+    ERROR,
+    REMOVED,
+    FontWatcher,
+    is_inotify_available,
+)
+
+testfiles_dir = os.path.join("tests", "testfiles")
+
+backends = [False]
+if is_inotify_available():
+    backends.append(True)
+
+
+def _copy_font(dirpath, name, target_name):
+    fontpath = os.path.join(str(dirpath), target_name)
+    shutil.copy(os.path.join(testfiles_dir, name), fontpath)
+    return fontpath
+
+
+def _write_release(fontpath):
+    with FontVersion(fontpath) as fv:
+        fv.set_release_status()
+        fv.write_version_string()
+
+
+def test_watch_scan(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionOnly.ttf", "A.ttf")
+    _copy_font(tmp_path, "test.txt", "notes.txt")
+    with FontWatcher(str(tmp_path), use_inotify=False) as watcher:
+        changes = watcher.scan()
+        assert [(change.change, change.fontpath) for change in changes] == [(ADDED, fontpath)]
+        assert str(changes[0]) == "[+] " + fontpath + ": Version 1.010"
+        assert list(watcher.fonts.keys()) == [fontpath]
+
+
+def test_watch_update_parses_only_changed_files(tmp_path, monkeypatch):
+    fontpaths = [
+        _copy_font(tmp_path, "Test-VersionOnly.ttf", "A.ttf"),
+        _copy_font(tmp_path, "Test-VersionOnly.ttf", "B.ttf"),
+    ]
+    with FontWatcher(str(tmp_path), use_inotify=False) as watcher:
+        watcher.scan()
+        parsed = []
+
+        def record_read(path):
+            parsed.append(path)
+            return read_font_reports(path)
+
+        monkeypatch.setattr("fontv.watch.read_font_reports", record_read)
+        _write_release(fontpaths[0])
+        changes = watcher.update(fontpaths)
+        assert parsed == [fontpaths[0]]
+        assert [change.change for change in changes] == [CHANGED]
+        assert str(changes[0]) == (
+            "[~] "
+            + fontpaths[0]
+            + ": Version 1.010 → Version 1.010;RELEASE | head.fontRevision 1.010 → 1.010"
+        )
+
+
+def test_watch_update_unchanged_version_data_is_not_reported(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionOnly.ttf", "A.ttf")
+    with FontWatcher(str(tmp_path), use_inotify=False) as watcher:
+        watcher.scan()
+        # a rebuild with the same version data
+        os.remove(fontpath)
+        _copy_font(tmp_path, "Test-VersionOnly.ttf", "A.ttf")
+        os.utime(fontpath, ns=(0, 0))
+        assert watcher.update([fontpath]) == []
+
+
+def test_watch_update_removed_and_error(tmp_path):
+    fontpath = _copy_font(tmp_path, "Test-VersionOnly.ttf", "A.ttf")
+    with FontWatcher(str(tmp_path), use_inotify=False) as watcher:
+        watcher.scan()
+        with open(fontpath, "wb") as f:
+            f.write(b"\0\1\0\0")
+        changes = watcher.update([fontpath])
+        assert [change.change for change in changes] == [ERROR]
+        os.remove(fontpath)
+        changes = watcher.update([fontpath])
+        assert [change.change for change in changes] == [REMOVED]
+        assert str(changes[0]) == "[-] " + fontpath
+        assert watcher.fonts == {}
+
+
+@pytest.mark.parametrize("use_inotify", backends)
+def test_watch_wait_for_changes_debounces_bursts(tmp_path, use_inotify):
+    fontpath = _copy_font(tmp_path, "Test-VersionOnly.ttf", "A.ttf")
+    subdir = tmp_path / "sub"
+    with FontWatcher(
+        str(tmp_path), debounce=0.3, poll_interval=0.02, use_inotify=use_inotify
+    ) as watcher:
+        watcher.scan()
+
+        def build():
+            for _ in range(3):
+                time.sleep(0.05)
+                _write_release(fontpath)
+            os.makedirs(str(subdir))
+            _copy_font(subdir, "Test-VersionDEV.otf", "B.otf")
+
+        builder = threading.Thread(target=build)
+        builder.start()
+        paths = watcher.wait_for_changes(timeout=5)
+        builder.join()
+        newpath = os.path.join(str(subdir), "B.otf")
+        assert {fontpath, newpath} <= paths
+        changes = watcher.update(paths)
+        assert [(change.change, change.fontpath) for change in changes] == [
+            (CHANGED, fontpath),
+            (ADDED, newpath),
+        ]
+        assert watcher.wait_for_changes(timeout=0.1) == set()